@@ -7,12 +7,69 @@ from __future__ import annotations
 
 import logging
 import os
+from collections import OrderedDict
 from typing import Any
 
 import requests
 
+from clients.http_session import get_shared_session
+
 logger = logging.getLogger(__name__)
 
+# 条件付きリクエスト用ETagキャッシュの最大エントリ数
+ETAG_CACHE_MAX_ENTRIES = 256
+HTTP_NOT_MODIFIED = 304
+HTTP_NOT_FOUND = 404
+
+# GraphQLで1クエリにまとめて取得するIssue/Pull Requestの最大数
+GRAPHQL_BATCH_SIZE = 20
+# GraphQLの状態値とREST APIの状態値の対応
+GRAPHQL_STATE_MAP = {"OPEN": "open", "CLOSED": "closed", "MERGED": "closed"}
+# タスクの取得に必要なフィールド(コメント・レビューは1クエリに収まる件数まで取得する)
+GRAPHQL_TASK_FRAGMENT = """
+fragment ActorFields on Actor { __typename login }
+fragment CommentFields on Comment {
+  author { ...ActorFields }
+  body
+  createdAt
+  updatedAt
+}
+fragment TaskFields on IssueOrPullRequest {
+  __typename
+  ... on Issue {
+    number title body state createdAt updatedAt
+    author { ...ActorFields }
+    labels(first: 100) { nodes { name } }
+    assignees(first: 50) { nodes { login } }
+    comments(first: 100) { pageInfo { hasNextPage } nodes { databaseId ...CommentFields } }
+  }
+  ... on PullRequest {
+    number title body state createdAt updatedAt
+    headRefName headRefOid baseRefName
+    author { ...ActorFields }
+    labels(first: 100) { nodes { name } }
+    assignees(first: 50) { nodes { login } }
+    reviewRequests(first: 20) { nodes { requestedReviewer { ... on User { login } } } }
+    comments(first: 100) { pageInfo { hasNextPage } nodes { databaseId ...CommentFields } }
+    reviews(first: 50) {
+      pageInfo { hasNextPage }
+      nodes {
+        databaseId body state submittedAt
+        author { ...ActorFields }
+        comments(first: 50) {
+          pageInfo { hasNextPage }
+          nodes { databaseId path line ...CommentFields }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+class GitHubGraphQLError(requests.exceptions.RequestException):
+    """GraphQL APIがエラーを返し、データを取得できなかった場合の例外."""
+
 
 class GithubClient:
     """GitHub APIクライアント.
@@ -46,6 +103,14 @@ class GithubClient:
             "Accept": "application/vnd.github+json",
         }
 
+        # 接続プーリング・レート制限追従の共有セッション(同じトークンのクライアント間で共有)
+        self.session = get_shared_session(self.api_url, self.token)
+
+        # 条件付きリクエスト(If-None-Match)用のETagキャッシュ
+        # キー: URL+クエリパラメータ、値: (ETag, レスポンスボディ)
+        self._etag_cache: OrderedDict[str, tuple[str, Any]] = OrderedDict()
+        self.not_modified_count = 0
+
     def get_pull_request_labels(self, owner: str, repo: str, pull_number: int) -> list[str]:
         """指定したPull Requestのラベル一覧を取得する.
 
@@ -65,7 +130,7 @@ class GithubClient:
         url = f"{self.api_url}/repos/{owner}/{repo}/issues/{pull_number}"
 
         # APIリクエストの実行
-        response = requests.get(url, headers=self.headers, timeout=30)
+        response = self.session.get(url, headers=self.headers, timeout=30)
         response.raise_for_status()
 
         # レスポンスからラベル名を抽出
@@ -153,19 +218,19 @@ class GithubClient:
         # デフォルトブランチのSHAを取得
         if sha is None:
             repo_info_url = f"{self.api_url}/repos/{owner}/{repo}"
-            repo_response = requests.get(repo_info_url, headers=self.headers, timeout=30)
+            repo_response = self.session.get(repo_info_url, headers=self.headers, timeout=30)
             repo_response.raise_for_status()
             default_branch = repo_response.json()["default_branch"]
 
             branch_url = f"{self.api_url}/repos/{owner}/{repo}/git/ref/heads/{default_branch}"
-            branch_response = requests.get(branch_url, headers=self.headers, timeout=30)
+            branch_response = self.session.get(branch_url, headers=self.headers, timeout=30)
             branch_response.raise_for_status()
             sha = branch_response.json()["object"]["sha"]
 
         # ブランチを作成
         url = f"{self.api_url}/repos/{owner}/{repo}/git/refs"
         data = {"ref": f"refs/heads/{branch}", "sha": sha}
-        response = requests.post(url, headers=self.headers, json=data, timeout=30)
+        response = self.session.post(url, headers=self.headers, json=data, timeout=30)
         response.raise_for_status()
         return response.json()
 
@@ -206,7 +271,7 @@ class GithubClient:
         if sha:
             data["sha"] = sha
 
-        response = requests.put(url, headers=self.headers, json=data, timeout=30)
+        response = self.session.put(url, headers=self.headers, json=data, timeout=30)
         response.raise_for_status()
         return response.json()
 
@@ -243,7 +308,7 @@ class GithubClient:
             "base": base,
             "draft": draft,
         }
-        response = requests.post(url, headers=self.headers, json=data, timeout=30)
+        response = self.session.post(url, headers=self.headers, json=data, timeout=30)
         response.raise_for_status()
         return response.json()
 
@@ -275,7 +340,7 @@ class GithubClient:
         if body is not None:
             data["body"] = body
 
-        response = requests.patch(url, headers=self.headers, json=data, timeout=30)
+        response = self.session.patch(url, headers=self.headers, json=data, timeout=30)
         response.raise_for_status()
         return response.json()
 
@@ -301,7 +366,7 @@ class GithubClient:
         url = f"{self.api_url}/repos/{owner}/{repo}/pulls/{pull_number}/requested_reviewers"
         data = {"reviewers": reviewers}
 
-        response = requests.post(url, headers=self.headers, json=data, timeout=30)
+        response = self.session.post(url, headers=self.headers, json=data, timeout=30)
         response.raise_for_status()
         return response.json()
 
@@ -322,7 +387,7 @@ class GithubClient:
         """
         url = f"{self.api_url}/repos/{owner}/{repo}/issues/{issue_number}/labels"
         data = {"labels": labels}
-        response = requests.post(url, headers=self.headers, json=data, timeout=30)
+        response = self.session.post(url, headers=self.headers, json=data, timeout=30)
         response.raise_for_status()
         return response.json()
 
@@ -354,7 +419,7 @@ class GithubClient:
         if labels:
             data["labels"] = labels
 
-        response = requests.patch(url, headers=self.headers, json=data, timeout=30)
+        response = self.session.patch(url, headers=self.headers, json=data, timeout=30)
         response.raise_for_status()
         return response.json()
 
@@ -370,7 +435,7 @@ class GithubClient:
 
         """
         url = f"{self.api_url}/repos/{owner}/{repo}/git/refs/heads/{branch}"
-        response = requests.delete(url, headers=self.headers, timeout=30)
+        response = self.session.delete(url, headers=self.headers, timeout=30)
         response.raise_for_status()
 
     def add_comment_to_pull_request(
@@ -396,7 +461,7 @@ class GithubClient:
         data = {"body": body}
 
         # コメントを投稿
-        response = requests.post(url, headers=self.headers, json=data, timeout=30)
+        response = self.session.post(url, headers=self.headers, json=data, timeout=30)
         response.raise_for_status()
 
         return response.json()
@@ -424,7 +489,7 @@ class GithubClient:
         data = {"body": body}
 
         # コメントを更新
-        response = requests.patch(url, headers=self.headers, json=data, timeout=30)
+        response = self.session.patch(url, headers=self.headers, json=data, timeout=30)
         response.raise_for_status()
 
         return response.json()
@@ -473,7 +538,7 @@ class GithubClient:
         data = labels
 
         # ラベルを更新
-        response = requests.put(url, headers=self.headers, json=data, timeout=30)
+        response = self.session.put(url, headers=self.headers, json=data, timeout=30)
         response.raise_for_status()
         return response.json()
 
@@ -500,7 +565,7 @@ class GithubClient:
         data = labels
 
         # ラベルを更新
-        response = requests.put(url, headers=self.headers, json=data, timeout=30)
+        response = self.session.put(url, headers=self.headers, json=data, timeout=30)
         response.raise_for_status()
         return response.json()
 
@@ -538,10 +603,26 @@ class GithubClient:
         # 不要なURLフィールドを削除
         issue_comments = [self.remove_url_fields(c) for c in issue_comments_raw]
 
+        return self.merge_pull_request_comments(review_comments, issue_comments)
+
+    @staticmethod
+    def merge_pull_request_comments(
+        reviews: list[dict[str, Any]], issue_comments: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """レビューとIssueコメントを種別を付けてマージし、時系列順に並べる.
+
+        Args:
+            reviews: コメントが紐づけられたレビューのリスト
+            issue_comments: Issueコメント(タイムラインコメント)のリスト
+
+        Returns:
+            時系列順にソートされたコメントのリスト
+
+        """
         # レビューコメントとIssueコメントをマージして時系列ソート
         merged = [
             {**r, "type": "review", "sort_key": r.get("submitted_at")}
-            for r in review_comments
+            for r in reviews
         ] + [
             {**c, "type": "issue_comment", "sort_key": c.get("created_at")}
             for c in issue_comments
@@ -654,7 +735,7 @@ class GithubClient:
         headers = self.headers.copy()
 
         # Pull Request情報を取得
-        resp = requests.get(url, headers=headers, timeout=30)
+        resp = self.session.get(url, headers=headers, timeout=30)
         resp.raise_for_status()
         pr = resp.json()
 
@@ -664,6 +745,265 @@ class GithubClient:
 
         return pr
 
+    def get_commit_sha(self, owner: str, repo: str, ref: str = "HEAD") -> str:
+        """ブランチ・タグなどの参照が指すコミットSHAを取得する.
+
+        Args:
+            owner: リポジトリのオーナー名
+            repo: リポジトリ名
+            ref: 参照(デフォルト: HEAD = デフォルトブランチ)
+
+        Returns:
+            コミットSHA
+
+        Raises:
+            requests.HTTPError: APIリクエストが失敗した場合
+
+        """
+        url = f"{self.api_url}/repos/{owner}/{repo}/commits/{ref}"
+        # shaメディアタイプを指定するとコミット本体を返さずSHAのみを返す
+        headers = {**self.headers, "Accept": "application/vnd.github.sha"}
+        resp = self.session.get(url, headers=headers, timeout=30)
+        resp.raise_for_status()
+        return resp.text.strip()
+
+    def get_file_content(self, owner: str, repo: str, path: str, ref: str | None = None) -> str | None:
+        """リポジトリ内のファイルの内容をテキストで取得する.
+
+        Args:
+            owner: リポジトリのオーナー名
+            repo: リポジトリ名
+            path: リポジトリ内のファイルパス
+            ref: ブランチ・タグ・コミットSHA(Noneの場合はデフォルトブランチ)
+
+        Returns:
+            ファイル内容。ファイルが存在しない場合はNone
+
+        Raises:
+            requests.HTTPError: APIリクエストが失敗した場合(404以外)
+
+        """
+        url = f"{self.api_url}/repos/{owner}/{repo}/contents/{path}"
+        # rawメディアタイプを指定するとBase64エンコードされていない内容を返す
+        headers = {**self.headers, "Accept": "application/vnd.github.raw"}
+        params = {"ref": ref} if ref else None
+        resp = self.session.get(url, headers=headers, params=params, timeout=30)
+        if resp.status_code == HTTP_NOT_FOUND:
+            return None
+        resp.raise_for_status()
+        return resp.content.decode("utf-8", errors="replace")
+
+    def get_git_tree(self, owner: str, repo: str, tree_sha: str) -> dict[str, Any]:
+        """Gitツリーを再帰的に1リクエストで取得する.
+
+        Args:
+            owner: リポジトリのオーナー名
+            repo: リポジトリ名
+            tree_sha: ツリーまたはコミットのSHA
+
+        Returns:
+            {"sha", "tree": [{"path", "type", ...}], "truncated"} 形式の辞書。
+            エントリ数が上限を超えた場合は truncated が True になる
+
+        Raises:
+            requests.HTTPError: APIリクエストが失敗した場合
+
+        """
+        url = f"{self.api_url}/repos/{owner}/{repo}/git/trees/{tree_sha}"
+        resp = self.session.get(url, headers=self.headers, params={"recursive": 1}, timeout=60)
+        resp.raise_for_status()
+        return resp.json()
+
+    def get_comment_change_marker(
+        self, owner: str, repo: str, number: int, *, pull_request: bool = False,
+    ) -> str:
+        """Issue/Pull Requestのコメント変更検知用マーカーを取得する.
+
+        更新日時とコメント数から生成します。ETagによる条件付きリクエストを使用するため、
+        変更がない場合は304応答となりレート制限を消費しません。
+
+        Args:
+            owner: リポジトリのオーナー名
+            repo: リポジトリ名
+            number: Issue/Pull Request番号
+            pull_request: Pull Requestの場合True(レビューコメント数も含める)
+
+        Returns:
+            変更検知用マーカー
+
+        Raises:
+            requests.HTTPError: APIリクエストが失敗した場合
+
+        """
+        kind = "pulls" if pull_request else "issues"
+        data = self._conditional_get(f"{self.api_url}/repos/{owner}/{repo}/{kind}/{number}", {})
+        marker = f"{data.get('updated_at')}:{data.get('comments')}"
+        if pull_request:
+            marker += f":{data.get('review_comments')}"
+        return marker
+
+    def graphql(self, query: str, variables: dict[str, Any] | None = None) -> dict[str, Any]:
+        """GitHub GraphQL APIにクエリを送信する.
+
+        Args:
+            query: GraphQLクエリ
+            variables: クエリ変数
+
+        Returns:
+            レスポンスのdata部分(エラーで取得できなかったフィールドはNone)
+
+        Raises:
+            requests.HTTPError: APIリクエストが失敗した場合
+            GitHubGraphQLError: エラーが返され、dataが空だった場合
+
+        """
+        response = self.session.post(
+            self.graphql_url,
+            headers=self.headers,
+            json={"query": query, "variables": variables or {}},
+            timeout=30,
+        )
+        response.raise_for_status()
+        body = response.json()
+        data = body.get("data")
+        if body.get("errors"):
+            # レート制限・SAML・スコープ不足などはHTTP 200でdataがnullになるため例外にする
+            if not data:
+                msg = f"GitHub GraphQL API returned errors: {body['errors']}"
+                raise GitHubGraphQLError(msg)
+            # 存在しないIssue/PRなどは部分的なエラーとして返るためログのみ出力する
+            logger.warning("GitHub GraphQL API returned errors: %s", body["errors"])
+        return data or {}
+
+    @property
+    def graphql_url(self) -> str:
+        """GraphQL APIのエンドポイントURL(GitHub Enterpriseの /api/v3 にも対応)."""
+        base = self.api_url.rstrip("/")
+        if base.endswith("/api/v3"):
+            return base[: -len("/v3")] + "/graphql"
+        return f"{base}/graphql"
+
+    def get_issues_and_pull_requests(
+        self, keys: list[tuple[str, str, int]],
+    ) -> dict[tuple[str, str, int], dict[str, Any]]:
+        """複数のIssue/Pull RequestをGraphQLでまとめて取得する.
+
+        ラベル・アサイン・コメント・レビュー(レビューコメント付き)を1クエリで取得し、
+        REST APIと同じ形式の辞書に変換して返します。コメントが1回のクエリに
+        収まらなかった場合、prefetched_commentsはNoneになります。
+
+        Args:
+            keys: (オーナー名, リポジトリ名, 番号) のリスト
+
+        Returns:
+            キーごとのIssue/Pull Request情報(見つからなかったものは含まれない)
+
+        Raises:
+            requests.HTTPError: APIリクエストが失敗した場合
+
+        """
+        results: dict[tuple[str, str, int], dict[str, Any]] = {}
+        for start in range(0, len(keys), GRAPHQL_BATCH_SIZE):
+            batch = keys[start:start + GRAPHQL_BATCH_SIZE]
+            variable_defs = []
+            selections = []
+            variables: dict[str, Any] = {}
+            for i, (owner, repo, number) in enumerate(batch):
+                variable_defs.append(f"$owner{i}: String!, $repo{i}: String!, $number{i}: Int!")
+                selections.append(
+                    f"item{i}: repository(owner: $owner{i}, name: $repo{i}) "
+                    f"{{ issueOrPullRequest(number: $number{i}) {{ ...TaskFields }} }}"
+                )
+                variables.update({f"owner{i}": owner, f"repo{i}": repo, f"number{i}": number})
+
+            query = (
+                f"query({', '.join(variable_defs)}) {{ {' '.join(selections)} }}\n"
+                f"{GRAPHQL_TASK_FRAGMENT}"
+            )
+            data = self.graphql(query, variables)
+            for i, key in enumerate(batch):
+                node = (data.get(f"item{i}") or {}).get("issueOrPullRequest")
+                if node:
+                    results[key] = self._convert_graphql_task(key[0], key[1], node)
+        return results
+
+    def _convert_graphql_task(self, owner: str, repo: str, node: dict[str, Any]) -> dict[str, Any]:
+        """GraphQLのIssue/Pull RequestノードをREST API形式の辞書に変換する."""
+
+        def login(actor: dict[str, Any] | None) -> dict[str, Any]:
+            # GraphQLのBotのloginには"[bot]"が付かないため、REST APIと同じ形式にする
+            actor = actor or {}
+            name = actor.get("login", "")
+            if actor.get("__typename") == "Bot" and name and not name.endswith("[bot]"):
+                name += "[bot]"
+            return {"login": name}
+
+        def convert_comment(comment: dict[str, Any]) -> dict[str, Any]:
+            return {
+                "id": comment.get("databaseId"),
+                "user": login(comment.get("author")),
+                "body": comment.get("body", ""),
+                "created_at": comment.get("createdAt"),
+                "updated_at": comment.get("updatedAt"),
+            }
+
+        comments = node.get("comments") or {}
+        complete = not comments.get("pageInfo", {}).get("hasNextPage", False)
+        issue_comments = [convert_comment(c) for c in comments.get("nodes", [])]
+
+        item: dict[str, Any] = {
+            "number": node["number"],
+            "title": node.get("title", ""),
+            "body": node.get("body", ""),
+            "state": GRAPHQL_STATE_MAP.get(node.get("state", ""), "open"),
+            "user": login(node.get("author")),
+            "labels": [{"name": n["name"]} for n in (node.get("labels") or {}).get("nodes", [])],
+            "assignees": [login(n) for n in (node.get("assignees") or {}).get("nodes", [])],
+            "repository_url": f"{self.api_url}/repos/{owner}/{repo}",
+            "created_at": node.get("createdAt"),
+            "updated_at": node.get("updatedAt"),
+        }
+
+        if node.get("__typename") != "PullRequest":
+            item["prefetched_comments"] = issue_comments if complete else None
+            return item
+
+        item["pull_request"] = {}
+        item["head"] = {"ref": node.get("headRefName"), "sha": node.get("headRefOid")}
+        item["base"] = {"ref": node.get("baseRefName")}
+        item["requested_reviewers"] = [
+            login(n.get("requestedReviewer"))
+            for n in (node.get("reviewRequests") or {}).get("nodes", [])
+            if (n.get("requestedReviewer") or {}).get("login")
+        ]
+
+        reviews_connection = node.get("reviews") or {}
+        complete = complete and not reviews_connection.get("pageInfo", {}).get("hasNextPage", False)
+        reviews = []
+        for review in reviews_connection.get("nodes", []):
+            review_comments = review.get("comments") or {}
+            complete = complete and not review_comments.get("pageInfo", {}).get("hasNextPage", False)
+            reviews.append({
+                "id": review.get("databaseId"),
+                "user": login(review.get("author")),
+                "body": review.get("body", ""),
+                "state": review.get("state"),
+                "submitted_at": review.get("submittedAt"),
+                "comments": [
+                    {
+                        **convert_comment(c),
+                        "path": c.get("path"),
+                        "line": c.get("line"),
+                        "pull_request_review_id": review.get("databaseId"),
+                    }
+                    for c in review_comments.get("nodes", [])
+                ],
+            })
+        item["prefetched_comments"] = (
+            self.merge_pull_request_comments(reviews, issue_comments) if complete else None
+        )
+        return item
+
     def search_issues_and_prs(
         self,
         query: str,
@@ -768,7 +1108,7 @@ class GithubClient:
             page_params["page"] = page_number
 
             try:
-                response = requests.get(url, headers=self.headers, params=page_params, timeout=30)
+                response = self.session.get(url, headers=self.headers, params=page_params, timeout=30)
                 response.raise_for_status()
                 page_items = response.json()
             except requests.exceptions.RequestException as e:
@@ -815,9 +1155,7 @@ class GithubClient:
                 params["order"] = order
 
             try:
-                response = requests.get(url, headers=self.headers, params=params, timeout=30)
-                response.raise_for_status()
-                data = response.json()
+                data = self._conditional_get(url, params)
             except requests.exceptions.RequestException as e:
                 logger.error(
                     "GitHub Search API request failed: url=%s, params=%s, error=%s",
@@ -845,3 +1183,43 @@ class GithubClient:
             pages_fetched += 1
 
         return aggregated
+
+    def _conditional_get(self, url: str, params: dict[str, Any]) -> Any:
+        """ETagを用いた条件付きGETでJSONを取得する.
+
+        前回と同じURL・パラメータのリクエストにはIf-None-Matchを付与し、
+        304 Not Modifiedが返った場合はキャッシュ済みのレスポンスを返します。
+        GitHubでは304応答はレート制限のカウント対象外です。
+
+        Args:
+            url: リクエストURL
+            params: クエリパラメータ
+
+        Returns:
+            レスポンスのJSON
+
+        Raises:
+            requests.HTTPError: APIリクエストが失敗した場合
+
+        """
+        cache_key = f"{url}?{sorted(params.items())}"
+        cached = self._etag_cache.get(cache_key)
+        headers = self.headers.copy()
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+
+        response = self.session.get(url, headers=headers, params=params, timeout=30)
+        if response.status_code == HTTP_NOT_MODIFIED and cached is not None:
+            self.not_modified_count += 1
+            self._etag_cache.move_to_end(cache_key)
+            return cached[1]
+        response.raise_for_status()
+        payload = response.json()
+
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache[cache_key] = (etag, payload)
+            self._etag_cache.move_to_end(cache_key)
+            while len(self._etag_cache) > ETAG_CACHE_MAX_ENTRIES:
+                self._etag_cache.popitem(last=False)
+        return payload
@@ -2,12 +2,27 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
+from urllib.parse import quote
 
 import requests
 
+from clients.http_session import get_shared_session
+
 logger = logging.getLogger(__name__)
 
+# 条件付きリクエスト用ETagキャッシュの最大エントリ数
+ETAG_CACHE_MAX_ENTRIES = 256
+HTTP_NOT_MODIFIED = 304
+HTTP_NOT_FOUND = 404
+# X-Total-Pagesが分かる場合に残りページを並列取得する最大スレッド数
+PAGINATION_MAX_WORKERS = 4
+# ページングに使用するレスポンスヘッダー
+PAGINATION_HEADERS = ("X-Next-Page", "X-Total-Pages", "Link")
+
 
 class GitlabClient:
     def __init__(self, token: str, api_url: str = "https://gitlab.com/api/v4") -> None:
@@ -33,6 +48,15 @@ class GitlabClient:
             "Content-Type": "application/json",
         }
 
+        # 接続プーリング・レート制限追従の共有セッション(同じトークンのクライアント間で共有)
+        self.session = get_shared_session(self.api_url, self.token)
+
+        # 条件付きリクエスト(If-None-Match)用のETagキャッシュ
+        # キー: URL+クエリパラメータ、値: (ETag, レスポンスボディ, ページング関連ヘッダー)
+        self._etag_cache: OrderedDict[str, tuple[str, Any, dict[str, str]]] = OrderedDict()
+        self._etag_lock = threading.Lock()
+        self.not_modified_count = 0
+
     def list_issues(
         self,
         project_id: int | str,
@@ -62,7 +86,7 @@ class GitlabClient:
     ) -> dict[str, Any]:
         url = f"{self.api_url}/projects/{project_id}/issues/{issue_iid}/notes"
         data = {"body": body}
-        resp = requests.post(url, headers=self.headers, json=data, timeout=30)
+        resp = self.session.post(url, headers=self.headers, json=data, timeout=30)
         resp.raise_for_status()
         return resp.json()
 
@@ -82,7 +106,7 @@ class GitlabClient:
         """
         url = f"{self.api_url}/projects/{project_id}/issues/{issue_iid}/notes/{note_id}"
         data = {"body": body}
-        resp = requests.put(url, headers=self.headers, json=data, timeout=30)
+        resp = self.session.put(url, headers=self.headers, json=data, timeout=30)
         resp.raise_for_status()
         return resp.json()
 
@@ -91,7 +115,7 @@ class GitlabClient:
     ) -> dict[str, Any]:
         url = f"{self.api_url}/projects/{project_id}/issues/{issue_iid}"
         data = {"labels": ",".join(labels)}
-        resp = requests.put(url, headers=self.headers, json=data, timeout=30)
+        resp = self.session.put(url, headers=self.headers, json=data, timeout=30)
         resp.raise_for_status()
         return resp.json()
 
@@ -105,7 +129,7 @@ class GitlabClient:
             Project information including path_with_namespace
         """
         url = f"{self.api_url}/projects/{project_id}"
-        resp = requests.get(url, headers=self.headers, timeout=30)
+        resp = self.session.get(url, headers=self.headers, timeout=30)
         resp.raise_for_status()
         return resp.json()
 
@@ -141,7 +165,7 @@ class GitlabClient:
     ) -> dict[str, Any]:
         url = f"{self.api_url}/projects/{project_id}/merge_requests/{merge_request_iid}/notes"
         data = {"body": body}
-        resp = requests.post(url, headers=self.headers, json=data, timeout=30)
+        resp = self.session.post(url, headers=self.headers, json=data, timeout=30)
         resp.raise_for_status()
         return resp.json()
 
@@ -161,7 +185,7 @@ class GitlabClient:
         """
         url = f"{self.api_url}/projects/{project_id}/merge_requests/{merge_request_iid}/notes/{note_id}"
         data = {"body": body}
-        resp = requests.put(url, headers=self.headers, json=data, timeout=30)
+        resp = self.session.put(url, headers=self.headers, json=data, timeout=30)
         resp.raise_for_status()
         return resp.json()
 
@@ -170,7 +194,7 @@ class GitlabClient:
     ) -> dict[str, Any]:
         url = f"{self.api_url}/projects/{project_id}/merge_requests/{merge_request_iid}"
         data = {"labels": ",".join(labels)}
-        resp = requests.put(url, headers=self.headers, json=data, timeout=30)
+        resp = self.session.put(url, headers=self.headers, json=data, timeout=30)
         resp.raise_for_status()
         return resp.json()
 
@@ -178,7 +202,7 @@ class GitlabClient:
         self, project_id: int | str, mr_iid: int | str,
     ) -> dict[str, Any]:
         url = f"{self.api_url}/projects/{project_id}/merge_requests/{mr_iid}"
-        resp = requests.get(url, headers=self.headers, timeout=30)
+        resp = self.session.get(url, headers=self.headers, timeout=30)
         resp.raise_for_status()
         return resp.json()
 
@@ -201,6 +225,77 @@ class GitlabClient:
         url = f"{self.api_url}/projects/{project_id}/repository/branches"
         return self._fetch_paginated_list(url, {}, per_page, max_pages)
 
+    def get_commit_sha(self, project_id: int | str, ref: str | None = None) -> str | None:
+        """Get the commit SHA that a ref points to.
+
+        Args:
+            project_id: Project ID
+            ref: Branch, tag or commit (default branch when None)
+
+        Returns:
+            Commit SHA, or None if the repository has no commits
+        """
+        url = f"{self.api_url}/projects/{project_id}/repository/commits"
+        params: dict[str, Any] = {"per_page": 1}
+        if ref:
+            params["ref_name"] = ref
+        resp = self.session.get(url, headers=self.headers, params=params, timeout=30)
+        resp.raise_for_status()
+        commits = resp.json()
+        if not commits:
+            return None
+        return commits[0]["id"]
+
+    def get_file_content(
+        self, project_id: int | str, file_path: str, ref: str | None = None,
+    ) -> str | None:
+        """Get the raw content of a repository file.
+
+        Args:
+            project_id: Project ID
+            file_path: File path in the repository
+            ref: Branch, tag or commit (default branch when None)
+
+        Returns:
+            File content, or None if the file does not exist
+        """
+        url = f"{self.api_url}/projects/{project_id}/repository/files/{quote(file_path, safe='')}/raw"
+        params = {"ref": ref} if ref else None
+        resp = self.session.get(url, headers=self.headers, params=params, timeout=30)
+        if resp.status_code == HTTP_NOT_FOUND:
+            return None
+        resp.raise_for_status()
+        return resp.content.decode("utf-8", errors="replace")
+
+    def list_repository_tree(
+        self,
+        project_id: int | str,
+        ref: str | None = None,
+        per_page: int = 100,
+        max_pages: int = 1000,
+    ) -> list[dict[str, Any]]:
+        """List the whole repository tree recursively.
+
+        Uses keyset pagination, following the ``Link`` header's next URL, so
+        large trees are not cut off by offset pagination limits. Servers that
+        ignore ``pagination=keyset`` return offset pagination headers; when
+        ``X-Total-Pages`` is present the remaining pages are fetched in parallel.
+
+        Args:
+            project_id: Project ID
+            ref: Branch, tag or commit (default branch when None)
+            per_page: Number of items per page
+            max_pages: Maximum number of pages to fetch
+
+        Returns:
+            List of tree entries ({"path", "type", ...})
+        """
+        url = f"{self.api_url}/projects/{project_id}/repository/tree"
+        params: dict[str, Any] = {"recursive": True}
+        if ref:
+            params["ref"] = ref
+        return self._fetch_paginated_list(url, params, per_page, max_pages, keyset=True)
+
     def get_user_by_username(
         self, username: str,
     ) -> dict[str, Any] | None:
@@ -214,7 +309,7 @@ class GitlabClient:
         """
         url = f"{self.api_url}/users"
         params = {"username": username}
-        resp = requests.get(url, headers=self.headers, params=params, timeout=30)
+        resp = self.session.get(url, headers=self.headers, params=params, timeout=30)
         resp.raise_for_status()
         users = resp.json()
         if isinstance(users, list) and len(users) > 0:
@@ -236,7 +331,7 @@ class GitlabClient:
         """
         url = f"{self.api_url}/projects/{project_id}/repository/branches"
         data = {"branch": branch_name, "ref": ref}
-        resp = requests.post(url, headers=self.headers, json=data, timeout=30)
+        resp = self.session.post(url, headers=self.headers, json=data, timeout=30)
         resp.raise_for_status()
         return resp.json()
 
@@ -265,7 +360,7 @@ class GitlabClient:
             "commit_message": commit_message,
             "actions": actions,
         }
-        resp = requests.post(url, headers=self.headers, json=data, timeout=30)
+        resp = self.session.post(url, headers=self.headers, json=data, timeout=30)
         resp.raise_for_status()
         return resp.json()
 
@@ -313,7 +408,7 @@ class GitlabClient:
             data["assignee_ids"] = assignee_ids
         if labels:
             data["labels"] = ",".join(labels)
-        resp = requests.post(url, headers=self.headers, json=data, timeout=30)
+        resp = self.session.post(url, headers=self.headers, json=data, timeout=30)
         resp.raise_for_status()
         return resp.json()
 
@@ -353,7 +448,7 @@ class GitlabClient:
             data["reviewer_ids"] = reviewer_ids
         if labels:
             data["labels"] = ",".join(labels)
-        resp = requests.put(url, headers=self.headers, json=data, timeout=30)
+        resp = self.session.put(url, headers=self.headers, json=data, timeout=30)
         resp.raise_for_status()
         return resp.json()
 
@@ -367,9 +462,114 @@ class GitlabClient:
             branch_name: Name of the branch to delete
         """
         url = f"{self.api_url}/projects/{project_id}/repository/branches/{branch_name}"
-        resp = requests.delete(url, headers=self.headers, timeout=30)
+        resp = self.session.delete(url, headers=self.headers, timeout=30)
         resp.raise_for_status()
 
+    def get_comment_change_marker(
+        self, project_id: int | str, iid: int | str, *, merge_request: bool = False,
+    ) -> str:
+        """Issue/Merge Requestのコメント変更検知用マーカーを取得する.
+
+        更新日時とユーザーコメント数(user_notes_count)から生成します。
+
+        Args:
+            project_id: プロジェクトID
+            iid: Issue/Merge RequestのIID
+            merge_request: Merge Requestの場合True
+
+        Returns:
+            変更検知用マーカー
+
+        Raises:
+            requests.HTTPError: APIリクエストが失敗した場合
+
+        """
+        kind = "merge_requests" if merge_request else "issues"
+        data, _ = self._conditional_get(f"{self.api_url}/projects/{project_id}/{kind}/{iid}", {})
+        return f"{data.get('updated_at')}:{data.get('user_notes_count')}"
+
+    def list_all_issues(
+        self,
+        labels: list[str] | None = None,
+        assignee_username: str | None = None,
+        updated_after: str | None = None,
+        search: str | None = None,
+        state: str = "opened",
+        per_page: int = 100,
+        max_pages: int = 200,
+    ) -> list[dict[str, Any]]:
+        """アクセス可能な全プロジェクトのIssueを条件付きで取得する.
+
+        ラベル・アサイン・更新日時の絞り込みはサーバー側で行います。
+        同一条件の再取得にはETagによる条件付きリクエストを使用します。
+
+        Args:
+            labels: 絞り込むラベル名のリスト(AND条件)
+            assignee_username: アサインされたユーザー名
+            updated_after: この日時(ISO 8601)以降に更新されたものに限定
+            search: タイトル・本文の検索文字列
+            state: Issueの状態
+            per_page: 1ページあたりの件数
+            max_pages: 最大ページ数
+
+        Returns:
+            Issue情報のリスト
+
+        """
+        url = f"{self.api_url}/issues"
+        params = self._build_list_filter_params(labels, assignee_username, updated_after, search, state)
+        return self._fetch_paginated_list(url, params, per_page, max_pages, use_etag=True)
+
+    def list_all_merge_requests(
+        self,
+        labels: list[str] | None = None,
+        assignee_username: str | None = None,
+        updated_after: str | None = None,
+        search: str | None = None,
+        state: str = "opened",
+        per_page: int = 100,
+        max_pages: int = 200,
+    ) -> list[dict[str, Any]]:
+        """アクセス可能な全プロジェクトのMerge Requestを条件付きで取得する.
+
+        Args:
+            labels: 絞り込むラベル名のリスト(AND条件)
+            assignee_username: アサインされたユーザー名
+            updated_after: この日時(ISO 8601)以降に更新されたものに限定
+            search: タイトル・本文の検索文字列
+            state: Merge Requestの状態
+            per_page: 1ページあたりの件数
+            max_pages: 最大ページ数
+
+        Returns:
+            Merge Request情報のリスト
+
+        """
+        url = f"{self.api_url}/merge_requests"
+        params = self._build_list_filter_params(labels, assignee_username, updated_after, search, state)
+        return self._fetch_paginated_list(url, params, per_page, max_pages, use_etag=True)
+
+    @staticmethod
+    def _build_list_filter_params(
+        labels: list[str] | None,
+        assignee_username: str | None,
+        updated_after: str | None,
+        search: str | None,
+        state: str,
+    ) -> dict[str, Any]:
+        """一覧APIのサーバー側フィルタ用クエリパラメータを組み立てる."""
+        # scopeのデフォルトはcreated_by_meのため明示的にallを指定する
+        params: dict[str, Any] = {"scope": "all", "state": state, "order_by": "updated_at"}
+        if labels:
+            params["labels"] = ",".join(labels)
+        if assignee_username:
+            params["assignee_username"] = assignee_username
+        if updated_after:
+            params["updated_after"] = updated_after
+        if search:
+            params["search"] = search
+        return params
+
     def search_issues(
         self,
         query: str,
@@ -400,54 +600,236 @@ class GitlabClient:
         params: dict[str, Any],
         per_page: int,
         max_pages: int,
+        *,
+        use_etag: bool = False,
+        keyset: bool = False,
     ) -> list[dict[str, Any]]:
-        """GitLab APIからページング結果を全件取得するヘルパー."""
-        items: list[dict[str, Any]] = []
-        page: int = 1
-        visited_pages: set[int] = set()
+        """GitLab APIからページング結果を全件取得するヘルパー.
+
+        1ページ目の応答にX-Total-Pagesヘッダーがある場合は、残りのページを
+        並列に取得します。ヘッダーがない場合(件数が多い場合など)は
+        X-Next-Pageヘッダーを順に辿ります。
+
+        Args:
+            url: リクエストURL
+            params: クエリパラメータ
+            per_page: 1ページあたりの件数
+            max_pages: 最大ページ数
+            use_etag: ETagによる条件付きリクエストを使用するか
+            keyset: キーセットページネーション(Linkヘッダーのnextを辿る)を使用するか。
+                GitLabがキーセットページネーションをサポートするAPIでのみ指定する
+
+        Returns:
+            全ページの要素のリスト
+
+        """
+        base_params = dict(params)
+        base_params["per_page"] = per_page
+        if keyset:
+            return self._fetch_keyset_pages(url, base_params, max_pages)
+
+        items, headers = self._fetch_page(url, base_params, 1, use_etag=use_etag)
+        if not items:
+            return []
+
+        # 全ページ数が分かる場合は残りのページを並列取得する
+        total_pages = self._parse_page_header(headers.get("X-Total-Pages"))
+        if total_pages is not None:
+            pages = list(range(2, min(total_pages, max_pages) + 1))
+            return items + self._fetch_pages_concurrently(url, base_params, pages, use_etag=use_etag)
 
         # X-Next-Pageヘッダーとレスポンス件数を使って次ページを辿る
-        while page not in visited_pages and page <= max_pages:
+        page = 1
+        visited_pages: set[int] = {1}
+        while True:
+            next_page_header = headers.get("X-Next-Page")
+            if next_page_header is not None:
+                next_page = self._parse_page_header(next_page_header)
+                if next_page is None:
+                    break
+                page = next_page
+            else:
+                page += 1
+            if page in visited_pages or page > max_pages:
+                break
             visited_pages.add(page)
-            page_params = dict(params)
-            page_params["per_page"] = per_page
-            page_params["page"] = page
 
+            page_items, headers = self._fetch_page(url, base_params, page, use_etag=use_etag)
+            if not page_items:
+                break
+            items.extend(page_items)
+
+        return items
+
+    def _fetch_pages_concurrently(
+        self,
+        url: str,
+        params: dict[str, Any],
+        pages: list[int],
+        *,
+        use_etag: bool,
+    ) -> list[dict[str, Any]]:
+        """指定ページを並列に取得し、ページ順に連結して返す."""
+        if not pages:
+            return []
+
+        def fetch(page: int) -> list[dict[str, Any]]:
+            page_items, _ = self._fetch_page(url, params, page, use_etag=use_etag)
+            return page_items or []
+
+        items: list[dict[str, Any]] = []
+        workers = min(PAGINATION_MAX_WORKERS, len(pages))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gitlab-page") as executor:
+            for page_items in executor.map(fetch, pages):
+                items.extend(page_items)
+        return items
+
+    def _fetch_keyset_pages(
+        self,
+        url: str,
+        params: dict[str, Any],
+        max_pages: int,
+    ) -> list[dict[str, Any]]:
+        """キーセットページネーションでLinkヘッダーのnextを順に辿って取得する.
+
+        サーバーがキーセットページネーションを使わずにX-Total-Pagesヘッダーを返した場合は、
+        オフセットページネーションで残りのページを並列に取得します。
+        """
+        items: list[dict[str, Any]] = []
+        next_url: str | None = url
+        request_params: dict[str, Any] | None = {**params, "pagination": "keyset"}
+        for _ in range(max_pages):
+            if next_url is None:
+                break
             try:
-                resp = requests.get(url, headers=self.headers, params=page_params, timeout=30)
+                resp = self.session.get(next_url, headers=self.headers, params=request_params, timeout=30)
                 resp.raise_for_status()
-                payload = resp.json()
             except requests.exceptions.RequestException as e:
                 logger.error(
                     "GitLab API request failed: url=%s, params=%s, error=%s",
-                    url, page_params, e
+                    next_url, request_params, e
                 )
                 raise
 
-            page_items: list[dict[str, Any]]
-            if isinstance(payload, list):
-                page_items = payload
-            elif isinstance(payload, dict) and isinstance(payload.get("items"), list):
-                page_items = payload["items"]
-            else:
-                break
-
+            page_items = self._extract_page_items(resp.json())
             if not page_items:
                 break
-
             items.extend(page_items)
 
-            next_page_header = resp.headers.get("X-Next-Page")
-            if next_page_header:
-                try:
-                    next_page = int(next_page_header)
-                except ValueError:
-                    break
-                if next_page <= 0:
-                    break
-                page = next_page
-                continue
-
-            page += 1
+            # 全ページ数が分かる場合(キーセットページネーション非対応)は残りのページを並列取得する
+            total_pages = self._parse_page_header(resp.headers.get("X-Total-Pages"))
+            if request_params is not None and total_pages is not None:
+                pages = list(range(2, min(total_pages, max_pages) + 1))
+                return items + self._fetch_pages_concurrently(url, params, pages, use_etag=False)
 
+            # nextのURLには次ページのカーソルを含む全パラメータが含まれる
+            next_url = self._find_next_link(resp.headers.get("Link"))
+            request_params = None
         return items
+
+    def _fetch_page(
+        self,
+        url: str,
+        params: dict[str, Any],
+        page: int,
+        *,
+        use_etag: bool,
+    ) -> tuple[list[dict[str, Any]] | None, dict[str, str]]:
+        """1ページ分を取得し、(要素のリスト, ページング関連ヘッダー)を返す."""
+        page_params = dict(params)
+        page_params["page"] = page
+        try:
+            if use_etag:
+                payload, headers = self._conditional_get(url, page_params)
+            else:
+                resp = self.session.get(url, headers=self.headers, params=page_params, timeout=30)
+                resp.raise_for_status()
+                payload = resp.json()
+                headers = self._pagination_headers(resp.headers)
+        except requests.exceptions.RequestException as e:
+            logger.error(
+                "GitLab API request failed: url=%s, params=%s, error=%s",
+                url, page_params, e
+            )
+            raise
+        return self._extract_page_items(payload), headers
+
+    @staticmethod
+    def _extract_page_items(payload: object) -> list[dict[str, Any]] | None:
+        """レスポンスのJSONからページの要素を取り出す."""
+        if isinstance(payload, list):
+            return payload
+        if isinstance(payload, dict) and isinstance(payload.get("items"), list):
+            return payload["items"]
+        return None
+
+    @staticmethod
+    def _pagination_headers(headers: Any) -> dict[str, str]:  # noqa: ANN401
+        """レスポンスヘッダーからページング関連のヘッダーだけを取り出す."""
+        return {name: headers[name] for name in PAGINATION_HEADERS if headers.get(name) is not None}
+
+    @staticmethod
+    def _parse_page_header(value: str | None) -> int | None:
+        """X-Next-Page/X-Total-Pagesヘッダーの値を正のページ番号に変換する."""
+        if not value:
+            return None
+        try:
+            page = int(value)
+        except ValueError:
+            return None
+        return page if page > 0 else None
+
+    @staticmethod
+    def _find_next_link(link_header: str | None) -> str | None:
+        """LinkヘッダーからrelがnextのURLを取り出す."""
+        if not link_header:
+            return None
+        for link in requests.utils.parse_header_links(link_header):
+            if link.get("rel") == "next":
+                return link.get("url")
+        return None
+
+    def _conditional_get(self, url: str, params: dict[str, Any]) -> tuple[Any, dict[str, str]]:
+        """ETagを用いた条件付きGETでJSONとページング関連ヘッダーを取得する.
+
+        前回と同じURL・パラメータのリクエストにはIf-None-Matchを付与し、
+        304 Not Modifiedが返った場合はキャッシュ済みのレスポンスを返します。
+        ページの並列取得から呼ばれるため、キャッシュの操作はロックで保護します。
+
+        Args:
+            url: リクエストURL
+            params: クエリパラメータ
+
+        Returns:
+            (レスポンスのJSON, ページング関連ヘッダーの辞書)
+
+        Raises:
+            requests.HTTPError: APIリクエストが失敗した場合
+
+        """
+        cache_key = f"{url}?{sorted(params.items())}"
+        with self._etag_lock:
+            cached = self._etag_cache.get(cache_key)
+        headers = self.headers.copy()
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+
+        resp = self.session.get(url, headers=headers, params=params, timeout=30)
+        if resp.status_code == HTTP_NOT_MODIFIED and cached is not None:
+            with self._etag_lock:
+                self.not_modified_count += 1
+                if cache_key in self._etag_cache:
+                    self._etag_cache.move_to_end(cache_key)
+            return cached[1], cached[2]
+        resp.raise_for_status()
+        payload = resp.json()
+        pagination_headers = self._pagination_headers(resp.headers)
+
+        etag = resp.headers.get("ETag")
+        if etag:
+            with self._etag_lock:
+                self._etag_cache[cache_key] = (etag, payload, pagination_headers)
+                self._etag_cache.move_to_end(cache_key)
+                while len(self._etag_cache) > ETAG_CACHE_MAX_ENTRIES:
+                    self._etag_cache.popitem(last=False)
+        return payload, pagination_headers
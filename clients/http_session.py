@@ -0,0 +1,355 @@
+"""GitHub/GitLab REST API用の共有HTTPセッション.
+
+このモジュールは、接続プーリング・自動リトライ・レート制限ヘッダーに
+追従するトークンバケット方式の流量制御を備えたHTTPセッションと、
+エンドポイント別のレイテンシ統計を提供します。
+同じAPI URLとトークンを使うクライアントは1つのセッションを共有します。
+"""
+from __future__ import annotations
+
+import email.utils
+import logging
+import re
+import threading
+import time
+from typing import Any
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# 接続プールのサイズ(ホストごと)
+POOL_MAXSIZE = 16
+# 接続エラー・5xx応答に対するリトライ回数とバックオフ係数(秒)
+SERVER_ERROR_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (502, 503, 504)
+# レート制限応答(429/403)に対するリトライ回数
+RATE_LIMIT_RETRIES = 3
+# レート制限解除を待つ最大時間(秒)
+RATE_LIMIT_MAX_WAIT_SECONDS = 900.0
+# トークンバケットの初期レート(リクエスト/秒)とバースト容量
+DEFAULT_RATE_PER_SECOND = 10.0
+DEFAULT_BURST = 20
+# 残りリクエスト数がこの値を下回ったら、リセットまでの時間で均等に使うよう減速する
+RATE_LIMIT_LOW_WATERMARK = 100
+# レート制限ヘッダーから算出するレートの下限(リクエスト/秒)
+MIN_RATE_PER_SECOND = 0.05
+# 統計のログに出力するエンドポイント数(累積時間の長い順)
+LATENCY_LOG_TOP_ENDPOINTS = 5
+
+HTTP_FORBIDDEN = 403
+HTTP_TOO_MANY_REQUESTS = 429
+HTTP_SERVER_ERROR = 500
+
+# エンドポイント名の正規化で置き換える数値・SHAのパスセグメント
+_ID_SEGMENT_PATTERN = re.compile(r"^(\d+|[0-9a-f]{40})$")
+
+_shared_sessions: dict[tuple[str, str], RateLimitedSession] = {}
+_shared_sessions_lock = threading.Lock()
+
+
+def get_shared_session(api_url: str, token: str) -> RateLimitedSession:
+    """API URLとトークンの組ごとに共有されるセッションを取得する.
+
+    レート制限はトークン単位で課されるため、同じトークンを使う
+    クライアント間で流量制御の状態と接続プールを共有します。
+
+    Args:
+        api_url: APIのベースURL
+        token: 認証トークン
+
+    Returns:
+        共有セッション
+
+    """
+    key = (api_url, token)
+    with _shared_sessions_lock:
+        session = _shared_sessions.get(key)
+        if session is None:
+            session = RateLimitedSession()
+            _shared_sessions[key] = session
+        return session
+
+
+def log_shared_session_stats(log: logging.Logger, top: int = LATENCY_LOG_TOP_ENDPOINTS) -> None:
+    """共有セッションごとのレート制限回数とレイテンシ統計をログに出力する.
+
+    累積時間の長いエンドポイントから最大top件を出力します。
+
+    Args:
+        log: 出力先のロガー
+        top: 出力するエンドポイント数
+
+    """
+    with _shared_sessions_lock:
+        sessions = list(_shared_sessions.items())
+    for (api_url, _), session in sessions:
+        stats = session.get_latency_stats()
+        if not stats:
+            continue
+        slowest = sorted(stats.items(), key=lambda item: item[1]["total_seconds"], reverse=True)[:top]
+        log.info(
+            "API統計: %s リクエスト数=%d エラー数=%d レート制限=%d回 累積時間上位=[%s]",
+            api_url,
+            sum(int(s["count"]) for s in stats.values()),
+            sum(int(s["errors"]) for s in stats.values()),
+            session.rate_limited_count,
+            ", ".join(
+                f"{endpoint} 回数={int(s['count'])} 平均={s['total_seconds'] / s['count']:.2f}s "
+                f"最大={s['max_seconds']:.2f}s"
+                for endpoint, s in slowest
+            ),
+        )
+
+
+class TokenBucket:
+    """スレッドセーフなトークンバケット."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """トークンバケットを初期化する.
+
+        Args:
+            rate: 1秒あたりに補充されるトークン数
+            capacity: バケットの容量(バースト可能なリクエスト数)
+
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """トークンを1つ取得する(不足している場合は補充まで待機する).
+
+        Returns:
+            待機した秒数
+
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                else:
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def set_rate(self, rate: float) -> None:
+        """補充レートを変更する."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(rate, MIN_RATE_PER_SECOND)
+
+    def block_for(self, seconds: float) -> None:
+        """指定秒数の間、トークンの払い出しを停止する."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+
+class RateLimitedSession:
+    """レート制限に追従するHTTPセッション.
+
+    requests.Sessionによる接続プーリングに加え、以下を行います。
+    - 接続エラー・5xx応答は冪等なメソッドのみ指数バックオフでリトライ
+    - X-RateLimit-Remaining/RateLimit-Remainingが少なくなるとリセット時刻まで均等に減速
+    - 429またはレート制限による403はRetry-After/リセット時刻まで待機してリトライ
+    - エンドポイント別のリクエスト数・累積/最大レイテンシ・エラー数を記録
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+        burst: int = DEFAULT_BURST,
+    ) -> None:
+        """セッションを初期化する.
+
+        Args:
+            rate_per_second: トークンバケットの初期レート(リクエスト/秒)
+            burst: トークンバケットの容量
+
+        """
+        self._session = requests.Session()
+        retry = Retry(
+            total=SERVER_ERROR_RETRIES,
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUS_CODES,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+        self.default_rate = rate_per_second
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.rate_limited_count = 0
+        self._latency_stats: dict[str, dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:  # noqa: ANN401
+        """GETリクエストを送信する."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:  # noqa: ANN401
+        """POSTリクエストを送信する."""
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs: Any) -> requests.Response:  # noqa: ANN401
+        """PUTリクエストを送信する."""
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs: Any) -> requests.Response:  # noqa: ANN401
+        """PATCHリクエストを送信する."""
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs: Any) -> requests.Response:  # noqa: ANN401
+        """DELETEリクエストを送信する."""
+        return self.request("DELETE", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:  # noqa: ANN401
+        """流量制御とレート制限リトライ付きでリクエストを送信する.
+
+        Args:
+            method: HTTPメソッド
+            url: リクエストURL
+            **kwargs: requests.Session.requestに渡す引数
+
+        Returns:
+            レスポンス(レート制限のリトライを使い切った場合は最後のレスポンス)
+
+        Raises:
+            requests.exceptions.RequestException: 通信に失敗した場合
+
+        """
+        endpoint = self.endpoint_name(method, url)
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            started = time.monotonic()
+            try:
+                response = self._session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException:
+                self._record_latency(endpoint, time.monotonic() - started, error=True)
+                raise
+            self._record_latency(
+                endpoint,
+                time.monotonic() - started,
+                error=response.status_code >= HTTP_SERVER_ERROR,
+            )
+
+            wait = self._apply_rate_limit_headers(response)
+            if wait is None or attempt >= RATE_LIMIT_RETRIES:
+                return response
+
+            attempt += 1
+            self.rate_limited_count += 1
+            logger.warning(
+                "APIのレート制限に達しました。%.1f秒後にリトライします: %s (%d/%d)",
+                wait, endpoint, attempt, RATE_LIMIT_RETRIES,
+            )
+            self.bucket.block_for(wait)
+
+    def get_latency_stats(self) -> dict[str, dict[str, float]]:
+        """エンドポイント別のレイテンシ統計のスナップショットを取得する.
+
+        Returns:
+            エンドポイント名をキーとした
+            {"count", "total_seconds", "max_seconds", "errors"} の辞書
+
+        """
+        with self._stats_lock:
+            return {endpoint: dict(stats) for endpoint, stats in self._latency_stats.items()}
+
+    @staticmethod
+    def endpoint_name(method: str, url: str) -> str:
+        """統計用のエンドポイント名を生成する(数値IDやSHAは:idに置き換える)."""
+        segments = [
+            ":id" if _ID_SEGMENT_PATTERN.match(segment) else segment
+            for segment in urlparse(url).path.split("/")
+        ]
+        return f"{method.upper()} {'/'.join(segments)}"
+
+    def _record_latency(self, endpoint: str, elapsed: float, *, error: bool) -> None:
+        with self._stats_lock:
+            stats = self._latency_stats.setdefault(
+                endpoint, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "errors": 0},
+            )
+            stats["count"] += 1
+            stats["total_seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+            if error:
+                stats["errors"] += 1
+
+    def _apply_rate_limit_headers(self, response: requests.Response) -> float | None:
+        """レート制限ヘッダーを反映し、リトライが必要な場合は待機秒数を返す."""
+        headers = response.headers
+        remaining = _parse_int(
+            headers.get("X-RateLimit-Remaining", headers.get("RateLimit-Remaining")),
+        )
+        reset_in = _seconds_until_reset(headers.get("X-RateLimit-Reset", headers.get("RateLimit-Reset")))
+
+        # 残り回数が少ない場合は、リセットまでの時間で均等に使うようにレートを下げる
+        if remaining is not None:
+            if remaining >= RATE_LIMIT_LOW_WATERMARK:
+                self.bucket.set_rate(self.default_rate)
+            elif reset_in is not None:
+                self.bucket.set_rate(min(remaining / max(reset_in, 1.0), self.default_rate))
+
+        retry_after = _parse_retry_after(headers.get("Retry-After"))
+        is_rate_limited = response.status_code == HTTP_TOO_MANY_REQUESTS or (
+            response.status_code == HTTP_FORBIDDEN
+            and (remaining == 0 or retry_after is not None)
+        )
+        if not is_rate_limited:
+            return None
+
+        if retry_after is None:
+            retry_after = reset_in if reset_in is not None else 60.0
+        return min(max(retry_after, 1.0), RATE_LIMIT_MAX_WAIT_SECONDS)
+
+
+def _parse_int(value: str | None) -> int | None:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _seconds_until_reset(value: str | None) -> float | None:
+    """リセット時刻ヘッダー(UNIX時刻)から残り秒数を算出する."""
+    reset_at = _parse_int(value)
+    if reset_at is None:
+        return None
+    return max(reset_at - time.time(), 0.0)
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Retry-Afterヘッダー(秒数またはHTTP日付)を秒数に変換する."""
+    if value is None:
+        return None
+    seconds = _parse_int(value)
+    if seconds is not None:
+        return float(seconds)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
@@ -2,6 +2,8 @@
 
 bhouston/mcp-server-text-editorとの通信を管理するクラスを提供します。
 コンテナ内でMCPサーバープロセスを起動し、標準入出力を介してJSON-RPCで通信します。
+レスポンスは読み取りスレッドがJSON-RPCのidごとに振り分けるため、
+複数のリクエストを同時に送信できます。
 """
 
 from __future__ import annotations
@@ -10,12 +12,25 @@ import json
 import logging
 import subprocess
 import threading
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any
+from typing import IO, TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from handlers.task import Task  # noqa: F401 - Type hint import
 
+# エラーメッセージに含める標準エラー出力の行数
+STDERR_TAIL_LINES = 20
+# 読み取りスレッドの終了を待つ最大時間(秒)
+READER_JOIN_TIMEOUT_SECONDS = 5.0
+# 一括編集で受け付けるコマンドと、取り消しが必要な編集コマンド
+BATCH_COMMANDS = ("view", "str_replace", "insert")
+BATCH_EDIT_COMMANDS = ("str_replace", "insert")
+# 一括編集で受け付ける最大操作数
+MAX_BATCH_OPERATIONS = 50
+
 
 @dataclass
 class TextEditorToolResult:
@@ -67,6 +82,13 @@ class TextEditorMCPClient:
         self._process: subprocess.Popen | None = None
         self._initialized = False
 
+        # 送信済みでレスポンス待ちのリクエスト(JSON-RPCのid → Future)
+        self._pending: dict[int, Future[dict[str, Any]]] = {}
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._readers: list[threading.Thread] = []
+        self._stderr_tail: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+
     def _get_next_request_id(self) -> int:
         """次のリクエストIDを取得する.
 
@@ -115,6 +137,7 @@ class TextEditorMCPClient:
                 text=True,
                 bufsize=1,  # 行バッファリング
             )
+            self._start_readers()
 
             # MCPサーバーの初期化
             self._initialize_server()
@@ -194,6 +217,10 @@ class TextEditorMCPClient:
         finally:
             self._process = None
             self._initialized = False
+            for reader in self._readers:
+                reader.join(timeout=READER_JOIN_TIMEOUT_SECONDS)
+            self._readers = []
+            self._fail_pending("MCP server stopped")
 
     def call_tool(self, tool: str, args: dict[str, Any]) -> TextEditorToolResult:
         """テキストエディタツールを呼び出す.
@@ -214,8 +241,14 @@ class TextEditorMCPClient:
             raise RuntimeError(msg)
 
         # toolパラメータは無視（text_editor固定）
-        arguments = args
-        
+        try:
+            return self._parse_tool_response(self._send_request(self._build_tool_request(args)))
+        except Exception as e:
+            self.logger.exception("text_editorツール呼び出し中にエラー発生")
+            return TextEditorToolResult(success=False, content="", error=str(e))
+
+    def _build_tool_request(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        """ツール呼び出しのJSON-RPCリクエストを作成する."""
         # commandに基づいてdescriptionを生成
         command = arguments.get("command", "")
         description_map = {
@@ -226,12 +259,12 @@ class TextEditorMCPClient:
             "undo_edit": "Undo last edit",
         }
         description = description_map.get(command, "Execute text editor command")
-        
+
         # descriptionをargumentsに追加
         arguments_with_desc = {**arguments, "description": description}
+        self.logger.debug("text_editorツール呼び出し: %s", arguments_with_desc)
 
-        # ツール呼び出しリクエスト
-        request = {
+        return {
             "jsonrpc": "2.0",
             "id": self._get_next_request_id(),
             "method": "tools/call",
@@ -241,57 +274,46 @@ class TextEditorMCPClient:
             },
         }
 
-        self.logger.debug("text_editorツール呼び出し: %s", arguments_with_desc)
-
-        try:
-            response = self._send_request(request)
-
-            if "error" in response:
-                error_msg = response["error"].get("message", str(response["error"]))
-                self.logger.warning("text_editorツールエラー: %s", error_msg)
-                return TextEditorToolResult(
-                    success=False,
-                    content="",
-                    error=error_msg,
-                )
-
-            # 結果を取得
-            result = response.get("result", {})
-            content_list = result.get("content", [])
-
-            # コンテンツを文字列として結合
-            content_parts = []
-            for item in content_list:
-                if isinstance(item, dict) and "text" in item:
-                    content_parts.append(item["text"])
-                elif isinstance(item, str):
-                    content_parts.append(item)
-
-            content = "\n".join(content_parts)
-
-            # エラーチェック(isError フラグ)
-            is_error = result.get("isError", False)
-            if is_error:
-                return TextEditorToolResult(
-                    success=False,
-                    content="",
-                    error=content,
-                )
-
+    def _parse_tool_response(self, response: dict[str, Any]) -> TextEditorToolResult:
+        """ツール呼び出しのJSON-RPCレスポンスを実行結果に変換する."""
+        if "error" in response:
+            error_msg = response["error"].get("message", str(response["error"]))
+            self.logger.warning("text_editorツールエラー: %s", error_msg)
             return TextEditorToolResult(
-                success=True,
-                content=content,
-                error="",
+                success=False,
+                content="",
+                error=error_msg,
             )
 
-        except Exception as e:
-            self.logger.exception("text_editorツール呼び出し中にエラー発生")
+        # 結果を取得
+        result = response.get("result", {})
+        content_list = result.get("content", [])
+
+        # コンテンツを文字列として結合
+        content_parts = []
+        for item in content_list:
+            if isinstance(item, dict) and "text" in item:
+                content_parts.append(item["text"])
+            elif isinstance(item, str):
+                content_parts.append(item)
+
+        content = "\n".join(content_parts)
+
+        # エラーチェック(isError フラグ)
+        is_error = result.get("isError", False)
+        if is_error:
             return TextEditorToolResult(
                 success=False,
                 content="",
-                error=str(e),
+                error=content,
             )
 
+        return TextEditorToolResult(
+            success=True,
+            content=content,
+            error="",
+        )
+
     def _ensure_process_available(self) -> bool:
         """MCPサーバープロセスが利用可能かどうかを確認する.
 
@@ -315,35 +337,132 @@ class TextEditorMCPClient:
             JSON-RPCレスポンス辞書
 
         Raises:
-            RuntimeError: 通信エラーの場合
+            RuntimeError: 通信エラーまたはタイムアウトの場合
+
+        """
+        return self._wait_response(request["id"], self._submit_request(request))
+
+    def _submit_request(self, request: dict[str, Any]) -> Future[dict[str, Any]]:
+        """JSON-RPCリクエストを送信し、レスポンスを受け取るFutureを返す.
+
+        Args:
+            request: JSON-RPCリクエスト辞書
+
+        Returns:
+            レスポンスが届くと完了するFuture
+
+        Raises:
+            RuntimeError: 送信に失敗した場合
 
         """
         if not self._ensure_process_available():
             msg = "MCP server process not available"
             raise RuntimeError(msg)
 
+        future: Future[dict[str, Any]] = Future()
+        request_id = request["id"]
+        with self._pending_lock:
+            self._pending[request_id] = future
+
         try:
-            # リクエストを送信
             request_json = json.dumps(request) + "\n"
-            self._process.stdin.write(request_json)
-            self._process.stdin.flush()
+            with self._write_lock:
+                self._process.stdin.write(request_json)
+                self._process.stdin.flush()
+        except Exception as e:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            msg = f"MCP communication error: {e}"
+            raise RuntimeError(msg) from e
 
-            # レスポンスを受信
-            response_line = self._process.stdout.readline()
+        return future
 
-            if not response_line:
-                msg = "No response from MCP server"
-                raise RuntimeError(msg)
+    def _wait_response(self, request_id: int, future: Future[dict[str, Any]]) -> dict[str, Any]:
+        """リクエストのレスポンスを待つ.
 
-            return json.loads(response_line.strip())
+        Args:
+            request_id: JSON-RPCリクエストのid
+            future: _submit_requestが返したFuture
 
-        except json.JSONDecodeError as e:
-            msg = f"Failed to parse MCP response: {e}"
-            raise RuntimeError(msg) from e
-        except Exception as e:
-            msg = f"MCP communication error: {e}"
+        Returns:
+            JSON-RPCレスポンス辞書
+
+        Raises:
+            RuntimeError: タイムアウトまたはサーバーが終了した場合
+
+        """
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError as e:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            msg = f"MCP request timed out after {self.timeout_seconds} seconds"
             raise RuntimeError(msg) from e
 
+    def _start_readers(self) -> None:
+        """標準出力・標準エラー出力の読み取りスレッドを起動する."""
+        self._stderr_tail.clear()
+        self._readers = [
+            threading.Thread(
+                target=self._read_stdout, args=(self._process.stdout,),
+                name="text-editor-mcp-stdout", daemon=True,
+            ),
+            threading.Thread(
+                target=self._drain_stderr, args=(self._process.stderr,),
+                name="text-editor-mcp-stderr", daemon=True,
+            ),
+        ]
+        for reader in self._readers:
+            reader.start()
+
+    def _read_stdout(self, stdout: IO[str]) -> None:
+        """標準出力のレスポンスをJSON-RPCのidごとにFutureへ振り分ける."""
+        try:
+            for line in stdout:
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    self.logger.debug("JSON-RPC以外の出力を無視します: %s", line.rstrip())
+                    continue
+                if not isinstance(message, dict) or "id" not in message:
+                    # サーバーからの通知は利用しない
+                    continue
+                with self._pending_lock:
+                    future = self._pending.pop(message["id"], None)
+                if future is None:
+                    self.logger.debug("待機していないレスポンスを無視します: id=%s", message["id"])
+                    continue
+                future.set_result(message)
+        except (OSError, ValueError) as e:
+            self.logger.debug("MCPサーバーの標準出力の読み取りを終了します: %s", e)
+        finally:
+            self._fail_pending("No response from MCP server")
+
+    def _drain_stderr(self, stderr: IO[str]) -> None:
+        """標準エラー出力を読み捨て、末尾の行をエラーメッセージ用に保持する.
+
+        読み取らないとパイプのバッファが埋まり、サーバーの書き込みが止まります。
+        """
+        try:
+            for line in stderr:
+                self._stderr_tail.append(line.rstrip())
+                self.logger.debug("text-editor MCPサーバー: %s", line.rstrip())
+        except (OSError, ValueError):
+            pass
+
+    def _fail_pending(self, reason: str) -> None:
+        """レスポンス待ちの全リクエストをエラーにする."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        stderr_tail = "\n".join(self._stderr_tail)
+        msg = f"{reason}: {stderr_tail}" if stderr_tail else reason
+        for future in pending.values():
+            future.set_exception(RuntimeError(msg))
+
     def _send_notification(self, notification: dict[str, Any]) -> None:
         """JSON-RPC通知を送信する(レスポンスなし).
 
@@ -356,8 +475,9 @@ class TextEditorMCPClient:
 
         try:
             notification_json = json.dumps(notification) + "\n"
-            self._process.stdin.write(notification_json)
-            self._process.stdin.flush()
+            with self._write_lock:
+                self._process.stdin.write(notification_json)
+                self._process.stdin.flush()
         except Exception as e:
             self.logger.warning("通知送信中にエラー発生: %s", e)
 
@@ -452,6 +572,54 @@ class TextEditorMCPClient:
         """
         return self.call_tool("text_editor", {"command": "undo_edit", "path": path})
 
+    def batch_edit(self, operations: list[dict[str, Any]]) -> TextEditorToolResult:
+        """複数の表示・置換・挿入をまとめて実行する.
+
+        操作を1つずつ順に実行し、失敗した時点で残りの操作は実行せず、成功した編集を
+        undo_editで逆順に取り消します(全て適用されるか、何も適用されないかのどちらか)。
+        同じファイルへの編集や取り消しが並行に処理されないよう、順に実行します。
+
+        Args:
+            operations: 操作のリスト(各要素はtext_editorツールの引数)
+
+        Returns:
+            全操作の結果をまとめたツール実行結果
+
+        Raises:
+            RuntimeError: サーバーが起動していない場合
+
+        """
+        error = _validate_batch_operations(operations)
+        if error:
+            return TextEditorToolResult(success=False, content="", error=error)
+
+        sections = []
+        applied: list[str] = []
+        failed_index = 0
+        for index, operation in enumerate(operations, start=1):
+            result = self.call_tool("text_editor", operation)
+            sections.append(_format_batch_section(index, operation, result))
+            if not result.success:
+                failed_index = index
+                break
+            if operation["command"] in BATCH_EDIT_COMMANDS:
+                applied.append(operation["path"])
+        content = "\n\n".join(sections)
+        if not failed_index:
+            return TextEditorToolResult(success=True, content=content)
+
+        # 成功した編集を新しいものから順に取り消す
+        undo_results = [self.undo_edit(path) for path in reversed(applied)]
+        error = f"Operation {failed_index} failed; "
+        if failed_index < len(operations):
+            error += f"skipped {len(operations) - failed_index} remaining operation(s); "
+        if all(result.success for result in undo_results):
+            error += f"rolled back {len(applied)} applied edit(s), no changes were made"
+        else:
+            error += "rollback failed, some edits may remain applied"
+            self.logger.warning("一括編集の取り消しに失敗しました: %s", [r.error for r in undo_results])
+        return TextEditorToolResult(success=False, content=content, error=error)
+
     def is_running(self) -> bool:
         """MCPサーバーが実行中かどうかを確認する.
 
@@ -536,3 +704,29 @@ class TextEditorMCPClient:
             }
             for func in functions
         ]
+
+
+def _validate_batch_operations(operations: object) -> str:
+    """一括編集の操作を検証し、問題があればエラーメッセージを返す."""
+    if not isinstance(operations, list) or not operations:
+        return "operations must be a non-empty array"
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return f"Too many operations: {len(operations)} (max {MAX_BATCH_OPERATIONS})"
+    required = {"str_replace": ("old_str", "new_str"), "insert": ("insert_line", "new_str")}
+    for index, operation in enumerate(operations, start=1):
+        if not isinstance(operation, dict) or not operation.get("path"):
+            return f"Operation {index}: path is required"
+        command = operation.get("command")
+        if command not in BATCH_COMMANDS:
+            return f"Operation {index}: unsupported command {command!r} (allowed: {', '.join(BATCH_COMMANDS)})"
+        missing = [key for key in required.get(command, ()) if operation.get(key) is None]
+        if missing:
+            return f"Operation {index}: {', '.join(missing)} required for '{command}'"
+    return ""
+
+
+def _format_batch_section(index: int, operation: dict[str, Any], result: TextEditorToolResult) -> str:
+    """一括編集の1操作分の結果を整形する."""
+    status = "ok" if result.success else "error"
+    body = result.content if result.success else result.error
+    return f"[{index}] {operation['command']} {operation['path']}: {status}\n{body}".rstrip()
@@ -7,6 +7,7 @@ LLMコンテキストに反映する機能を提供します。
 from __future__ import annotations
 
 import logging
+import time
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any
 
@@ -45,6 +46,15 @@ class CommentDetectionManager:
         # bot自身のユーザー名（除外用）
         self.bot_username: str | None = None
 
+        # チェックの最小間隔（秒）。LLMループの反復ごとではなく経過時間で間引く
+        detection_config = config.get("comment_detection", {})
+        self.min_check_interval_seconds = detection_config.get("min_check_interval_seconds", 30)
+        self._last_checked_at: float | None = None
+
+        # 前回全コメントを取得した時点の変更検知用マーカー（更新日時・コメント数）
+        self.last_change_marker: str | None = None
+        self.skipped_fetch_count = 0
+
         # 有効/無効とbot_usernameの決定
         self._configure()
 
@@ -86,7 +96,10 @@ class CommentDetectionManager:
 
         try:
             # 現在のコメント一覧を取得
+            marker = self._get_change_marker()
             comments = self.task.get_comments()
+            self.last_change_marker = marker
+            self._last_checked_at = time.monotonic()
 
             # コメントIDをセットに追加（文字列として管理）
             self.last_comment_ids = {
@@ -114,7 +127,27 @@ class CommentDetectionManager:
         if not self.enabled:
             return []
 
+        # 前回チェックから最小間隔が経過していなければスキップ
+        now = time.monotonic()
+        if (
+            self._last_checked_at is not None
+            and now - self._last_checked_at < self.min_check_interval_seconds
+        ):
+            return []
+        self._last_checked_at = now
+
         try:
+            # 更新日時・コメント数が前回と同じなら全コメントの取得を省略
+            marker = self._get_change_marker()
+            if marker is not None and marker == self.last_change_marker:
+                self.skipped_fetch_count += 1
+                self.last_check_time = datetime.now(timezone.utc)
+                self.logger.debug(
+                    "コメントの変更なし(全件取得を省略) (Task: %s)",
+                    getattr(self.task, "uuid", "unknown"),
+                )
+                return []
+
             # 現在のコメント一覧を取得
             current_comments = self.task.get_comments()
 
@@ -144,6 +177,7 @@ class CommentDetectionManager:
             # 状態を更新
             self.last_comment_ids = current_ids
             self.last_check_time = datetime.now(timezone.utc)
+            self.last_change_marker = marker
 
             if new_comments:
                 self.logger.info(
@@ -168,6 +202,22 @@ class CommentDetectionManager:
             # エラー時は空リストを返して処理を継続
             return []
 
+    def _get_change_marker(self) -> str | None:
+        """タスクから変更検知用マーカーを取得する.
+
+        Returns:
+            マーカー。タスクが未対応または取得に失敗した場合はNone（全件取得する）
+
+        """
+        get_marker = getattr(self.task, "get_comment_change_marker", None)
+        if get_marker is None:
+            return None
+        try:
+            return get_marker()
+        except Exception as e:
+            self.logger.debug("変更検知用マーカーの取得に失敗しました: %s", e)
+            return None
+
     def is_bot_comment(self, comment: dict[str, Any]) -> bool:
         """コメントがbot自身によるものか判定する.
 
@@ -262,6 +312,7 @@ class CommentDetectionManager:
         return {
             "last_comment_ids": list(self.last_comment_ids),
             "last_check_timestamp": (self.last_check_time.isoformat() if self.last_check_time else None),
+            "last_change_marker": self.last_change_marker,
         }
 
     def restore_state(self, state: dict[str, Any]) -> None:
@@ -285,6 +336,8 @@ class CommentDetectionManager:
             if timestamp:
                 self.last_check_time = datetime.fromisoformat(timestamp)
 
+            self.last_change_marker = state.get("last_change_marker")
+
             self.logger.info(
                 "コメント検出状態を復元しました: %d件のコメントID",
                 len(self.last_comment_ids),
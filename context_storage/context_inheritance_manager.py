@@ -1,6 +1,8 @@
 """コンテキスト引き継ぎマネージャーモジュール.
 
 同一Issue/MR/PRの過去コンテキストを検索し、引き継ぎを管理するクラスを提供します。
+過去コンテキストの最終要約・計画履歴・メタデータは、タスク完了時にDBへ保存した
+ダイジェストから取得します(ダイジェストがない古いタスクのみファイルから読み込みます)。
 """
 
 from __future__ import annotations
@@ -15,6 +17,9 @@ from typing import TYPE_CHECKING, Any
 if TYPE_CHECKING:
     from handlers.task_key import TaskKey
 
+# 計画履歴のダイジェストに保持する最大件数
+PLANNING_DIGEST_MAX_ENTRIES = 20
+
 
 @dataclass
 class PreviousContext:
@@ -298,16 +303,21 @@ class ContextInheritanceManager:
         if not uuid:
             return None
 
-        # コンテキストディレクトリから最終要約を取得
-        final_summary = self._load_final_summary(uuid)
-
-        # メタデータを読み込み
-        metadata = self._load_metadata(uuid)
-
-        # Planning履歴を読み込み（有効な場合）
-        planning_history = []
-        if self.inherit_plans:
-            planning_history = self._load_planning_history(uuid)
+        digest = db_task.context_digest
+        if digest is not None:
+            # 完了時に保存したダイジェストを使用(ファイルは読まない)
+            final_summary = digest.final_summary
+            metadata = digest.context_metadata or {}
+            planning_history = []
+            if self.inherit_plans and digest.planning_digest:
+                planning_history = digest.planning_digest[-self.max_previous_plans:]
+        else:
+            # ダイジェスト導入前に完了したタスクはコンテキストディレクトリから読み込む
+            final_summary = self._load_final_summary(uuid)
+            metadata = self._load_metadata(uuid)
+            planning_history = []
+            if self.inherit_plans:
+                planning_history = self._load_planning_history(uuid)
 
         # TaskKey辞書を構築
         # DBTaskから元のTaskKeyを復元して辞書化する
@@ -618,3 +628,58 @@ class ContextInheritanceManager:
                     lines.append(f"- {rec}")
 
         return "\n".join(lines)
+
+
+def build_planning_digest(entries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """計画履歴から引き継ぎに必要な項目だけを抜き出したダイジェストを作成する.
+
+    ContextInheritanceManager._build_planning_summary が参照する項目のみを残した
+    plan・verification・reflectionエントリを、新しいものから最大
+    PLANNING_DIGEST_MAX_ENTRIES件保持します。
+
+    Args:
+        entries: 計画履歴のエントリ(ファイル順)
+
+    Returns:
+        ダイジェストのエントリのリスト(ファイル順)
+
+    """
+    digest: list[dict[str, Any]] = []
+    for entry in entries:
+        entry_type = entry.get("type")
+        if entry_type == "plan":
+            plan = entry.get("plan") or {}
+            digest.append({
+                "type": "plan",
+                "plan": {
+                    "goal_understanding": {
+                        "goal_summary": plan.get("goal_understanding", {}).get("goal_summary", ""),
+                    },
+                    "task_decomposition": {
+                        "subtasks": [
+                            {"task_id": t.get("task_id", "")}
+                            for t in plan.get("task_decomposition", {}).get("subtasks", [])
+                        ],
+                    },
+                },
+            })
+        elif entry_type == "verification":
+            verification = entry.get("verification_result") or {}
+            digest.append({
+                "type": "verification",
+                "verification_result": {
+                    "issues_found": verification.get("issues_found", []),
+                    "verification_passed": verification.get("verification_passed", False),
+                },
+            })
+        elif entry_type == "reflection":
+            evaluation = entry.get("evaluation") or {}
+            digest.append({
+                "type": "reflection",
+                "evaluation": {
+                    "success": evaluation.get("success", False),
+                    "action_summary": evaluation.get("action_summary", ""),
+                    "failure_reason": evaluation.get("failure_reason"),
+                },
+            })
+    return digest[-PLANNING_DIGEST_MAX_ENTRIES:]
@@ -99,7 +99,7 @@ class TaskContextManager:
         
         # Initialize planning store (lazy import to avoid circular dependency)
         from handlers.planning_history_store import PlanningHistoryStore
-        self.planning_store = PlanningHistoryStore(task_uuid, self.planning_dir)
+        self.planning_store = PlanningHistoryStore(task_uuid, self.planning_dir, base_dir=self.base_dir)
         
         # 引き継ぎコンテキストの初期化（リジュームでない新規タスクの場合のみ）
         self.inheritance_context = None
@@ -394,6 +394,9 @@ class TaskContextManager:
                 logger.info("タスクを%sとしてデータベースに記録しました: uuid=%s", status, self.uuid)
         except Exception as e:
             logger.error("タスク%sのデータベース更新に失敗しました: %s", status, e, exc_info=True)
+
+        # 引き継ぎ用ダイジェストを保存（引き継ぎ時にコンテキストディレクトリを読まずに済むようにする）
+        self._save_context_digest()
         
         # Move directory
         target_dir = self.completed_dir / self.uuid
@@ -471,6 +474,23 @@ class TaskContextManager:
             # 要約作成失敗は致命的エラーではないため警告ログのみ
             logger.warning("最終要約の作成に失敗しました: %s", e, exc_info=True)
 
+    def _save_context_digest(self) -> None:
+        """最終要約・計画履歴のダイジェスト・メタデータをDBに保存する."""
+        from .context_inheritance_manager import build_planning_digest
+
+        try:
+            latest_summary = self.summary_store.get_latest_summary()
+            metadata_file = self.context_dir / "metadata.json"
+            metadata = json.loads(metadata_file.read_text()) if metadata_file.exists() else {}
+            self._db_manager.save_context_digest(
+                self.uuid,
+                final_summary=latest_summary.get("summary") if latest_summary else None,
+                planning_digest=build_planning_digest(self.planning_store.get_all_entries()),
+                metadata=metadata,
+            )
+        except Exception as e:
+            logger.warning("引き継ぎ用ダイジェストの保存に失敗しました: %s", e, exc_info=True)
+
     def _create_metadata(self) -> None:
         """Create metadata.json file."""
         llm_config = self.config.get("llm", {})
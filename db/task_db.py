@@ -5,6 +5,7 @@
 
 主要コンポーネント:
 - DBTask: SQLAlchemy ORMモデル（tasksテーブル定義）
+- DBTaskContextDigest: 完了タスクの引き継ぎ用ダイジェスト（task_context_digestsテーブル定義）
 - TaskDBManager: データベースアクセスロジック
 """
 
@@ -16,22 +17,30 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any
 
 from sqlalchemy import (
+    JSON,
     DateTime,
+    ForeignKey,
     Index,
     Integer,
     String,
     Text,
     create_engine,
 )
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
     Session,
+    joinedload,
     mapped_column,
+    relationship,
     sessionmaker,
 )
+from sqlalchemy.orm.attributes import set_committed_value
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from handlers.task_key import TaskKey
 
 logger = logging.getLogger(__name__)
@@ -89,6 +98,9 @@ class DBTask(Base):
     # ユーザー情報
     user: Mapped[str | None] = mapped_column(String(255), nullable=True)
 
+    # 引き継ぎ用ダイジェスト(完了時に保存、find_completed_tasks_by_keyで同時に取得)
+    context_digest: Mapped[DBTaskContextDigest | None] = relationship(uselist=False)
+
     # インデックス定義
     __table_args__ = (
         Index("ix_tasks_status", "status"),
@@ -154,6 +166,23 @@ class DBTask(Base):
         raise ValueError(msg)
 
 
+class DBTaskContextDigest(Base):
+    """完了タスクの引き継ぎ用ダイジェストを格納するORMモデル.
+
+    task_context_digestsテーブルに対応し、コンテキスト引き継ぎに必要な
+    最終要約・計画履歴のダイジェスト・メタデータを保持します。
+    引き継ぎ時にコンテキストディレクトリのファイルを読む必要がなくなります。
+    """
+
+    __tablename__ = "task_context_digests"
+
+    uuid: Mapped[str] = mapped_column(String(36), ForeignKey("tasks.uuid", ondelete="CASCADE"), primary_key=True)
+    final_summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    planning_digest: Mapped[list[dict[str, Any]]] = mapped_column(JSON, default=list)
+    context_metadata: Mapped[dict[str, Any]] = mapped_column(JSON, default=dict)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
 def _parse_task_key_dict(task_dict: dict[str, Any]) -> tuple[str, str, str | None, str | None, int | None, int]:
     """TaskKeyのto_dict()結果をデータベース形式に変換するヘルパー関数.
 
@@ -198,6 +227,9 @@ class TaskDBManager:
     セッション管理とトランザクション制御を提供します。
     """
 
+    # task_context_digestsテーブルが利用可能か(None: 未確認)
+    _digest_table_ready: bool | None = None
+
     def __init__(self, config: dict[str, Any] | None = None) -> None:
         """TaskDBManagerを初期化する.
 
@@ -400,7 +432,7 @@ class TaskDBManager:
             since: この日時以降に完了したタスクのみを取得（オプション）
 
         Returns:
-            list[DBTask]: 見つかったDBTaskオブジェクトのリスト（完了日時降順）
+            list[DBTask]: 見つかったDBTaskオブジェクトのリスト（完了日時降順、context_digestを読み込み済み）
 
         """
         task_dict = task_key.to_dict()
@@ -433,15 +465,94 @@ class TaskDBManager:
             if since:
                 query = query.filter(DBTask.completed_at >= since)
 
-            # 完了日時の降順でソート
+            # 完了日時の降順でソート(引き継ぎ用ダイジェストも同じクエリで取得)
+            digest_ready = self._ensure_context_digest_table()
+            if digest_ready:
+                query = query.options(joinedload(DBTask.context_digest))
             db_tasks = query.order_by(DBTask.completed_at.desc()).all()
 
-            # デタッチ状態にする
+            # デタッチ状態にする(ダイジェストのテーブルが使えない場合はcontext_digestをNoneにする)
             for db_task in db_tasks:
+                if not digest_ready:
+                    set_committed_value(db_task, "context_digest", None)
                 session.expunge(db_task)
 
             return db_tasks
 
+    def get_running_task_uuids(self, uuids: Iterable[str]) -> set[str]:
+        """指定したUUIDのうち、実行中のタスクのUUIDを取得する.
+
+        Args:
+            uuids: 確認するタスクUUID
+
+        Returns:
+            set[str]: statusがrunningのタスクのUUID
+
+        """
+        uuid_list = list(uuids)
+        if not uuid_list:
+            return set()
+
+        with self.get_session() as session:
+            rows = session.query(DBTask.uuid).filter(
+                DBTask.uuid.in_(uuid_list),
+                DBTask.status == "running",
+            ).all()
+            return {row.uuid for row in rows}
+
+    def _ensure_context_digest_table(self) -> bool:
+        """task_context_digestsテーブルが存在しない場合は作成する.
+
+        既存のデータベースにはテーブルがないことがあるため、初回利用時に作成します。
+        作成できなかった場合はダイジェストを使わずに動作します(結果はキャッシュします)。
+
+        Returns:
+            bool: テーブルが利用可能な場合True
+
+        """
+        if self._digest_table_ready is None:
+            try:
+                DBTaskContextDigest.__table__.create(self._engine, checkfirst=True)
+                self._digest_table_ready = True
+            except SQLAlchemyError as e:
+                logger.warning("task_context_digestsテーブルを作成できないため、ダイジェストを使用しません: %s", e)
+                self._digest_table_ready = False
+        return self._digest_table_ready
+
+    def save_context_digest(
+        self,
+        uuid: str,
+        final_summary: str | None,
+        planning_digest: list[dict[str, Any]],
+        metadata: dict[str, Any],
+    ) -> None:
+        """タスクの引き継ぎ用ダイジェストを保存する(既存の場合は上書き).
+
+        task_context_digestsテーブルが利用できない場合は何もしません。
+
+        Args:
+            uuid: タスクUUID
+            final_summary: 最終要約テキスト
+            planning_digest: 計画履歴のダイジェスト
+            metadata: コンテキストのメタデータ
+
+        """
+        if not self._ensure_context_digest_table():
+            return
+
+        digest = DBTaskContextDigest(
+            uuid=uuid,
+            final_summary=final_summary,
+            planning_digest=planning_digest,
+            context_metadata=metadata,
+            created_at=datetime.now(timezone.utc),
+        )
+        with self.get_session() as session:
+            session.merge(digest)
+            session.commit()
+
+        logger.debug("引き継ぎ用ダイジェストをDBに保存しました: uuid=%s", uuid)
+
     def save_task(self, db_task: DBTask) -> DBTask:
         """DBTaskオブジェクトを保存（更新）する.
 
@@ -0,0 +1,949 @@
+"""Docker Engine APIクライアントモジュール.
+
+docker CLIのプロセスを起動せずに、Unixソケット経由でDocker Engine APIを呼び出します。
+通常のAPI呼び出しはkeep-aliveの接続をプールして再利用し、execの出力は
+ハイジャックした接続(Upgrade: tcp)から多重化ストリームとして読み取ります。
+
+ExecutionEnvironmentManager._run_docker_command から使えるよう、
+docker CLIの引数のうち実行環境の管理で使うもの(create/start/rm/rename/inspect/ps/exec)を
+APIの呼び出しに変換する run_cli_command を提供します。変換できない引数の場合は
+UnsupportedDockerCommandError を送出し、呼び出し側はdocker CLIにフォールバックします。
+"""
+from __future__ import annotations
+
+import contextlib
+import http.client
+import json
+import logging
+import os
+import queue
+import re
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
+from urllib.parse import quote, urlencode
+
+from handlers.output_capture import (
+    READ_CHUNK_SIZE,
+    StreamingResult,
+    close_output_buffers,
+    create_output_buffers,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Dockerデーモンのソケットパス(DOCKER_HOSTがunix://の場合はそちらを優先)
+DEFAULT_SOCKET_PATH = "/var/run/docker.sock"
+# プールで保持するkeep-alive接続の最大数
+DEFAULT_POOL_SIZE = 8
+# API呼び出しのデフォルトのタイムアウト(秒)
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 60.0
+# 接続に失敗した後、APIの利用を再試行するまでの時間(秒)
+UNAVAILABLE_RETRY_SECONDS = 60.0
+# execのストリーム終了後、終了コードが確定するまで待つ最大時間(秒)
+EXEC_EXIT_CODE_WAIT_SECONDS = 2.0
+
+# 多重化ストリームのフレームヘッダ(ストリーム種別1バイト、予約3バイト、サイズ4バイト)
+_FRAME_HEADER = struct.Struct(">BxxxL")
+_FRAME_STREAMS = {1: "stdout", 2: "stderr"}
+# inspect/psの--formatで対応するテンプレート({{.Field}} と {{.Label "key"}} の形式のみ)
+_TEMPLATE_FIELD = re.compile(r'\{\{\s*\.(?:Label\s+"([^"]*)"|([A-Za-z][\w.]*))\s*\}\}')
+_MEMORY_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+_clients: dict[tuple[str, int], DockerEngineClient] = {}
+_clients_lock = threading.Lock()
+
+
+class DockerEngineError(RuntimeError):
+    """Docker Engine APIがエラーを返した場合の例外."""
+
+    def __init__(self, message: str, status_code: int | None = None) -> None:
+        """例外を初期化する.
+
+        Args:
+            message: エラーメッセージ
+            status_code: HTTPステータスコード(接続エラーの場合はNone)
+
+        """
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class DockerEngineUnavailableError(DockerEngineError):
+    """Dockerデーモンに接続できない場合の例外."""
+
+
+class DockerEngineTimeoutError(DockerEngineError):
+    """API呼び出しがタイムアウトした場合の例外."""
+
+
+class DockerEngineConnectionLostError(DockerEngineError):
+    """execの開始後にDockerデーモンとの接続が失われた場合の例外.
+
+    コマンドは実行済みの可能性があるため、docker CLIで実行し直してはいけません。
+    """
+
+
+class UnsupportedDockerCommandError(ValueError):
+    """docker CLIの引数をAPI呼び出しに変換できない場合の例外."""
+
+
+def get_docker_engine_client(
+    socket_path: str | None = None, pool_size: int = DEFAULT_POOL_SIZE,
+) -> DockerEngineClient | None:
+    """プロセスで共有するDocker Engine APIクライアントを取得する.
+
+    ExecutionEnvironmentManagerはタスクごとに作成されるため、
+    接続プールを共有できるようクライアントはソケットパスごとに1つだけ作成します。
+
+    Args:
+        socket_path: Dockerデーモンのソケットパス(Noneの場合はDOCKER_HOSTまたはデフォルト)
+        pool_size: プールで保持するkeep-alive接続の最大数
+
+    Returns:
+        クライアント(DOCKER_HOSTがUnixソケット以外、またはソケットがない場合はNone)
+
+    """
+    if socket_path is None:
+        socket_path = docker_socket_path_from_env()
+        if socket_path is None:
+            return None
+    if not os.path.exists(socket_path):
+        return None
+
+    with _clients_lock:
+        key = (socket_path, pool_size)
+        if key not in _clients:
+            _clients[key] = DockerEngineClient(socket_path, pool_size=pool_size)
+        return _clients[key]
+
+
+def docker_socket_path_from_env() -> str | None:
+    """DOCKER_HOSTからソケットパスを取得する(Unixソケット以外の場合はNone)."""
+    docker_host = os.environ.get("DOCKER_HOST", "")
+    if not docker_host:
+        return DEFAULT_SOCKET_PATH
+    if docker_host.startswith("unix://"):
+        return docker_host.removeprefix("unix://")
+    return None
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """Unixソケットに接続するHTTP接続."""
+
+    def __init__(self, socket_path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+@dataclass
+class ExecRequest:
+    """docker execの引数から変換したexecの作成条件.
+
+    Attributes:
+        container: コンテナIDまたはコンテナ名
+        cmd: 実行するコマンド
+        workdir: 作業ディレクトリ
+        env: 環境変数(KEY=VALUEの形式)
+        user: 実行ユーザー
+
+    """
+
+    container: str
+    cmd: list[str]
+    workdir: str | None = None
+    env: list[str] = field(default_factory=list)
+    user: str | None = None
+
+
+class DockerEngineClient:
+    """Unixソケット経由のDocker Engine APIクライアント.
+
+    接続エラーが発生すると一定時間は available がFalseになり、
+    呼び出し側はその間docker CLIを使います。
+    """
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        *,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT_SECONDS,
+    ) -> None:
+        """クライアントを初期化する.
+
+        Args:
+            socket_path: Dockerデーモンのソケットパス
+            pool_size: プールで保持するkeep-alive接続の最大数
+            timeout: API呼び出しのデフォルトのタイムアウト(秒)
+
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._pool: queue.LifoQueue[_UnixHTTPConnection] = queue.LifoQueue(maxsize=pool_size)
+        self._unavailable_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        """APIを利用できるかどうか(直近に接続エラーが発生した場合はFalse)."""
+        return time.monotonic() >= self._unavailable_until
+
+    def close(self) -> None:
+        """プールの接続を閉じる."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    # ------------------------------------------------------------------
+    # コンテナ
+    # ------------------------------------------------------------------
+
+    def ping(self) -> bool:
+        """Dockerデーモンに接続できるか確認する."""
+        try:
+            self._request("GET", "/_ping")
+        except DockerEngineError:
+            return False
+        return True
+
+    def create_container(self, name: str, config: dict[str, Any], *, timeout: float | None = None) -> str:
+        """コンテナを作成し、コンテナIDを返す."""
+        data = self._request("POST", "/containers/create", params={"name": name}, body=config, timeout=timeout)
+        return data["Id"]
+
+    def start_container(self, container: str, *, timeout: float | None = None) -> None:
+        """コンテナを起動する(起動済みの場合は何もしない)."""
+        self._request("POST", f"/containers/{quote(container)}/start", timeout=timeout)
+
+    def remove_container(self, container: str, *, force: bool = False, timeout: float | None = None) -> None:
+        """コンテナを削除する."""
+        self._request("DELETE", f"/containers/{quote(container)}", params={"force": int(force)}, timeout=timeout)
+
+    def rename_container(self, container: str, new_name: str, *, timeout: float | None = None) -> None:
+        """コンテナ名を変更する."""
+        self._request(
+            "POST", f"/containers/{quote(container)}/rename", params={"name": new_name}, timeout=timeout,
+        )
+
+    def inspect_container(self, container: str, *, timeout: float | None = None) -> dict[str, Any]:
+        """コンテナの詳細情報を取得する."""
+        return self._request("GET", f"/containers/{quote(container)}/json", timeout=timeout)
+
+    def list_containers(
+        self,
+        *,
+        all_containers: bool = False,
+        filters: dict[str, list[str]] | None = None,
+        timeout: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """条件に合うコンテナの一覧を1回の呼び出しで取得する.
+
+        Args:
+            all_containers: 停止中のコンテナも含めるかどうか
+            filters: docker ps --filter と同じ条件(例: {"name": ["coding-agent-exec"]})
+            timeout: タイムアウト秒数
+
+        Returns:
+            コンテナの一覧
+
+        """
+        params: dict[str, Any] = {"all": int(all_containers)}
+        if filters:
+            params["filters"] = json.dumps(filters)
+        return self._request("GET", "/containers/json", params=params, timeout=timeout)
+
+    # ------------------------------------------------------------------
+    # exec
+    # ------------------------------------------------------------------
+
+    def exec_run(self, request: ExecRequest, *, timeout: float | None = None) -> tuple[int, bytes, bytes]:
+        """コンテナでコマンドを実行し、終了まで待って出力を取得する.
+
+        Args:
+            request: execの作成条件
+            timeout: タイムアウト秒数
+
+        Returns:
+            (終了コード, 標準出力, 標準エラー出力) のタプル
+
+        Raises:
+            DockerEngineTimeoutError: タイムアウトした場合
+            DockerEngineConnectionLostError: execの開始後に接続が失われた場合
+            DockerEngineError: execの作成・開始に失敗した場合
+
+        """
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + timeout
+        exec_id = self._exec_create(request, timeout)
+        output = {"stdout": bytearray(), "stderr": bytearray()}
+        sock = self._exec_start(exec_id, timeout)
+        try:
+            for stream, chunk in _read_frames(sock, deadline):
+                output[stream].extend(chunk)
+        except TimeoutError as e:
+            msg = f"execがタイムアウトしました: {' '.join(request.cmd)}"
+            raise DockerEngineTimeoutError(msg) from e
+        except OSError as e:
+            msg = f"execの出力の読み取り中に接続が失われました: {e}"
+            raise DockerEngineConnectionLostError(msg) from e
+        finally:
+            sock.close()
+        try:
+            exit_code = self._exec_exit_code(exec_id)
+        except DockerEngineUnavailableError as e:
+            msg = f"execの終了コードの取得中に接続が失われました: {e}"
+            raise DockerEngineConnectionLostError(msg) from e
+        return exit_code, bytes(output["stdout"]), bytes(output["stderr"])
+
+    def exec_streaming(
+        self,
+        request: ExecRequest,
+        *,
+        timeout: float,
+        max_bytes: int,
+        max_total_bytes: int | None = None,
+        spill_dir: Path | None = None,
+    ) -> StreamingResult:
+        """コンテナでコマンドを実行し、出力を上限付きバッファに逐次読み取る.
+
+        出力量の合計がmax_total_bytesを超えた場合とタイムアウトした場合は
+        接続を閉じて打ち切ります(docker CLIのプロセスを強制終了した場合と同じく、
+        コンテナ内のプロセスは出力先を失い、次の書き込みで終了します)。
+
+        Args:
+            request: execの作成条件
+            timeout: タイムアウト秒数
+            max_bytes: 標準出力・標準エラー出力それぞれで保持する最大バイト数
+            max_total_bytes: 打ち切る出力量の合計(Noneの場合は打ち切らない)
+            spill_dir: 全出力を書き出すディレクトリ(Noneの場合は書き出さない)
+
+        Returns:
+            実行結果
+
+        Raises:
+            DockerEngineConnectionLostError: execの開始後に接続が失われた場合
+            DockerEngineError: execの作成・開始に失敗した場合
+
+        """
+        start_time = time.monotonic()
+        deadline = start_time + timeout
+        exec_id = self._exec_create(request, timeout)
+        sock = self._exec_start(exec_id, timeout)
+
+        buffers, spill_paths = create_output_buffers(max_bytes, spill_dir)
+        timed_out = False
+        limit_exceeded = False
+        try:
+            for stream, chunk in _read_frames(sock, deadline):
+                buffers[stream].write(chunk)
+                total = buffers["stdout"].total_bytes + buffers["stderr"].total_bytes
+                if max_total_bytes is not None and total > max_total_bytes:
+                    limit_exceeded = True
+                    break
+        except TimeoutError:
+            timed_out = True
+        except OSError as e:
+            msg = f"execの出力の読み取り中に接続が失われました: {e}"
+            raise DockerEngineConnectionLostError(msg) from e
+        finally:
+            sock.close()
+            kept_files = close_output_buffers(buffers, spill_paths)
+
+        returncode = -1
+        if not (timed_out or limit_exceeded):
+            with contextlib.suppress(DockerEngineError):
+                returncode = self._exec_exit_code(exec_id)
+
+        return StreamingResult(
+            returncode=returncode,
+            stdout=buffers["stdout"],
+            stderr=buffers["stderr"],
+            duration_ms=int((time.monotonic() - start_time) * 1000),
+            timed_out=timed_out,
+            output_limit_exceeded=limit_exceeded,
+            spill_files=kept_files,
+        )
+
+    def _exec_create(self, request: ExecRequest, timeout: float) -> str:
+        body: dict[str, Any] = {
+            "Cmd": request.cmd,
+            "AttachStdout": True,
+            "AttachStderr": True,
+            "Tty": False,
+        }
+        if request.workdir:
+            body["WorkingDir"] = request.workdir
+        if request.env:
+            body["Env"] = request.env
+        if request.user:
+            body["User"] = request.user
+        data = self._request("POST", f"/containers/{quote(request.container)}/exec", body=body, timeout=timeout)
+        return data["Id"]
+
+    def _exec_start(self, exec_id: str, timeout: float) -> socket.socket:
+        """execを開始し、出力を読み取るハイジャックした接続を返す.
+
+        execの出力は接続を専有するため、プールの接続は使わずに新しく接続します。
+        """
+        payload = json.dumps({"Detach": False, "Tty": False}).encode("utf-8")
+        request = (
+            f"POST /exec/{exec_id}/start HTTP/1.1\r\n"
+            "Host: docker\r\n"
+            "Content-Type: application/json\r\n"
+            "Connection: Upgrade\r\n"
+            "Upgrade: tcp\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "\r\n"
+        ).encode("ascii") + payload
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(min(timeout, self.timeout))
+        try:
+            sock.connect(self.socket_path)
+        except TimeoutError as e:
+            sock.close()
+            msg = "execの開始がタイムアウトしました"
+            raise DockerEngineTimeoutError(msg) from e
+        except OSError as e:
+            sock.close()
+            self._mark_unavailable()
+            msg = f"Dockerデーモンに接続できません: {e}"
+            raise DockerEngineUnavailableError(msg) from e
+
+        # 開始の要求を送った後はexecが開始された可能性があるため、接続できない場合の例外にしない
+        try:
+            sock.sendall(request)
+            status, headers, rest = _read_response_head(sock)
+        except TimeoutError as e:
+            sock.close()
+            msg = "execの開始がタイムアウトしました"
+            raise DockerEngineTimeoutError(msg) from e
+        except OSError as e:
+            sock.close()
+            self._mark_unavailable()
+            msg = f"execの開始中に接続が失われました: {e}"
+            raise DockerEngineConnectionLostError(msg) from e
+
+        if status not in (http.client.SWITCHING_PROTOCOLS, http.client.OK):
+            body = rest
+            with contextlib.suppress(OSError):
+                length = int(headers.get("content-length", len(rest)))
+                while len(body) < length and (chunk := sock.recv(READ_CHUNK_SIZE)):
+                    body += chunk
+            sock.close()
+            raise DockerEngineError(_error_message(body), status)
+
+        # ハイジャック後に受信済みのデータは、フレームの読み取り時に先頭から使う
+        return _PrefixedSocket(sock, rest)
+
+    def _exec_exit_code(self, exec_id: str) -> int:
+        """execの終了コードを取得する(ストリームの終了直後は確定まで待つ)."""
+        deadline = time.monotonic() + EXEC_EXIT_CODE_WAIT_SECONDS
+        while True:
+            data = self._request("GET", f"/exec/{exec_id}/json")
+            if not data.get("Running") and data.get("ExitCode") is not None:
+                return data["ExitCode"]
+            if time.monotonic() >= deadline:
+                return -1
+            time.sleep(0.05)
+
+    # ------------------------------------------------------------------
+    # docker CLIの引数の変換
+    # ------------------------------------------------------------------
+
+    def run_cli_command(self, args: list[str], *, timeout: float | None = None) -> tuple[int, str, str]:
+        """docker CLIの引数をAPI呼び出しに変換して実行する.
+
+        Args:
+            args: dockerコマンドの引数(先頭はサブコマンド)
+            timeout: タイムアウト秒数
+
+        Returns:
+            docker CLIと同じ形式の (終了コード, 標準出力, 標準エラー出力) のタプル
+
+        Raises:
+            UnsupportedDockerCommandError: API呼び出しに変換できない場合
+            DockerEngineUnavailableError: Dockerデーモンに接続できない場合
+            DockerEngineTimeoutError: タイムアウトした場合
+            DockerEngineConnectionLostError: execの開始後に接続が失われた場合
+
+        """
+        if not args:
+            msg = "サブコマンドがありません"
+            raise UnsupportedDockerCommandError(msg)
+        handler = {
+            "create": self._cli_create,
+            "start": self._cli_start,
+            "rm": self._cli_rm,
+            "rename": self._cli_rename,
+            "inspect": self._cli_inspect,
+            "ps": self._cli_ps,
+            "exec": self._cli_exec,
+        }.get(args[0])
+        if handler is None:
+            msg = f"未対応のサブコマンドです: {args[0]}"
+            raise UnsupportedDockerCommandError(msg)
+
+        try:
+            return handler(args[1:], timeout or self.timeout)
+        except (DockerEngineUnavailableError, DockerEngineTimeoutError, DockerEngineConnectionLostError):
+            raise
+        except DockerEngineError as e:
+            return 1, "", f"Error response from daemon: {e}\n"
+
+    def _cli_create(self, args: list[str], timeout: float) -> tuple[int, str, str]:
+        name, config = parse_create_args(args)
+        try:
+            container_id = self.create_container(name, config, timeout=timeout)
+        except DockerEngineError as e:
+            if e.status_code == http.client.NOT_FOUND:
+                # イメージがない場合はpullできるdocker CLIに任せる
+                msg = f"イメージがありません: {config['Image']}"
+                raise UnsupportedDockerCommandError(msg) from e
+            raise
+        return 0, f"{container_id}\n", ""
+
+    def _cli_start(self, args: list[str], timeout: float) -> tuple[int, str, str]:
+        containers = _positional(args, count=None)
+        for container in containers:
+            self.start_container(container, timeout=timeout)
+        return 0, "".join(f"{container}\n" for container in containers), ""
+
+    def _cli_rm(self, args: list[str], timeout: float) -> tuple[int, str, str]:
+        force = False
+        containers = []
+        for arg in args:
+            if arg in ("-f", "--force"):
+                force = True
+            elif arg.startswith("-"):
+                msg = f"未対応のオプションです: rm {arg}"
+                raise UnsupportedDockerCommandError(msg)
+            else:
+                containers.append(arg)
+
+        # docker rmと同じく、削除できなかったコンテナがあっても残りは削除する
+        stdout, stderr = [], []
+        for container in containers:
+            try:
+                self.remove_container(container, force=force, timeout=timeout)
+                stdout.append(f"{container}\n")
+            except (DockerEngineUnavailableError, DockerEngineTimeoutError):
+                raise
+            except DockerEngineError as e:
+                stderr.append(f"Error response from daemon: {e}\n")
+        return (1 if stderr else 0), "".join(stdout), "".join(stderr)
+
+    def _cli_rename(self, args: list[str], timeout: float) -> tuple[int, str, str]:
+        container, new_name = _positional(args, count=2)
+        self.rename_container(container, new_name, timeout=timeout)
+        return 0, "", ""
+
+    def _cli_inspect(self, args: list[str], timeout: float) -> tuple[int, str, str]:
+        options, containers = _split_options(args, {"-f": "format", "--format": "format"}, flags={})
+        if "format" not in options:
+            msg = "inspectは--formatの指定がある場合のみ対応しています"
+            raise UnsupportedDockerCommandError(msg)
+        lines = []
+        for container in containers:
+            data = self.inspect_container(container, timeout=timeout)
+            lines.append(_render_template(options["format"][-1], data) + "\n")
+        return 0, "".join(lines), ""
+
+    def _cli_ps(self, args: list[str], timeout: float) -> tuple[int, str, str]:
+        options, positional = _split_options(
+            args,
+            {"-f": "filter", "--filter": "filter", "--format": "format"},
+            flags={"-a": "all", "--all": "all", "-q": "quiet", "--quiet": "quiet"},
+        )
+        if positional:
+            msg = f"未対応の引数です: ps {' '.join(positional)}"
+            raise UnsupportedDockerCommandError(msg)
+        if "quiet" in options:
+            template = "{{.ID}}"
+        elif "format" in options:
+            template = options["format"][-1]
+        else:
+            msg = "psは--formatまたは-qの指定がある場合のみ対応しています"
+            raise UnsupportedDockerCommandError(msg)
+
+        filters: dict[str, list[str]] = {}
+        for item in options.get("filter", []):
+            key, _, value = item.partition("=")
+            filters.setdefault(key, []).append(value)
+
+        containers = self.list_containers(all_containers="all" in options, filters=filters, timeout=timeout)
+        lines = [_render_template(template, _ps_fields(container)) + "\n" for container in containers]
+        return 0, "".join(lines), ""
+
+    def _cli_exec(self, args: list[str], timeout: float) -> tuple[int, str, str]:
+        request = parse_exec_args(args)
+        exit_code, stdout, stderr = self.exec_run(request, timeout=timeout)
+        return exit_code, stdout.decode("utf-8", errors="replace"), stderr.decode("utf-8", errors="replace")
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict[str, Any] | None = None,
+        body: Any = None,
+        timeout: float | None = None,
+    ) -> Any:
+        """APIを呼び出し、レスポンスを返す(JSONの場合はデコードする).
+
+        プールの接続がデーモン側で閉じられていた場合は、新しい接続で1回だけ再試行します。
+
+        Raises:
+            DockerEngineUnavailableError: 接続できない場合
+            DockerEngineTimeoutError: タイムアウトした場合
+            DockerEngineError: エラーレスポンスの場合
+
+        """
+        url = path + (f"?{urlencode(params)}" if params else "")
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        timeout = timeout or self.timeout
+
+        for attempt in range(2):
+            conn, reused = self._acquire(timeout)
+            try:
+                conn.request(method, url, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except TimeoutError as e:
+                conn.close()
+                msg = f"Docker Engine APIの呼び出しがタイムアウトしました: {method} {path}"
+                raise DockerEngineTimeoutError(msg) from e
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                self._mark_unavailable()
+                msg = f"Dockerデーモンに接続できません: {e}"
+                raise DockerEngineUnavailableError(msg) from e
+            break
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+
+        if response.status >= http.client.BAD_REQUEST:
+            raise DockerEngineError(_error_message(data), response.status)
+        if "json" in (response.getheader("Content-Type") or "") and data:
+            return json.loads(data)
+        return data.decode("utf-8", errors="replace")
+
+    def _acquire(self, timeout: float) -> tuple[_UnixHTTPConnection, bool]:
+        """プールから接続を取り出す(空の場合は新しい接続を作成する)."""
+        try:
+            conn = self._pool.get_nowait()
+            reused = True
+        except queue.Empty:
+            conn = _UnixHTTPConnection(self.socket_path, timeout)
+            reused = False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, reused
+
+    def _release(self, conn: _UnixHTTPConnection) -> None:
+        """接続をプールに戻す(プールが満杯の場合は閉じる)."""
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _mark_unavailable(self) -> None:
+        if self.available:
+            logger.warning(
+                "Docker Engine APIに接続できないため、%d秒間docker CLIを使用します: %s",
+                UNAVAILABLE_RETRY_SECONDS, self.socket_path,
+            )
+        self._unavailable_until = time.monotonic() + UNAVAILABLE_RETRY_SECONDS
+        self.close()
+
+
+class _PrefixedSocket:
+    """ハイジャック時に受信済みのデータを先に返すソケットのラッパー."""
+
+    def __init__(self, sock: socket.socket, prefix: bytes) -> None:
+        self._sock = sock
+        self._prefix = prefix
+
+    def settimeout(self, timeout: float) -> None:
+        self._sock.settimeout(timeout)
+
+    def recv(self, size: int) -> bytes:
+        if self._prefix:
+            data, self._prefix = self._prefix[:size], self._prefix[size:]
+            return data
+        return self._sock.recv(size)
+
+    def close(self) -> None:
+        with contextlib.suppress(OSError):
+            self._sock.shutdown(socket.SHUT_RDWR)
+        self._sock.close()
+
+
+def _read_response_head(sock: socket.socket) -> tuple[int, dict[str, str], bytes]:
+    """HTTPレスポンスのステータス行とヘッダを読み取り、ヘッダの後の受信済みデータも返す."""
+    data = b""
+    while b"\r\n\r\n" not in data:
+        chunk = sock.recv(READ_CHUNK_SIZE)
+        if not chunk:
+            msg = "レスポンスのヘッダを受信する前に接続が閉じられました"
+            raise OSError(msg)
+        data += chunk
+    head, rest = data.split(b"\r\n\r\n", 1)
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    status = int(status_line.split()[1])
+    headers = {}
+    for line in header_lines:
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+    return status, headers, rest
+
+
+def _read_frames(sock: socket.socket | _PrefixedSocket, deadline: float) -> Iterator[tuple[str, bytes]]:
+    """多重化ストリームのフレームを (ストリーム名, データ) として順に返す.
+
+    Raises:
+        TimeoutError: deadlineまでにストリームが終わらなかった場合
+
+    """
+    buffer = bytearray()
+    while True:
+        while len(buffer) >= _FRAME_HEADER.size:
+            stream_type, size = _FRAME_HEADER.unpack_from(buffer)
+            if len(buffer) < _FRAME_HEADER.size + size:
+                break
+            payload = bytes(buffer[_FRAME_HEADER.size:_FRAME_HEADER.size + size])
+            del buffer[:_FRAME_HEADER.size + size]
+            if stream_type in _FRAME_STREAMS and payload:
+                yield _FRAME_STREAMS[stream_type], payload
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError
+        sock.settimeout(remaining)
+        chunk = sock.recv(READ_CHUNK_SIZE)
+        if not chunk:
+            return
+        buffer.extend(chunk)
+
+
+def _error_message(data: bytes) -> str:
+    """エラーレスポンスからメッセージを取り出す."""
+    try:
+        return json.loads(data)["message"]
+    except (ValueError, KeyError, TypeError):
+        return data.decode("utf-8", errors="replace").strip()
+
+
+def parse_exec_args(args: list[str]) -> ExecRequest:
+    """docker execの引数(サブコマンドを除く)をexecの作成条件に変換する.
+
+    Raises:
+        UnsupportedDockerCommandError: 標準入力・TTYの指定など、変換できない引数の場合
+
+    """
+    options, positional = _split_options(
+        args,
+        {"-w": "workdir", "--workdir": "workdir", "-e": "env", "--env": "env", "-u": "user", "--user": "user"},
+        flags={},
+        stop_at_positional=True,
+    )
+    container, *cmd = positional or [""]
+    if not cmd:
+        msg = "execにはコンテナとコマンドの指定が必要です"
+        raise UnsupportedDockerCommandError(msg)
+    return ExecRequest(
+        container=container,
+        cmd=cmd,
+        workdir=options.get("workdir", [None])[-1],
+        env=options.get("env", []),
+        user=options.get("user", [None])[-1],
+    )
+
+
+def parse_create_args(args: list[str]) -> tuple[str, dict[str, Any]]:
+    """docker createの引数(サブコマンドを除く)をコンテナ名とコンテナ作成条件に変換する.
+
+    Raises:
+        UnsupportedDockerCommandError: --nameがない、または未対応のオプションの場合
+
+    """
+    options, positional = _split_options(
+        args,
+        {
+            "--name": "name",
+            "--cpus": "cpus",
+            "-m": "memory", "--memory": "memory",
+            "-w": "workdir", "--workdir": "workdir",
+            "--security-opt": "security_opt",
+            "--network": "network",
+            "-v": "volume", "--volume": "volume",
+            "-e": "env", "--env": "env",
+            "-l": "label", "--label": "label",
+        },
+        flags={},
+        stop_at_positional=True,
+    )
+    if "name" not in options or not positional:
+        msg = "createには--nameとイメージの指定が必要です"
+        raise UnsupportedDockerCommandError(msg)
+
+    host_config: dict[str, Any] = {}
+    if "cpus" in options:
+        host_config["NanoCpus"] = int(float(options["cpus"][-1]) * 1_000_000_000)
+    if "memory" in options:
+        host_config["Memory"] = _parse_memory(options["memory"][-1])
+    if "security_opt" in options:
+        host_config["SecurityOpt"] = options["security_opt"]
+    if "network" in options:
+        host_config["NetworkMode"] = options["network"][-1]
+    if "volume" in options:
+        host_config["Binds"] = options["volume"]
+
+    config: dict[str, Any] = {"Image": positional[0], "HostConfig": host_config}
+    if len(positional) > 1:
+        config["Cmd"] = positional[1:]
+    if "workdir" in options:
+        config["WorkingDir"] = options["workdir"][-1]
+    if "env" in options:
+        config["Env"] = options["env"]
+    if "label" in options:
+        config["Labels"] = dict(label.partition("=")[::2] for label in options["label"])
+    return options["name"][-1], config
+
+
+def _split_options(
+    args: list[str],
+    value_options: dict[str, str],
+    flags: dict[str, str],
+    *,
+    stop_at_positional: bool = False,
+) -> tuple[dict[str, list[str]], list[str]]:
+    """CLIの引数をオプション(名前ごとの値のリスト)と位置引数に分ける.
+
+    Raises:
+        UnsupportedDockerCommandError: 未対応のオプションの場合
+
+    """
+    options: dict[str, list[str]] = {}
+    positional: list[str] = []
+    index = 0
+    while index < len(args):
+        arg = args[index]
+        if positional and stop_at_positional:
+            positional.extend(args[index:])
+            break
+        if not arg.startswith("-") or arg == "-":
+            positional.append(arg)
+        elif arg in flags:
+            options.setdefault(flags[arg], []).append("true")
+        else:
+            name, has_value, value = arg.partition("=")
+            if name not in value_options:
+                msg = f"未対応のオプションです: {arg}"
+                raise UnsupportedDockerCommandError(msg)
+            if not has_value:
+                index += 1
+                if index >= len(args):
+                    msg = f"オプションの値がありません: {arg}"
+                    raise UnsupportedDockerCommandError(msg)
+                value = args[index]
+            options.setdefault(value_options[name], []).append(value)
+        index += 1
+    return options, positional
+
+
+def _positional(args: list[str], count: int | None) -> list[str]:
+    """オプションを含まない引数を取得する(countを指定した場合は個数も確認する)."""
+    if any(arg.startswith("-") for arg in args) or (count is not None and len(args) != count):
+        msg = f"未対応の引数です: {' '.join(args)}"
+        raise UnsupportedDockerCommandError(msg)
+    return args
+
+
+def _parse_memory(value: str) -> int:
+    """docker CLIのメモリ指定(例: 4g)をバイト数に変換する."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([bkmgt]?)b?", value.strip().lower())
+    if not match:
+        msg = f"メモリ指定を解釈できません: {value}"
+        raise UnsupportedDockerCommandError(msg)
+    return int(float(match.group(1)) * _MEMORY_UNITS[match.group(2)])
+
+
+def _ps_fields(container: dict[str, Any]) -> dict[str, Any]:
+    """containers/jsonの要素をdocker psの--formatで使うフィールドに変換する."""
+    created = datetime.fromtimestamp(container.get("Created", 0), tz=timezone.utc)
+    return {
+        "ID": container.get("Id", "")[:12],
+        "Names": ",".join(name.lstrip("/") for name in container.get("Names") or []),
+        "Image": container.get("Image", ""),
+        "CreatedAt": created.strftime("%Y-%m-%d %H:%M:%S +0000 UTC"),
+        "State": container.get("State", ""),
+        "Status": container.get("Status", ""),
+        "Labels": container.get("Labels") or {},
+    }
+
+
+def _render_template(template: str, data: dict[str, Any]) -> str:
+    """{{.Field}} と {{.Label "key"}} の形式のみのGoテンプレートをデータで置き換える.
+
+    Raises:
+        UnsupportedDockerCommandError: 対応していない構文・フィールドを含む場合
+
+    """
+    def replace(match: re.Match[str]) -> str:
+        label, path = match.groups()
+        if label is not None:
+            # docker psと同じく、ラベルがない場合は空文字列
+            labels = data.get("Labels")
+            if not isinstance(labels, dict):
+                msg = f"未対応のフィールドです: {match.group(0)}"
+                raise UnsupportedDockerCommandError(msg)
+            return labels.get(label, "")
+
+        value: Any = data
+        for key in path.split("."):
+            if not isinstance(value, dict) or key not in value:
+                msg = f"未対応のフィールドです: {match.group(0)}"
+                raise UnsupportedDockerCommandError(msg)
+            value = value[key]
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        if isinstance(value, bool):
+            return str(value).lower()
+        return "" if value is None else str(value)
+
+    if "{{" in _TEMPLATE_FIELD.sub("", template):
+        msg = f"未対応のテンプレートです: {template}"
+        raise UnsupportedDockerCommandError(msg)
+    return _TEMPLATE_FIELD.sub(replace, template)
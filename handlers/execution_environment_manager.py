@@ -6,16 +6,44 @@ Command Executor MCP Server連携のためのDocker実行環境を管理する
 """
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
 import re
 import subprocess
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+from handlers.docker_engine_client import (
+    DEFAULT_POOL_SIZE,
+    DockerEngineClient,
+    DockerEngineConnectionLostError,
+    DockerEngineError,
+    DockerEngineTimeoutError,
+    DockerEngineUnavailableError,
+    UnsupportedDockerCommandError,
+    get_docker_engine_client,
+    parse_exec_args,
+)
+from handlers.output_capture import BoundedOutputBuffer, StreamingResult, run_streaming
+from handlers.persistent_shell import PersistentShell, PersistentShellError
+from handlers.repository_mirror_cache import DEFAULT_LOCK_TIMEOUT_SECONDS, RepositoryMirrorCache, strip_credentials
+from handlers.warm_container_pool import (
+    DEFAULT_REFILL_INTERVAL_SECONDS,
+    PooledContainer,
+    get_warm_container_pool,
+    start_warm_container_pool,
+    stop_warm_container_pool,
+)
+
 if TYPE_CHECKING:
+    from context_storage.tool_store import ToolStore
     from handlers.task import Task
 
 
@@ -29,6 +57,20 @@ DEFAULT_ENVIRONMENTS: dict[str, str] = {
 # デフォルト環境名（フォールバック用定数）
 DEFAULT_ENVIRONMENT = "python"
 
+# パッケージマネージャーごとのキャッシュ(コンテナ内のパス, キャッシュ先を指定する環境変数)
+DEPENDENCY_CACHE_DIRS: dict[str, tuple[str, str]] = {
+    "npm": ("/cache/npm", "npm_config_cache"),
+    "pip": ("/cache/pip", "PIP_CACHE_DIR"),
+    "conda": ("/cache/conda-pkgs", "CONDA_PKGS_DIRS"),
+    "bundler": ("/cache/bundler", "BUNDLE_USER_CACHE"),
+}
+
+# コマンドの全出力を書き出すディレクトリ(タスクのコンテキストディレクトリ内)
+COMMAND_OUTPUT_DIR = "command_outputs"
+
+# 依存関係スナップショットをコンテナとの間でコピーする際のコンテナ内の一時ファイル
+DEPENDENCY_SNAPSHOT_STAGING_PATH = "/tmp/dependency-snapshot-{cache}.tar.gz"
+
 
 @dataclass
 class ContainerInfo:
@@ -52,6 +94,63 @@ class ContainerInfo:
     status: str = "created"
 
 
+@dataclass(frozen=True)
+class DependencyInstaller:
+    """依存関係のインストール方法を保持するデータクラス.
+
+    Attributes:
+        manifest: 検出対象の依存関係ファイル
+        command: インストールコマンド
+        cache: 使用するパッケージマネージャーのキャッシュ(DEPENDENCY_CACHE_DIRSのキー)
+        group: 同じインストール先を共有するグループ。
+            同じグループのインストールは順番に、異なるグループのインストールは並列に実行される
+        lock_files: スナップショットのキーに含めるファイル
+        snapshot_paths: インストール結果のディレクトリ(コンテナ内のシェルで展開される)。
+            Noneの場合はスナップショットを作成しない
+
+    """
+
+    manifest: str
+    command: tuple[str, ...]
+    cache: str
+    group: str
+    lock_files: tuple[str, ...]
+    snapshot_paths: str | None = None
+
+
+# 依存関係ファイルとインストール方法
+# condaの環境はサイズが大きいためスナップショットの対象外とし、パッケージキャッシュのみ共有する
+DEPENDENCY_INSTALLERS: tuple[DependencyInstaller, ...] = (
+    DependencyInstaller(
+        "package.json", ("npm", "install"), "npm", "node",
+        ("package.json", "package-lock.json"), "/workspace/project/node_modules",
+    ),
+    DependencyInstaller(
+        "requirements.txt", ("pip", "install", "-r", "requirements.txt"), "pip", "python",
+        ("requirements.txt",),
+        "$(python -c 'import sysconfig; p = sysconfig.get_paths(); print(p[\"purelib\"], p[\"scripts\"])')",
+    ),
+    DependencyInstaller(
+        "environment.yml", ("mamba", "env", "update", "-f", "environment.yml"), "conda", "python",
+        ("environment.yml",),
+    ),
+    DependencyInstaller(
+        "condaenv.yaml", ("mamba", "env", "update", "-f", "condaenv.yaml"), "conda", "python",
+        ("condaenv.yaml",),
+    ),
+    DependencyInstaller(
+        "Gemfile", ("bundle", "install"), "bundler", "ruby",
+        ("Gemfile", "Gemfile.lock"), "$(gem env gemdir)",
+    ),
+)
+
+# 依存関係インストールの最大時間(秒)
+DEPENDENCY_INSTALL_TIMEOUT_SECONDS = 600
+
+# 残存コンテナを並列に削除する最大数
+STALE_CLEANUP_MAX_WORKERS = 8
+
+
 @dataclass
 class ExecutionResult:
     """コマンド実行結果を保持するデータクラス.
@@ -80,6 +179,12 @@ class ExecutionEnvironmentManager:
 
     # コンテナ名のプレフィックス
     CONTAINER_PREFIX = "coding-agent-exec"
+    # ウォームプールの待機コンテナ名のプレフィックス(残存コンテナのクリーンアップ対象に含まれる)
+    POOL_CONTAINER_PREFIX = f"{CONTAINER_PREFIX}-pool"
+    # 残存コンテナのクリーンアップでサーバー側の絞り込みに使うラベル
+    MANAGED_LABEL = "coding-agent.execution-environment"
+    TASK_UUID_LABEL = "coding-agent.task-uuid"
+    CREATED_AT_LABEL = "coding-agent.created-at"
 
     def __init__(self, config: dict[str, Any]) -> None:
         """ExecutionEnvironmentManagerを初期化する.
@@ -110,6 +215,15 @@ class ExecutionEnvironmentManager:
             "base_image", "coding-agent-executor:latest",
         )
 
+        # Docker Engine API設定(利用できない場合やAPIに変換できない引数の場合はdocker CLIを使用)
+        engine_api_config = self._docker_config.get("engine_api", {})
+        self._docker_api: DockerEngineClient | None = None
+        if engine_api_config.get("enabled", False):
+            self._docker_api = get_docker_engine_client(
+                engine_api_config.get("socket_path"),
+                engine_api_config.get("pool_size", DEFAULT_POOL_SIZE),
+            )
+
         # リソース制限設定
         resources = self._docker_config.get("resources", {})
         self._cpu_limit = resources.get("cpu_limit", 2)
@@ -121,25 +235,77 @@ class ExecutionEnvironmentManager:
         self._clone_depth = clone_config.get("depth", 1)
         self._auto_install_deps = clone_config.get("auto_install_deps", True)
 
+        # 依存関係キャッシュ設定
+        dep_cache_config = self._executor_config.get("dependency_cache", {})
+        self._dep_cache_enabled = dep_cache_config.get("enabled", True)
+        self._dep_cache_volume_prefix = dep_cache_config.get("volume_prefix", "coding-agent-cache")
+        snapshot_config = dep_cache_config.get("snapshots", {})
+        self._dep_snapshot_enabled = self._dep_cache_enabled and snapshot_config.get("enabled", True)
+        # スナップショットはコンテナにマウントせず、このプロセスがdocker cpでコピーする
+        self._dep_snapshot_dir = Path(snapshot_config.get("dir", "contexts/dependency_snapshots"))
+        self._dep_snapshot_max_entries = snapshot_config.get("max_entries", 20)
+
+        # リポジトリミラーキャッシュ設定
+        mirror_config = clone_config.get("mirror_cache", {})
+        self._mirror_cache: RepositoryMirrorCache | None = None
+        self._mirror_host_dir: str | None = None
+        self._mirror_container_path = mirror_config.get("container_path", "/mirror")
+        if mirror_config.get("enabled", False):
+            mirror_dir = Path(mirror_config.get("dir", "contexts/repo_mirrors"))
+            self._mirror_cache = RepositoryMirrorCache(
+                mirror_dir,
+                lock_timeout=mirror_config.get("lock_timeout_seconds", DEFAULT_LOCK_TIMEOUT_SECONDS),
+            )
+            # コンテナへのマウントにはDockerホストから見たパスが必要
+            self._mirror_host_dir = mirror_config.get("host_dir") or str(mirror_dir.resolve())
+        # タスクのコンテナにマウントしたミラーのディレクトリ名(タスクUUID → ミラー名)
+        self._task_mirrors: dict[str, str] = {}
+
         # 実行設定
         execution_config = self._executor_config.get("execution", {})
         self._timeout_seconds = execution_config.get("timeout_seconds", 1800)
         self._max_output_size = execution_config.get("max_output_size", 1048576)  # 1MB
+        # 出力量の合計がこれを超えたらコマンドを打ち切る(0の場合は打ち切らない)
+        self._max_total_output_size = execution_config.get("max_total_output_size", 268435456)  # 256MB
+        self._spill_output = execution_config.get("spill_output", True)
+        # コンテナごとの永続シェルでコマンドを実行する(cdや環境変数がコマンド間で保持される)
+        self._persistent_shell_enabled = execution_config.get("persistent_shell", False)
+        self._shells: dict[str, PersistentShell] = {}
 
         # クリーンアップ設定
         cleanup_config = self._executor_config.get("cleanup", {})
         self._cleanup_interval_hours = cleanup_config.get("interval_hours", 24)
         self._stale_threshold_hours = cleanup_config.get("stale_threshold_hours", 24)
 
+        # ウォームプール設定
+        self._warm_pool_config = self._executor_config.get("warm_pool", {})
+
+        # 一時停止時のチェックポイント設定
+        checkpoint_config = self._executor_config.get("checkpoint", {})
+        self._checkpoint_enabled = checkpoint_config.get("enabled", False)
+        self._checkpoint_repository = checkpoint_config.get("image_repository", "coding-agent-checkpoint")
+        self._checkpoint_timeout = checkpoint_config.get("timeout_seconds", 600)
+        # 再開されないチェックポイントのイメージを残存とみなす経過時間(時間)
+        self._checkpoint_retention_hours = checkpoint_config.get("retention_hours", self._stale_threshold_hours)
+        # 再開時に復元するチェックポイント(最初のprepareで使用する)と、復元に使ったイメージ
+        self._resume_checkpoint: dict[str, Any] | None = None
+        self._restored_checkpoint_image: str | None = None
+
         # アクティブコンテナの追跡
         self._active_containers: dict[str, ContainerInfo] = {}
 
+        # 依存関係インストールの所要時間(ToolStoreに記録するまで保持)
+        self._tool_store: ToolStore | None = None
+        self._dependency_timings: list[dict[str, Any]] = []
+        self._dependency_timing_lock = threading.Lock()
+
         # 現在のタスク参照（コマンド実行時に使用）
         self._current_task: Task | None = None
 
         # テキスト編集MCP設定を取得
         self._text_editor_config = config.get("text_editor_mcp", {})
         self._text_editor_enabled = self._is_text_editor_enabled()
+        self._batch_edit_enabled = self._text_editor_config.get("batch_edit", {}).get("enabled", False)
 
         # アクティブなtext-editor MCPクライアントの追跡
         self._text_editor_clients: dict[str, Any] = {}
@@ -171,6 +337,21 @@ class ExecutionEnvironmentManager:
         """
         self._current_task = task
 
+    def set_tool_store(self, tool_store: ToolStore) -> None:
+        """依存関係インストールの所要時間を記録するToolStoreを設定する.
+
+        設定前に記録した所要時間はこの時点でまとめて書き込みます。
+
+        Args:
+            tool_store: タスクのToolStore
+
+        """
+        with self._dependency_timing_lock:
+            self._tool_store = tool_store
+            pending, self._dependency_timings = self._dependency_timings, []
+            for timing in pending:
+                self._record_dependency_timing(timing)
+
     def is_enabled(self) -> bool:
         """Command Executor機能が有効かどうかを確認する.
         
@@ -215,6 +396,15 @@ class ExecutionEnvironmentManager:
             subprocess.TimeoutExpired: タイムアウト
 
         """
+        if self._docker_api is not None and self._docker_api.available:
+            result = self._run_docker_api(args, timeout=timeout or 60)
+            if result is not None:
+                if check and result.returncode != 0:
+                    raise subprocess.CalledProcessError(
+                        result.returncode, result.args, output=result.stdout, stderr=result.stderr,
+                    )
+                return result
+
         cmd = ["docker", *args]
         self.logger.debug("Docker command: %s", " ".join(cmd))
 
@@ -226,6 +416,38 @@ class ExecutionEnvironmentManager:
             check=check,
         )
 
+    def _run_docker_api(self, args: list[str], *, timeout: int) -> subprocess.CompletedProcess | None:
+        """DockerコマンドをDocker Engine APIの呼び出しで実行する.
+
+        Args:
+            args: Dockerコマンドの引数
+            timeout: タイムアウト秒数
+
+        Returns:
+            docker CLIと同じ形式の実行結果(APIで実行できない場合はNone)
+
+        Raises:
+            subprocess.TimeoutExpired: タイムアウト
+            subprocess.SubprocessError: execの開始後にDockerデーモンとの接続が失われた場合
+
+        """
+        cmd = ["docker", *args]
+        try:
+            returncode, stdout, stderr = self._docker_api.run_cli_command(args, timeout=timeout)
+        except UnsupportedDockerCommandError as e:
+            self.logger.debug("docker CLIで実行します: %s (%s)", args[0], e)
+            return None
+        except DockerEngineUnavailableError:
+            return None
+        except DockerEngineTimeoutError as e:
+            raise subprocess.TimeoutExpired(cmd, timeout) from e
+        except DockerEngineConnectionLostError as e:
+            # コマンドは実行済みの可能性があるため、docker CLIで実行し直さない
+            msg = f"{' '.join(cmd)}: {e}"
+            raise subprocess.SubprocessError(msg) from e
+        self.logger.debug("Docker Engine API: %s", " ".join(cmd))
+        return subprocess.CompletedProcess(cmd, returncode, stdout, stderr)
+
     def _get_clone_url(self, task: Task) -> tuple[str, str | None]:
         """タスクからクローンURLとブランチを取得する.
         
@@ -345,8 +567,25 @@ class ExecutionEnvironmentManager:
         except (RuntimeError, subprocess.SubprocessError) as e:
             self.logger.warning("既存コンテナの削除に失敗: %s", e)
 
-        # コンテナを作成（選択された環境のイメージを使用）
-        container_id, is_custom_image = self._create_container(task, selected_env)
+        start_time = time.monotonic()
+
+        # 一時停止時のチェックポイントがあれば、クローンと依存関係のインストールを省略して復元する
+        container_info = self._restore_checkpoint(task, container_name, selected_env)
+        if container_info is not None:
+            self.logger.info(
+                "チェックポイントから実行環境を復元しました: %s (%.1f秒)",
+                container_info.container_id, time.monotonic() - start_time,
+            )
+            return container_info
+
+        # ウォームプールの待機コンテナを払い出す（なければ選択された環境のイメージで作成）
+        pooled = self._acquire_pooled_container(container_name, selected_env)
+        if pooled is not None:
+            container_id = pooled.container_id
+            # 待機コンテナはgitのインストールまで完了している
+            is_custom_image = True
+        else:
+            container_id, is_custom_image = self._create_container(task, selected_env)
 
         # コンテナ情報を作成（environment_name属性を含める）
         container_info = ContainerInfo(
@@ -378,7 +617,7 @@ class ExecutionEnvironmentManager:
         # 依存関係の自動インストール
         if self._auto_install_deps:
             try:
-                self._install_dependencies(container_id)
+                self._install_dependencies(container_id, strip_credentials(self._get_clone_url(task)[0]))
             except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
                 self.logger.warning("依存関係のインストールに失敗: %s", e)
 
@@ -393,6 +632,14 @@ class ExecutionEnvironmentManager:
         # アクティブコンテナに登録
         self._active_containers[task_uuid] = container_info
 
+        pool = get_warm_container_pool()
+        if pool is not None:
+            metrics = pool.record_ready(selected_env, time.monotonic() - start_time, hit=pooled is not None)
+            self.logger.info(
+                "ウォームプール利用状況(%s): ヒット率=%.2f, 平均準備時間=%.1f秒",
+                selected_env, metrics["hit_rate"], metrics["avg_ready_seconds"],
+            )
+
         self.logger.info(
             "実行環境の準備が完了しました: %s (環境: %s)",
             container_id,
@@ -400,6 +647,105 @@ class ExecutionEnvironmentManager:
         )
         return container_info
 
+    def checkpoint(self, task_uuid: str) -> dict[str, Any] | None:
+        """タスクのコンテナをイメージとして保存する(一時停止時に使用).
+
+        クローン済みのプロジェクト、インストール済みの依存関係、作業中の変更を含む
+        コンテナのファイルシステムを `docker commit` で保存します。
+        再開時に set_resume_checkpoint で渡すと、prepare はこのイメージからコンテナを作成します。
+
+        Args:
+            task_uuid: タスクのUUID
+
+        Returns:
+            チェックポイントの情報(無効な場合や保存に失敗した場合はNone)
+
+        """
+        container_info = self._active_containers.get(task_uuid)
+        if not self._checkpoint_enabled or container_info is None or container_info.status != "ready":
+            return None
+
+        # 一時停止のたびに別のタグで保存する(前回のチェックポイントは再開後のcleanupで削除する)
+        image = f"{self._checkpoint_repository}:{task_uuid}-{time.strftime('%Y%m%d%H%M%S')}"
+        start_time = time.monotonic()
+        try:
+            self._run_docker_command(
+                ["commit", container_info.container_id, image], timeout=self._checkpoint_timeout,
+            )
+        except subprocess.SubprocessError as e:
+            self.logger.warning("実行環境のチェックポイントの保存に失敗しました: %s", e)
+            return None
+
+        self.logger.info(
+            "実行環境のチェックポイントを保存しました: %s (%.1f秒)", image, time.monotonic() - start_time,
+        )
+        return {
+            "image": image,
+            "environment_name": container_info.environment_name,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def set_resume_checkpoint(self, checkpoint: dict[str, Any] | None) -> None:
+        """再開時に復元するチェックポイントを設定する.
+
+        Args:
+            checkpoint: checkpoint で保存したチェックポイントの情報
+
+        """
+        self._resume_checkpoint = checkpoint if self._checkpoint_enabled else None
+
+    def _restore_checkpoint(
+        self, task: Task, container_name: str, environment_name: str,
+    ) -> ContainerInfo | None:
+        """チェックポイントのイメージからタスクのコンテナを作成する.
+
+        チェックポイントの環境が要求された環境と異なる場合は復元しません。
+        復元に使ったイメージは、コンテナを削除する cleanup で削除します。
+
+        Args:
+            task: タスクオブジェクト
+            container_name: タスク用のコンテナ名
+            environment_name: 使用する環境名
+
+        Returns:
+            復元したコンテナの情報(チェックポイントがない、または復元できない場合はNone)
+
+        """
+        checkpoint = self._resume_checkpoint
+        if not checkpoint:
+            return None
+        self._resume_checkpoint = None
+
+        image = checkpoint["image"]
+        if checkpoint.get("environment_name") != environment_name:
+            # 使われないチェックポイントのイメージは残さない
+            self._run_docker_command(["rmi", image], check=False)
+            return None
+        try:
+            # クローン済みのプロジェクトはミラーのオブジェクトを参照するため、同じミラーをマウントする
+            container_id = self._create_and_start_container(
+                container_name, environment_name, image, task_uuid=task.uuid,
+                mirror_name=self._prepare_task_mirror(task, update=False),
+            )
+        except RuntimeError as e:
+            self.logger.warning("チェックポイントから復元できないため、新しく準備します: %s (%s)", image, e)
+            return None
+        self._restored_checkpoint_image = image
+
+        container_info = ContainerInfo(
+            container_id=container_id,
+            task_uuid=task.uuid,
+            environment_name=environment_name,
+            status="ready",
+        )
+        if self._text_editor_enabled:
+            try:
+                self._start_text_editor_mcp(container_id, task.uuid)
+            except Exception as e:
+                self.logger.warning("text-editor MCPの起動に失敗しました: %s", e)
+        self._active_containers[task.uuid] = container_info
+        return container_info
+
     def _validate_and_select_environment(self, environment_name: str | None) -> str:
         """環境名を検証し、使用する環境を選択する.
 
@@ -444,24 +790,70 @@ class ExecutionEnvironmentManager:
             RuntimeError: コンテナ作成に失敗した場合
 
         """
-        task_uuid = task.uuid
-        container_name = self._get_container_name(task_uuid)
+        container_name = self._get_container_name(task.uuid)
+        image, is_custom_image = self._select_image(environment_name)
+        container_id = self._create_and_start_container(
+            container_name, environment_name, image, task_uuid=task.uuid,
+            mirror_name=self._prepare_task_mirror(task, update=True),
+        )
+        return container_id, is_custom_image
+
+    def _prepare_task_mirror(self, task: Task, *, update: bool) -> str | None:
+        """タスクのコンテナにマウントするリポジトリミラーを準備する.
+
+        マウントするのはタスクのリポジトリのミラーのみで、他のリポジトリのミラーは
+        コンテナから参照できません。
+
+        Args:
+            task: タスクオブジェクト
+            update: ミラーを作成・最新化するか(Falseの場合は既存のミラーのみ使用)
+
+        Returns:
+            ミラーのディレクトリ名(ミラーを使用しない場合はNone)
+
+        """
+        if self._mirror_cache is None:
+            return None
+        clone_url, _ = self._get_clone_url(task)
+        if not update:
+            name = self._mirror_cache.mirror_name(clone_url)
+            return name if (self._mirror_cache.cache_dir / name / "HEAD").exists() else None
+        try:
+            return self._mirror_cache.update(clone_url)
+        except RuntimeError as e:
+            self.logger.warning("ミラーを更新できないため、リモートからクローンします: %s", e)
+            return None
 
-        # 環境名に基づいてイメージを選択
-        is_custom_image = False
+    def _select_image(self, environment_name: str | None) -> tuple[str, bool]:
+        """環境名に基づいてイメージを選択する.
+
+        Args:
+            environment_name: 環境名
+
+        Returns:
+            (イメージ名, カスタムイメージ使用フラグ) のタプル
+
+        """
         if environment_name and environment_name in self._environments:
             image = self._environments[environment_name]
-            is_custom_image = True
             self.logger.info("環境 '%s' のイメージを使用: %s", environment_name, image)
-        else:
-            # フォールバック: base_imageを使用
-            image = self._base_image
-            self.logger.info("デフォルトイメージを使用: %s", image)
+            return image, True
+        # フォールバック: base_imageを使用
+        self.logger.info("デフォルトイメージを使用: %s", self._base_image)
+        return self._base_image, False
 
-        # コンテナ作成コマンドを構築
-        create_args = [
-            "create",
-            "--name", container_name,
+    def _build_create_options(self, environment_name: str | None, mirror_name: str | None = None) -> list[str]:
+        """コンテナ名・イメージ以外のコンテナ作成オプションを構築する.
+
+        Args:
+            environment_name: 環境名(依存関係キャッシュのボリュームの選択に使用)
+            mirror_name: 読み取り専用でマウントするタスクのリポジトリミラーのディレクトリ名
+
+        Returns:
+            docker createのオプション
+
+        """
+        options = [
             "--cpus", str(self._cpu_limit),
             "--memory", self._memory_limit,
             "--workdir", "/workspace",
@@ -469,6 +861,59 @@ class ExecutionEnvironmentManager:
             "--security-opt", "no-new-privileges",
             # coding-agent-networkに接続してwebやrabbitmqにアクセス可能にする
             "--network", "coding_agent_coding-agent-network",
+        ]
+
+        # タスクのリポジトリのミラーのみを読み取り専用でマウント
+        if self._mirror_host_dir and mirror_name:
+            options.extend([
+                "-v", f"{self._mirror_host_dir}/{mirror_name}:{self._mirror_container_path}/{mirror_name}:ro",
+            ])
+
+        # パッケージマネージャーのキャッシュを環境ごとの名前付きボリュームで共有
+        if self._dep_cache_enabled:
+            cache_env = environment_name if environment_name in self._environments else "base"
+            for cache_name, (cache_path, env_var) in DEPENDENCY_CACHE_DIRS.items():
+                volume = f"{self._dep_cache_volume_prefix}-{cache_env}-{cache_name}"
+                options.extend(["-v", f"{volume}:{cache_path}", "-e", f"{env_var}={cache_path}"])
+
+        return options
+
+    def _container_spec(self, environment_name: str | None, image: str) -> tuple[str, ...]:
+        """ウォームプールのコンテナが要求を満たすか判定するための作成条件を取得する."""
+        return (*self._build_create_options(environment_name), image)
+
+    def _create_and_start_container(
+        self,
+        container_name: str,
+        environment_name: str | None,
+        image: str,
+        *,
+        task_uuid: str | None = None,
+        mirror_name: str | None = None,
+    ) -> str:
+        """Dockerコンテナを作成して起動する.
+
+        Args:
+            container_name: コンテナ名
+            environment_name: 環境名
+            image: イメージ名
+            task_uuid: タスクのUUID(ウォームプールの待機コンテナの場合はNone)
+            mirror_name: マウントするタスクのリポジトリミラーのディレクトリ名
+
+        Returns:
+            コンテナID
+
+        Raises:
+            RuntimeError: コンテナ作成または起動に失敗した場合
+
+        """
+        # 残存コンテナのクリーンアップで作成時刻やタスクを判定できるようラベルを付ける
+        labels = [f"{self.MANAGED_LABEL}=true", f"{self.CREATED_AT_LABEL}={int(time.time())}"]
+        if task_uuid:
+            labels.append(f"{self.TASK_UUID_LABEL}={task_uuid}")
+        create_args = [
+            "create", "--name", container_name, *self._build_create_options(environment_name, mirror_name),
+            *(arg for label in labels for arg in ("--label", label)),
             image,
         ]
 
@@ -492,7 +937,94 @@ class ExecutionEnvironmentManager:
             self._run_docker_command(["rm", "-f", container_id], check=False)
             raise RuntimeError(error_msg) from e
 
-        return container_id, is_custom_image
+        if task_uuid and mirror_name:
+            self._task_mirrors[task_uuid] = mirror_name
+        return container_id
+
+    def start_warm_pool(self) -> bool:
+        """ウォームプールを起動する.
+
+        このインスタンスの設定で待機コンテナを作成する補充スレッドを起動します。
+        プールはプロセス内で共有され、以降に作成されたインスタンスの prepare でも利用されます。
+
+        Returns:
+            ウォームプールを起動した(または起動済みの)場合True
+
+        """
+        if not self.is_enabled() or not self._warm_pool_config.get("enabled", False):
+            return False
+
+        default_size = self._warm_pool_config.get("default_size", 1)
+        sizes = self._warm_pool_config.get("sizes", {})
+        target_sizes = {name: sizes.get(name, default_size) for name in self._environments}
+        start_warm_container_pool(
+            creator=self._create_pooled_container,
+            remover=lambda container_id: self._run_docker_command(["rm", "-f", container_id], check=False),
+            target_sizes=target_sizes,
+            refill_interval=self._warm_pool_config.get(
+                "refill_interval_seconds", DEFAULT_REFILL_INTERVAL_SECONDS,
+            ),
+        )
+        return True
+
+    def stop_warm_pool(self) -> None:
+        """ウォームプールを停止し、待機コンテナを削除する."""
+        stop_warm_container_pool()
+
+    def _create_pooled_container(self, environment_name: str) -> PooledContainer:
+        """ウォームプール用の待機コンテナを作成する(gitのインストールまで行う).
+
+        Args:
+            environment_name: 環境名
+
+        Returns:
+            待機コンテナ
+
+        """
+        image, is_custom_image = self._select_image(environment_name)
+        name = f"{self.POOL_CONTAINER_PREFIX}-{environment_name}-{uuid.uuid4().hex[:12]}"
+        container_id = self._create_and_start_container(name, environment_name, image)
+        if not is_custom_image:
+            try:
+                self._install_git(container_id)
+            except RuntimeError:
+                self._run_docker_command(["rm", "-f", container_id], check=False)
+                raise
+        return PooledContainer(
+            container_id=container_id,
+            name=name,
+            environment_name=environment_name,
+            spec=self._container_spec(environment_name, image),
+        )
+
+    def _acquire_pooled_container(self, container_name: str, environment_name: str) -> PooledContainer | None:
+        """ウォームプールから待機コンテナを払い出し、タスク用のコンテナ名に変更する.
+
+        Args:
+            container_name: タスク用のコンテナ名
+            environment_name: 環境名
+
+        Returns:
+            払い出したコンテナ(プールが無効・空の場合はNone)
+
+        """
+        pool = get_warm_container_pool()
+        if pool is None:
+            return None
+
+        image, _ = self._select_image(environment_name)
+        spec = self._container_spec(environment_name, image)
+        while (pooled := pool.acquire(environment_name, spec)) is not None:
+            try:
+                # 残存コンテナのクリーンアップ等で削除されている場合はrenameが失敗する
+                self._run_docker_command(["rename", pooled.container_id, container_name])
+            except subprocess.SubprocessError as e:
+                self.logger.warning("待機コンテナを利用できないため破棄します: %s (%s)", pooled.name, e)
+                pool.discard(pooled)
+                continue
+            self.logger.info("ウォームプールの待機コンテナを使用します: %s", pooled.name)
+            return pooled
+        return None
 
     def _install_git(self, container_id: str) -> None:
         """コンテナ内にgitをインストールする.
@@ -544,6 +1076,19 @@ class ExecutionEnvironmentManager:
         safe_url = re.sub(r"://[^@]+@", "://***@", clone_url)
         self.logger.info("プロジェクトをクローンします: %s", safe_url)
 
+        # タスクのミラーがマウントされている場合はミラーからローカルクローンする
+        # (ミラーなしで作成したウォームプールのコンテナなどはリモートからクローンする)
+        mirror_name = self._task_mirrors.get(task.uuid)
+        if mirror_name is not None:
+            try:
+                self._clone_from_mirror(container_id, mirror_name, clone_url, branch)
+                return
+            except (RuntimeError, subprocess.SubprocessError) as e:
+                self.logger.warning("ミラーからのクローンに失敗したため、リモートからクローンします: %s", e)
+                self._run_docker_command(
+                    ["exec", container_id, "rm", "-rf", "/workspace/project"], check=False,
+                )
+
         # クローンコマンドを構築
         clone_cmd = [
             "git",
@@ -576,45 +1121,312 @@ class ExecutionEnvironmentManager:
             self.logger.exception(error_msg)
             raise RuntimeError(error_msg) from e
 
-    def _install_dependencies(self, container_id: str) -> None:
+    def _clone_from_mirror(self, container_id: str, mirror_name: str, clone_url: str, branch: str | None) -> None:
+        """ホスト側のリポジトリミラーからコンテナ内にプロジェクトをクローンする.
+
+        コンテナ作成前に最新化し、読み取り専用でマウントしたミラーから
+        `git clone --shared` で作業ツリーを作成し、originをリモートのURLに戻します。
+
+        Args:
+            container_id: コンテナID
+            mirror_name: マウントしたミラーのディレクトリ名
+            clone_url: 認証情報を含むクローンURL
+            branch: チェックアウトするブランチ(Noneの場合はデフォルトブランチ)
+
+        Raises:
+            subprocess.SubprocessError: コンテナ内のクローンに失敗した場合
+
+        """
+        mirror_path = f"{self._mirror_container_path}/{mirror_name}"
+
+        # ミラーの所有者とコンテナ内のユーザーが異なるためsafe.directoryを許可する
+        clone_cmd = ["git", "-c", "safe.directory=*", "clone", "--shared"]
+        if branch:
+            clone_cmd.extend(["--branch", branch])
+        clone_cmd.extend([mirror_path, "/workspace/project"])
+
+        self._run_docker_command(["exec", container_id, *clone_cmd], timeout=300)
+        self._run_docker_command([
+            "exec", container_id,
+            "git", "-C", "/workspace/project", "remote", "set-url", "origin", clone_url,
+        ])
+        self.logger.info("ミラーからプロジェクトのクローンが完了しました: %s", mirror_name)
+
+    def _install_dependencies(self, container_id: str, repository: str = "") -> None:
         """プロジェクトの依存関係をインストールする.
 
-        プロジェクトの種類を自動検出し、適切なパッケージマネージャーで
-        依存関係をインストールします。
+        プロジェクトの種類を1回のexecで自動検出し、適切なパッケージマネージャーで
+        依存関係をインストールします。インストール先が独立したパッケージマネージャー
+        (npmとpip等)は並列に実行します。
+        同じリポジトリでロックファイルが同じインストール結果のスナップショットがあれば、
+        インストールせずにスナップショットを展開します。
 
         Args:
             container_id: コンテナID
+            repository: 認証情報を除いたリポジトリのURL(スナップショットのキーに使用、
+                空の場合はスナップショットを使わない)
 
         """
         self.logger.info("依存関係のインストールを開始します")
 
-        # 依存関係ファイルの検出とインストールコマンドのマッピング
-        dep_checks = [
-            # (ファイル名, インストールコマンド)
-            ("package.json", ["npm", "install"]),
-            ("requirements.txt", ["pip", "install", "-r", "requirements.txt"]),
-            ("environment.yml", ["mamba", "env", "update", "-f", "environment.yml"]),
-            ("condaenv.yaml", ["mamba", "env", "update", "-f", "condaenv.yaml"]),
-            ("Gemfile", ["bundle", "install"]),
-        ]
+        installers = self._detect_dependency_installers(container_id)
+        if not installers:
+            self.logger.info("依存関係ファイルはありません")
+            return
+
+        image_id = ""
+        if self._dep_snapshot_enabled and repository and any(installer.snapshot_paths for installer in installers):
+            image_id = self._get_container_image_id(container_id)
+
+        groups: dict[str, list[DependencyInstaller]] = {}
+        for installer in installers:
+            groups.setdefault(installer.group, []).append(installer)
+
+        def install_group(group: list[DependencyInstaller]) -> None:
+            for installer in group:
+                self._install_dependency(container_id, installer, image_id, repository)
+
+        with ThreadPoolExecutor(max_workers=len(groups), thread_name_prefix="dependency-install") as executor:
+            # 例外はinstall_group内で処理済みのため、完了を待つだけでよい
+            list(executor.map(install_group, groups.values()))
+
+    def _detect_dependency_installers(self, container_id: str) -> list[DependencyInstaller]:
+        """プロジェクトに存在する依存関係ファイルを1回のexecで検出する.
 
-        workspace = "/workspace/project"
+        Args:
+            container_id: コンテナID
+
+        Returns:
+            検出された依存関係ファイルに対応するインストール方法
+
+        """
+        manifests = " ".join(installer.manifest for installer in DEPENDENCY_INSTALLERS)
+        probe_cmd = f'for f in {manifests}; do [ -f "$f" ] && echo "$f"; done; true'
+        result = self._run_docker_command(
+            ["exec", "-w", "/workspace/project", container_id, "sh", "-c", probe_cmd], check=False,
+        )
+        found = set(result.stdout.split()) if result.returncode == 0 else set()
+        for manifest in sorted(found):
+            self.logger.info("依存関係ファイルを検出: %s", manifest)
+        return [installer for installer in DEPENDENCY_INSTALLERS if installer.manifest in found]
+
+    def _install_dependency(
+        self, container_id: str, installer: DependencyInstaller, image_id: str, repository: str = "",
+    ) -> None:
+        """1つの依存関係ファイルのインストールを行い、所要時間を記録する.
+
+        Args:
+            container_id: コンテナID
+            installer: 依存関係のインストール方法
+            image_id: コンテナのイメージID(スナップショットのキーに使用)
+            repository: 認証情報を除いたリポジトリのURL(スナップショットのキーに使用)
+
+        """
+        dep_file = installer.manifest
+        start_time = time.monotonic()
+
+        snapshot_file = None
+        if self._dep_snapshot_enabled and installer.snapshot_paths:
+            snapshot_file = self._get_dependency_snapshot_file(container_id, installer, image_id, repository)
+            if snapshot_file and self._restore_dependency_snapshot(container_id, installer, snapshot_file):
+                self.logger.info("依存関係をスナップショットから復元しました: %s", dep_file)
+                self._add_dependency_timing(installer, start_time, "restored")
+                return
 
-        for dep_file, install_cmd in dep_checks:
-            # ファイルの存在確認
-            check_args = ["exec", container_id, "test", "-f", f"{workspace}/{dep_file}"]
-            result = self._run_docker_command(check_args, check=False)
+        # インストールコマンドを実行
+        exec_args = ["exec", "-w", "/workspace/project", container_id, *installer.command]
+        try:
+            self._run_docker_command(exec_args, timeout=DEPENDENCY_INSTALL_TIMEOUT_SECONDS)
+            self.logger.info("依存関係のインストールが完了: %s", dep_file)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            self.logger.warning("依存関係のインストールに失敗: %s - %s", dep_file, e)
+            self._add_dependency_timing(installer, start_time, "error", error=str(e))
+            return
+        install_ms = (time.monotonic() - start_time) * 1000
+
+        if snapshot_file:
+            self._save_dependency_snapshot(container_id, installer, snapshot_file)
+        self._add_dependency_timing(installer, start_time, "installed", install_ms=install_ms)
+
+    def _add_dependency_timing(
+        self,
+        installer: DependencyInstaller,
+        start_time: float,
+        outcome: str,
+        *,
+        install_ms: float | None = None,
+        error: str | None = None,
+    ) -> None:
+        """依存関係インストールの所要時間を記録する."""
+        duration_ms = (time.monotonic() - start_time) * 1000
+        self.logger.info(
+            "依存関係の準備時間: %s %.0fms (%s)", installer.manifest, duration_ms, outcome,
+        )
+        timing = {
+            "manifest": installer.manifest,
+            "command": " ".join(installer.command),
+            "outcome": outcome,
+            "duration_ms": duration_ms,
+            "install_ms": install_ms,
+            "error": error,
+        }
+        # 並列インストールのスレッドから呼ばれるため、ToolStoreへの書き込みを直列化する
+        with self._dependency_timing_lock:
+            if self._tool_store is None:
+                self._dependency_timings.append(timing)
+            else:
+                self._record_dependency_timing(timing)
 
-            if result.returncode == 0:
-                self.logger.info("依存関係ファイルを検出: %s", dep_file)
+    def _record_dependency_timing(self, timing: dict[str, Any]) -> None:
+        """依存関係インストールの所要時間をToolStoreに書き込む."""
+        try:
+            self._tool_store.add_tool_call(
+                tool_name="install_dependencies",
+                args={"manifest": timing["manifest"], "command": timing["command"]},
+                result={"outcome": timing["outcome"], "install_ms": timing["install_ms"]},
+                status="error" if timing["outcome"] == "error" else "success",
+                duration_ms=timing["duration_ms"],
+                error=timing["error"],
+            )
+        except OSError as e:
+            self.logger.warning("依存関係の準備時間の記録に失敗しました: %s", e)
+
+    def _get_container_image_id(self, container_id: str) -> str:
+        """コンテナのイメージIDを取得する(取得できない場合は空文字列)."""
+        result = self._run_docker_command(
+            ["inspect", "--format", "{{.Image}}", container_id], check=False,
+        )
+        return result.stdout.strip() if result.returncode == 0 else ""
 
-                # インストールコマンドを実行
-                exec_args = ["exec", "-w", workspace, container_id, *install_cmd]
-                try:
-                    self._run_docker_command(exec_args, timeout=600)
-                    self.logger.info("依存関係のインストールが完了: %s", dep_file)
-                except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-                    self.logger.warning("依存関係のインストールに失敗: %s - %s", dep_file, e)
+    def _get_dependency_snapshot_file(
+        self, container_id: str, installer: DependencyInstaller, image_id: str, repository: str,
+    ) -> Path | None:
+        """ロックファイルの内容に対応するスナップショットのパスを取得する.
+
+        スナップショットはリポジトリごとのディレクトリに保存し、キーにはイメージIDと
+        インストールコマンドを含め、ロックファイルかイメージが変わった場合は
+        別のスナップショットになるようにします。
+
+        Args:
+            container_id: コンテナID
+            installer: 依存関係のインストール方法
+            image_id: コンテナのイメージID
+            repository: 認証情報を除いたリポジトリのURL
+
+        Returns:
+            このプロセスから見たスナップショットのパス(キーを計算できない場合はNone)
+
+        """
+        if not image_id or not repository:
+            return None
+        lock_files = " ".join(installer.lock_files)
+        result = self._run_docker_command(
+            [
+                "exec", "-w", "/workspace/project", container_id,
+                "sh", "-c", f"cat -- {lock_files} 2>/dev/null | sha256sum",
+            ],
+            check=False,
+        )
+        if result.returncode != 0 or not result.stdout.strip():
+            return None
+        lock_digest = result.stdout.split()[0]
+        key_source = "\0".join([image_id, *installer.command, lock_digest])
+        key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()[:32]
+        repository_dir = hashlib.sha256(repository.encode("utf-8")).hexdigest()[:16]
+        return self._dep_snapshot_dir / repository_dir / f"{installer.cache}-{key}.tar.gz"
+
+    @staticmethod
+    def _snapshot_members(installer: DependencyInstaller) -> str:
+        """スナップショットの対象ディレクトリを / からの相対パスで列挙するシェル式を返す."""
+        return f'$(for p in {installer.snapshot_paths}; do echo "${{p#/}}"; done)'
+
+    def _restore_dependency_snapshot(
+        self, container_id: str, installer: DependencyInstaller, snapshot_file: Path,
+    ) -> bool:
+        """依存関係のスナップショットをコンテナにコピーして展開する.
+
+        展開はsnapshot_pathsのディレクトリに限定し、絶対パスや .. を含む要素は展開しません。
+
+        Args:
+            container_id: コンテナID
+            installer: 依存関係のインストール方法
+            snapshot_file: このプロセスから見たスナップショットのパス
+
+        Returns:
+            復元できた場合True
+
+        """
+        if not snapshot_file.is_file():
+            return False
+        staging_path = DEPENDENCY_SNAPSHOT_STAGING_PATH.format(cache=installer.cache)
+        restore_cmd = (
+            f"tar -xzf {staging_path} -C / {self._snapshot_members(installer)}; "
+            f"rc=$?; rm -f {staging_path}; exit $rc"
+        )
+        try:
+            self._run_docker_command(
+                ["cp", str(snapshot_file), f"{container_id}:{staging_path}"],
+                timeout=DEPENDENCY_INSTALL_TIMEOUT_SECONDS,
+            )
+            result = self._run_docker_command(
+                ["exec", container_id, "sh", "-c", restore_cmd],
+                timeout=DEPENDENCY_INSTALL_TIMEOUT_SECONDS,
+                check=False,
+            )
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            self.logger.warning("依存関係スナップショットの展開に失敗しました: %s - %s", snapshot_file, e)
+            return False
+        if result.returncode != 0:
+            return False
+        # 展開したスナップショットは更新時刻を更新し、古いものから削除されるようにする
+        try:
+            snapshot_file.touch()
+        except OSError:
+            pass
+        return True
+
+    def _save_dependency_snapshot(
+        self, container_id: str, installer: DependencyInstaller, snapshot_file: Path,
+    ) -> None:
+        """インストール結果のスナップショットをコンテナから取り出して保存し、古いスナップショットを削除する.
+
+        Args:
+            container_id: コンテナID
+            installer: 依存関係のインストール方法
+            snapshot_file: このプロセスから見たスナップショットのパス
+
+        """
+        staging_path = DEPENDENCY_SNAPSHOT_STAGING_PATH.format(cache=installer.cache)
+        # 書き込み途中のスナップショットが展開されないよう、一時ファイルに取り出してから配置する
+        tmp_file = snapshot_file.with_name(f"{snapshot_file.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+        try:
+            snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+            self._run_docker_command(
+                ["exec", container_id, "sh", "-c", f"tar -czf {staging_path} -C / {self._snapshot_members(installer)}"],
+                timeout=DEPENDENCY_INSTALL_TIMEOUT_SECONDS,
+            )
+            self._run_docker_command(
+                ["cp", f"{container_id}:{staging_path}", str(tmp_file)], timeout=DEPENDENCY_INSTALL_TIMEOUT_SECONDS,
+            )
+            tmp_file.replace(snapshot_file)
+            self.logger.info("依存関係のスナップショットを保存しました: %s", snapshot_file)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+            self.logger.warning("依存関係のスナップショットの保存に失敗: %s - %s", snapshot_file, e)
+            tmp_file.unlink(missing_ok=True)
+        finally:
+            self._run_docker_command(["exec", container_id, "rm", "-f", staging_path], check=False)
+        self._prune_dependency_snapshots()
+
+    def _prune_dependency_snapshots(self) -> None:
+        """保持数を超えた古いスナップショットを削除する."""
+        try:
+            snapshots = sorted(
+                self._dep_snapshot_dir.glob("*/*.tar.gz"), key=lambda path: path.stat().st_mtime, reverse=True,
+            )
+            for path in snapshots[self._dep_snapshot_max_entries:]:
+                path.unlink(missing_ok=True)
+        except OSError as e:
+            self.logger.warning("古い依存関係スナップショットの削除に失敗: %s", e)
 
     def execute(self, container_id: str, command: str) -> ExecutionResult:
         """指定コンテナでコマンドを実行する.
@@ -629,49 +1441,163 @@ class ExecutionEnvironmentManager:
         """
         self.logger.info("コマンドを実行します: %s", command)
 
-        start_time = time.time()
-
         # コンテナ内でコマンドを実行
         exec_args = ["exec", "-w", "/workspace/project", container_id, "sh", "-c", command]
+        result = self._run_streaming_exec(exec_args)
+        stdout, stderr = self._format_streaming_output(result)
 
-        try:
-            result = self._run_docker_command(
-                exec_args,
-                timeout=self._timeout_seconds,
-                check=False,
-            )
+        if result.timed_out:
+            self.logger.warning("コマンドがタイムアウトしました: %s", command)
+            return ExecutionResult(exit_code=-1, stdout=stdout, stderr=stderr, duration_ms=result.duration_ms)
+
+        execution_result = ExecutionResult(
+            exit_code=result.returncode,
+            stdout=stdout,
+            stderr=stderr,
+            duration_ms=result.duration_ms,
+        )
 
-            duration_ms = int((time.time() - start_time) * 1000)
+        self.logger.info(
+            "コマンド実行完了: exit_code=%d, duration=%dms",
+            execution_result.exit_code,
+            execution_result.duration_ms,
+        )
 
-            # 出力サイズの制限
-            stdout = result.stdout[:self._max_output_size]
-            stderr = result.stderr[:self._max_output_size]
+        return execution_result
 
-            execution_result = ExecutionResult(
-                exit_code=result.returncode,
-                stdout=stdout,
-                stderr=stderr,
-                duration_ms=duration_ms,
-            )
+    def _run_streaming_exec(self, exec_args: list[str]) -> StreamingResult:
+        """docker execを実行し、出力を上限付きで逐次取得する.
 
-            self.logger.info(
-                "コマンド実行完了: exit_code=%d, duration=%dms",
-                execution_result.exit_code,
-                execution_result.duration_ms,
+        ToolStoreが設定されている場合は、省略した出力を含む全出力を
+        タスクのコンテキストディレクトリに書き出します。
+
+        Args:
+            exec_args: docker execの引数
+
+        Returns:
+            実行結果
+
+        """
+        spill_dir = None
+        if self._spill_output and self._tool_store is not None:
+            spill_dir = self._tool_store.context_dir / COMMAND_OUTPUT_DIR
+
+        if self._docker_api is not None and self._docker_api.available:
+            try:
+                return self._docker_api.exec_streaming(
+                    parse_exec_args(exec_args[1:]),
+                    timeout=self._timeout_seconds,
+                    max_bytes=self._max_output_size,
+                    max_total_bytes=self._max_total_output_size or None,
+                    spill_dir=spill_dir,
+                )
+            except DockerEngineTimeoutError:
+                # execの開始待ちでタイムアウトした場合は、コマンドを重ねて実行しない
+                return StreamingResult(
+                    returncode=-1,
+                    stdout=BoundedOutputBuffer(self._max_output_size),
+                    stderr=BoundedOutputBuffer(self._max_output_size),
+                    duration_ms=self._timeout_seconds * 1000,
+                    timed_out=True,
+                )
+            except DockerEngineConnectionLostError as e:
+                # execの開始後に接続が失われた場合も、コマンドを重ねて実行しない
+                stderr = BoundedOutputBuffer(self._max_output_size)
+                stderr.write(f"{e}\n".encode())
+                return StreamingResult(
+                    returncode=-1,
+                    stdout=BoundedOutputBuffer(self._max_output_size),
+                    stderr=stderr,
+                    duration_ms=0,
+                )
+            except (UnsupportedDockerCommandError, DockerEngineError) as e:
+                # コンテナがない等のエラーもdocker CLIと同じ出力で返せるよう、CLIで実行し直す
+                self.logger.debug("docker CLIで実行します: %s", e)
+
+        cmd = ["docker", *exec_args]
+        self.logger.debug("Docker command: %s", " ".join(cmd))
+        return run_streaming(
+            cmd,
+            timeout=self._timeout_seconds,
+            max_bytes=self._max_output_size,
+            max_total_bytes=self._max_total_output_size or None,
+            spill_dir=spill_dir,
+        )
+
+    def _run_in_persistent_shell(
+        self, container_info: ContainerInfo, command: str, working_directory: str | None,
+    ) -> StreamingResult | None:
+        """コンテナの永続シェルでコマンドを実行する.
+
+        シェルが未起動または終了している場合は作業ディレクトリで起動します。
+
+        Args:
+            container_info: コンテナ情報
+            command: 実行するコマンド
+            working_directory: 実行前に移動するディレクトリ(Noneの場合は現在のディレクトリ)
+
+        Returns:
+            実行結果(永続シェルが利用できない場合はNone)
+
+        """
+        container_id = container_info.container_id
+        shell = self._shells.get(container_id)
+        try:
+            if shell is None or not shell.alive:
+                shell = PersistentShell(
+                    ["docker", "exec", "-i", "-w", container_info.workspace_path, container_id, "sh"],
+                )
+                shell.start()
+                self._shells[container_id] = shell
+
+            spill_dir = None
+            if self._spill_output and self._tool_store is not None:
+                spill_dir = self._tool_store.context_dir / COMMAND_OUTPUT_DIR
+            return shell.run(
+                command,
+                timeout=self._timeout_seconds,
+                max_bytes=self._max_output_size,
+                max_total_bytes=self._max_total_output_size or None,
+                spill_dir=spill_dir,
+                working_directory=working_directory,
             )
+        except PersistentShellError as e:
+            self.logger.warning("永続シェルを利用できないため、個別に実行します: %s", e)
+            self._close_shell(container_id)
+            return None
 
-            return execution_result
+    def _close_shell(self, container_id: str) -> None:
+        """コンテナの永続シェルを終了する."""
+        shell = self._shells.pop(container_id, None)
+        if shell is not None:
+            shell.close()
 
-        except subprocess.TimeoutExpired:
-            duration_ms = int((time.time() - start_time) * 1000)
-            self.logger.warning("コマンドがタイムアウトしました: %s", command)
+    def _format_streaming_output(self, result: StreamingResult) -> tuple[str, str]:
+        """ストリーミング実行の出力を、打ち切りや全出力ファイルの案内を付けて文字列化する.
+
+        Args:
+            result: ストリーミング実行の結果
+
+        Returns:
+            (標準出力, 標準エラー出力) のタプル
 
-            return ExecutionResult(
-                exit_code=-1,
-                stdout="",
-                stderr=f"Command timed out after {self._timeout_seconds} seconds",
-                duration_ms=duration_ms,
+        """
+        stdout = result.stdout.getvalue()
+        stderr = result.stderr.getvalue()
+
+        notes = []
+        if result.timed_out:
+            notes.append(f"Command timed out after {self._timeout_seconds} seconds")
+        if result.output_limit_exceeded:
+            notes.append(
+                f"Command terminated: output exceeded {self._max_total_output_size} bytes",
             )
+        notes.extend(
+            f"Full {stream} saved to: {path}" for stream, path in result.spill_files.items()
+        )
+        if notes:
+            stderr = "\n".join([stderr, *notes]) if stderr else "\n".join(notes)
+        return stdout, stderr
 
     def cleanup(self, task_uuid: str) -> None:
         """タスク終了時にコンテナを削除する.
@@ -685,10 +1611,20 @@ class ExecutionEnvironmentManager:
         # text-editor MCPサーバーを停止(有効な場合)
         self._stop_text_editor_mcp(task_uuid)
 
+        # 永続シェルを終了
+        container_info = self._active_containers.get(task_uuid)
+        if container_info is not None:
+            self._close_shell(container_info.container_id)
+
         try:
             self._remove_container(task_uuid)
             # アクティブコンテナから削除
             self._active_containers.pop(task_uuid, None)
+            self._task_mirrors.pop(task_uuid, None)
+            # 復元に使ったチェックポイントのイメージを削除(再度一時停止した場合は新しいイメージが保存済み)
+            if self._restored_checkpoint_image:
+                self._run_docker_command(["rmi", self._restored_checkpoint_image], check=False)
+                self._restored_checkpoint_image = None
             self.logger.info("実行環境のクリーンアップが完了しました: %s", task_uuid)
         except (RuntimeError, subprocess.SubprocessError) as e:
             self.logger.exception("実行環境のクリーンアップに失敗: %s", e)
@@ -725,65 +1661,183 @@ class ExecutionEnvironmentManager:
         raise RuntimeError(error_msg)
 
     def cleanup_stale_containers(self) -> int:
-        """残存コンテナを定期的にクリーンアップする.
+        """残存コンテナをクリーンアップする.
+
+        実行環境のラベルとコンテナ名の接頭辞でDocker側で絞り込んで一覧し、
+        作成時刻のラベル(ラベルがない場合はCreatedAt)から一定時間経過したコンテナを並列に削除します。
+        tasksテーブルで実行中のタスクのコンテナは削除しません。
 
-        命名規則に合致し、一定時間経過したコンテナを削除します。
-        
         Returns:
             削除されたコンテナ数
 
         """
         self.logger.info("残存コンテナのクリーンアップを開始します")
 
-        # コンテナ一覧を取得
-        list_args = [
-            "ps", "-a",
-            "--filter", f"name={self.CONTAINER_PREFIX}",
-            "--format", "{{.ID}}\t{{.Names}}\t{{.CreatedAt}}",
+        # ラベルがない場合に備えて作成時刻の文字列も取得する
+        fields = [
+            "{{.ID}}",
+            "{{.Names}}",
+            f'{{{{.Label "{self.CREATED_AT_LABEL}"}}}}',
+            f'{{{{.Label "{self.TASK_UUID_LABEL}"}}}}',
+            "{{.CreatedAt}}",
         ]
-
-        try:
-            result = self._run_docker_command(list_args, check=False)
-        except subprocess.SubprocessError as e:
-            self.logger.exception("コンテナ一覧の取得に失敗: %s", e)
-            return 0
-
-        if not result.stdout.strip():
+        # ラベル導入前に作成されたコンテナも削除できるよう、コンテナ名の接頭辞でも一覧する
+        # (docker psは異なる種類のフィルタをAND条件で扱うため別々に取得する)
+        list_filters = [f"label={self.MANAGED_LABEL}", f"name={self.CONTAINER_PREFIX}"]
+        containers: dict[str, list[str]] = {}
+        for list_filter in list_filters:
+            list_args = ["ps", "-a", "--filter", list_filter, "--format", "\t".join(fields)]
+            try:
+                result = self._run_docker_command(list_args, check=False)
+            except subprocess.SubprocessError as e:
+                self.logger.exception("コンテナ一覧の取得に失敗: %s", e)
+                return 0
+            for line in result.stdout.strip().split("\n"):
+                parts = line.split("\t")
+                if len(parts) >= len(fields):
+                    containers.setdefault(parts[0], parts[:len(fields)])
+
+        if not containers:
             self.logger.info("残存コンテナはありません")
             return 0
 
-        deleted_count = 0
-        threshold = datetime.now(timezone.utc)
+        now = time.time()
+        candidates: list[tuple[str, str, str | None, float]] = []
+        for container_id, container_name, created_label, task_uuid, created_at in containers.values():
 
-        for line in result.stdout.strip().split("\n"):
-            if not line:
+            created = self._get_container_created_timestamp(created_label, created_at)
+            if created is None:
+                self.logger.warning("コンテナ作成時刻の取得に失敗: %s", container_name)
                 continue
 
-            parts = line.split("\t")
-            if len(parts) < 3:
+            hours_diff = (now - created) / 3600
+            if hours_diff > self._stale_threshold_hours:
+                # ウォームプールから払い出したコンテナはコンテナ名からタスクを判定する
+                if not task_uuid and not container_name.startswith(self.POOL_CONTAINER_PREFIX):
+                    task_uuid = container_name.removeprefix(f"{self.CONTAINER_PREFIX}-")
+                candidates.append((container_id, container_name, task_uuid or None, hours_diff))
+
+        if not candidates:
+            self.logger.info("残存コンテナのクリーンアップが完了: 0件削除")
+            return 0
+
+        # 実行中のタスクのコンテナは削除しない(DBを確認できない場合はタスクのコンテナを全て残す)
+        task_uuids = {task_uuid for _, _, task_uuid, _ in candidates if task_uuid}
+        protected = self._get_running_task_uuids(task_uuids) | set(self._active_containers)
+        stale = []
+        for container_id, container_name, task_uuid, hours_diff in candidates:
+            if task_uuid in protected:
+                self.logger.info("実行中のタスクのコンテナのため削除しません: %s", container_name)
                 continue
+            self.logger.info(
+                "残存コンテナを削除します: %s (経過時間: %.1f時間)", container_name, hours_diff,
+            )
+            stale.append(container_id)
+
+        def remove(container_id: str) -> bool:
+            try:
+                return self._run_docker_command(["rm", "-f", container_id], check=False).returncode == 0
+            except subprocess.SubprocessError as e:
+                self.logger.warning("残存コンテナの削除に失敗: %s (%s)", container_id, e)
+                return False
+
+        deleted_count = 0
+        if stale:
+            workers = min(STALE_CLEANUP_MAX_WORKERS, len(stale))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stale-container-cleanup") as executor:
+                deleted_count = sum(executor.map(remove, stale))
+
+        self.logger.info("残存コンテナのクリーンアップが完了: %d件削除", deleted_count)
+        return deleted_count
+
+    def cleanup_stale_checkpoint_images(self) -> int:
+        """再開されなかったチェックポイントのイメージを削除する.
 
-            container_id, container_name, created_at = parts[0], parts[1], parts[2]
+        停止された、または再開されなかった一時停止タスクのイメージが残り続けないよう、
+        保存から一定時間経過したチェックポイントのイメージを削除します。
+        tasksテーブルで実行中のタスクのイメージは削除しません。
 
-            # 作成時刻をパース（複数のフォーマットに対応）
+        Returns:
+            削除されたイメージ数
+
+        """
+        list_args = [
+            "images", self._checkpoint_repository,
+            "--format", "{{.Repository}}:{{.Tag}}\t{{.CreatedAt}}",
+        ]
+        try:
+            result = self._run_docker_command(list_args, check=False)
+        except subprocess.SubprocessError as e:
+            self.logger.exception("チェックポイントのイメージ一覧の取得に失敗: %s", e)
+            return 0
+
+        now = time.time()
+        candidates: list[tuple[str, str]] = []
+        for line in result.stdout.strip().splitlines():
+            image, _, created_at = line.partition("\t")
             created = self._parse_docker_datetime(created_at)
-            if created is None:
-                self.logger.warning("コンテナ作成時刻のパースに失敗: %s", created_at)
+            if created is None or (now - created.timestamp()) / 3600 <= self._checkpoint_retention_hours:
                 continue
+            # タグは <タスクUUID>-<保存日時>
+            task_uuid = image.rpartition(":")[2].rpartition("-")[0]
+            candidates.append((image, task_uuid))
 
-            # 閾値時間を超過しているか確認
-            hours_diff = (threshold - created).total_seconds() / 3600
-            if hours_diff > self._stale_threshold_hours:
-                self.logger.info(
-                    "残存コンテナを削除します: %s (経過時間: %.1f時間)",
-                    container_name, hours_diff,
-                )
-                self._run_docker_command(["rm", "-f", container_id], check=False)
+        if not candidates:
+            return 0
+
+        task_uuids = {task_uuid for _, task_uuid in candidates if task_uuid}
+        protected = self._get_running_task_uuids(task_uuids) | set(self._active_containers)
+        deleted_count = 0
+        for image, task_uuid in candidates:
+            if task_uuid in protected:
+                continue
+            try:
+                removed = self._run_docker_command(["rmi", image], check=False).returncode == 0
+            except subprocess.SubprocessError as e:
+                self.logger.warning("チェックポイントのイメージの削除に失敗: %s (%s)", image, e)
+                continue
+            if removed:
+                self.logger.info("残存したチェックポイントのイメージを削除しました: %s", image)
                 deleted_count += 1
 
-        self.logger.info("残存コンテナのクリーンアップが完了: %d件削除", deleted_count)
+        self.logger.info("チェックポイントのイメージのクリーンアップが完了: %d件削除", deleted_count)
         return deleted_count
 
+    def _get_container_created_timestamp(self, created_label: str, created_at: str) -> float | None:
+        """作成時刻のラベル(UNIX時刻)からコンテナの作成時刻を取得する(ラベルがない場合はCreatedAtから)."""
+        try:
+            return float(created_label)
+        except ValueError:
+            pass
+        created = self._parse_docker_datetime(created_at)
+        return created.timestamp() if created is not None else None
+
+    def _get_running_task_uuids(self, task_uuids: set[str]) -> set[str]:
+        """tasksテーブルで実行中のタスクのUUIDを取得する.
+
+        DBに接続できない場合は、誤って削除しないよう全てのUUIDを実行中として扱います。
+
+        Args:
+            task_uuids: 確認するタスクのUUID
+
+        Returns:
+            実行中のタスクのUUID
+
+        """
+        if not task_uuids:
+            return set()
+        try:
+            from db.task_db import TaskDBManager
+
+            db_manager = TaskDBManager(self.config)
+            try:
+                return db_manager.get_running_task_uuids(task_uuids)
+            finally:
+                db_manager.close()
+        except Exception as e:
+            self.logger.warning("タスクの状態を確認できないため、タスクのコンテナは削除しません: %s", e)
+            return set(task_uuids)
+
     def _parse_docker_datetime(self, datetime_str: str) -> datetime | None:
         """Docker日時文字列をパースする.
 
@@ -926,49 +1980,31 @@ class ExecutionEnvironmentManager:
             "sh", "-c", command,
         ]
 
-        start_time = time.time()
-
         try:
-            result = self._run_docker_command(
-                exec_args,
-                timeout=self._timeout_seconds,
-                check=False,
-            )
-            duration_ms = int((time.time() - start_time) * 1000)
-
-            # 出力サイズを制限
-            stdout = result.stdout
-            stderr = result.stderr
-
-            if len(stdout) > self._max_output_size:
-                stdout = stdout[:self._max_output_size] + "\n...(truncated)"
-            if len(stderr) > self._max_output_size:
-                stderr = stderr[:self._max_output_size] + "\n...(truncated)"
-
-            return {
-                "exit_code": result.returncode,
-                "stdout": stdout,
-                "stderr": stderr,
-                "duration_ms": duration_ms,
-            }
-
-        except subprocess.TimeoutExpired:
-            duration_ms = int((time.time() - start_time) * 1000)
-            return {
-                "exit_code": -1,
-                "stdout": "",
-                "stderr": f"Command timeout after {self._timeout_seconds} seconds",
-                "duration_ms": duration_ms,
-            }
+            result = None
+            if self._persistent_shell_enabled:
+                result = self._run_in_persistent_shell(
+                    container_info, command, working_directory,
+                )
+            if result is None:
+                result = self._run_streaming_exec(exec_args)
         except Exception as e:
-            duration_ms = int((time.time() - start_time) * 1000)
             return {
                 "exit_code": -1,
                 "stdout": "",
                 "stderr": f"Command execution error: {str(e)}",
-                "duration_ms": duration_ms,
+                "duration_ms": 0,
             }
 
+        # 出力は先頭と末尾のみを保持したもの(省略時は全出力をファイルに保存)
+        stdout, stderr = self._format_streaming_output(result)
+        return {
+            "exit_code": -1 if result.timed_out else result.returncode,
+            "stdout": stdout,
+            "stderr": stderr,
+            "duration_ms": result.duration_ms,
+        }
+
     def get_function_calling_functions(self) -> list[dict[str, Any]]:
         """Function calling用の関数定義を取得する.
         
@@ -979,10 +2015,27 @@ class ExecutionEnvironmentManager:
         if not self.is_enabled():
             return []
 
+        description = (
+            "Execute a command in an isolated Docker execution environment with project source code. "
+            "The project is already cloned and dependencies are installed."
+        )
+        working_directory_description = (
+            "Working directory path (optional, defaults to project root /workspace/project)"
+        )
+        if self._persistent_shell_enabled:
+            description += (
+                " Commands run in a persistent shell: the current directory and exported "
+                "environment variables are kept between calls."
+            )
+            working_directory_description = (
+                "Directory to cd into before running the command "
+                "(optional, defaults to the shell's current directory)"
+            )
+
         return [
             {
                 "name": "command-executor_execute_command",
-                "description": "Execute a command in an isolated Docker execution environment with project source code. The project is already cloned and dependencies are installed.",
+                "description": description,
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -992,7 +2045,7 @@ class ExecutionEnvironmentManager:
                         },
                         "working_directory": {
                             "type": "string",
-                            "description": "Working directory path (optional, defaults to project root /workspace/project)",
+                            "description": working_directory_description,
                         },
                     },
                     "required": ["command"],
@@ -1131,6 +2184,63 @@ class ExecutionEnvironmentManager:
                 "error": str(e),
             }
 
+    def call_text_editor_batch(self, operations: list[dict[str, Any]]) -> dict[str, Any]:
+        """複数のtext-editor操作を一括で実行する.
+
+        いずれかの操作が失敗した場合、適用済みの編集は取り消されます。
+
+        Args:
+            operations: 操作のリスト(各要素はtext_editorツールの引数)
+
+        Returns:
+            実行結果の辞書 {"success": bool, "content": str, "error": str}
+
+        Raises:
+            RuntimeError: 現在のタスクが設定されていない場合、
+                         またはtext-editor MCPが起動していない場合
+
+        """
+        if self._current_task is None:
+            raise RuntimeError("Current task not set. Call set_current_task() first.")
+
+        task_uuid = self._current_task.uuid
+        client = self._text_editor_clients.get(task_uuid)
+
+        if client is None:
+            raise RuntimeError(f"Text editor MCP not started for task {task_uuid}")
+
+        # Noneの値を持つキーを削除
+        cleaned_operations = [
+            {k: v for k, v in operation.items() if v is not None} if isinstance(operation, dict) else operation
+            for operation in operations or []
+        ]
+
+        self.logger.info("text_editorの一括編集を実行します: %d件", len(cleaned_operations))
+
+        try:
+            result = client.batch_edit(cleaned_operations)
+            return {
+                "success": result.success,
+                "content": result.content,
+                "error": result.error,
+            }
+        except Exception as e:
+            self.logger.exception("text_editorの一括編集中にエラー発生: %s", e)
+            return {
+                "success": False,
+                "content": "",
+                "error": str(e),
+            }
+
+    def is_batch_edit_enabled(self) -> bool:
+        """text-editorの一括編集ツールが有効かどうかを返す.
+
+        Returns:
+            有効な場合True、無効な場合False
+
+        """
+        return self._text_editor_enabled and self._batch_edit_enabled
+
     def get_text_editor_client(self, task_uuid: str) -> Any | None:
         """タスクのtext-editor MCPクライアントを取得する.
         
@@ -1151,7 +2261,7 @@ class ExecutionEnvironmentManager:
         if not self._text_editor_enabled:
             return []
 
-        return [
+        functions = [
             {
                 "name": "text_editor",
                 "description": (
@@ -1201,6 +2311,66 @@ class ExecutionEnvironmentManager:
                 },
             },
         ]
+        if self._batch_edit_enabled:
+            functions.append(self._get_batch_edit_function())
+        return functions
+
+    def _get_batch_edit_function(self) -> dict[str, Any]:
+        """text-editorの一括編集ツールの関数定義を取得する."""
+        from clients.text_editor_mcp_client import BATCH_COMMANDS, MAX_BATCH_OPERATIONS
+
+        return {
+            "name": "text_batch_edit",
+            "description": (
+                "Apply several text_editor operations (view, str_replace, insert) in one call. "
+                "Operations run in order and are applied atomically: if any operation fails, "
+                "all edits from this call are reverted. Use this for multi-location or multi-file edits "
+                f"instead of many separate text_editor calls (max {MAX_BATCH_OPERATIONS} operations)."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "operations": {
+                        "type": "array",
+                        "description": "Operations to apply in order",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "command": {
+                                    "type": "string",
+                                    "enum": list(BATCH_COMMANDS),
+                                    "description": "The command to execute",
+                                },
+                                "path": {
+                                    "type": "string",
+                                    "description": "File path",
+                                },
+                                "view_range": {
+                                    "type": "array",
+                                    "items": {"type": "integer"},
+                                    "description": "Optional line range [start, end] for 'view'",
+                                },
+                                "old_str": {
+                                    "type": "string",
+                                    "description": "String to replace (required for 'str_replace')",
+                                },
+                                "new_str": {
+                                    "type": "string",
+                                    "description": "Replacement or inserted text (required for 'str_replace' and 'insert')",
+                                },
+                                "insert_line": {
+                                    "type": "integer",
+                                    "description": "Line number to insert at (required for 'insert')",
+                                },
+                            },
+                            "required": ["command", "path"],
+                        },
+                    },
+                },
+                "required": ["operations"],
+            },
+        }
+
 
     def get_text_editor_tools(self) -> list[dict[str, Any]]:
         """text-editorツールのFunction calling用ツール定義を取得する(OpenAI形式).
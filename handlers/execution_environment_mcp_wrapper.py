@@ -107,6 +107,9 @@ class ExecutionEnvironmentMCPWrapper:
             raise ValueError(msg)
 
         if self.mcp_server_name == "text":
+            # 一括編集(text_batch_edit)はoperationsの配列をまとめて実行
+            if tool == "batch_edit":
+                return self.execution_manager.call_text_editor_batch(args.get("operations", []))
             # text_editorツールは単一ツール、commandパラメータで動作切替
             return self.execution_manager.call_text_editor_tool(tool="text_editor", arguments=args)
 
@@ -176,10 +179,14 @@ class ExecutionEnvironmentMCPWrapper:
             テキストエディタ機能説明を含むプロンプト文字列
 
         """
-        return """### text-editor mcp tools
+        prompt = """### text-editor mcp tools
 プロジェクトワークスペース内のファイル表示・作成・編集が可能です。
 
 * `text_editor` → { "command": enum["view","create","str_replace","insert","undo_edit"], "path": string, ... } --- ファイル操作ツール"""
+        if self.execution_manager.is_batch_edit_enabled():
+            prompt += """
+* `text_batch_edit` → { "operations": [{ "command": enum["view","str_replace","insert"], "path": string, ... }] } --- 複数の表示・編集を1回で実行(1つでも失敗した場合は全ての編集を取り消し)"""
+        return prompt
 
     def call_initialize(self) -> None:
         """初期化処理.
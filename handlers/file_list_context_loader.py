@@ -3,33 +3,123 @@
 このモジュールは、Issue/MR/PRの処理時に対象プロジェクトのファイル一覧を
 初期コンテキストに含める機能を提供します。
 
-GitHub MCPサーバーでは`get_file_contents`ツール、
-GitLab MCPサーバーでは`get_repository_tree`ツールを使用してファイル一覧を取得します。
+トークンが設定されている場合は、GitHubのGit Trees API(`git/trees/{sha}?recursive=1`)、
+GitLabの`repository/tree?recursive=true`でツリー全体をまとめて取得し、
+リポジトリとコミットSHAをキーにディスクへキャッシュします。
+取得できない場合は、GitHub MCPサーバーの`get_file_contents`ツール、
+GitLab MCPサーバーの`get_repository_tree`ツールを使用してファイル一覧を取得します。
 """
 from __future__ import annotations
 
+import contextlib
+import hashlib
+import json
 import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 from mcp import McpError
 
+from clients.github_client import GithubClient
+from clients.gitlab_client import GitlabClient
+
 if TYPE_CHECKING:
     from clients.mcp_tool_client import MCPToolClient
     from handlers.task import Task
 
 
+@dataclass
+class RepositoryTree:
+    """REST APIで取得したリポジトリのツリー情報."""
+
+    repository: str  # キャッシュキーに使うリポジトリ識別子(プラットフォーム・API URLを含む)
+    sha: str  # ツリーを取得したコミットSHA
+    files: list[str]  # ファイルパスのリスト
+
+
+class FileListCache:
+    """リポジトリとコミットSHAをキーにしたファイル一覧のディスクキャッシュ.
+
+    コミットSHAが同じであればツリーは変わらないため、有効期限は設けず、
+    エントリ数が上限を超えたら更新日時の古いものから削除します。
+    """
+
+    def __init__(self, cache_dir: Path, max_entries: int) -> None:
+        """キャッシュを初期化する.
+
+        Args:
+            cache_dir: キャッシュファイルを保存するディレクトリ
+            max_entries: 保持する最大エントリ数
+
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+
+    def get(self, repository: str, sha: str) -> list[str] | None:
+        """キャッシュされたファイル一覧を取得する(未キャッシュの場合はNone)."""
+        path = self._path(repository, sha)
+        try:
+            with path.open(encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self.logger.warning("ファイル一覧キャッシュの読み込みに失敗しました: %s", path)
+            return None
+        if data.get("repository") != repository or data.get("sha") != sha:
+            return None
+        # 参照されたエントリを削除対象から外すため更新日時を更新する
+        with contextlib.suppress(OSError):
+            path.touch()
+        return data.get("files", [])
+
+    def put(self, repository: str, sha: str, files: list[str]) -> None:
+        """ファイル一覧をキャッシュに保存する."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"repository": repository, "sha": sha, "files": files}, f, ensure_ascii=False)
+            Path(tmp_path).replace(self._path(repository, sha))
+        except OSError:
+            self.logger.warning("ファイル一覧キャッシュの保存に失敗しました: %s@%s", repository, sha)
+            return
+        self._evict()
+
+    def _path(self, repository: str, sha: str) -> Path:
+        digest = hashlib.sha256(f"{repository}@{sha}".encode()).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def _evict(self) -> None:
+        """上限を超えたエントリを更新日時の古いものから削除する."""
+        try:
+            entries = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        except OSError:
+            return
+        for path in entries[:max(len(entries) - self.max_entries, 0)]:
+            with contextlib.suppress(OSError):
+                path.unlink()
+
+
 class FileListContextLoader:
     """プロジェクトファイル一覧コンテキストローダー.
 
     プロジェクトディレクトリからファイル一覧を取得し、
     フラットリスト形式に整形してシステムプロンプト用のコンテキストを生成します。
 
-    GitHub MCPまたはGitLab MCP経由でファイルアクセスをサポートします。
+    GitHub/GitLabのREST API、またはGitHub MCP・GitLab MCP経由での
+    ファイルアクセスをサポートします。
     """
 
     # デフォルト設定値
     DEFAULT_ENABLED = True
     DEFAULT_MAX_DEPTH = -1  # 無制限
+    DEFAULT_USE_TREE_API = True
+    DEFAULT_CACHE_MAX_ENTRIES = 200
 
     def __init__(
         self,
@@ -51,6 +141,56 @@ class FileListContextLoader:
         file_list_config = config.get("file_list_context", {})
         self.enabled = file_list_config.get("enabled", self.DEFAULT_ENABLED)
         self.max_depth = file_list_config.get("max_depth", self.DEFAULT_MAX_DEPTH)
+        self.use_tree_api = file_list_config.get("use_tree_api", self.DEFAULT_USE_TREE_API)
+
+        base_dir = Path(config.get("context_storage", {}).get("base_dir", "contexts"))
+        self.cache = FileListCache(
+            Path(file_list_config.get("cache_dir", base_dir / "file_list_cache")),
+            file_list_config.get("cache_max_entries", self.DEFAULT_CACHE_MAX_ENTRIES),
+        )
+
+    def get_github_client(self) -> GithubClient | None:
+        """設定のトークンからGitHubクライアントを生成する(REST APIを使わない場合はNone)."""
+        github_config = self.config.get("github", {})
+        token = github_config.get("personal_access_token")
+        if not self.use_tree_api or not token:
+            return None
+        return GithubClient(token=token, api_url=github_config.get("api_url") or "https://api.github.com")
+
+    def get_gitlab_client(self) -> GitlabClient | None:
+        """設定のトークンからGitLabクライアントを生成する(REST APIを使わない場合はNone)."""
+        gitlab_config = self.config.get("gitlab", {})
+        token = gitlab_config.get("personal_access_token")
+        if not self.use_tree_api or not token:
+            return None
+        return GitlabClient(token=token, api_url=gitlab_config.get("api_url") or "https://gitlab.com/api/v4")
+
+    def load_repository_tree(
+        self,
+        *,
+        owner: str | None = None,
+        repo: str | None = None,
+        project_id: str | None = None,
+    ) -> RepositoryTree | None:
+        """デフォルトブランチのツリーをREST API(またはキャッシュ)から取得する.
+
+        Args:
+            owner: リポジトリオーナー (GitHub用)
+            repo: リポジトリ名 (GitHub用)
+            project_id: プロジェクトID (GitLab用)
+
+        Returns:
+            ツリー情報。REST APIを使用できない場合はNone
+
+        Raises:
+            requests.exceptions.RequestException: API呼び出しに失敗した場合
+
+        """
+        if owner and repo:
+            return self._fetch_file_list_from_github_tree(owner, repo)
+        if project_id:
+            return self._fetch_file_list_from_gitlab_tree(project_id)
+        return None
 
     def load_file_list(self, task: Task) -> str:
         """タスクに関連するプロジェクトのファイル一覧を取得して整形する.
@@ -114,6 +254,13 @@ class FileListContextLoader:
             ファイルパスのリスト
 
         """
+        try:
+            tree = self._fetch_file_list_from_github_tree(owner, repo)
+            if tree is not None:
+                return tree.files
+        except Exception as e:
+            self.logger.warning("Git Trees APIでのファイル一覧取得に失敗したため、MCPで取得します: %s", e)
+
         try:
             mcp_client = self.mcp_clients["github"]
             file_list: list[str] = []
@@ -124,6 +271,37 @@ class FileListContextLoader:
             self.logger.exception("GitHub ファイル一覧取得エラー")
             return []
 
+    def _fetch_file_list_from_github_tree(self, owner: str, repo: str) -> RepositoryTree | None:
+        """Git Trees APIでデフォルトブランチのファイル一覧を1リクエストで取得する.
+
+        Args:
+            owner: リポジトリオーナー
+            repo: リポジトリ名
+
+        Returns:
+            ツリー情報。REST APIを使用できない場合はNone
+
+        """
+        client = self.get_github_client()
+        if client is None:
+            return None
+
+        repository = f"github:{client.api_url}/{owner}/{repo}"
+        sha = client.get_commit_sha(owner, repo)
+        cached = self.cache.get(repository, sha)
+        if cached is not None:
+            self.logger.info("ファイル一覧をキャッシュから取得しました: %s/%s@%s", owner, repo, sha[:12])
+            return RepositoryTree(repository, sha, cached)
+
+        tree = client.get_git_tree(owner, repo, sha)
+        if tree.get("truncated"):
+            # 上限を超えたツリーは不完全なため、MCPでディレクトリごとに取得する
+            self.logger.warning("Gitツリーが大きすぎて切り詰められました: %s/%s", owner, repo)
+            return None
+        file_list = [entry["path"] for entry in tree.get("tree", []) if entry.get("type") == "blob"]
+        self.cache.put(repository, sha, file_list)
+        return RepositoryTree(repository, sha, file_list)
+
     def _fetch_github_directory_contents(
         self,
         mcp_client: MCPToolClient,
@@ -200,6 +378,13 @@ class FileListContextLoader:
             ファイルパスのリスト
 
         """
+        try:
+            tree = self._fetch_file_list_from_gitlab_tree(project_id)
+            if tree is not None:
+                return tree.files
+        except Exception as e:
+            self.logger.warning("GitLab REST APIでのファイル一覧取得に失敗したため、MCPで取得します: %s", e)
+
         try:
             mcp_client = self.mcp_clients["gitlab"]
             file_list: list[str] = []
@@ -232,6 +417,35 @@ class FileListContextLoader:
             self.logger.exception("GitLab ファイル一覧取得エラー")
             return []
 
+    def _fetch_file_list_from_gitlab_tree(self, project_id: str) -> RepositoryTree | None:
+        """REST APIでデフォルトブランチのツリー全体を取得する(ページは並列取得).
+
+        Args:
+            project_id: GitLabプロジェクトID
+
+        Returns:
+            ツリー情報。REST APIを使用できない場合はNone
+
+        """
+        client = self.get_gitlab_client()
+        if client is None:
+            return None
+
+        repository = f"gitlab:{client.api_url}/{project_id}"
+        sha = client.get_commit_sha(project_id)
+        if sha is None:
+            # コミットのない空のリポジトリ
+            return RepositoryTree(repository, "", [])
+        cached = self.cache.get(repository, sha)
+        if cached is not None:
+            self.logger.info("ファイル一覧をキャッシュから取得しました: %s@%s", project_id, sha[:12])
+            return RepositoryTree(repository, sha, cached)
+
+        tree = client.list_repository_tree(project_id, ref=sha)
+        file_list = [entry["path"] for entry in tree if entry.get("type") == "blob"]
+        self.cache.put(repository, sha, file_list)
+        return RepositoryTree(repository, sha, file_list)
+
     def _apply_depth_limit(self, file_list: list[str], max_depth: int) -> list[str]:
         """ファイルリストに階層制限を適用する.
 
@@ -0,0 +1,111 @@
+"""差分ポーリングの状態管理.
+
+Producerが毎回すべての対象Issue/PR/MRを検索し直さずに済むよう、
+前回までに観測した更新日時の最大値(ハイウォーターマーク)を保持します。
+取りこぼし対策として一定間隔で全件同期(リコンシリエーション)を行います。
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalPollingState:
+    """タスク取得の差分ポーリング状態を保持するクラス.
+
+    状態はプロセス内のメモリにのみ保持します。プロセス再起動後の
+    最初のポーリングは必ず全件同期になるため、永続化は不要です。
+    """
+
+    def __init__(self, config: dict[str, Any]) -> None:
+        """差分ポーリング状態を初期化する.
+
+        Args:
+            config: アプリケーション設定辞書
+
+        """
+        producer_config = config.get("continuous", {}).get("producer", {})
+        polling_config = producer_config.get("incremental_polling", {})
+        self.enabled = polling_config.get("enabled", True)
+        self.full_sync_interval_seconds = polling_config.get("full_sync_interval_minutes", 60) * 60
+        self.overlap_seconds = polling_config.get("overlap_seconds", 120)
+
+        self._high_water_marks: dict[str, datetime] = {}
+        self._last_full_sync: float | None = None
+        self._full_sync = True
+
+    def start_poll(self) -> bool:
+        """ポーリングの開始を記録し、今回が全件同期かどうかを返す.
+
+        Returns:
+            全件同期を行う場合True
+
+        """
+        now = time.monotonic()
+        self._full_sync = (
+            not self.enabled
+            or self._last_full_sync is None
+            or now - self._last_full_sync >= self.full_sync_interval_seconds
+        )
+        if self._full_sync:
+            self._last_full_sync = now
+            logger.info("全件同期でタスクを取得します")
+        return self._full_sync
+
+    def get_updated_after(self, kind: str) -> datetime | None:
+        """差分取得に使用する更新日時の下限を取得する.
+
+        ハイウォーターマークから重複許容幅(overlap_seconds)を差し引いた値を返します。
+        検索インデックスの反映遅延による取りこぼしを避けるためです。
+
+        Args:
+            kind: 取得対象の種別("issues", "merge_requests" など)
+
+        Returns:
+            更新日時の下限、全件同期の場合やハイウォーターマーク未確定の場合はNone
+
+        """
+        if self._full_sync:
+            return None
+        high_water_mark = self._high_water_marks.get(kind)
+        if high_water_mark is None:
+            return None
+        return high_water_mark - timedelta(seconds=self.overlap_seconds)
+
+    def record(self, kind: str, items: list[dict[str, Any]]) -> None:
+        """取得結果の更新日時からハイウォーターマークを更新する.
+
+        Args:
+            kind: 取得対象の種別
+            items: APIから取得したIssue/PR/MRのリスト
+
+        """
+        for item in items:
+            updated_at = self.parse_timestamp(item.get("updated_at"))
+            if updated_at is None:
+                continue
+            current = self._high_water_marks.get(kind)
+            if current is None or updated_at > current:
+                self._high_water_marks[kind] = updated_at
+
+    @staticmethod
+    def parse_timestamp(value: object) -> datetime | None:
+        """ISO 8601形式の日時文字列をタイムゾーン付きdatetimeに変換する."""
+        if not isinstance(value, str) or not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed
+
+    @staticmethod
+    def format_timestamp(value: datetime) -> str:
+        """datetimeをAPIクエリ用のISO 8601文字列(UTC)に変換する."""
+        return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
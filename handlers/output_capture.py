@@ -0,0 +1,240 @@
+"""コマンド出力のストリーミング取得モジュール.
+
+実行環境で実行したコマンドの標準出力・標準エラー出力を逐次読み取り、
+先頭と末尾だけを保持する上限付きバッファに蓄積します。
+大量の出力を全てメモリに保持せずに済み、必要に応じて全出力をファイルに
+書き出したり、出力量が上限を超えた時点でコマンドを打ち切ったりできます。
+"""
+from __future__ import annotations
+
+import contextlib
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO
+
+# パイプから一度に読み取るバイト数
+READ_CHUNK_SIZE = 64 * 1024
+# 出力の読み取りスレッドの終了を待つ最大時間(秒)
+READER_JOIN_TIMEOUT_SECONDS = 5.0
+
+
+class BoundedOutputBuffer:
+    """先頭と末尾のみを保持する上限付き出力バッファ.
+
+    上限を超えた出力は中間部分を省略し、省略したバイト数を示すマーカーに置き換えます。
+    spill_fileが指定された場合は、全出力をファイルにも書き出します。
+    """
+
+    def __init__(self, max_bytes: int, spill_file: IO[bytes] | None = None) -> None:
+        """バッファを初期化する.
+
+        Args:
+            max_bytes: 保持する最大バイト数(先頭と末尾で半分ずつ)
+            spill_file: 全出力を書き出すファイル
+
+        """
+        self.max_bytes = max_bytes
+        self.spill_file = spill_file
+        self.total_bytes = 0
+        self._head_limit = max_bytes // 2
+        self._tail_limit = max_bytes - self._head_limit
+        self._head = bytearray()
+        self._tail: deque[bytes] = deque()
+        self._tail_bytes = 0
+
+    @property
+    def truncated(self) -> bool:
+        """出力の一部を省略したかどうか."""
+        return self.total_bytes > self.max_bytes
+
+    def write(self, data: bytes) -> None:
+        """出力を追加する."""
+        self.total_bytes += len(data)
+        if self.spill_file is not None:
+            self.spill_file.write(data)
+
+        if len(self._head) < self._head_limit:
+            room = self._head_limit - len(self._head)
+            self._head.extend(data[:room])
+            data = data[room:]
+        if not data:
+            return
+
+        self._tail.append(data)
+        self._tail_bytes += len(data)
+        # 末尾の上限を超える古いチャンクはまとめて捨てる(部分的な切り詰めはgetvalueで行う)
+        while self._tail and self._tail_bytes - len(self._tail[0]) >= self._tail_limit:
+            self._tail_bytes -= len(self._tail.popleft())
+
+    def getvalue(self) -> str:
+        """保持している出力を文字列で取得する."""
+        tail = b"".join(self._tail)
+        if not self.truncated:
+            return (bytes(self._head) + tail).decode("utf-8", errors="replace")
+
+        tail = tail[-self._tail_limit:] if self._tail_limit else b""
+        omitted = self.total_bytes - len(self._head) - len(tail)
+        return (
+            self._head.decode("utf-8", errors="replace")
+            + f"\n...(truncated {omitted} bytes)...\n"
+            + tail.decode("utf-8", errors="replace")
+        )
+
+
+@dataclass
+class StreamingResult:
+    """ストリーミング実行の結果.
+
+    Attributes:
+        returncode: 終了コード(打ち切った場合は強制終了時のコード)
+        stdout: 標準出力のバッファ
+        stderr: 標準エラー出力のバッファ
+        duration_ms: 実行時間(ミリ秒)
+        timed_out: タイムアウトで打ち切ったかどうか
+        output_limit_exceeded: 出力量の上限を超えて打ち切ったかどうか
+        spill_files: 全出力を書き出したファイル(出力を省略した場合のみ残す)
+
+    """
+
+    returncode: int
+    stdout: BoundedOutputBuffer
+    stderr: BoundedOutputBuffer
+    duration_ms: int
+    timed_out: bool = False
+    output_limit_exceeded: bool = False
+    spill_files: dict[str, Path] = field(default_factory=dict)
+
+
+def run_streaming(
+    cmd: list[str],
+    *,
+    timeout: float,
+    max_bytes: int,
+    max_total_bytes: int | None = None,
+    spill_dir: Path | None = None,
+) -> StreamingResult:
+    """コマンドを実行し、出力を上限付きバッファに逐次読み取る.
+
+    出力量の合計がmax_total_bytesを超えた場合とタイムアウトした場合は
+    プロセスを強制終了します。docker execの場合、クライアントの終了によって
+    コンテナ内のプロセスは出力先を失い、次の書き込みで終了します。
+
+    Args:
+        cmd: 実行するコマンド
+        timeout: タイムアウト秒数
+        max_bytes: 標準出力・標準エラー出力それぞれで保持する最大バイト数
+        max_total_bytes: 打ち切る出力量の合計(Noneの場合は打ち切らない)
+        spill_dir: 全出力を書き出すディレクトリ(Noneの場合は書き出さない)
+
+    Returns:
+        実行結果
+
+    """
+    buffers, spill_paths = create_output_buffers(max_bytes, spill_dir)
+    limit_exceeded = threading.Event()
+    lock = threading.Lock()
+
+    start_time = time.monotonic()
+    process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def read_stream(pipe: IO[bytes], buffer: BoundedOutputBuffer) -> None:
+        while chunk := pipe.read1(READ_CHUNK_SIZE):
+            with lock:
+                buffer.write(chunk)
+                total = buffers["stdout"].total_bytes + buffers["stderr"].total_bytes
+            if max_total_bytes is not None and total > max_total_bytes and not limit_exceeded.is_set():
+                limit_exceeded.set()
+                process.kill()
+
+    readers = [
+        threading.Thread(target=read_stream, args=(process.stdout, buffers["stdout"]), daemon=True),
+        threading.Thread(target=read_stream, args=(process.stderr, buffers["stderr"]), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    timed_out = False
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        process.kill()
+        process.wait()
+    finally:
+        for reader in readers:
+            reader.join(timeout=READER_JOIN_TIMEOUT_SECONDS)
+        for pipe in (process.stdout, process.stderr):
+            with contextlib.suppress(OSError):
+                pipe.close()
+        kept_files = close_output_buffers(buffers, spill_paths)
+
+    return StreamingResult(
+        returncode=process.returncode,
+        stdout=buffers["stdout"],
+        stderr=buffers["stderr"],
+        duration_ms=int((time.monotonic() - start_time) * 1000),
+        timed_out=timed_out,
+        output_limit_exceeded=limit_exceeded.is_set(),
+        spill_files=kept_files,
+    )
+
+
+def create_output_buffers(
+    max_bytes: int, spill_dir: Path | None = None,
+) -> tuple[dict[str, BoundedOutputBuffer], dict[str, Path]]:
+    """標準出力・標準エラー出力のバッファを作成する.
+
+    Args:
+        max_bytes: それぞれのバッファで保持する最大バイト数
+        spill_dir: 全出力を書き出すディレクトリ(Noneの場合は書き出さない)
+
+    Returns:
+        (ストリーム名ごとのバッファ, ストリーム名ごとの全出力ファイルのパス) のタプル
+
+    """
+    spill_paths: dict[str, Path] = {}
+    buffers: dict[str, BoundedOutputBuffer] = {}
+    if spill_dir is not None:
+        spill_dir.mkdir(parents=True, exist_ok=True)
+        prefix = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    for stream in ("stdout", "stderr"):
+        spill_file = None
+        if spill_dir is not None:
+            spill_paths[stream] = spill_dir / f"{prefix}.{stream}.log"
+            spill_file = spill_paths[stream].open("wb")
+        buffers[stream] = BoundedOutputBuffer(max_bytes, spill_file)
+    return buffers, spill_paths
+
+
+def close_output_buffers(
+    buffers: dict[str, BoundedOutputBuffer], spill_paths: dict[str, Path],
+) -> dict[str, Path]:
+    """全出力ファイルを閉じ、出力を省略したストリームのファイルのみを残す.
+
+    出力を省略しなかった場合は全出力が結果に含まれるため、ファイルは削除します。
+
+    Args:
+        buffers: ストリーム名ごとのバッファ
+        spill_paths: ストリーム名ごとの全出力ファイルのパス
+
+    Returns:
+        残したファイルのパス
+
+    """
+    kept_files = {}
+    for stream, buffer in buffers.items():
+        if buffer.spill_file is not None:
+            buffer.spill_file.close()
+        path = spill_paths.get(stream)
+        if path is None:
+            continue
+        if buffer.truncated:
+            kept_files[stream] = path
+        else:
+            path.unlink(missing_ok=True)
+    return kept_files
@@ -0,0 +1,262 @@
+"""実行環境コンテナ内の永続シェルモジュール.
+
+`docker exec -i` で起動した1つのシェルに、コマンドを標準入力から順に送って実行します。
+コマンドごとのプロセス起動が不要になり、cdや環境変数などのシェルの状態が
+コマンド間で保持されます。各コマンドの終わりは、コマンドごとに生成した
+センチネル文字列を標準出力・標準エラー出力に書き出すことで検出します。
+"""
+from __future__ import annotations
+
+import contextlib
+import queue
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+from typing import IO, TYPE_CHECKING
+
+from handlers.output_capture import (
+    READ_CHUNK_SIZE,
+    StreamingResult,
+    close_output_buffers,
+    create_output_buffers,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# シェルの終了を待つ最大時間(秒)
+SHELL_CLOSE_TIMEOUT_SECONDS = 5.0
+# シェル内で使う変数名のプレフィックス(ユーザーの変数と衝突しないようにする)
+_VAR_PREFIX = "__coding_agent"
+
+
+class PersistentShellError(RuntimeError):
+    """永続シェルが利用できない場合の例外."""
+
+
+class PersistentShell:
+    """docker exec -i で起動した永続シェル.
+
+    コマンドはシングルクォートで囲んだ変数として送り、構文チェック後に
+    現在のシェルでevalします。構文エラーでシェルが終了することはなく、
+    コマンドの標準入力は/dev/nullに切り替えるため、後続のコマンドを読み込むこともありません。
+    タイムアウトや出力量の上限で打ち切った場合はシェルを終了し、次回は新しいシェルを起動します。
+    """
+
+    def __init__(self, cmd: list[str]) -> None:
+        """永続シェルを初期化する.
+
+        Args:
+            cmd: シェルを起動するコマンド(例: docker exec -i <container> sh)
+
+        """
+        self.cmd = cmd
+        self._process: subprocess.Popen | None = None
+        self._chunks: queue.Queue[tuple[str, bytes | None]] = queue.Queue()
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        """シェルが動作中かどうか."""
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> None:
+        """シェルを起動する.
+
+        Raises:
+            PersistentShellError: 起動に失敗した場合
+
+        """
+        try:
+            self._process = subprocess.Popen(
+                self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            )
+        except OSError as e:
+            msg = f"永続シェルの起動に失敗しました: {e}"
+            raise PersistentShellError(msg) from e
+        self._chunks = queue.Queue()
+        for stream, pipe in (("stdout", self._process.stdout), ("stderr", self._process.stderr)):
+            threading.Thread(
+                target=self._read_stream, args=(stream, pipe, self._chunks),
+                name=f"persistent-shell-{stream}", daemon=True,
+            ).start()
+
+    def close(self) -> None:
+        """シェルを終了する."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        with contextlib.suppress(OSError):
+            process.stdin.close()
+        try:
+            process.wait(timeout=SHELL_CLOSE_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def run(
+        self,
+        command: str,
+        *,
+        timeout: float,
+        max_bytes: int,
+        max_total_bytes: int | None = None,
+        spill_dir: Path | None = None,
+        working_directory: str | None = None,
+    ) -> StreamingResult:
+        """シェルでコマンドを実行する.
+
+        Args:
+            command: 実行するコマンド
+            timeout: タイムアウト秒数
+            max_bytes: 標準出力・標準エラー出力それぞれで保持する最大バイト数
+            max_total_bytes: 打ち切る出力量の合計(Noneの場合は打ち切らない)
+            spill_dir: 全出力を書き出すディレクトリ(Noneの場合は書き出さない)
+            working_directory: 実行前に移動するディレクトリ(移動はシェルに保持される)
+
+        Returns:
+            実行結果
+
+        Raises:
+            PersistentShellError: シェルが起動していない、またはコマンドを送れなかった場合
+
+        """
+        with self._lock:
+            if not self.alive:
+                msg = "永続シェルが起動していません"
+                raise PersistentShellError(msg)
+
+            token = f"__CODING_AGENT_DONE_{uuid.uuid4().hex}__"
+            try:
+                self._process.stdin.write(_build_script(command, token, working_directory).encode("utf-8"))
+                self._process.stdin.flush()
+            except OSError as e:
+                self.close()
+                msg = f"永続シェルへのコマンド送信に失敗しました: {e}"
+                raise PersistentShellError(msg) from e
+
+            return self._collect(token, timeout, max_bytes, max_total_bytes, spill_dir)
+
+    def _collect(
+        self,
+        token: str,
+        timeout: float,
+        max_bytes: int,
+        max_total_bytes: int | None,
+        spill_dir: Path | None,
+    ) -> StreamingResult:
+        """センチネルが両方のストリームに現れるまで出力を読み取る."""
+        buffers, spill_paths = create_output_buffers(max_bytes, spill_dir)
+        # センチネルの前にはスクリプトが改行を1つ出力する
+        marker = b"\n" + token.encode("ascii")
+        pending = {"stdout": bytearray(), "stderr": bytearray()}
+        done = {"stdout": False, "stderr": False}
+        returncode: int | None = None
+        timed_out = False
+        limit_exceeded = False
+        shell_exited = False
+
+        start_time = time.monotonic()
+        deadline = start_time + timeout
+        try:
+            while not all(done.values()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                try:
+                    stream, chunk = self._chunks.get(timeout=remaining)
+                except queue.Empty:
+                    timed_out = True
+                    break
+
+                if chunk is None:
+                    # シェルが終了した(コマンド内のexit等)。残りの出力を読み切る
+                    buffers[stream].write(bytes(pending[stream]))
+                    pending[stream].clear()
+                    done[stream] = True
+                    shell_exited = True
+                    continue
+
+                data = pending[stream]
+                data.extend(chunk)
+                index = data.find(marker)
+                if index >= 0:
+                    line_end = data.find(b"\n", index + len(marker))
+                    if stream == "stdout" and line_end < 0:
+                        # 終了コードの行が揃うまで待つ
+                        continue
+                    buffers[stream].write(bytes(data[:index]))
+                    if stream == "stdout":
+                        returncode = int(data[index + len(marker):line_end].strip() or -1)
+                    data.clear()
+                    done[stream] = True
+                else:
+                    # センチネルの途中までの可能性がある末尾だけを残してバッファに移す
+                    keep = len(marker) - 1
+                    if len(data) > keep:
+                        buffers[stream].write(bytes(data[:-keep]))
+                        del data[:-keep]
+
+                total = buffers["stdout"].total_bytes + buffers["stderr"].total_bytes
+                if max_total_bytes is not None and total > max_total_bytes:
+                    limit_exceeded = True
+                    break
+        finally:
+            # 打ち切った場合にセンチネル待ちで保留していた出力も結果に含める
+            for stream, data in pending.items():
+                buffers[stream].write(bytes(data))
+            kept_files = close_output_buffers(buffers, spill_paths)
+
+        if shell_exited and not timed_out and self._process is not None:
+            returncode = self._process.wait()
+
+        if timed_out or limit_exceeded or returncode is None or not all(done.values()):
+            # 実行中のコマンドを止めるため、シェルごと終了する
+            self._kill()
+
+        return StreamingResult(
+            returncode=-1 if returncode is None else returncode,
+            stdout=buffers["stdout"],
+            stderr=buffers["stderr"],
+            duration_ms=int((time.monotonic() - start_time) * 1000),
+            timed_out=timed_out,
+            output_limit_exceeded=limit_exceeded,
+            spill_files=kept_files,
+        )
+
+    def _kill(self) -> None:
+        process, self._process = self._process, None
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+
+    @staticmethod
+    def _read_stream(stream: str, pipe: IO[bytes], chunks: queue.Queue[tuple[str, bytes | None]]) -> None:
+        """パイプの出力をキューに送る(終了時はNoneを送る)."""
+        with contextlib.suppress(OSError, ValueError):
+            while chunk := pipe.read1(READ_CHUNK_SIZE):
+                chunks.put((stream, chunk))
+        chunks.put((stream, None))
+
+
+def _build_script(command: str, token: str, working_directory: str | None) -> str:
+    """コマンドを実行し、終了コードとセンチネルを出力するシェルスクリプトを組み立てる."""
+    run = f'eval "${_VAR_PREFIX}_cmd"'
+    if working_directory:
+        run = f"cd -- {shlex.quote(working_directory)} && {run}"
+    return "\n".join([
+        f"{_VAR_PREFIX}_cmd={shlex.quote(command)}",
+        f'if {_VAR_PREFIX}_err=$(sh -n -c "${_VAR_PREFIX}_cmd" 2>&1); then',
+        f"{{ {run}; }} </dev/null",
+        f"{_VAR_PREFIX}_rc=$?",
+        "else",
+        f"printf '%s\\n' \"${_VAR_PREFIX}_err\" >&2",
+        f"{_VAR_PREFIX}_rc=2",
+        "fi",
+        f"printf '\\n%s %s\\n' '{token}' \"${_VAR_PREFIX}_rc\"",
+        f"printf '\\n%s\\n' '{token}' >&2",
+        "",
+    ])
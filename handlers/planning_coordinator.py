@@ -105,6 +105,7 @@ class PlanningCoordinator:
             task_uuid=task.uuid,
             enabled=progress_config.get("enabled", True),
             max_history_entries=progress_config.get("max_history_entries", 100),
+            update_interval_seconds=progress_config.get("update_interval_seconds", 5.0),
         )
 
         # Use provided LLM client or create new one if not provided
@@ -870,7 +871,12 @@ class PlanningCoordinator:
         planning_state = self.get_planning_state()
 
         # Pause the task with planning state
-        self.pause_manager.pause_task(self.task, self.task.uuid, planning_state=planning_state)
+        self.pause_manager.pause_task(
+            self.task,
+            self.task.uuid,
+            planning_state=planning_state,
+            execution_manager=self.execution_manager,
+        )
 
     def _post_completion_comment(self, status: str, summary: str = "", reason: str = "") -> None:
         """タスク完了コメントを投稿.
@@ -0,0 +1,179 @@
+"""Planning history index module.
+
+This module provides a local SQLite index of planning history entries keyed by
+issue ID, so entries for one issue can be read without scanning every task's
+planning JSONL files.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+# Index database file name (created directly under the context base directory)
+INDEX_FILENAME = "planning_index.sqlite3"
+# Seconds to wait for a lock held by another process
+INDEX_LOCK_TIMEOUT_SECONDS = 30.0
+# Task status directories that hold planning files
+STATUS_DIRS = ("running", "completed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS planning_entries (
+    issue_id TEXT NOT NULL,
+    task_uuid TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    timestamp TEXT NOT NULL DEFAULT '',
+    UNIQUE (task_uuid, file_name, offset)
+);
+CREATE INDEX IF NOT EXISTS idx_planning_entries_issue ON planning_entries (issue_id, timestamp);
+CREATE TABLE IF NOT EXISTS index_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class PlanningHistoryIndex:
+    """SQLite index of planning history entries by issue ID.
+
+    Each row points at one JSONL line by task UUID, file name and byte offset.
+    Files are located under ``running`` or ``completed`` at lookup time, so the
+    index stays valid when a task's context directory is moved on completion.
+    Entries written before the index existed are indexed once on first lookup.
+    """
+
+    def __init__(self, base_dir: Path) -> None:
+        """Initialize the index.
+
+        Args:
+            base_dir: Context storage base directory (contains running/ and completed/)
+
+        """
+        self.base_dir = base_dir
+        self.path = base_dir / INDEX_FILENAME
+        self.logger = logging.getLogger(__name__)
+        self._schema_ready = False
+
+    def add(self, issue_id: str, task_uuid: str, file_name: str, offset: int, timestamp: str) -> None:
+        """Record the location of an appended entry.
+
+        Args:
+            issue_id: Issue or MR identifier of the entry
+            task_uuid: Task UUID owning the planning file
+            file_name: Planning JSONL file name
+            offset: Byte offset of the entry's line in the file
+            timestamp: Entry timestamp (used for ordering)
+
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO planning_entries VALUES (?, ?, ?, ?, ?)",
+                (issue_id, task_uuid, file_name, offset, timestamp),
+            )
+
+    def find(self, issue_id: str) -> list[dict[str, Any]]:
+        """Read all indexed entries for an issue.
+
+        Args:
+            issue_id: Issue or MR identifier
+
+        Returns:
+            List of entries for the issue, in chronological order
+
+        """
+        self._ensure_backfilled()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT task_uuid, file_name, offset FROM planning_entries "
+                "WHERE issue_id = ? ORDER BY timestamp, rowid",
+                (issue_id,),
+            ).fetchall()
+
+        entries = []
+        handles: dict[tuple[str, str], Any] = {}
+        try:
+            for task_uuid, file_name, offset in rows:
+                key = (task_uuid, file_name)
+                if key not in handles:
+                    path = self._locate(task_uuid, file_name)
+                    handles[key] = path.open("rb") if path is not None else None
+                handle = handles[key]
+                if handle is None:
+                    continue
+                handle.seek(offset)
+                try:
+                    entries.append(json.loads(handle.readline()))
+                except json.JSONDecodeError as e:
+                    self.logger.warning(f"Error reading {file_name} of task {task_uuid}: {e}")
+        finally:
+            for handle in handles.values():
+                if handle is not None:
+                    handle.close()
+        return entries
+
+    def _locate(self, task_uuid: str, file_name: str) -> Path | None:
+        """Find a task's planning file in the running or completed directory."""
+        for status in STATUS_DIRS:
+            path = self.base_dir / status / task_uuid / "planning" / file_name
+            if path.exists():
+                return path
+        return None
+
+    def _ensure_backfilled(self) -> None:
+        """Index entries written before the index existed (runs once)."""
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM index_meta WHERE key = 'backfilled'").fetchone():
+                return
+
+        rows = []
+        for status in STATUS_DIRS:
+            status_dir = self.base_dir / status
+            if not status_dir.exists():
+                continue
+            for jsonl_file in status_dir.glob("*/planning/*.jsonl"):
+                rows.extend(self._scan_file(jsonl_file))
+
+        with self._connect() as conn:
+            conn.executemany("INSERT OR IGNORE INTO planning_entries VALUES (?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO index_meta VALUES ('backfilled', '1')")
+        self.logger.info("Indexed %d existing planning history entries", len(rows))
+
+    def _scan_file(self, jsonl_file: Path) -> list[tuple[str, str, str, int, str]]:
+        """Collect index rows for every entry with an issue ID in a planning file."""
+        task_uuid = jsonl_file.parent.parent.name
+        rows = []
+        try:
+            with jsonl_file.open("rb") as f:
+                offset = 0
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        if entry.get("issue_id") is not None:
+                            rows.append((
+                                str(entry["issue_id"]), task_uuid, jsonl_file.name,
+                                offset, entry.get("timestamp", ""),
+                            ))
+                    offset += len(line)
+        except (json.JSONDecodeError, OSError) as e:
+            self.logger.warning(f"Error reading {jsonl_file}: {e}")
+        return rows
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection, committing on success and closing it afterwards."""
+        conn = sqlite3.connect(self.path, timeout=INDEX_LOCK_TIMEOUT_SECONDS)
+        try:
+            if not self._schema_ready:
+                conn.executescript(_SCHEMA)
+                self._schema_ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
@@ -6,23 +6,32 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from handlers.planning_history_index import PlanningHistoryIndex
+
 
 class PlanningHistoryStore:
     """Manages planning and revision history using JSONL files.
     
     Stores planning history in JSONL format, with one file per task UUID.
+    The file is read once on first access; afterwards each entry's JSON line is
+    kept in memory, indexed by type, and updated by this store's appends. Reads
+    only parse the entries they return, so callers always get fresh objects.
     """
 
-    def __init__(self, task_uuid: str, planning_dir: Path) -> None:
+    def __init__(self, task_uuid: str, planning_dir: Path, base_dir: Path | None = None) -> None:
         """Initialize the planning history store.
         
         Args:
             task_uuid: Unique identifier for the task
             planning_dir: Planning directory path for this task
+            base_dir: Context storage base directory used to look up other tasks'
+                history by issue (cross-task lookup is disabled if omitted)
         """
         self.task_uuid = task_uuid
         self.logger = logging.getLogger(__name__)
@@ -40,6 +49,13 @@ class PlanningHistoryStore:
         self.issue_id = None
         self.task_metadata = {}
 
+        # Index of entries by issue for cross-task lookups
+        self.index = PlanningHistoryIndex(base_dir) if base_dir is not None else None
+
+        # Entry JSON lines grouped by type (loaded on first read)
+        self._lines_by_type: dict[str, list[str]] | None = None
+        self._latest_plan_line: str | None = None
+
     def save_plan(self, plan: dict[str, Any]) -> None:
         """Save initial plan to JSONL file.
         
@@ -135,8 +151,7 @@ class PlanningHistoryStore:
             List of replan decision entries
 
         """
-        entries = self._read_jsonl()
-        return [e for e in entries if e.get("type") == "replan_decision"]
+        return self._get_entries("replan_decision")
 
     def get_latest_plan(self) -> dict[str, Any] | None:
         """Get the most recent plan.
@@ -144,16 +159,8 @@ class PlanningHistoryStore:
         Returns:
             Latest plan entry or None if no plan exists
         """
-        entries = self._read_jsonl()
-        
-        # Find the most recent plan or revision entry
-        for entry in reversed(entries):
-            if entry.get("type") == "plan":
-                return entry
-            elif entry.get("type") == "revision":
-                return entry
-        
-        return None
+        self._get_lines_by_type()
+        return json.loads(self._latest_plan_line) if self._latest_plan_line is not None else None
 
     def has_plan(self) -> bool:
         """Check if a plan exists.
@@ -161,11 +168,8 @@ class PlanningHistoryStore:
         Returns:
             True if plan exists, False otherwise
         """
-        if not self.filepath.exists():
-            return False
-        
-        entries = self._read_jsonl()
-        return any(e.get("type") in ("plan", "revision") for e in entries)
+        self._get_lines_by_type()
+        return self._latest_plan_line is not None
 
     def get_revision_history(self) -> list[dict[str, Any]]:
         """Get all revision history entries.
@@ -173,8 +177,7 @@ class PlanningHistoryStore:
         Returns:
             List of revision entries
         """
-        entries = self._read_jsonl()
-        return [e for e in entries if e.get("type") == "revision"]
+        return self._get_entries("revision")
 
     def get_all_reflections(self) -> list[dict[str, Any]]:
         """Get all reflection entries.
@@ -182,14 +185,21 @@ class PlanningHistoryStore:
         Returns:
             List of reflection entries
         """
-        entries = self._read_jsonl()
-        return [e for e in entries if e.get("type") == "reflection"]
+        return self._get_entries("reflection")
+
+    def get_all_entries(self) -> list[dict[str, Any]]:
+        """Get all entries in file order.
+        
+        Returns:
+            List of all entries
+        """
+        return self._read_jsonl()
 
     def get_past_executions_for_issue(self, issue_id: str) -> list[dict[str, Any]]:
         """Get past execution history for the same issue/MR.
         
-        Searches all task planning directories (running and completed) for entries
-        matching the given issue_id.
+        Looks up entries matching the given issue_id across all tasks (running and
+        completed) through the planning history index.
         
         Args:
             issue_id: Issue or MR identifier
@@ -197,55 +207,75 @@ class PlanningHistoryStore:
         Returns:
             List of all entries for the issue, in chronological order
         """
-        all_entries = []
-        
-        # Search in both running and completed contexts
-        # Go up from current planning dir: contexts/running/{uuid}/planning -> contexts/running
-        parent = self.directory.parent.parent
-        
-        # Search both running and completed directories
-        for status_dir in [parent / "running", parent / "completed"]:
-            if not status_dir.exists():
-                continue
-                
-            for task_dir in status_dir.iterdir():
-                if not task_dir.is_dir():
-                    continue
-                    
-                planning_dir = task_dir / "planning"
-                if not planning_dir.exists():
-                    continue
-                
-                # Search all JSONL files in this planning directory
-                for jsonl_file in planning_dir.glob("*.jsonl"):
-                    try:
-                        with jsonl_file.open("r", encoding="utf-8") as f:
-                            for line in f:
-                                if line.strip():
-                                    entry = json.loads(line)
-                                    if entry.get("issue_id") == issue_id:
-                                        all_entries.append(entry)
-                    except (json.JSONDecodeError, IOError) as e:
-                        self.logger.warning(f"Error reading {jsonl_file}: {e}")
-                        continue
-        
-        # Sort by timestamp
-        all_entries.sort(key=lambda x: x.get("timestamp", ""))
-        return all_entries
+        if self.index is None:
+            return []
+        try:
+            return self.index.find(issue_id)
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to look up planning history for issue {issue_id}: {e}")
+            return []
 
     def _append_to_file(self, entry: dict[str, Any]) -> None:
-        """Append an entry to the JSONL file.
+        """Append an entry to the JSONL file and record it in the index.
         
         Args:
             entry: Entry dictionary to append
         """
+        line = json.dumps(entry)
         try:
-            with self.filepath.open("a", encoding="utf-8") as f:
-                f.write(json.dumps(entry) + "\n")
+            with self.filepath.open("ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write((line + "\n").encode("utf-8"))
         except IOError as e:
             self.logger.error(f"Failed to write to {self.filepath}: {e}")
             raise
 
+        if self._lines_by_type is not None:
+            self._add_to_cache(entry.get("type"), line)
+
+        if self.index is None or entry.get("issue_id") is None:
+            return
+        try:
+            self.index.add(
+                str(entry["issue_id"]), self.task_uuid, self.filepath.name, offset, entry.get("timestamp", ""),
+            )
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to index planning entry for {self.filepath}: {e}")
+
+    def _get_entries(self, entry_type: str) -> list[dict[str, Any]]:
+        """Get all entries of one type in file order.
+        
+        Args:
+            entry_type: Entry type (e.g. "revision", "reflection")
+            
+        Returns:
+            List of entries of the given type
+        """
+        return [json.loads(line) for line in self._get_lines_by_type().get(entry_type, [])]
+
+    def _get_lines_by_type(self) -> dict[str, list[str]]:
+        """Get entry JSON lines grouped by type, reading the file on first use.
+        
+        Returns:
+            Mapping of entry type to JSON lines in file order
+        """
+        if self._lines_by_type is None:
+            self._lines_by_type = {}
+            for entry in self._read_jsonl():
+                self._add_to_cache(entry.get("type"), json.dumps(entry))
+        return self._lines_by_type
+
+    def _add_to_cache(self, entry_type: str | None, line: str) -> None:
+        """Add an entry's JSON line to the in-memory indexes.
+        
+        Args:
+            entry_type: Entry type
+            line: Entry serialized as JSON
+        """
+        self._lines_by_type.setdefault(entry_type, []).append(line)
+        if entry_type in ("plan", "revision"):
+            self._latest_plan_line = line
+
     def _read_jsonl(self) -> list[dict[str, Any]]:
         """Read all entries from the JSONL file.
         
@@ -2,12 +2,23 @@
 
 タスク実行中に1つの進捗コメントを更新し続けることで、
 Issue/MRのコメント数を削減し、可読性を向上させる。
+
+コメントの更新はバックグラウンドスレッドでまとめて行い、
+LLMの実行ループがGitHub/GitLab APIの応答を待たないようにする。
 """
 
+import hashlib
 import logging
+import threading
+import time
 from datetime import datetime
 from typing import Any
 
+# 進捗コメントを反映する最小間隔のデフォルト値(秒)
+DEFAULT_UPDATE_INTERVAL_SECONDS = 5.0
+# 終了時に更新スレッドの停止を待つ最大時間(秒)
+UPDATER_JOIN_TIMEOUT_SECONDS = 30.0
+
 
 class ProgressCommentManager:
     """タスク実行の進捗コメントを管理するクラス.
@@ -17,6 +28,7 @@ class ProgressCommentManager:
     - 進捗情報の追記・更新
     - フォーマット管理（Markdown形式）
     - コメントIDの管理
+    - コメント更新の集約(一定間隔ごとにまとめて反映し、内容が同じなら更新しない)
     """
 
     # フェーズの順序定義
@@ -48,6 +60,7 @@ class ProgressCommentManager:
         task_uuid: str | None = None,
         enabled: bool = True,
         max_history_entries: int = 100,
+        update_interval_seconds: float = DEFAULT_UPDATE_INTERVAL_SECONDS,
     ) -> None:
         """初期化.
         
@@ -57,12 +70,15 @@ class ProgressCommentManager:
             task_uuid: タスクのUUID（記録・追跡用）
             enabled: 進捗コメント機能の有効/無効
             max_history_entries: 履歴エントリの最大保持数
+            update_interval_seconds: コメントを反映する最小間隔(秒)。
+                0以下の場合は変更のたびに同期的に反映する
         """
         self.task = task
         self.logger = logger
         self.task_uuid = task_uuid
         self.enabled = enabled
         self.max_history_entries = max_history_entries
+        self.update_interval_seconds = update_interval_seconds
 
         # 状態管理
         self.comment_id: int | str | None = None
@@ -83,6 +99,19 @@ class ProgressCommentManager:
         self.completed_phases: set[str] = set()  # 完了したフェーズのセット
         self.active_phase: str | None = None     # 現在アクティブなフェーズ
 
+        # コメント更新の集約用
+        # 状態の変更とコメント内容の生成はこのConditionのロック下で行う
+        self._condition = threading.Condition(threading.RLock())
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        self._flush_requested = False
+        self._closed = False
+        self._last_flush_at = 0.0
+        self._last_content_hash: str | None = None
+        self._updater_thread: threading.Thread | None = None
+        self.update_count = 0
+        self.skipped_update_count = 0
+
     def create_initial_comment(self, task_info: str = "") -> int | str | None:
         """タスク開始時の初期コメントを作成.
         
@@ -95,16 +124,19 @@ class ProgressCommentManager:
         if not self.enabled:
             return None
 
-        self.start_time = datetime.now()
-        self.last_update_time = self.start_time
-        self.current_phase = "Initializing"
-        self.current_status = "started"
+        with self._condition:
+            self.start_time = datetime.now()
+            self.last_update_time = self.start_time
+            self.current_phase = "Initializing"
+            self.current_status = "started"
 
-        # 初期コメント作成
-        content = self._build_comment_content(task_info)
+            # 初期コメント作成
+            content = self._build_comment_content(task_info)
         try:
             result = self.task.comment(content)
             self.comment_id = result.get("id")
+            self._last_content_hash = self._hash_content(content)
+            self._last_flush_at = time.monotonic()
             self.logger.info(f"進捗コメントを作成しました: ID={self.comment_id}")
             return self.comment_id
         except Exception as e:
@@ -132,18 +164,19 @@ class ProgressCommentManager:
             return
 
         # 状態更新
-        if phase:
-            self.current_phase = phase
-        if status:
-            self.current_status = status
-        if action_counter is not None:
-            self.action_counter = action_counter
-        if total_actions is not None:
-            self.total_actions = total_actions
-        if llm_call_count is not None:
-            self.llm_call_count = llm_call_count
-
-        self.last_update_time = datetime.now()
+        with self._condition:
+            if phase:
+                self.current_phase = phase
+            if status:
+                self.current_status = status
+            if action_counter is not None:
+                self.action_counter = action_counter
+            if total_actions is not None:
+                self.total_actions = total_actions
+            if llm_call_count is not None:
+                self.llm_call_count = llm_call_count
+
+            self.last_update_time = datetime.now()
         self._update_comment()
 
     def add_history_entry(
@@ -174,14 +207,15 @@ class ProgressCommentManager:
             "timestamp": timestamp,
         }
 
-        self.history_entries.append(entry)
+        with self._condition:
+            self.history_entries.append(entry)
 
-        # 履歴エントリ数上限チェック
-        if len(self.history_entries) > self.max_history_entries:
-            removed = self.history_entries.pop(0)
-            self.logger.debug(f"履歴エントリが上限を超えたため削除: {removed['title']}")
+            # 履歴エントリ数上限チェック
+            if len(self.history_entries) > self.max_history_entries:
+                removed = self.history_entries.pop(0)
+                self.logger.debug(f"履歴エントリが上限を超えたため削除: {removed['title']}")
 
-        self.last_update_time = datetime.now()
+            self.last_update_time = datetime.now()
         self._update_comment()
 
     def set_llm_comment(self, comment: str | None) -> None:
@@ -197,10 +231,12 @@ class ProgressCommentManager:
             return
 
         # commentがNoneまたは空文字列の場合は以前のコメントを維持
-        if comment:
+        if not comment:
+            return
+
+        with self._condition:
             self.llm_comment = comment
-        
-        self.last_update_time = datetime.now()
+            self.last_update_time = datetime.now()
         self._update_comment()
 
     def set_understanding_result(self, understanding_result: dict[str, Any]) -> None:
@@ -219,8 +255,9 @@ class ProgressCommentManager:
         if not self.enabled or self.comment_id is None:
             return
 
-        self.latest_understanding = understanding_result
-        self.last_update_time = datetime.now()
+        with self._condition:
+            self.latest_understanding = understanding_result
+            self.last_update_time = datetime.now()
         self._update_comment()
 
     def set_verification_result(self, verification_result: dict[str, Any]) -> None:
@@ -240,8 +277,9 @@ class ProgressCommentManager:
         if not self.enabled or self.comment_id is None:
             return
 
-        self.latest_verification = verification_result
-        self.last_update_time = datetime.now()
+        with self._condition:
+            self.latest_verification = verification_result
+            self.last_update_time = datetime.now()
         self._update_comment()
 
     def update_checklist(
@@ -257,8 +295,9 @@ class ProgressCommentManager:
         if not self.enabled or self.comment_id is None:
             return
 
-        self.checklist_items = checklist_items
-        self.last_update_time = datetime.now()
+        with self._condition:
+            self.checklist_items = checklist_items
+            self.last_update_time = datetime.now()
         self._update_comment()
 
     def set_active_phase(self, phase: str) -> None:
@@ -269,10 +308,12 @@ class ProgressCommentManager:
         """
         if not self.enabled or self.comment_id is None:
             return
-        
-        self.active_phase = phase
-        self.last_update_time = datetime.now()
-        self._update_comment()
+
+        with self._condition:
+            self.active_phase = phase
+            self.last_update_time = datetime.now()
+        # フェーズの切り替わりは待機間隔を待たずに反映する
+        self._update_comment(immediate=True)
 
     def mark_phase_completed(self, phase: str) -> None:
         """フェーズを完了としてマーク.
@@ -282,10 +323,11 @@ class ProgressCommentManager:
         """
         if not self.enabled or self.comment_id is None:
             return
-        
-        self.completed_phases.add(phase)
-        self.last_update_time = datetime.now()
-        self._update_comment()
+
+        with self._condition:
+            self.completed_phases.add(phase)
+            self.last_update_time = datetime.now()
+        self._update_comment(immediate=True)
 
     def finalize(
         self,
@@ -301,7 +343,8 @@ class ProgressCommentManager:
         if not self.enabled or self.comment_id is None:
             return
 
-        self.current_status = final_status
+        with self._condition:
+            self.current_status = final_status
         if summary:
             # サマリーを履歴に追加
             self.add_history_entry(
@@ -310,9 +353,13 @@ class ProgressCommentManager:
                 details=summary,
             )
         else:
-            self.last_update_time = datetime.now()
+            with self._condition:
+                self.last_update_time = datetime.now()
             self._update_comment()
 
+        # 未反映の変更を同期的に反映してから更新スレッドを停止する
+        self.close()
+
         self.logger.info(f"タスク終了 - 最終ステータス: {final_status}")
 
     def _build_comment_content(self, task_info: str = "") -> str:
@@ -579,17 +626,103 @@ class ProgressCommentManager:
         footer_text = " | ".join(parts)
         return f"---\n*{footer_text}*"
 
-    def _update_comment(self) -> None:
-        """コメントをIssue/MRに反映.
-        
-        task.update_comment()を呼び出して、進捗コメントを更新する。
+    def flush(self) -> None:
+        """未反映の変更をIssue/MRのコメントに同期的に反映.
+
+        生成したコメント内容が前回反映した内容と同じ場合は更新しない。
         """
         if not self.enabled or self.comment_id is None:
             return
 
-        content = self._build_comment_content()
-        try:
-            self.task.update_comment(self.comment_id, content)
-            self.logger.debug(f"進捗コメントを更新しました: ID={self.comment_id}")
-        except Exception as e:
-            self.logger.error(f"進捗コメントの更新に失敗しました: {e}")
+        with self._flush_lock:
+            with self._condition:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                self._flush_requested = False
+                content = self._build_comment_content()
+            self._last_flush_at = time.monotonic()
+
+            content_hash = self._hash_content(content)
+            if content_hash == self._last_content_hash:
+                self.skipped_update_count += 1
+                return
+
+            try:
+                self.task.update_comment(self.comment_id, content)
+                self._last_content_hash = content_hash
+                self.update_count += 1
+                self.logger.debug(f"進捗コメントを更新しました: ID={self.comment_id}")
+            except Exception as e:
+                self.logger.error(f"進捗コメントの更新に失敗しました: {e}")
+
+    def close(self) -> None:
+        """未反映の変更を反映し、更新スレッドを停止.
+
+        停止後の変更は変更のたびに同期的に反映する。
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        thread = self._updater_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=UPDATER_JOIN_TIMEOUT_SECONDS)
+        self._updater_thread = None
+        self.flush()
+
+    def _update_comment(self, immediate: bool = False) -> None:
+        """コメントの更新を要求.
+
+        変更を未反映として記録し、更新スレッドに通知する。
+        更新スレッドは前回の反映から update_interval_seconds が経過するまで
+        変更を集約してから反映する。
+
+        Args:
+            immediate: Trueの場合は待機間隔を待たずに反映する
+        """
+        if not self.enabled or self.comment_id is None:
+            return
+
+        with self._condition:
+            self._dirty = True
+            if immediate:
+                self._flush_requested = True
+            synchronous = self._closed or self.update_interval_seconds <= 0
+            if not synchronous:
+                self._ensure_updater_started()
+                self._condition.notify_all()
+
+        if synchronous:
+            self.flush()
+
+    def _ensure_updater_started(self) -> None:
+        """更新スレッドが未起動であれば起動（_conditionのロック下で呼び出す）."""
+        if self._updater_thread is not None:
+            return
+        self._updater_thread = threading.Thread(
+            target=self._run_updater,
+            name=f"progress-comment-{self.comment_id}",
+            daemon=True,
+        )
+        self._updater_thread.start()
+
+    def _run_updater(self) -> None:
+        """未反映の変更を一定間隔ごとにまとめて反映する更新スレッドの本体."""
+        while True:
+            with self._condition:
+                while not self._dirty and not self._closed:
+                    self._condition.wait()
+                # 前回の反映から間隔が空くまで待機し、その間の変更をまとめる
+                while not self._closed and not self._flush_requested:
+                    remaining = self._last_flush_at + self.update_interval_seconds - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._closed:
+                    return
+            self.flush()
+
+    @staticmethod
+    def _hash_content(content: str) -> str:
+        """コメント内容のハッシュ値を計算."""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
@@ -3,20 +3,78 @@
 このモジュールは、プロジェクトディレクトリ内に配置されたLLMエージェント向けの
 ルールファイル(AGENTS.md、CLAUDE.md等)を自動的に検出し、読み込む機能を提供します。
 
-MCP経由でファイルアクセスを行います。
+トークンが設定されている場合は、ファイル一覧のキャッシュ(FileListContextLoader)から
+存在するルールファイルを特定してREST APIで並列に取得し、組み立てたルールを
+リポジトリとコミットSHAをキーにメモリへキャッシュします。
+それ以外の場合はMCP経由でファイルアクセスを行います。
 """
 from __future__ import annotations
 
 import base64
 import logging
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING, Any
 
 from mcp import McpError
 
+from handlers.file_list_context_loader import FileListContextLoader
+
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from clients.mcp_tool_client import MCPToolClient
 
+# ルート直下で検索するルールファイル(この順に結合する)
+ROOT_RULE_FILES = ("AGENTS.md", "CLAUDE.md", "AGENT.md")
+# ルールファイルを並列取得する最大スレッド数
+FETCH_MAX_WORKERS = 4
+
+
+class RulesCache:
+    """組み立て済みルールテキストのLRUキャッシュ(合計バイト数で上限を管理)."""
+
+    def __init__(self) -> None:
+        """キャッシュを初期化する."""
+        self._entries: OrderedDict[tuple[Any, ...], str] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[Any, ...]) -> str | None:
+        """キャッシュされたルールテキストを取得する(未キャッシュの場合はNone)."""
+        with self._lock:
+            rules = self._entries.get(key)
+            if rules is not None:
+                self._entries.move_to_end(key)
+            return rules
+
+    def put(self, key: tuple[Any, ...], rules: str, max_bytes: int) -> None:
+        """ルールテキストを保存し、上限を超えた分を古いものから削除する."""
+        size = len(rules.encode("utf-8"))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= len(old.encode("utf-8"))
+            if size > max_bytes:
+                return
+            self._entries[key] = rules
+            self._total_bytes += size
+            while self._total_bytes > max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted.encode("utf-8"))
+
+    def clear(self) -> None:
+        """キャッシュを空にする."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+
+# プロセス内で共有するルールキャッシュ(ローダーはタスクごとに生成されるため)
+_rules_cache = RulesCache()
+
 
 class ProjectAgentRulesLoader:
     """プロジェクト固有エージェントルールローダー.
@@ -33,6 +91,7 @@ class ProjectAgentRulesLoader:
     DEFAULT_MAX_AGENT_FILES = 10
     DEFAULT_MAX_PROMPT_FILES = 50
     DEFAULT_MAX_DEPTH = 10
+    DEFAULT_CACHE_MAX_BYTES = 4 * 1024 * 1024  # 4MB
 
     def __init__(
         self,
@@ -90,7 +149,9 @@ class ProjectAgentRulesLoader:
         self.search_prompt_files = search_config.get("prompt_files", True)
         self.case_insensitive = search_config.get("case_insensitive", True)
 
-
+        # 組み立て済みルールのキャッシュ設定
+        cache_config = rules_config.get("cache", {})
+        self.cache_max_bytes = cache_config.get("max_bytes", self.DEFAULT_CACHE_MAX_BYTES)
 
     def load_rules(self) -> str:
         """ルールファイルを検索して読み込み、結合されたルールテキストを返す.
@@ -110,9 +171,88 @@ class ProjectAgentRulesLoader:
             if not rules_config.get("enabled", True):
                 return ""
 
+        try:
+            rules = self._load_rules_via_tree()
+        except Exception as e:
+            self.logger.warning("REST APIでのルール読み込みに失敗したため、MCPで読み込みます: %s", e)
+            rules = None
+        if rules is not None:
+            return rules
+
         return self._load_rules_via_mcp()
 
+    def _load_rules_via_tree(self) -> str | None:
+        """ファイル一覧から存在するルールファイルを特定し、REST APIで並列に読み込む.
+
+        Returns:
+            結合フォーマットで整形されたルールテキスト。REST APIを使用できない場合はNone
 
+        """
+        file_loader = FileListContextLoader(self.config, mcp_clients={})
+        tree = file_loader.load_repository_tree(
+            owner=self.owner, repo=self.repo, project_id=self.project_id,
+        )
+        if tree is None:
+            return None
+
+        cache_key = (
+            tree.repository, tree.sha, self.search_root_files, self.case_insensitive,
+            self.max_file_size, self.max_total_size,
+        )
+        cached = _rules_cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug("ルールをキャッシュから取得しました: %s@%s", tree.repository, tree.sha[:12])
+            return cached
+
+        # ファイル一覧に存在するものだけを取得するため、存在しないファイルへの問い合わせは発生しない
+        candidates = self._find_root_rule_files(tree.files) if self.search_root_files else []
+        if self.owner and self.repo:
+            github_client = file_loader.get_github_client()
+            if github_client is None:
+                return None
+
+            def fetch(path: str) -> str | None:
+                return github_client.get_file_content(self.owner, self.repo, path, ref=tree.sha)
+        else:
+            gitlab_client = file_loader.get_gitlab_client()
+            if gitlab_client is None:
+                return None
+
+            def fetch(path: str) -> str | None:
+                return gitlab_client.get_file_content(self.project_id, path, ref=tree.sha)
+
+        files_content: list[tuple[str, str]] = []
+        total_size = 0
+        for path, content in zip(candidates, self._fetch_files_concurrently(candidates, fetch)):
+            total_size = self._append_within_limits(files_content, path, content, total_size)
+
+        rules = self._format_rules(files_content)
+        _rules_cache.put(cache_key, rules, self.cache_max_bytes)
+        return rules
+
+    def _find_root_rule_files(self, files: list[str]) -> list[str]:
+        """ファイル一覧からルート直下のルールファイルのパスを検索順に取得する."""
+        root_files = [path for path in files if "/" not in path]
+        found: list[str] = []
+        for filename in ROOT_RULE_FILES:
+            if filename in root_files:
+                found.append(filename)
+            elif self.case_insensitive:
+                match = next((path for path in root_files if path.lower() == filename.lower()), None)
+                if match is not None and match not in found:
+                    found.append(match)
+        return found
+
+    @staticmethod
+    def _fetch_files_concurrently(
+        paths: list[str],
+        fetch: Callable[[str], str | None],
+    ) -> list[str | None]:
+        """ファイル内容を並列に取得する(結果はpathsと同じ順序)."""
+        if len(paths) <= 1:
+            return [fetch(path) for path in paths]
+        with ThreadPoolExecutor(max_workers=min(FETCH_MAX_WORKERS, len(paths))) as executor:
+            return list(executor.map(fetch, paths))
 
     def _load_rules_via_mcp(self) -> str:
         """MCPツール経由でルールを読み込む.
@@ -136,16 +276,27 @@ class ProjectAgentRulesLoader:
         total_size: int,
     ) -> int:
         """MCP経由でルート直下のファイルを読み込む."""
-        for filename in ["AGENTS.md", "CLAUDE.md", "AGENT.md"]:
+        for filename in ROOT_RULE_FILES:
             content = self._get_file_content_via_mcp(filename)
-            if content:
-                content_size = len(content.encode("utf-8"))
-                if (
-                    content_size <= self.max_file_size
-                    and total_size + content_size <= self.max_total_size
-                ):
-                    files_content.append((filename, content))
-                    total_size += content_size
+            total_size = self._append_within_limits(files_content, filename, content, total_size)
+        return total_size
+
+    def _append_within_limits(
+        self,
+        files_content: list[tuple[str, str]],
+        path: str,
+        content: str | None,
+        total_size: int,
+    ) -> int:
+        """サイズ制限内であればファイル内容を追加し、追加後の合計サイズを返す."""
+        if content:
+            content_size = len(content.encode("utf-8"))
+            if (
+                content_size <= self.max_file_size
+                and total_size + content_size <= self.max_total_size
+            ):
+                files_content.append((path, content))
+                total_size += content_size
         return total_size
 
     def _check_file_not_found_error(self, exception: BaseException) -> bool:
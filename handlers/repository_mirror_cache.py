@@ -0,0 +1,143 @@
+"""リポジトリのベアミラーキャッシュモジュール.
+
+実行環境コンテナでのプロジェクトクローンを高速化するため、
+リポジトリごとのベアミラーをホスト側に保持します。
+ミラーはファイルロック下で `git fetch` により更新され、コンテナには
+読み取り専用でマウントされます。コンテナ内ではミラーから
+`git clone --shared` することで、ネットワークを介さずにクローンできます。
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import shutil
+import subprocess
+from pathlib import Path
+
+import portalocker
+
+# ミラー更新(clone/fetch)の最大時間(秒)
+DEFAULT_UPDATE_TIMEOUT_SECONDS = 600
+# 他プロセスによるミラー更新の完了を待つ最大時間(秒)
+DEFAULT_LOCK_TIMEOUT_SECONDS = 900
+# ミラーで保持する参照(プルリクエスト等の参照は取得しない)
+MIRROR_REFSPECS = ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+
+# URL中の認証情報
+_CREDENTIALS_PATTERN = re.compile(r"://[^@/]+@")
+
+
+def strip_credentials(url: str) -> str:
+    """URLから認証情報を除去する."""
+    return _CREDENTIALS_PATTERN.sub("://", url)
+
+
+class RepositoryMirrorCache:
+    """リポジトリごとのベアミラーを管理するクラス.
+
+    ミラーのディレクトリ名は認証情報を除いたURLから決まるため、
+    トークンが異なっても同じリポジトリは同じミラーを共有します。
+    ミラーの設定には認証情報を含むURLを保存しません。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        *,
+        update_timeout: int = DEFAULT_UPDATE_TIMEOUT_SECONDS,
+        lock_timeout: int = DEFAULT_LOCK_TIMEOUT_SECONDS,
+    ) -> None:
+        """ミラーキャッシュを初期化する.
+
+        Args:
+            cache_dir: ミラーを保存するディレクトリ(このプロセスから見たパス)
+            update_timeout: ミラー更新(clone/fetch)の最大時間(秒)
+            lock_timeout: 他プロセスによる更新の完了を待つ最大時間(秒)
+
+        """
+        self.cache_dir = Path(cache_dir)
+        self.update_timeout = update_timeout
+        self.lock_timeout = lock_timeout
+        self.logger = logging.getLogger(__name__)
+
+    def mirror_name(self, clone_url: str) -> str:
+        """クローンURLに対応するミラーのディレクトリ名を取得する."""
+        safe_url = strip_credentials(clone_url).rstrip("/")
+        repo_name = re.sub(r"[^A-Za-z0-9._-]", "_", safe_url.rsplit("/", 1)[-1]).removesuffix(".git")
+        digest = hashlib.sha256(safe_url.encode("utf-8")).hexdigest()[:16]
+        return f"{repo_name}-{digest}.git"
+
+    def update(self, clone_url: str) -> str:
+        """ミラーを作成または最新化し、ミラーのディレクトリ名を返す.
+
+        同じミラーの更新はファイルロックで直列化されます。
+
+        Args:
+            clone_url: 認証情報を含むクローンURL
+
+        Returns:
+            ミラーのディレクトリ名(cache_dirからの相対パス)
+
+        Raises:
+            RuntimeError: ミラーの作成・更新に失敗した場合
+
+        """
+        name = self.mirror_name(clone_url)
+        mirror_path = self.cache_dir / name
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        lock_path = self.cache_dir / f"{name}.lock"
+        try:
+            with portalocker.Lock(str(lock_path), timeout=self.lock_timeout):
+                if (mirror_path / "HEAD").exists():
+                    self._fetch(mirror_path, clone_url)
+                else:
+                    self._create(mirror_path, clone_url)
+        except portalocker.exceptions.LockException as e:
+            error_msg = f"ミラーのロック取得がタイムアウトしました: {name}"
+            raise RuntimeError(error_msg) from e
+        return name
+
+    def _create(self, mirror_path: Path, clone_url: str) -> None:
+        """ミラーを新規作成する."""
+        self.logger.info("リポジトリのミラーを作成します: %s", strip_credentials(clone_url))
+        tmp_path = mirror_path.with_name(mirror_path.name + ".tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        self._run_git(["git", "init", "--bare", "--quiet", str(tmp_path)])
+        # ミラーから--sharedでクローンしたリポジトリが参照するオブジェクトを消さないよう自動GCを無効化
+        self._run_git(["git", "--git-dir", str(tmp_path), "config", "gc.auto", "0"])
+        self._run_git([
+            "git", "--git-dir", str(tmp_path), "remote", "add", "origin", strip_credentials(clone_url),
+        ])
+        self._fetch(tmp_path, clone_url)
+        # 作成途中のミラーが使われないよう、完成してから配置する
+        tmp_path.rename(mirror_path)
+
+    def _fetch(self, mirror_path: Path, clone_url: str) -> None:
+        """ミラーを最新化する(認証情報はコマンドライン引数でのみ渡す)."""
+        self.logger.info("リポジトリのミラーを更新します: %s", strip_credentials(clone_url))
+        self._run_git([
+            "git", "-c", "http.sslVerify=false", "--git-dir", str(mirror_path),
+            "fetch", "--prune", "--quiet", clone_url, *MIRROR_REFSPECS,
+        ])
+        # クローン時のデフォルトブランチがリモートと一致するようにHEADを合わせる
+        result = subprocess.run(
+            ["git", "-c", "http.sslVerify=false", "ls-remote", "--symref", clone_url, "HEAD"],
+            capture_output=True, text=True, timeout=self.update_timeout, check=False,
+        )
+        match = re.search(r"^ref: (refs/heads/\S+)\s+HEAD", result.stdout, re.MULTILINE)
+        if match:
+            self._run_git(["git", "--git-dir", str(mirror_path), "symbolic-ref", "HEAD", match.group(1)])
+
+    def _run_git(self, cmd: list[str]) -> None:
+        """gitコマンドを実行する(エラー出力から認証情報を除去して例外化する)."""
+        try:
+            subprocess.run(cmd, capture_output=True, text=True, timeout=self.update_timeout, check=True)
+        except subprocess.CalledProcessError as e:
+            safe_stderr = strip_credentials(e.stderr or "")
+            error_msg = f"ミラーのgitコマンドに失敗しました: {safe_stderr}"
+            raise RuntimeError(error_msg) from e
+        except subprocess.TimeoutExpired as e:
+            error_msg = "ミラーのgitコマンドがタイムアウトしました"
+            raise RuntimeError(error_msg) from e
@@ -0,0 +1,81 @@
+"""残存コンテナのバックグラウンドクリーンアップモジュール.
+
+ExecutionEnvironmentManager.cleanup_stale_containers と cleanup_stale_checkpoint_images を
+専用のスレッドで定期実行し、コンテナやイメージの一覧取得・削除でProducerの
+タスク取得ループを待たせないようにします。
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from handlers.execution_environment_manager import ExecutionEnvironmentManager
+
+logger = logging.getLogger(__name__)
+
+# クリーンアップスレッドの停止を待つ最大時間(秒)
+CLEANER_JOIN_TIMEOUT_SECONDS = 30.0
+
+
+class StaleContainerCleaner:
+    """残存コンテナとチェックポイントのイメージを定期的に削除するバックグラウンドスレッド.
+
+    起動直後に1回クリーンアップを行い、以降はinterval_secondsごとに実行します。
+    """
+
+    def __init__(self, execution_manager: ExecutionEnvironmentManager, interval_seconds: float) -> None:
+        """クリーンアップスレッドを初期化する.
+
+        Args:
+            execution_manager: 残存コンテナを削除する実行環境マネージャー
+            interval_seconds: クリーンアップの間隔(秒)
+
+        """
+        self.execution_manager = execution_manager
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """クリーンアップスレッドを起動する."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="stale-container-cleaner", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """クリーンアップスレッドを停止する."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=CLEANER_JOIN_TIMEOUT_SECONDS)
+            self._thread = None
+
+    def run_once(self) -> int:
+        """クリーンアップを1回実行する.
+
+        Returns:
+            削除されたコンテナ数(失敗した場合は0)
+
+        """
+        deleted = 0
+        try:
+            deleted = self.execution_manager.cleanup_stale_containers()
+        except Exception:
+            logger.exception("残存コンテナのクリーンアップに失敗")
+        if deleted > 0:
+            logger.info("残存コンテナのクリーンアップ: %d件削除", deleted)
+
+        try:
+            self.execution_manager.cleanup_stale_checkpoint_images()
+        except Exception:
+            logger.exception("チェックポイントのイメージのクリーンアップに失敗")
+        return deleted
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            self.run_once()
+            if self._stop_event.wait(self.interval_seconds):
+                break
@@ -185,3 +185,16 @@ class Task(ABC):
             - updated_at: 更新日時（ISO 8601形式、オプション、str | None）
 
         """
+
+    def get_comment_change_marker(self) -> str | None:
+        """コメントの変更検知用マーカーを取得する.
+
+        Issue/MRの更新日時やコメント数など、全コメントを取得するより軽量な
+        情報から生成した文字列を返します。マーカーが前回と同じ場合、
+        新規コメントはないものとして全コメントの再取得を省略できます。
+
+        Returns:
+            変更検知用マーカー。サポートしない場合はNone
+
+        """
+        return None
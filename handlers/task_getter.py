@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import logging
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, Any, NoReturn
 
 if TYPE_CHECKING:
+    from .task import Task
     from .task_getter_github import TaskGetterFromGitHub
     from .task_getter_gitlab import TaskGetterFromGitLab
 
+logger = logging.getLogger(__name__)
+
 
 class TaskGetter(ABC):
     @abstractmethod
@@ -35,3 +39,26 @@ class TaskGetter(ABC):
         """タスクキーからタスクを生成."""
         msg = "from_task_keyはサブクラスで実装してください"
         raise NotImplementedError(msg)
+
+    def from_task_keys(self, task_key_dicts: list[dict[str, Any]]) -> list[Any]:
+        """複数のタスクキーからタスクを生成.
+
+        まとめて取得できるサブクラスはオーバーライドする。
+        取得に失敗したタスクキーに対応する要素はNoneになる。
+        """
+        tasks = []
+        for task_key_dict in task_key_dicts:
+            try:
+                tasks.append(self.from_task_key(task_key_dict))
+            except Exception:
+                logger.exception("タスクの取得に失敗しました: %s", task_key_dict)
+                tasks.append(None)
+        return tasks
+
+    def is_pending_task(self, task: Task) -> bool:
+        """タスクが未処理の取得対象かどうかを判定する.
+
+        Webhookで受信したタスクを、最新のラベル・状態で再確認するために使用する。
+        """
+        msg = "is_pending_taskはサブクラスで実装してください"
+        raise NotImplementedError(msg)
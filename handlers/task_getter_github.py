@@ -1,17 +1,25 @@
 from __future__ import annotations
 
 import json
+import logging
 from typing import TYPE_CHECKING, Any
 
+import requests
+
 from clients.github_client import GithubClient
 
+from .incremental_polling import IncrementalPollingState
 from .task import Task
 from .task_getter import TaskGetter
 from .task_key import GitHubIssueTaskKey, GitHubPullRequestTaskKey
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from clients.mcp_tool_client import MCPToolClient
 
+logger = logging.getLogger(__name__)
+
 
 class TaskGitHubIssue(Task):
     def __init__(
@@ -29,6 +37,8 @@ class TaskGitHubIssue(Task):
         self.github_client = github_client
         self.config = config
         self.labels = [label.get("name", "") for label in issue.get("labels", [])]
+        # GraphQLで取得済みのコメント(最初のプロンプト生成で1度だけ使用する)
+        self._prefetched_comments = issue.pop("prefetched_comments", None)
 
     def prepare(self) -> None:
         # ラベル付け変更
@@ -58,10 +68,15 @@ class TaskGitHubIssue(Task):
         # ボット自身のユーザー名を取得（GitHub設定から）
         bot_username = self.config.get("github", {}).get("bot_username", "github-actions[bot]")
         
+        raw_comments = self._prefetched_comments
+        self._prefetched_comments = None
+        if raw_comments is None:
+            raw_comments = self.mcp_client.call_tool("get_issue_comments", args)
+
         # 空のbody、ボット自身の投稿を除外
         all_comments = [
             comment.get("body", "")
-            for comment in self.mcp_client.call_tool("get_issue_comments", args)
+            for comment in raw_comments
             if comment.get("body", "").strip()
             and comment.get("user", {}).get("login") != bot_username
         ]
@@ -191,6 +206,12 @@ class TaskGitHubIssue(Task):
         
         return self.get_assignees()
 
+    def get_comment_change_marker(self) -> str | None:
+        """Issueの更新日時とコメント数から変更検知用マーカーを取得する."""
+        return self.github_client.get_comment_change_marker(
+            self.issue["owner"], self.issue["repo"], self.issue["number"],
+        )
+
     def get_comments(self) -> list[dict[str, Any]]:
         """Issueの全コメントを取得する.
 
@@ -240,6 +261,8 @@ class TaskGitHubPullRequest(Task):
             label.get("name", "") if isinstance(label, dict) else label
             for label in pr.get("labels", [])
         ]  # ラベルが辞書型であることを確認
+        # GraphQLで取得済みのコメント(最初のプロンプト生成で1度だけ使用する)
+        self._prefetched_comments = pr.pop("prefetched_comments", None)
 
     def prepare(self) -> None:
         # ラベル付け変更
@@ -255,9 +278,12 @@ class TaskGitHubPullRequest(Task):
         )
 
     def get_prompt(self) -> str:
-        all_comments = self.github_client.get_pull_request_comments(
-            owner=self.pr["owner"], repo=self.pr["repo"], pull_number=self.pr["number"],
-        )
+        all_comments = self._prefetched_comments
+        self._prefetched_comments = None
+        if all_comments is None:
+            all_comments = self.github_client.get_pull_request_comments(
+                owner=self.pr["owner"], repo=self.pr["repo"], pull_number=self.pr["number"],
+            )
         
         # ボット自身のユーザー名を取得（GitHub設定から）
         bot_username = self.config.get("github", {}).get("bot_username", "github-actions[bot]")
@@ -409,6 +435,12 @@ class TaskGitHubPullRequest(Task):
         
         return self.get_assignees()
 
+    def get_comment_change_marker(self) -> str | None:
+        """Pull Requestの更新日時とコメント数から変更検知用マーカーを取得する."""
+        return self.github_client.get_comment_change_marker(
+            self.pr["owner"], self.pr["repo"], self.pr["number"], pull_request=True,
+        )
+
     def get_comments(self) -> list[dict[str, Any]]:
         """Pull Requestの会話コメントを取得する.
 
@@ -473,9 +505,14 @@ class TaskGetterFromGitHub(TaskGetter):
                 "set GITHUB_API_URL environment variable."
             )
         self.github_client = GithubClient(token=token, api_url=api_url)
+        # タスクキーからの取得にGraphQL(1クエリでコメント・レビューまで取得)を使用するか
+        self.use_graphql = github_config.get("use_graphql", True)
 
-    def get_task_list(self) -> list[Task]:
-        # MCPサーバーでissue検索（クローズ済みを除外）
+        # 差分ポーリング状態(ゲッターを使い回す間だけ保持される)
+        self.polling_state = IncrementalPollingState(config)
+
+    def _build_search_query(self, kind: str) -> str:
+        """ラベル・アサイン・更新日時の条件を含む検索クエリを組み立てる."""
         query = (
             f'label:"{self.config["github"]["bot_label"]}" state:open {self.config["github"].get("query", "")}'
         )
@@ -484,21 +521,27 @@ class TaskGetterFromGitHub(TaskGetter):
             query += f" assignee:{assignee}"
         else:
             query += "  author:@me"
-        issues = self.github_client.search_issues(query)
+
+        # 差分ポーリング時は前回以降に更新されたものだけを検索する
+        updated_after = self.polling_state.get_updated_after(kind)
+        if updated_after is not None:
+            query += f" updated:>={IncrementalPollingState.format_timestamp(updated_after)}"
+        return query
+
+    def get_task_list(self) -> list[Task]:
+        self.polling_state.start_poll()
+
+        # MCPサーバーでissue検索（クローズ済みを除外）
+        issues = self.github_client.search_issues(self._build_search_query("issues"))
+        self.polling_state.record("issues", issues)
         tasks = [
             TaskGitHubIssue(issue, self.mcp_client, self.github_client, self.config)
             for issue in issues
         ]
 
         # PRの検索（クローズ済みを除外）
-        query = (
-            f'label:"{self.config["github"]["bot_label"]}" state:open {self.config["github"].get("query", "")}'
-        )
-        if assignee:
-            query += f" assignee:{assignee}"
-        else:
-            query += "  author:@me"
-        prs = self.github_client.search_pull_requests(query)
+        prs = self.github_client.search_pull_requests(self._build_search_query("pull_requests"))
+        self.polling_state.record("pull_requests", prs)
         pr_tasks = [
             TaskGitHubPullRequest(pr, self.mcp_client, self.github_client, self.config)
             for pr in prs
@@ -507,7 +550,79 @@ class TaskGetterFromGitHub(TaskGetter):
 
         return tasks
 
+    def is_pending_task(self, task: Task) -> bool:
+        """タスクが未処理の取得対象(bot_label付与済みでオープン)かどうかを判定する.
+
+        Webhookで受信したタスクを、最新のラベル・状態で再確認するために使用する。
+        """
+        item = task.pr if isinstance(task, TaskGitHubPullRequest) else getattr(task, "issue", {})
+        if item.get("state", "open") != "open":
+            return False
+        if self.config["github"]["bot_label"] not in getattr(task, "labels", []):
+            return False
+        assignee = self.config["github"].get("assignee")
+        return not assignee or assignee in task.get_assignees()
+
+    def from_task_keys(self, task_key_dicts: list[dict[str, Any]]) -> list[Task | None]:
+        """複数のタスクキーからタスクをまとめて生成する.
+
+        GraphQLが有効な場合は、Issue/PRとラベル・アサイン・コメント・レビューを
+        まとめて取得します。GraphQLの取得に失敗した場合や、GraphQLで取得できなかった
+        キーは1件ずつREST APIで取得します。
+        """
+        if not self.use_graphql:
+            return super().from_task_keys(task_key_dicts)
+        return self._from_task_keys_graphql(task_key_dicts, self._from_task_key_rest_safe)
+
     def from_task_key(self, task_key_dict: dict[str, Any]) -> Task | None:
+        """タスクキーからタスクを生成する.
+
+        GraphQLで取得できなかった場合はREST APIで取得し、その取得に失敗した場合は例外を送出します。
+        """
+        ttype = task_key_dict.get("type")
+        if self.use_graphql and ttype in ("github_issue", "github_pull_request"):
+            return self._from_task_keys_graphql([task_key_dict], self._from_task_key_rest)[0]
+        return self._from_task_key_rest(task_key_dict)
+
+    def _from_task_keys_graphql(
+        self,
+        task_key_dicts: list[dict[str, Any]],
+        fallback: Callable[[dict[str, Any]], Task | None],
+    ) -> list[Task | None]:
+        """GraphQLでタスクをまとめて生成し、取得できなかったキーはfallbackで生成する."""
+        keys = [
+            (d.get("owner"), d.get("repo"), d.get("number"))
+            if d.get("type") in ("github_issue", "github_pull_request") else None
+            for d in task_key_dicts
+        ]
+        try:
+            items = self.github_client.get_issues_and_pull_requests([k for k in keys if k is not None])
+        except requests.exceptions.RequestException:
+            logger.warning("GraphQLでのタスク取得に失敗したため、REST APIで取得します", exc_info=True)
+            return [fallback(task_key_dict) for task_key_dict in task_key_dicts]
+
+        tasks: list[Task | None] = []
+        for key, task_key_dict in zip(keys, task_key_dicts, strict=True):
+            item = items.get(key) if key is not None else None
+            if item is None:
+                # GraphQLで取得できなかったキーは部分的なエラーの可能性があるためRESTで再取得する
+                tasks.append(fallback(task_key_dict))
+            elif "pull_request" in item:
+                tasks.append(TaskGitHubPullRequest(item, self.mcp_client, self.github_client, self.config))
+            else:
+                tasks.append(TaskGitHubIssue(item, self.mcp_client, self.github_client, self.config))
+        return tasks
+
+    def _from_task_key_rest_safe(self, task_key_dict: dict[str, Any]) -> Task | None:
+        """REST APIでタスクを取得し、失敗した場合はNoneを返す."""
+        try:
+            return self._from_task_key_rest(task_key_dict)
+        except Exception:
+            logger.exception("タスクの取得に失敗しました: %s", task_key_dict)
+            return None
+
+    def _from_task_key_rest(self, task_key_dict: dict[str, Any]) -> Task | None:
+        """MCP/REST APIでタスクキーからタスクを生成する."""
         ttype = task_key_dict.get("type")
         if ttype == "github_issue":
             task_key = GitHubIssueTaskKey.from_dict(task_key_dict)
@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING, Any
 
 from clients.gitlab_client import GitlabClient
 
+from .incremental_polling import IncrementalPollingState
 from .task import Task
 from .task_getter import TaskGetter
 from .task_key import GitLabIssueTaskKey, GitLabMergeRequestTaskKey
@@ -188,6 +189,10 @@ class TaskGitLabIssue(Task):
         
         return self.get_assignees()
 
+    def get_comment_change_marker(self) -> str | None:
+        """Issueの更新日時とコメント数から変更検知用マーカーを取得する."""
+        return self.gitlab_client.get_comment_change_marker(self.project_id, self.issue_iid)
+
     def get_comments(self) -> list[dict[str, Any]]:
         """Issueの全コメントを取得する.
 
@@ -499,6 +504,12 @@ class TaskGitLabMergeRequest(Task):
         
         return self.get_assignees()
 
+    def get_comment_change_marker(self) -> str | None:
+        """Merge Requestの更新日時とコメント数から変更検知用マーカーを取得する."""
+        return self.gitlab_client.get_comment_change_marker(
+            self.project_id, self.merge_request_iid, merge_request=True,
+        )
+
     def get_comments(self) -> list[dict[str, Any]]:
         """Merge Requestの全コメントを取得する.
 
@@ -578,32 +589,47 @@ class TaskGetterFromGitLab(TaskGetter):
             )
         self.gitlab_client = GitlabClient(token=token, api_url=api_url)
 
+        # 差分ポーリング状態(ゲッターを使い回す間だけ保持される)
+        self.polling_state = IncrementalPollingState(config)
+
+    def _get_updated_after(self, kind: str) -> str | None:
+        """差分ポーリング用のupdated_afterパラメータ値を取得する."""
+        updated_after = self.polling_state.get_updated_after(kind)
+        if updated_after is None:
+            return None
+        return IncrementalPollingState.format_timestamp(updated_after)
+
     def get_task_list(self) -> list[Task]:
         tasks = []
+        self.polling_state.start_poll()
 
         query = self.config["gitlab"].get("query", "")
         assignee = self.config["gitlab"].get("bot_name")
-        # クローズ済みを除外（state='opened'がデフォルトだが明示的に指定）
-        issues = self.gitlab_client.search_issues(query, state="opened")
-        issues = [
-            issue
-            for issue in issues
-            if self.config["gitlab"]["bot_label"] in issue.get("labels")
-            and (issue.get("assignee") or {}).get("username", "") == assignee
-        ]
+        labels = [self.config["gitlab"]["bot_label"]]
+
+        # ラベル・アサインの絞り込みはサーバー側で行う（クローズ済みを除外）
+        issues = self.gitlab_client.list_all_issues(
+            labels=labels,
+            assignee_username=assignee,
+            updated_after=self._get_updated_after("issues"),
+            search=query or None,
+            state="opened",
+        )
+        self.polling_state.record("issues", issues)
         tasks.extend([
             TaskGitLabIssue(issue, self.mcp_client, self.gitlab_client, self.config)
             for issue in issues
         ])
 
         # クローズ済みのMRを除外
-        merge_requests = self.gitlab_client.search_merge_requests(query, state="opened")
-        merge_requests = [
-            mr
-            for mr in merge_requests
-            if self.config["gitlab"]["bot_label"] in mr.get("labels")
-            and (mr.get("assignee") or {}).get("username", "") == assignee
-        ]
+        merge_requests = self.gitlab_client.list_all_merge_requests(
+            labels=labels,
+            assignee_username=assignee,
+            updated_after=self._get_updated_after("merge_requests"),
+            search=query or None,
+            state="opened",
+        )
+        self.polling_state.record("merge_requests", merge_requests)
         tasks.extend([
             TaskGitLabMergeRequest(mr, self.mcp_client, self.gitlab_client, self.config)
             for mr in merge_requests
@@ -611,6 +637,24 @@ class TaskGetterFromGitLab(TaskGetter):
 
         return tasks
 
+    def is_pending_task(self, task: Task) -> bool:
+        """タスクが未処理の取得対象(bot_label付与済み・ボットにアサイン済み)かどうかを判定する.
+
+        Webhookで受信したタスクを、最新のラベル・状態で再確認するために使用する。
+        """
+        if isinstance(task, TaskGitLabMergeRequest):
+            item, labels = task.mr, task.labels
+        elif isinstance(task, TaskGitLabIssue):
+            item, labels = task.issue, task.issue.get("labels", [])
+        else:
+            return False
+        if item.get("state", "opened") != "opened":
+            return False
+        if self.config["gitlab"]["bot_label"] not in labels:
+            return False
+        assignee = self.config["gitlab"].get("bot_name")
+        return not assignee or assignee in task.get_assignees()
+
     def from_task_key(self, task_key_dict: dict[str, Any]) -> Task | None:
         ttype = task_key_dict.get("type")
         if ttype == "gitlab_issue":
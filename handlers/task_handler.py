@@ -5,9 +5,12 @@
 """
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import os
 import re
+from collections import OrderedDict
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
@@ -21,6 +24,24 @@ if TYPE_CHECKING:
 # 定数定義
 MAX_JSON_PARSE_ERRORS = 5
 MAX_CONSECUTIVE_TOOL_ERRORS = 3
+# システムプロンプトキャッシュの最大エントリ数
+SYSTEM_PROMPT_CACHE_MAX_ENTRIES = 32
+# システムプロンプトの組み立てに使うテンプレートファイル
+SYSTEM_PROMPT_TEMPLATE_FILES = (
+    "system_prompt.txt",
+    "system_prompt_function_call.txt",
+    "system_prompt_command_executor.txt",
+    "system_prompt_text_editor.txt",
+)
+# システムプロンプトの内容に影響する設定セクションと環境変数
+SYSTEM_PROMPT_CONFIG_SECTIONS = (
+    "command_executor", "text_editor_mcp", "project_agent_rules", "file_list_context",
+)
+SYSTEM_PROMPT_ENV_VARS = (
+    "PROJECT_AGENT_RULES_ENABLED",
+    "PROJECT_AGENT_RULES_MAX_FILE_SIZE",
+    "PROJECT_AGENT_RULES_MAX_TOTAL_SIZE",
+)
 
 
 class TaskHandler:
@@ -49,6 +70,15 @@ class TaskHandler:
         self.config = config
         self.logger = logging.getLogger(__name__)
 
+        # 組み立て済みシステムプロンプトのキャッシュ
+        # キー: (テンプレートの更新時刻, 現在のMCPクライアントのプロンプトのハッシュ, リポジトリ@コミットSHA, 設定のハッシュ)
+        self._system_prompt_cache: OrderedDict[tuple[Any, ...], str] = OrderedDict()
+        # MCPクライアント名ごとの (クライアント, ツール一覧から生成したプロンプト)
+        # 同じクライアントのツール一覧は再取得しない(クライアントが置き換えられた場合は再生成する)
+        self._mcp_prompts: dict[str, tuple[Any, str]] = {}
+        self.system_prompt_cache_hits = 0
+        self.system_prompt_cache_misses = 0
+
     def sanitize_arguments(self, arguments: str | dict | list) -> dict[str, Any]:
         """引数をサニタイズして辞書形式に変換する.
 
@@ -154,7 +184,7 @@ class TaskHandler:
                 if context_storage_enabled and task.uuid:
                     # Use file-based context storage
                     # Planning/Context Storage/Legacyの全モードでLLMクライアントフックを使用
-                    self._handle_with_context_storage(task, self.config)
+                    self._handle_with_context_storage(task, self.config, execution_manager)
                 else:
                     # Use legacy in-memory handling
                     # Planning/Context Storage/Legacyの全モードでLLMクライアントフックを使用
@@ -283,6 +313,7 @@ class TaskHandler:
         """
         from handlers.execution_environment_manager import ExecutionEnvironmentManager
         from handlers.execution_environment_mcp_wrapper import ExecutionEnvironmentMCPWrapper
+        from pause_resume_manager import PauseResumeManager
 
         try:
             # ExecutionEnvironmentManagerを初期化
@@ -301,6 +332,12 @@ class TaskHandler:
                 )
                 return None
             
+            # 再開したタスクは一時停止時のチェックポイントから実行環境を復元する
+            if getattr(task, "is_resumed", False):
+                manager.set_resume_checkpoint(
+                    PauseResumeManager(task_config).get_execution_checkpoint(task.uuid),
+                )
+
             if not prepare:
                 # 計画フェーズ完了後にコンテナを起動する
                 self.logger.info(
@@ -411,12 +448,18 @@ class TaskHandler:
         except Exception as e:
             self.logger.warning("実行環境のクリーンアップに失敗しました: %s", e)
 
-    def _handle_with_context_storage(self, task: Task, task_config: dict[str, Any]) -> None:
+    def _handle_with_context_storage(
+        self,
+        task: Task,
+        task_config: dict[str, Any],
+        execution_manager: Any | None = None,
+    ) -> None:
         """Handle task with file-based context storage.
 
         Args:
             task: Task object
             task_config: Task configuration
+            execution_manager: Execution environment manager instance
 
         """
         from clients.lm_client import get_llm_client
@@ -585,7 +628,9 @@ class TaskHandler:
                     self._save_comment_detection_state(
                         task.uuid, task_config, comment_detection_manager.get_state()
                     )
-                    pause_manager.pause_task(task, task.uuid, planning_state=None)
+                    pause_manager.pause_task(
+                        task, task.uuid, planning_state=None, execution_manager=execution_manager,
+                    )
                     return  # Exit without calling finish()
                 
                 # Check for assignee removal (task stop)
@@ -715,6 +760,9 @@ class TaskHandler:
             # Pass execution environment manager to coordinator
             # (環境準備・切り替え処理で必要)
             coordinator.execution_manager = execution_manager
+            if execution_manager is not None:
+                # 依存関係インストールの所要時間を診断用にツール履歴へ記録する
+                execution_manager.set_tool_store(context_manager.get_tool_store())
             
             # Execute with planning
             success = coordinator.execute_with_planning()
@@ -1006,6 +1054,11 @@ class TaskHandler:
         プロジェクトファイル一覧がある場合は末尾に追加します。
         Command Executor機能が有効な場合はその説明を追加します。
         
+        テンプレートの更新時刻・現在のMCPクライアントのプロンプト・リポジトリのコミットSHA・
+        設定が同じ場合は、前回組み立てたシステムプロンプトを再利用します。
+        MCPクライアントのプロンプトはクライアントごとに初回の取得結果を使うため
+        (_get_mcp_prompt 参照)、キャッシュキーはクライアントの追加・置き換えで変わります。
+
         Args:
             task_config: タスク固有の設定（Noneの場合はself.configを使用）
             task: タスクオブジェクト（プロジェクトルール取得用）
@@ -1016,7 +1069,43 @@ class TaskHandler:
         """
         if task_config is None:
             task_config = self.config
-            
+
+        cache_key = self._system_prompt_cache_key(task_config, task)
+        if cache_key is not None:
+            cached = self._system_prompt_cache.get(cache_key)
+            if cached is not None:
+                self._system_prompt_cache.move_to_end(cache_key)
+                self.system_prompt_cache_hits += 1
+                self.logger.debug(
+                    "システムプロンプトをキャッシュから取得しました (hit=%d, miss=%d)",
+                    self.system_prompt_cache_hits, self.system_prompt_cache_misses,
+                )
+                return cached
+
+        self.system_prompt_cache_misses += 1
+        prompt = self._build_system_prompt(task_config, task)
+
+        if cache_key is not None:
+            self._system_prompt_cache[cache_key] = prompt
+            while len(self._system_prompt_cache) > SYSTEM_PROMPT_CACHE_MAX_ENTRIES:
+                self._system_prompt_cache.popitem(last=False)
+        return prompt
+
+    def _build_system_prompt(
+        self,
+        task_config: dict[str, Any],
+        task: Task | None = None,
+    ) -> str:
+        """システムプロンプトを組み立てる(キャッシュを使わない).
+
+        Args:
+            task_config: タスク固有の設定
+            task: タスクオブジェクト（プロジェクトルール取得用）
+
+        Returns:
+            生成されたシステムプロンプト文字列
+
+        """
         if task_config.get("llm", {}).get("function_calling", True):
             # function callingが有効な場合
             with Path("system_prompt_function_call.txt").open() as f:
@@ -1026,13 +1115,8 @@ class TaskHandler:
             with Path("system_prompt.txt").open() as f:
                 prompt = f.read()
 
-        # MCPクライアントからシステムプロンプトを取得して結合
-        mcp_prompt = ""
-        for client in self.mcp_clients.values():
-            mcp_prompt += client.system_prompt + "\n"
-
-        # プロンプトテンプレートのプレースホルダーを置換
-        prompt = prompt.replace("{mcp_prompt}", mcp_prompt)
+        # プロンプトテンプレートのプレースホルダーをMCPクライアントのプロンプトで置換
+        prompt = prompt.replace("{mcp_prompt}", self._get_mcp_prompt())
 
         # Command Executor機能が有効な場合、その説明を追加
         command_executor_prompt = self._load_command_executor_prompt(task_config)
@@ -1056,6 +1140,100 @@ class TaskHandler:
 
         return prompt
 
+    def _get_mcp_prompt(self) -> str:
+        """現在のMCPクライアントからシステムプロンプトを取得して結合する.
+
+        ツール一覧の取得にはMCPサーバーの起動を伴うため、クライアントごとに初回の結果を
+        再利用する。クライアントの追加・置き換え(タスクごとの実行環境ラッパーなど)は
+        反映されるが、同じクライアントのMCPサーバー側でツールが変わった場合は、
+        クライアントを作り直すまで反映されない。
+        """
+        mcp_prompt = ""
+        for name, client in self.mcp_clients.items():
+            cached = self._mcp_prompts.get(name)
+            if cached is None or cached[0] is not client:
+                cached = (client, client.system_prompt)
+                self._mcp_prompts[name] = cached
+            mcp_prompt += cached[1] + "\n"
+        return mcp_prompt
+
+    def _system_prompt_cache_key(
+        self,
+        task_config: dict[str, Any],
+        task: Task | None,
+    ) -> tuple[Any, ...] | None:
+        """システムプロンプトキャッシュのキーを生成する.
+
+        Args:
+            task_config: タスク固有の設定
+            task: タスクオブジェクト
+
+        Returns:
+            キャッシュキー。キャッシュが無効な場合や
+            リポジトリのコミットSHAを特定できない場合はNone
+
+        """
+        if not task_config.get("system_prompt_cache", {}).get("enabled", True):
+            return None
+
+        revision = None
+        if task is not None:
+            revision = self._get_repository_revision(task_config, task)
+            if revision is None:
+                # ルール・ファイル一覧が最新か判断できないためキャッシュしない
+                return None
+
+        templates = tuple(
+            (name, path.stat().st_mtime_ns if (path := Path(name)).exists() else None)
+            for name in SYSTEM_PROMPT_TEMPLATE_FILES
+        )
+        flags = {
+            "function_calling": task_config.get("llm", {}).get("function_calling", True),
+            "sections": {name: task_config.get(name) for name in SYSTEM_PROMPT_CONFIG_SECTIONS},
+            "env": {name: os.getenv(name) for name in SYSTEM_PROMPT_ENV_VARS},
+        }
+        flags_hash = hashlib.sha256(
+            json.dumps(flags, sort_keys=True, default=str).encode("utf-8"),
+        ).hexdigest()
+        mcp_prompt_hash = hashlib.sha256(self._get_mcp_prompt().encode("utf-8")).hexdigest()
+        return (templates, mcp_prompt_hash, revision, flags_hash)
+
+    def _get_repository_revision(self, task_config: dict[str, Any], task: Task) -> str | None:
+        """タスクのリポジトリとデフォルトブランチのコミットSHAを表す文字列を取得する.
+
+        Args:
+            task_config: タスク固有の設定
+            task: タスクオブジェクト
+
+        Returns:
+            "リポジトリ@コミットSHA" 形式の文字列。REST APIを使用できない場合はNone
+
+        """
+        from handlers.file_list_context_loader import FileListContextLoader
+
+        task_key = task.get_task_key()
+        owner = getattr(task_key, "owner", None)
+        repo = getattr(task_key, "repo", None)
+        project_id = getattr(task_key, "project_id", None)
+        loader = FileListContextLoader(task_config, mcp_clients={})
+
+        try:
+            if owner and repo:
+                github_client = loader.get_github_client()
+                if github_client is None:
+                    return None
+                sha = github_client.get_commit_sha(owner, repo)
+                return f"github:{github_client.api_url}/{owner}/{repo}@{sha}"
+            if project_id:
+                gitlab_client = loader.get_gitlab_client()
+                if gitlab_client is None:
+                    return None
+                sha = gitlab_client.get_commit_sha(project_id)
+                return f"gitlab:{gitlab_client.api_url}/{project_id}@{sha}"
+        except Exception as e:
+            self.logger.debug("コミットSHAの取得に失敗したため、システムプロンプトをキャッシュしません: %s", e)
+        return None
+
     def _load_command_executor_prompt(
         self,
         task_config: dict[str, Any],
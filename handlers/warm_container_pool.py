@@ -0,0 +1,282 @@
+"""実行環境コンテナのウォームプールモジュール.
+
+環境(イメージ)ごとに起動済みのコンテナを事前に用意しておき、
+ExecutionEnvironmentManager.prepare で払い出すことでコンテナの作成・起動・
+gitのインストールを待たずにタスクを開始できるようにします。
+払い出したコンテナはタスク終了時に通常どおり削除され、
+バックグラウンドの補充スレッドが目標数まで新しいコンテナを作成します。
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+# 補充を再試行するまでの間隔(秒)
+DEFAULT_REFILL_INTERVAL_SECONDS = 30.0
+# 準備時間の統計に保持する件数
+READY_TIME_SAMPLES = 100
+# 補充スレッドの停止を待つ最大時間(秒)
+REFILL_JOIN_TIMEOUT_SECONDS = 10.0
+
+_pool: WarmContainerPool | None = None
+_pool_lock = threading.Lock()
+
+
+@dataclass
+class PooledContainer:
+    """プール内の待機コンテナ.
+
+    Attributes:
+        container_id: DockerコンテナID
+        name: プール用のコンテナ名
+        environment_name: 環境名
+        spec: コンテナ作成条件(イメージ・リソース制限等)の識別子
+        created_at: 作成時刻(time.monotonic)
+
+    """
+
+    container_id: str
+    name: str
+    environment_name: str
+    spec: Hashable
+    created_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class PoolMetrics:
+    """環境ごとのプール利用状況.
+
+    Attributes:
+        hits: プールから払い出した回数
+        misses: プールが空で新規作成した回数
+        ready_seconds: 準備開始から利用可能になるまでの時間(直近の履歴)
+
+    """
+
+    hits: int = 0
+    misses: int = 0
+    ready_seconds: deque[float] = field(default_factory=lambda: deque(maxlen=READY_TIME_SAMPLES))
+
+    def to_dict(self) -> dict[str, Any]:
+        """ログ出力用の辞書に変換する."""
+        total = self.hits + self.misses
+        samples = list(self.ready_seconds)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "avg_ready_seconds": sum(samples) / len(samples) if samples else 0.0,
+        }
+
+
+def get_warm_container_pool() -> WarmContainerPool | None:
+    """プロセスで起動中のウォームプールを取得する(未起動の場合はNone)."""
+    with _pool_lock:
+        return _pool
+
+
+def start_warm_container_pool(
+    creator: Callable[[str], PooledContainer],
+    remover: Callable[[str], None],
+    target_sizes: dict[str, int],
+    refill_interval: float = DEFAULT_REFILL_INTERVAL_SECONDS,
+) -> WarmContainerPool:
+    """プロセスで共有するウォームプールを起動する(起動済みの場合はそれを返す).
+
+    Args:
+        creator: 環境名を受け取り、起動済みの待機コンテナを作成する関数
+        remover: コンテナIDを受け取り、コンテナを削除する関数
+        target_sizes: 環境名ごとの待機コンテナの目標数
+        refill_interval: 補充を再試行するまでの間隔(秒)
+
+    Returns:
+        起動したウォームプール
+
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WarmContainerPool(creator, remover, target_sizes, refill_interval)
+            _pool.start()
+        return _pool
+
+
+def stop_warm_container_pool() -> None:
+    """プロセスで共有するウォームプールを停止し、待機コンテナを削除する."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.stop()
+
+
+class WarmContainerPool:
+    """環境ごとに起動済みコンテナを保持するプール.
+
+    タスクを実行したコンテナは状態が変わっているため再利用せず、
+    払い出した分は補充スレッドが新しいコンテナで補います。
+    """
+
+    def __init__(
+        self,
+        creator: Callable[[str], PooledContainer],
+        remover: Callable[[str], None],
+        target_sizes: dict[str, int],
+        refill_interval: float = DEFAULT_REFILL_INTERVAL_SECONDS,
+    ) -> None:
+        """ウォームプールを初期化する.
+
+        Args:
+            creator: 環境名を受け取り、起動済みの待機コンテナを作成する関数
+            remover: コンテナIDを受け取り、コンテナを削除する関数
+            target_sizes: 環境名ごとの待機コンテナの目標数
+            refill_interval: 補充を再試行するまでの間隔(秒)
+
+        """
+        self._creator = creator
+        self._remover = remover
+        self.target_sizes = {name: size for name, size in target_sizes.items() if size > 0}
+        self.refill_interval = refill_interval
+        self._idle: dict[str, deque[PooledContainer]] = {name: deque() for name in self.target_sizes}
+        self._metrics: dict[str, PoolMetrics] = {}
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """補充スレッドを起動する."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run_refill, name="warm-container-pool", daemon=True)
+        self._thread.start()
+        logger.info("コンテナのウォームプールを開始しました: %s", self.target_sizes)
+
+    def stop(self) -> None:
+        """補充スレッドを停止し、待機コンテナを削除する."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=REFILL_JOIN_TIMEOUT_SECONDS)
+            self._thread = None
+
+        with self._condition:
+            idle = [container for containers in self._idle.values() for container in containers]
+            for containers in self._idle.values():
+                containers.clear()
+        for container in idle:
+            self._remove(container)
+        logger.info("コンテナのウォームプールを停止しました(待機コンテナ%d件を削除)", len(idle))
+
+    def acquire(self, environment_name: str, spec: Hashable) -> PooledContainer | None:
+        """待機コンテナを払い出す.
+
+        作成条件が異なるコンテナ(タスク固有の設定でリソース制限が変わった場合等)は
+        払い出さずにプールに残します。
+
+        Args:
+            environment_name: 環境名
+            spec: 要求するコンテナ作成条件の識別子
+
+        Returns:
+            払い出したコンテナ(条件に合うコンテナがない場合はNone)
+
+        """
+        with self._condition:
+            containers = self._idle.get(environment_name)
+            if not containers:
+                return None
+            for container in containers:
+                if container.spec == spec:
+                    containers.remove(container)
+                    # 払い出した分をすぐに補充する
+                    self._condition.notify_all()
+                    return container
+        return None
+
+    def discard(self, container: PooledContainer) -> None:
+        """払い出したが利用できなかったコンテナを削除する."""
+        self._remove(container)
+
+    def record_ready(self, environment_name: str, seconds: float, *, hit: bool) -> dict[str, Any]:
+        """準備完了までの時間とプールの利用有無を記録する.
+
+        Args:
+            environment_name: 環境名
+            seconds: 準備開始から利用可能になるまでの時間(秒)
+            hit: プールから払い出したかどうか
+
+        Returns:
+            記録後の環境の利用状況
+
+        """
+        with self._condition:
+            metrics = self._metrics.setdefault(environment_name, PoolMetrics())
+            if hit:
+                metrics.hits += 1
+            else:
+                metrics.misses += 1
+            metrics.ready_seconds.append(seconds)
+            return metrics.to_dict()
+
+    def get_metrics(self) -> dict[str, dict[str, Any]]:
+        """環境ごとの利用状況と待機コンテナ数を取得する."""
+        with self._condition:
+            result = {name: metrics.to_dict() for name, metrics in self._metrics.items()}
+            for name, containers in self._idle.items():
+                result.setdefault(name, PoolMetrics().to_dict())["idle"] = len(containers)
+            return result
+
+    def _run_refill(self) -> None:
+        """待機コンテナを目標数まで補充するスレッドの本体."""
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                environment_name = self._next_shortage()
+                if environment_name is None:
+                    self._condition.wait(self.refill_interval)
+                    continue
+
+            try:
+                container = self._creator(environment_name)
+            except Exception:
+                logger.exception("待機コンテナの作成に失敗しました: %s", environment_name)
+                with self._condition:
+                    if not self._stopped:
+                        self._condition.wait(self.refill_interval)
+                continue
+
+            with self._condition:
+                if not self._stopped:
+                    self._idle[environment_name].append(container)
+                    logger.info(
+                        "待機コンテナを作成しました: %s (%s: %d/%d)",
+                        container.name, environment_name,
+                        len(self._idle[environment_name]), self.target_sizes[environment_name],
+                    )
+                    continue
+            # 停止中に作成されたコンテナは残さない
+            self._remove(container)
+
+    def _next_shortage(self) -> str | None:
+        """待機コンテナが目標数に満たない環境を取得する(ロック保持中に呼び出す)."""
+        for environment_name, target in self.target_sizes.items():
+            if len(self._idle[environment_name]) < target:
+                return environment_name
+        return None
+
+    def _remove(self, container: PooledContainer) -> None:
+        try:
+            self._remover(container.container_id)
+        except Exception:
+            logger.exception("待機コンテナの削除に失敗しました: %s", container.name)
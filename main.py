@@ -15,11 +15,12 @@ import time
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import requests
 import yaml
 
+from clients.http_session import log_shared_session_stats
 from clients.lm_client import get_llm_client
 from clients.mcp_tool_client import MCPToolClient
 from filelock_util import FileLock
@@ -27,6 +28,10 @@ from handlers.task_getter import TaskGetter
 from handlers.task_handler import TaskHandler
 from pause_resume_manager import PauseResumeManager
 from queueing import InMemoryTaskQueue, RabbitMQTaskQueue
+from webhook_receiver import WebhookReceiver
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
 
 
 
@@ -87,6 +92,7 @@ def load_config(config_file: str = "config.yaml") -> dict[str, Any]:
     _override_llm_config(config)
     _override_feature_flags(config)
     _override_executor_config(config)
+    _override_webhook_config(config)
 
     return config
 
@@ -457,6 +463,10 @@ def _override_executor_config(config: dict[str, Any]) -> None:
         config["command_executor"]["docker"]["resources"] = {}
     if "execution" not in config["command_executor"]:
         config["command_executor"]["execution"] = {}
+    if "clone" not in config["command_executor"]:
+        config["command_executor"]["clone"] = {}
+    if "mirror_cache" not in config["command_executor"]["clone"]:
+        config["command_executor"]["clone"]["mirror_cache"] = {}
     
     # default_environment
     default_env = os.environ.get("EXECUTOR_DEFAULT_ENVIRONMENT")
@@ -489,6 +499,14 @@ def _override_executor_config(config: dict[str, Any]) -> None:
         except ValueError:
             pass
 
+    # リポジトリミラーキャッシュ
+    mirror_enabled = os.environ.get("REPO_MIRROR_ENABLED")
+    if mirror_enabled:
+        config["command_executor"]["clone"]["mirror_cache"]["enabled"] = mirror_enabled.lower() == "true"
+    mirror_host_dir = os.environ.get("REPO_MIRROR_HOST_DIR")
+    if mirror_host_dir:
+        config["command_executor"]["clone"]["mirror_cache"]["host_dir"] = mirror_host_dir
+
 
 def _override_bot_config(config: dict[str, Any]) -> None:
     """ボット名設定を環境変数で上書きする."""
@@ -505,12 +523,39 @@ def _override_bot_config(config: dict[str, Any]) -> None:
         config["gitlab"]["bot_name"] = gitlab_bot_name
 
 
+def _override_webhook_config(config: dict[str, Any]) -> None:
+    """Webhook受信設定を環境変数で上書きする."""
+    if "webhook" not in config:
+        config["webhook"] = {}
+
+    env_enabled = os.environ.get("WEBHOOK_ENABLED", "").lower()
+    if env_enabled in ("true", "false"):
+        config["webhook"]["enabled"] = env_enabled == "true"
+
+    port = os.environ.get("WEBHOOK_PORT")
+    if port:
+        try:
+            config["webhook"]["port"] = int(port)
+        except ValueError:
+            pass
+
+    github_secret = os.environ.get("GITHUB_WEBHOOK_SECRET")
+    if github_secret:
+        config["webhook"]["github_secret"] = github_secret
+
+    gitlab_secret = os.environ.get("GITLAB_WEBHOOK_SECRET")
+    if gitlab_secret:
+        config["webhook"]["gitlab_secret"] = gitlab_secret
+
+
 def produce_tasks(
     config: dict[str, Any],
     mcp_clients: dict[str, MCPToolClient],
     task_source: str,
     task_queue: RabbitMQTaskQueue | InMemoryTaskQueue,
     logger: logging.Logger,
+    *,
+    task_getter: TaskGetter | None = None,
 ) -> None:
     """タスクを取得してキューに追加する.
 
@@ -524,22 +569,25 @@ def produce_tasks(
         task_source: タスクソース("github" または "gitlab")
         task_queue: タスクキューオブジェクト
         logger: ログ出力用のロガー
+        task_getter: 再利用するタスクゲッター(Noneの場合は新規生成)。
+            継続動作モードでは差分ポーリング状態とETagキャッシュを保持するために使い回す
 
     """
     # タスクゲッターのファクトリーメソッドでインスタンス生成
-    task_getter = TaskGetter.factory(config, mcp_clients, task_source)
+    if task_getter is None:
+        task_getter = TaskGetter.factory(config, mcp_clients, task_source)
 
     # 一時停止タスクの検出と再投入
     pause_manager = PauseResumeManager(config)
     paused_tasks = pause_manager.get_paused_tasks()
 
+    # 一時停止タスクの存在確認はまとめて取得する(GitHubではGraphQLの1クエリ)
+    paused_task_objects = task_getter.from_task_keys([s.get("task_key") or {} for s in paused_tasks])
+
     paused_count = 0
-    for task_state in paused_tasks:
+    for task_state, task in zip(paused_tasks, paused_task_objects):
         # Validate task still exists on GitHub/GitLab
         try:
-            task_dict_temp = task_state["task_key"]
-            task = task_getter.from_task_key(task_dict_temp)
-
             if task is None:
                 logger.warning("一時停止タスクが見つかりません(削除済み): %s", task_state.get("uuid"))
                 continue
@@ -562,26 +610,83 @@ def produce_tasks(
 
     # 各タスクの準備処理を実行してキューに追加
     for task in tasks:
-        task.prepare()  # ラベル付与などの準備処理
-        task_dict = task.get_task_key().to_dict()
-        task_dict["uuid"] = str(uuid.uuid4())  # UUID v4を生成して追加
-        
-        # ユーザー情報を取得
-        user = task.get_user()
-        if user is None:
-            # ボットが作成者でレビュアーも不在の場合はエラーログを出して除外
-            logger.error(
-                "タスクのユーザー情報が取得できません（ボット作成でレビュアー不在）: %s",
-                task_dict
-            )
-            continue
-        
-        task_dict["user"] = user  # ユーザー情報を追加
-        task_queue.put(task_dict)
+        enqueue_task(task, task_queue, logger)
 
     logger.info("%d件のタスクをキューに追加しました", len(tasks))
 
 
+def enqueue_task(
+    task: Any,
+    task_queue: RabbitMQTaskQueue | InMemoryTaskQueue,
+    logger: logging.Logger,
+) -> bool:
+    """タスクの準備処理を実行してキューに追加する.
+
+    Args:
+        task: 追加するタスク
+        task_queue: タスクキューオブジェクト
+        logger: ログ出力用のロガー
+
+    Returns:
+        キューに追加した場合True、ユーザー情報が取得できず除外した場合False
+
+    """
+    task.prepare()  # ラベル付与などの準備処理
+    task_dict = task.get_task_key().to_dict()
+    task_dict["uuid"] = str(uuid.uuid4())  # UUID v4を生成して追加
+
+    # ユーザー情報を取得
+    user = task.get_user()
+    if user is None:
+        # ボットが作成者でレビュアーも不在の場合はエラーログを出して除外
+        logger.error(
+            "タスクのユーザー情報が取得できません（ボット作成でレビュアー不在）: %s",
+            task_dict
+        )
+        return False
+
+    task_dict["user"] = user  # ユーザー情報を追加
+    task_queue.put(task_dict)
+    return True
+
+
+def produce_webhook_tasks(
+    task_keys: list[dict[str, Any]],
+    task_getter: TaskGetter,
+    task_queue: RabbitMQTaskQueue | InMemoryTaskQueue,
+    logger: logging.Logger,
+) -> int:
+    """Webhookで受信したタスクキーをキューに追加する.
+
+    ペイロードの内容は信用せず、最新のタスク情報を取得して
+    bot_label付与済みの未処理タスクであることを確認してから追加します。
+
+    Args:
+        task_keys: Webhookから変換されたタスクキー辞書のリスト
+        task_getter: タスクゲッター
+        task_queue: タスクキューオブジェクト
+        logger: ログ出力用のロガー
+
+    Returns:
+        キューに追加したタスク数
+
+    """
+    added = 0
+    for task_key, task in zip(task_keys, task_getter.from_task_keys(task_keys)):
+        try:
+            if task is None or not task_getter.is_pending_task(task):
+                logger.debug("Webhookのタスク候補は対象外です: %s", task_key)
+                continue
+            if enqueue_task(task, task_queue, logger):
+                added += 1
+        except Exception:
+            logger.exception("Webhookタスクの追加に失敗しました: %s", task_key)
+
+    if added > 0:
+        logger.info("Webhookから%d件のタスクをキューに追加しました", added)
+    return added
+
+
 def consume_tasks(
     task_queue: RabbitMQTaskQueue | InMemoryTaskQueue,
     handler: TaskHandler,
@@ -670,6 +775,8 @@ def wait_with_signal_check(
     wait_seconds: int,
     pause_manager: PauseResumeManager,
     logger: logging.Logger,
+    *,
+    on_tick: Callable[[], None] | None = None,
 ) -> bool:
     """停止シグナルをチェックしながら指定時間待機する.
 
@@ -677,21 +784,24 @@ def wait_with_signal_check(
         wait_seconds: 待機時間(秒)
         pause_manager: PauseResumeManagerインスタンス
         logger: ロガー
+        on_tick: 1秒ごとに呼び出す処理(Webhookで受信したタスクの取り込みなど)
 
     Returns:
         True: 待機完了、False: 停止シグナル検出
 
     """
-    elapsed = 0
-    while elapsed < wait_seconds:
-        # 停止シグナルをチェック
-        if pause_manager.check_pause_signal():
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        remaining = deadline - time.monotonic()
+        if on_tick is not None:
+            on_tick()
+            remaining = min(remaining, 1.0)
+        # シグナル検出時は即座に起床する
+        if pause_manager.wait_for_pause_signal(max(remaining, 0)):
             logger.info("停止シグナルを検出しました")
             return False
-        # 1秒待機
-        time.sleep(1)
-        elapsed += 1
-    return True
+        if time.monotonic() >= deadline:
+            return True
 
 
 def run_producer_continuous(
@@ -715,12 +825,19 @@ def run_producer_continuous(
 
     """
     from handlers.execution_environment_manager import ExecutionEnvironmentManager
+    from handlers.stale_container_cleaner import StaleContainerCleaner
 
     # 継続動作モード設定を取得
     continuous_config = config.get("continuous", {})
     producer_config = continuous_config.get("producer", {})
     interval_minutes = producer_config.get("interval_minutes", 1)
     delay_first_run = producer_config.get("delay_first_run", False)
+
+    # Webhook有効時はポーリングを低頻度の整合性チェックとして扱う
+    webhook_config = config.get("webhook", {})
+    webhook_enabled = webhook_config.get("enabled", False)
+    if webhook_enabled:
+        interval_minutes = webhook_config.get("reconciliation_interval_minutes", 30)
     interval_seconds = interval_minutes * 60
 
     # ヘルスチェック設定
@@ -730,13 +847,14 @@ def run_producer_continuous(
 
     # PauseResumeManager初期化
     pause_manager = PauseResumeManager(config)
+    # 一時停止シグナル(ファイル・SIGTERM/SIGUSR1)のイベント駆動監視を開始
+    pause_manager.start_signal_watcher()
 
     # ExecutionEnvironmentManager初期化（残存コンテナクリーンアップ用）
     execution_manager = ExecutionEnvironmentManager(config)
     cleanup_config = config.get("command_executor", {}).get("cleanup", {})
     cleanup_interval_hours = cleanup_config.get("interval_hours", 24)
     cleanup_interval_seconds = cleanup_interval_hours * 3600
-    last_cleanup = 0.0
 
     logger.info("継続動作モードで起動しました(Producer)")
     logger.info("タスク取得間隔: %d分", interval_minutes)
@@ -751,17 +869,32 @@ def run_producer_continuous(
             logger.info("継続動作モードを終了しました(Producer)")
             return
 
-    # 起動時に残存コンテナをクリーンアップ
+    # 残存コンテナのクリーンアップをバックグラウンドで開始(起動時に1回、以降は定期実行)
+    stale_cleaner: StaleContainerCleaner | None = None
     if execution_manager.is_enabled():
-        try:
-            deleted = execution_manager.cleanup_stale_containers()
-            if deleted > 0:
-                logger.info("起動時の残存コンテナクリーンアップ: %d件削除", deleted)
-        except Exception:
-            logger.exception("起動時の残存コンテナクリーンアップに失敗")
+        stale_cleaner = StaleContainerCleaner(execution_manager, cleanup_interval_seconds)
+        stale_cleaner.start()
 
     lock_path = Path(tempfile.gettempdir()) / "produce_tasks.lock"
 
+    # 差分ポーリング状態を保持するため、タスクゲッターはループ間で使い回す
+    task_getter = TaskGetter.factory(config, mcp_clients, task_source)
+
+    # Webhook受信サーバーを起動する
+    # 受信したタスクは待機中にメインスレッドで取り込み、キューやAPIクライアントを共有しない
+    webhook_receiver: WebhookReceiver | None = None
+    on_tick: Callable[[], None] | None = None
+    if webhook_enabled:
+        webhook_receiver = WebhookReceiver(config, task_source)
+        webhook_receiver.start()
+
+        def _produce_webhook_tasks() -> None:
+            task_keys = webhook_receiver.drain_task_keys()
+            if task_keys:
+                produce_webhook_tasks(task_keys, task_getter, task_queue, logger)
+
+        on_tick = _produce_webhook_tasks
+
     while True:
         loop_count += 1
 
@@ -771,16 +904,6 @@ def run_producer_continuous(
             update_healthcheck_file(healthcheck_dir, "producer")
             last_healthcheck = current_time
 
-        # 残存コンテナの定期クリーンアップ
-        if execution_manager.is_enabled() and current_time - last_cleanup >= cleanup_interval_seconds:
-            try:
-                deleted = execution_manager.cleanup_stale_containers()
-                if deleted > 0:
-                    logger.info("定期クリーンアップ: %d件の残存コンテナを削除", deleted)
-                last_cleanup = current_time
-            except Exception:
-                logger.exception("残存コンテナのクリーンアップに失敗")
-
         # 停止シグナルをチェック
         if pause_manager.check_pause_signal():
             logger.info("停止シグナルを検出しました")
@@ -791,16 +914,25 @@ def run_producer_continuous(
         # タスク取得処理(ファイルロック付き)
         try:
             with FileLock(str(lock_path)):
-                produce_tasks(config, mcp_clients, task_source, task_queue, logger)
+                produce_tasks(
+                    config, mcp_clients, task_source, task_queue, logger, task_getter=task_getter,
+                )
         except Exception:
             logger.exception("タスク取得処理中にエラーが発生しました")
 
+        log_shared_session_stats(logger)
+
         logger.info("次のタスク取得まで%d分待機します", interval_minutes)
 
         # 指定時間待機(シグナルチェック付き)
-        if not wait_with_signal_check(interval_seconds, pause_manager, logger):
+        if not wait_with_signal_check(interval_seconds, pause_manager, logger, on_tick=on_tick):
             break
 
+    if webhook_receiver is not None:
+        webhook_receiver.stop()
+    if stale_cleaner is not None:
+        stale_cleaner.stop()
+
     logger.info("継続動作モードを終了しました(Producer)")
 
 
@@ -822,6 +954,8 @@ def run_consumer_continuous(
         task_config: タスク設定情報
 
     """
+    from handlers.execution_environment_manager import ExecutionEnvironmentManager
+
     # 設定を取得
     config = task_config["config"]
     mcp_clients = task_config["mcp_clients"]
@@ -840,6 +974,13 @@ def run_consumer_continuous(
 
     # PauseResumeManager初期化
     pause_manager = PauseResumeManager(config)
+    # 一時停止シグナル(ファイル・SIGTERM/SIGUSR1)のイベント駆動監視を開始
+    pause_manager.start_signal_watcher()
+
+    # 実行環境コンテナのウォームプールを起動(有効な場合)
+    execution_manager = ExecutionEnvironmentManager(config)
+    if execution_manager.start_warm_pool():
+        logger.info("実行環境コンテナのウォームプールを起動しました")
 
     # タスクゲッター初期化
     task_getter = TaskGetter.factory(config, mcp_clients, task_source)
@@ -870,6 +1011,7 @@ def run_consumer_continuous(
             timeout=queue_timeout,
             signal_checker=pause_manager.check_pause_signal,
             poll_interval=1.0,
+            signal_waiter=pause_manager.wait_for_pause_signal,
         )
 
         if task_key_dict is None:
@@ -913,6 +1055,8 @@ def run_consumer_continuous(
         if min_interval > 0:
             time.sleep(min_interval)
 
+    # 待機コンテナを残さないようにウォームプールを停止
+    execution_manager.stop_warm_pool()
     logger.info("継続動作モードを終了しました(Consumer)")
 
 
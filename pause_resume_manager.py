@@ -8,11 +8,15 @@ from __future__ import annotations
 import json
 import logging
 import shutil
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+from pause_signal_watcher import find_running_watcher, get_signal_watcher
+
 if TYPE_CHECKING:
+    from handlers.execution_environment_manager import ExecutionEnvironmentManager
     from handlers.task import Task
     from handlers.task_key import TaskKey
 
@@ -36,6 +40,9 @@ class PauseResumeManager:
         self.signal_file = Path(pause_config.get("signal_file", "contexts/pause_signal"))
         self.check_interval = pause_config.get("check_interval", 1)
         self.paused_task_expiry_days = pause_config.get("paused_task_expiry_days", 30)
+        self.event_driven = pause_config.get("event_driven", True)
+        self.poll_interval_seconds = pause_config.get("poll_interval_seconds", 1.0)
+        self.handle_signals = pause_config.get("handle_signals", True)
         
         # Get directory paths
         context_storage_config = config.get("context_storage", {})
@@ -47,6 +54,18 @@ class PauseResumeManager:
         # Create paused directory if it doesn't exist
         self.paused_dir.mkdir(parents=True, exist_ok=True)
 
+    def start_signal_watcher(self) -> None:
+        """Start the shared event-driven pause signal watcher.
+
+        Once started, check_pause_signal() and wait_for_pause_signal() use the
+        watcher's threading.Event instead of calling stat() on the signal file.
+        Managers created later in the same process share the same watcher.
+        """
+        if not self.enabled or not self.event_driven:
+            return
+        watcher = get_signal_watcher(self.signal_file, poll_interval=self.poll_interval_seconds)
+        watcher.start(handle_signals=self.handle_signals)
+
     def check_pause_signal(self) -> bool:
         """Check if pause signal file exists.
 
@@ -56,17 +75,52 @@ class PauseResumeManager:
         """
         if not self.enabled:
             return False
-        
-        if self.signal_file.exists():
+
+        watcher = find_running_watcher(self.signal_file)
+        detected = watcher.event.is_set() if watcher is not None else self.signal_file.exists()
+        if detected:
             self.logger.info("一時停止シグナルを検出しました: %s", self.signal_file)
             return True
         return False
 
+    def wait_for_pause_signal(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for a pause signal.
+
+        Wakes up as soon as the signal is detected when the watcher is running,
+        otherwise polls the signal file every poll_interval_seconds.
+
+        Args:
+            timeout: Maximum wait time in seconds
+
+        Returns:
+            True if pause signal is detected, False on timeout
+
+        """
+        if not self.enabled:
+            time.sleep(max(timeout, 0))
+            return False
+
+        watcher = find_running_watcher(self.signal_file)
+        if watcher is not None:
+            detected = watcher.wait(max(timeout, 0))
+        else:
+            deadline = time.monotonic() + timeout
+            while not (detected := self.signal_file.exists()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(self.poll_interval_seconds, remaining))
+
+        if detected:
+            self.logger.info("一時停止シグナルを検出しました: %s", self.signal_file)
+        return detected
+
     def pause_task(
         self,
         task: Task,
         task_uuid: str,
         planning_state: dict[str, Any] | None = None,
+        execution_manager: ExecutionEnvironmentManager | None = None,
     ) -> None:
         """Pause a task and save its state.
 
@@ -74,6 +128,8 @@ class PauseResumeManager:
             task: Task object to pause
             task_uuid: Task UUID
             planning_state: Planning state (if Planning mode is enabled)
+            execution_manager: Execution environment manager whose container is
+                checkpointed so that resume can skip clone and dependency install
 
         """
         if not self.enabled:
@@ -97,6 +153,15 @@ class PauseResumeManager:
         # Add planning state if provided
         if planning_state:
             task_state["planning_state"] = planning_state
+
+        # Checkpoint the execution container before it is removed by cleanup
+        if execution_manager is not None:
+            try:
+                checkpoint = execution_manager.checkpoint(task_uuid)
+                if checkpoint:
+                    task_state["execution_checkpoint"] = checkpoint
+            except Exception as e:
+                self.logger.exception("実行環境のチェックポイント保存中にエラー: %s", e)
         
         # Move context directory from running to paused
         running_context_dir = self.running_dir / task_uuid
@@ -240,6 +305,29 @@ class PauseResumeManager:
         
         return paused_tasks
 
+    def get_execution_checkpoint(self, task_uuid: str) -> dict[str, Any] | None:
+        """Get the execution environment checkpoint saved at pause time.
+
+        Args:
+            task_uuid: Task UUID
+
+        Returns:
+            Checkpoint information if available, None otherwise
+
+        """
+        # The context directory is moved to running/ once the task context is restored
+        for context_dir in (self.paused_dir / task_uuid, self.running_dir / task_uuid):
+            task_state_path = context_dir / "task_state.json"
+            if not task_state_path.exists():
+                continue
+            try:
+                with task_state_path.open() as f:
+                    return json.load(f).get("execution_checkpoint")
+            except Exception as e:
+                self.logger.exception("task_state.jsonの読み込みエラー: %s", e)
+                return None
+        return None
+
     def prepare_resume_task_dict(self, task_state: dict[str, Any]) -> dict[str, Any]:
         """Prepare task dictionary for resuming.
 
@@ -0,0 +1,307 @@
+"""一時停止シグナルのイベント駆動監視.
+
+このモジュールは、一時停止シグナルファイルの作成・削除と
+SIGTERM/SIGUSR1の受信を監視し、共有の threading.Event に反映する
+監視スレッドを提供します。Linuxではinotifyでシグナルファイルの
+ディレクトリを監視し、利用できない環境ではstat()のポーリングで代替します。
+待機側は event.wait(timeout) を使うことで、シグナル検出時に即座に起床し、
+待機中にファイルシステムへアクセスしなくなります。
+"""
+from __future__ import annotations
+
+import contextlib
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import signal
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import types
+
+logger = logging.getLogger(__name__)
+
+# inotifyのイベントマスク(linux/inotify.h)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+# inotify_event構造体のヘッダー(wd, mask, cookie, len)
+_INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+_INOTIFY_READ_SIZE = 64 * 1024
+
+# 一時停止として扱うシグナル
+DEFAULT_PAUSE_SIGNALS = ("SIGTERM", "SIGUSR1")
+
+_watchers: dict[Path, PauseSignalWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def get_signal_watcher(signal_file: Path, poll_interval: float = 1.0) -> PauseSignalWatcher:
+    """シグナルファイルごとに共有される監視オブジェクトを取得する.
+
+    同じプロセス内の複数のPauseResumeManagerが同じEventを参照できるように、
+    シグナルファイルの絶対パスごとに1つの監視オブジェクトを共有します。
+
+    Args:
+        signal_file: 一時停止シグナルファイルのパス
+        poll_interval: inotifyが使えない場合のポーリング間隔(秒)
+
+    Returns:
+        監視オブジェクト(未起動の場合もある)
+
+    """
+    key = Path(signal_file).resolve()
+    with _watchers_lock:
+        watcher = _watchers.get(key)
+        if watcher is None:
+            watcher = PauseSignalWatcher(key, poll_interval=poll_interval)
+            _watchers[key] = watcher
+        return watcher
+
+
+def find_running_watcher(signal_file: Path) -> PauseSignalWatcher | None:
+    """起動済みの監視オブジェクトを取得する(未起動の場合はNone)."""
+    with _watchers_lock:
+        watcher = _watchers.get(Path(signal_file).resolve())
+    if watcher is None or not watcher.running:
+        return None
+    return watcher
+
+
+class PauseSignalWatcher:
+    """一時停止シグナルを監視し、threading.Eventに反映するクラス.
+
+    Eventはシグナルファイルが存在する間、またはSIGTERM/SIGUSR1を受信した後に
+    セットされます。シグナルファイルが削除されるとクリアされますが、
+    プロセスシグナルによる停止要求はプロセス終了まで保持されます。
+    """
+
+    def __init__(self, signal_file: Path, poll_interval: float = 1.0) -> None:
+        """監視オブジェクトを初期化する.
+
+        Args:
+            signal_file: 一時停止シグナルファイルのパス
+            poll_interval: inotifyが使えない場合のポーリング間隔(秒)
+
+        """
+        self.signal_file = Path(signal_file)
+        self.poll_interval = poll_interval
+        self.event = threading.Event()
+        self.signal_received: str | None = None
+        self.mode: str | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._wake_fds: tuple[int, int] | None = None
+        self._previous_handlers: dict[int, object] = {}
+
+    @property
+    def running(self) -> bool:
+        """監視スレッドが動作中かどうか."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, *, handle_signals: bool = True) -> None:
+        """監視スレッドを起動する(起動済みの場合は何もしない).
+
+        Args:
+            handle_signals: SIGTERM/SIGUSR1のハンドラーを登録するか
+                (メインスレッドから呼び出された場合のみ登録される)
+
+        """
+        with self._lock:
+            if self.running:
+                return
+            self._stop_event.clear()
+            self.refresh()
+
+            inotify_fd = _open_inotify(self.signal_file.parent)
+            if inotify_fd is not None:
+                self.mode = "inotify"
+                self._wake_fds = os.pipe()
+                target = self._run_inotify
+                args: tuple[int, ...] = (inotify_fd,)
+            else:
+                self.mode = "polling"
+                target = self._run_polling
+                args = ()
+            self._thread = threading.Thread(
+                target=target, args=args, name="pause-signal-watcher", daemon=True,
+            )
+            self._thread.start()
+
+        if handle_signals:
+            self._install_signal_handlers()
+        logger.info("一時停止シグナルの監視を開始しました(%s): %s", self.mode, self.signal_file)
+
+    def stop(self) -> None:
+        """監視スレッドを停止し、登録したシグナルハンドラーを元に戻す."""
+        with self._lock:
+            thread = self._thread
+            self._stop_event.set()
+            if self._wake_fds is not None:
+                with contextlib.suppress(OSError):
+                    os.write(self._wake_fds[1], b"x")
+            if thread is not None:
+                thread.join(timeout=5)
+            if self._wake_fds is not None:
+                for fd in self._wake_fds:
+                    with contextlib.suppress(OSError):
+                        os.close(fd)
+                self._wake_fds = None
+            self._thread = None
+        self._restore_signal_handlers()
+
+    def refresh(self) -> bool:
+        """シグナルファイルの有無をEventに反映する.
+
+        Returns:
+            反映後のEventの状態
+
+        """
+        if self.signal_received is not None or self.signal_file.exists():
+            self.event.set()
+        else:
+            self.event.clear()
+        return self.event.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """一時停止シグナルを待機する.
+
+        Args:
+            timeout: 最大待機時間(秒)。Noneの場合は無期限
+
+        Returns:
+            シグナルを検出した場合True、タイムアウトした場合False
+
+        """
+        return self.event.wait(timeout)
+
+    def _run_inotify(self, inotify_fd: int) -> None:
+        """inotifyのイベントを待ち受ける監視スレッドの本体."""
+        wake_fd = self._wake_fds[0] if self._wake_fds else None
+        name = os.fsencode(self.signal_file.name)
+        try:
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([inotify_fd, wake_fd], [], [])
+                if wake_fd in readable:
+                    return
+                data = os.read(inotify_fd, _INOTIFY_READ_SIZE)
+                relevant, watch_removed = _parse_inotify_events(data, name)
+                if relevant or watch_removed:
+                    self.refresh()
+                if watch_removed:
+                    # 監視対象のディレクトリが削除・移動された場合はポーリングに切り替える
+                    logger.warning("シグナルファイルのディレクトリの監視が外れたため、ポーリングに切り替えます")
+                    self.mode = "polling"
+                    self._run_polling()
+                    return
+        except OSError:
+            logger.exception("inotifyによる監視に失敗したため、ポーリングに切り替えます")
+            self.mode = "polling"
+            self._run_polling()
+        finally:
+            with contextlib.suppress(OSError):
+                os.close(inotify_fd)
+
+    def _run_polling(self) -> None:
+        """シグナルファイルをポーリングする監視スレッドの本体."""
+        while not self._stop_event.wait(self.poll_interval):
+            self.refresh()
+
+    def _install_signal_handlers(self) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            logger.debug("メインスレッド以外のため、シグナルハンドラーは登録しません")
+            return
+        for name in DEFAULT_PAUSE_SIGNALS:
+            signum = getattr(signal, name, None)
+            if signum is None or signum in self._previous_handlers:
+                continue
+            self._previous_handlers[signum] = signal.signal(signum, self._handle_signal)
+
+    def _restore_signal_handlers(self) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for signum, handler in self._previous_handlers.items():
+            signal.signal(signum, handler)
+        self._previous_handlers.clear()
+
+    def _handle_signal(self, signum: int, _frame: types.FrameType | None) -> None:
+        """プロセスシグナルを一時停止要求としてEventに反映する."""
+        self.signal_received = signal.Signals(signum).name
+        self.event.set()
+        logger.info("%sを受信しました。一時停止シグナルとして扱います", self.signal_received)
+
+
+def _open_inotify(directory: Path) -> int | None:
+    """ディレクトリを監視するinotifyのファイルディスクリプタを作成する.
+
+    inotifyが使えない環境やディレクトリが作成できない場合はNoneを返す。
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    libc_name = ctypes.util.find_library("c")
+    try:
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        inotify_init1 = libc.inotify_init1
+        inotify_add_watch = libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+
+    fd = inotify_init1(IN_CLOEXEC)
+    if fd < 0:
+        logger.debug("inotify_init1に失敗しました: errno=%d", ctypes.get_errno())
+        return None
+    wd = inotify_add_watch(fd, os.fsencode(str(directory)), WATCH_MASK)
+    if wd < 0:
+        logger.debug("inotify_add_watchに失敗しました: errno=%d", ctypes.get_errno())
+        os.close(fd)
+        return None
+    return fd
+
+
+def _parse_inotify_events(data: bytes, name: bytes) -> tuple[bool, bool]:
+    """inotifyのイベント列を解析する.
+
+    Args:
+        data: inotifyのファイルディスクリプタから読み取ったバイト列
+        name: シグナルファイルのファイル名
+
+    Returns:
+        (シグナルファイルに関するイベントがあったか, 監視が外れたか)
+
+    """
+    relevant = False
+    watch_removed = False
+    offset = 0
+    while offset + _INOTIFY_EVENT_HEADER.size <= len(data):
+        _, mask, _, length = _INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+        offset += _INOTIFY_EVENT_HEADER.size
+        event_name = data[offset:offset + length].rstrip(b"\0")
+        offset += length
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+            watch_removed = True
+        elif event_name == name:
+            relevant = True
+    return relevant, watch_removed
@@ -53,6 +53,7 @@ class TaskQueue(ABC):
         timeout: float | None = None,
         signal_checker: Callable[[], bool] | None = None,
         poll_interval: float = 1.0,
+        signal_waiter: Callable[[float], bool] | None = None,
     ) -> dict[str, Any] | None:
         """停止シグナルをチェックしながらキューからタスクを取得する.
 
@@ -61,6 +62,8 @@ class TaskQueue(ABC):
             signal_checker: 停止シグナルをチェックするコールバック関数
                            Trueを返した場合は即座にNoneを返す
             poll_interval: シグナルチェック間隔(秒)
+            signal_waiter: 指定秒数だけ停止シグナルを待機するコールバック関数
+                          ポーリング間の待機に使用し、Trueを返した場合は即座にNoneを返す
 
         Returns:
             取得したタスクの辞書。タイムアウトまたは停止シグナル検出時はNone
@@ -120,6 +123,7 @@ class InMemoryTaskQueue(TaskQueue):
         timeout: float | None = None,
         signal_checker: Callable[[], bool] | None = None,
         poll_interval: float = 1.0,
+        signal_waiter: Callable[[float], bool] | None = None,
     ) -> dict[str, Any] | None:
         """停止シグナルをチェックしながらキューからタスクを取得する.
 
@@ -127,6 +131,8 @@ class InMemoryTaskQueue(TaskQueue):
             timeout: タイムアウト時間(秒)。Noneの場合は無期限待機
             signal_checker: 停止シグナルをチェックするコールバック関数
             poll_interval: シグナルチェック間隔(秒)
+            signal_waiter: 指定秒数だけ停止シグナルを待機するコールバック関数
+                          ポーリング間の待機に使用し、Trueを返した場合は即座にNoneを返す
 
         Returns:
             取得したタスクの辞書。タイムアウトまたは停止シグナル検出時はNone
@@ -138,10 +144,9 @@ class InMemoryTaskQueue(TaskQueue):
                 # 停止シグナルをチェック
                 if signal_checker and signal_checker():
                     return None
-                try:
-                    return self.queue.get(timeout=poll_interval)
-                except Empty:
-                    continue
+                task, stopped = self._get_or_wait(poll_interval, signal_waiter)
+                if task is not None or stopped:
+                    return task
         else:
             # タイムアウトが指定されている場合
             elapsed = 0.0
@@ -152,12 +157,36 @@ class InMemoryTaskQueue(TaskQueue):
                 # 残り時間を計算
                 remaining = timeout - elapsed
                 wait_time = min(poll_interval, remaining)
-                try:
-                    return self.queue.get(timeout=wait_time)
-                except Empty:
-                    elapsed += wait_time
+                task, stopped = self._get_or_wait(wait_time, signal_waiter)
+                if task is not None or stopped:
+                    return task
+                elapsed += wait_time
             return None
 
+    def _get_or_wait(
+        self,
+        wait_time: float,
+        signal_waiter: Callable[[float], bool] | None,
+    ) -> tuple[dict[str, Any] | None, bool]:
+        """キューからタスクを取得し、空の場合は次のポーリングまで待機する.
+
+        signal_waiterがない場合はキューのブロッキング取得で待機します。
+        ある場合は停止シグナルを待機し、待機中に追加されたタスクは次のポーリングで取得します。
+
+        Returns:
+            (取得したタスクの辞書またはNone, 待機中に停止シグナルを検出したか) のタプル
+
+        """
+        if signal_waiter is None:
+            try:
+                return self.queue.get(timeout=wait_time), False
+            except Empty:
+                return None, False
+        try:
+            return self.queue.get_nowait(), False
+        except Empty:
+            return None, signal_waiter(wait_time)
+
     def empty(self) -> bool:
         """キューが空かどうかを確認する.
 
@@ -266,6 +295,7 @@ class RabbitMQTaskQueue(TaskQueue):
         timeout: float | None = None,
         signal_checker: Callable[[], bool] | None = None,
         poll_interval: float = 1.0,
+        signal_waiter: Callable[[float], bool] | None = None,
     ) -> dict[str, Any] | None:
         """停止シグナルをチェックしながらキューからタスクを取得する.
 
@@ -273,6 +303,8 @@ class RabbitMQTaskQueue(TaskQueue):
             timeout: タイムアウト時間(秒)。Noneの場合は無期限待機
             signal_checker: 停止シグナルをチェックするコールバック関数
             poll_interval: シグナルチェック間隔(秒)
+            signal_waiter: 指定秒数だけ停止シグナルを待機するコールバック関数
+                          ポーリング間の待機に使用し、Trueを返した場合は即座にNoneを返す
 
         Returns:
             取得したタスクの辞書。タイムアウトまたは停止シグナル検出時はNone
@@ -288,8 +320,9 @@ class RabbitMQTaskQueue(TaskQueue):
                 result = self._get_once()
                 if result is not None:
                     return result
-                # 待機
-                time.sleep(poll_interval)
+                # 待機(シグナル検出時は即座に起床する)
+                if self._wait_for_signal(poll_interval, signal_waiter):
+                    return None
         else:
             # タイムアウトが指定されている場合
             elapsed = 0.0
@@ -304,10 +337,27 @@ class RabbitMQTaskQueue(TaskQueue):
                 # 残り時間を計算
                 remaining = timeout - elapsed
                 wait_time = min(poll_interval, remaining)
-                time.sleep(wait_time)
+                if self._wait_for_signal(wait_time, signal_waiter):
+                    return None
                 elapsed += wait_time
             return None
 
+    @staticmethod
+    def _wait_for_signal(
+        wait_time: float,
+        signal_waiter: Callable[[float], bool] | None,
+    ) -> bool:
+        """次のポーリングまで待機する.
+
+        Returns:
+            待機中に停止シグナルを検出した場合True
+
+        """
+        if signal_waiter is None:
+            time.sleep(wait_time)
+            return False
+        return signal_waiter(wait_time)
+
     def empty(self) -> bool:
         """RabbitMQキューが空かどうかを確認する.
 
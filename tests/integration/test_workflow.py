@@ -321,8 +321,8 @@ class TestGitLabWorkflowIntegration(unittest.TestCase):
 
         # Mock the GitLab client methods to return mock data
         mock_data = self.gitlab_mcp_client.get_mock_data()
-        self.gitlab_client.search_issues.return_value = mock_data["issues"]
-        self.gitlab_client.search_merge_requests.return_value = []
+        self.gitlab_client.list_all_issues.return_value = mock_data["issues"]
+        self.gitlab_client.list_all_merge_requests.return_value = []
 
         # Patch GitLab client creation
         self.gitlab_client_patcher = patch("handlers.task_getter_gitlab.GitlabClient")
@@ -69,6 +69,8 @@ class TestCommentDetectionManager(unittest.TestCase):
             "context_storage": {
                 "base_dir": str(self.temp_dir / "contexts"),
             },
+            # 各テストでは経過時間による間引きを無効化する
+            "comment_detection": {"min_check_interval_seconds": 0},
         }
 
     def tearDown(self) -> None:
@@ -371,6 +373,58 @@ class TestCommentDetectionManager(unittest.TestCase):
         self.assertEqual(len(new_comments), 1)
         self.assertEqual(new_comments[0]["id"], 3)
 
+    def test_check_is_rate_limited_by_wall_clock(self) -> None:
+        """Test that checks within the minimum interval skip fetching comments."""
+        from comment_detection_manager import CommentDetectionManager
+
+        config = {**self.config, "comment_detection": {"min_check_interval_seconds": 60}}
+        self.task.get_comments = MagicMock(return_value=[])
+
+        manager = CommentDetectionManager(self.task, config)
+        manager.initialize()
+        self.assertEqual(manager.check_for_new_comments(), [])
+        self.assertEqual(self.task.get_comments.call_count, 1)
+
+        # 間隔が経過した後は再びチェックする
+        manager._last_checked_at -= 61
+        manager.check_for_new_comments()
+        self.assertEqual(self.task.get_comments.call_count, 2)
+
+    def test_unchanged_marker_skips_full_fetch(self) -> None:
+        """Test that an unchanged change marker skips the full comment fetch."""
+        from comment_detection_manager import CommentDetectionManager
+
+        self.task.set_comments([{"id": 1, "author": "user1", "body": "comment 1"}])
+        self.task.get_comment_change_marker = MagicMock(return_value="2024-01-01T00:00:00Z:1")
+        self.task.get_comments = MagicMock(wraps=self.task.get_comments)
+
+        manager = CommentDetectionManager(self.task, self.config)
+        manager.initialize()
+        self.assertEqual(manager.check_for_new_comments(), [])
+        self.assertEqual(self.task.get_comments.call_count, 1)
+        self.assertEqual(manager.skipped_fetch_count, 1)
+
+        # マーカーが変わったら全件取得して新規コメントを検出する
+        self.task.get_comment_change_marker.return_value = "2024-01-02T00:00:00Z:2"
+        self.task.set_comments([
+            {"id": 1, "author": "user1", "body": "comment 1"},
+            {"id": 2, "author": "user2", "body": "comment 2"},
+        ])
+        new_comments = manager.check_for_new_comments()
+        self.assertEqual([c["id"] for c in new_comments], [2])
+        self.assertEqual(manager.get_state()["last_change_marker"], "2024-01-02T00:00:00Z:2")
+
+    def test_marker_error_falls_back_to_full_fetch(self) -> None:
+        """Test that a failure to get the marker falls back to fetching comments."""
+        from comment_detection_manager import CommentDetectionManager
+
+        self.task.get_comment_change_marker = MagicMock(side_effect=RuntimeError("boom"))
+        self.task.get_comments = MagicMock(return_value=[{"id": 1, "author": "user1", "body": "x"}])
+
+        manager = CommentDetectionManager(self.task, self.config)
+        new_comments = manager.check_for_new_comments()
+        self.assertEqual(len(new_comments), 1)
+
 
 class MockGitLabTask:
     """Mock GitLab task for testing."""
@@ -14,6 +14,7 @@ from context_storage.context_inheritance_manager import (
     ContextInheritanceManager,
     InheritanceContext,
     PreviousContext,
+    build_planning_digest,
 )
 from handlers.task_key import GitHubIssueTaskKey
 
@@ -77,6 +78,8 @@ class TestContextInheritanceManager(unittest.TestCase):
         mock_task.status = status
         mock_task.created_at = datetime.now(timezone.utc)
         mock_task.completed_at = completed_at
+        # ダイジェスト導入前のタスク（ファイルから読み込む）
+        mock_task.context_digest = None
 
         # get_task_keyメソッドのモック
         if task_source == "github" and task_type == "issue":
@@ -442,6 +445,51 @@ class TestContextInheritanceManager(unittest.TestCase):
             self.assertEqual(results[0].uuid, "new-uuid")
             self.assertEqual(results[1].uuid, "old-uuid")
 
+    def test_get_inheritance_context_from_digest(self) -> None:
+        """DBのダイジェストがある場合はコンテキストディレクトリを読まないテスト."""
+        self._add_test_task(uuid="test-uuid-digest")
+        self.test_tasks[0].context_digest = MagicMock(
+            final_summary="Digest summary",
+            planning_digest=build_planning_digest([
+                {"type": "plan", "plan": {"goal_understanding": {"goal_summary": "Fix bug"}}},
+                {"type": "reflection", "evaluation": {"success": True, "action_summary": "edit"}},
+            ]),
+            context_metadata={"user": "alice"},
+        )
+        # コンテキストディレクトリは存在しない（アーカイブ済み）
+
+        with patch('db.task_db.TaskDBManager') as mock_db_manager:
+            mock_db_manager.return_value.find_completed_tasks_by_key.return_value = self.test_tasks
+
+            manager = ContextInheritanceManager(self.base_dir, self.config)
+            inheritance = manager.get_inheritance_context(GitHubIssueTaskKey("testowner", "testrepo", 123))
+
+        self.assertIsNotNone(inheritance)
+        self.assertEqual(inheritance.final_summary, "Digest summary")
+        self.assertEqual(inheritance.previous_context.metadata, {"user": "alice"})
+        self.assertEqual(inheritance.planning_summary["previous_plan_summary"]["goal"], "Fix bug")
+        self.assertEqual(inheritance.planning_summary["execution_history"]["successful_actions"], ["edit"])
+
+    def test_build_planning_digest_keeps_summary_fields(self) -> None:
+        """ダイジェストは計画サマリーの作成に必要な項目だけを保持するテスト."""
+        entries = [
+            {"type": "plan", "timestamp": "t", "plan": {
+                "goal_understanding": {"goal_summary": "Goal", "main_objective": "long text"},
+                "task_decomposition": {"subtasks": [{"task_id": "t1", "description": "long text"}]},
+            }},
+            {"type": "replan_decision", "llm_decision": {}},
+            {"type": "verification", "verification_result": {
+                "verification_passed": True, "issues_found": ["i1"], "completion_confidence": 0.9,
+            }},
+        ]
+        manager = ContextInheritanceManager(self.base_dir, {"context_inheritance": {"enabled": False}})
+
+        digest = build_planning_digest(entries)
+
+        self.assertEqual([e["type"] for e in digest], ["plan", "verification"])
+        self.assertEqual(manager._build_planning_summary(digest), manager._build_planning_summary(entries))
+
+
 
 class TestPreviousContext(unittest.TestCase):
     """Test PreviousContext dataclass."""
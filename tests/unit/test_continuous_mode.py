@@ -64,6 +64,21 @@ class TestInMemoryTaskQueueWithSignalCheck:
         # タイムアウトより早く終了している
         assert elapsed < 1.0
 
+    def test_get_with_signal_check_waits_on_signal_waiter(self) -> None:
+        """signal_waiterがある場合はポーリング間にシグナルを待機し、検出時はNoneを返す."""
+        queue = InMemoryTaskQueue()
+        signal_waiter = MagicMock(side_effect=[False, True])
+
+        result = queue.get_with_signal_check(timeout=10.0, poll_interval=0.1, signal_waiter=signal_waiter)
+
+        assert result is None
+        assert signal_waiter.call_count == 2
+        signal_waiter.assert_called_with(0.1)
+
+        queue.put({"task": "ready"})
+        assert queue.get_with_signal_check(timeout=10.0, signal_waiter=signal_waiter) == {"task": "ready"}
+        assert signal_waiter.call_count == 2
+
     def test_get_with_signal_check_no_timeout(self) -> None:
         """タイムアウトがNoneの場合、シグナルで停止する."""
         queue = InMemoryTaskQueue()
@@ -0,0 +1,264 @@
+"""Docker Engine APIクライアントのユニットテスト."""
+from __future__ import annotations
+
+import json
+import socketserver
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Any, ClassVar
+from unittest.mock import MagicMock, patch
+from urllib.parse import parse_qs, urlparse
+
+# Mock the mcp module before importing
+sys.modules.setdefault("mcp", MagicMock())
+
+import pytest
+
+from handlers.docker_engine_client import (
+    DockerEngineClient,
+    DockerEngineConnectionLostError,
+    DockerEngineUnavailableError,
+    UnsupportedDockerCommandError,
+    parse_create_args,
+    parse_exec_args,
+)
+from handlers.execution_environment_manager import ExecutionEnvironmentManager
+
+
+def _frame(stream_type: int, data: bytes) -> bytes:
+    return struct.pack(">BxxxL", stream_type, len(data)) + data
+
+
+class _FakeDockerHandler(BaseHTTPRequestHandler):
+    """Docker Engine APIの一部を模倣するハンドラ."""
+
+    protocol_version = "HTTP/1.1"
+    # 受け付けたリクエスト(メソッド, パス, クエリ, ボディ)と、受け付けた接続数
+    requests: ClassVar[list[tuple[str, str, dict[str, list[str]], Any]]] = []
+    connections: ClassVar[int] = 0
+    # execごとの出力フレームと終了コード
+    exec_output: ClassVar[bytes] = b""
+    exec_exit_code: ClassVar[int] = 0
+
+    def setup(self) -> None:
+        super().setup()
+        type(self).connections += 1
+
+    def log_message(self, *_: object) -> None:
+        pass
+
+    def _handle(self) -> None:
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        self.requests.append((self.command, url.path, parse_qs(url.query), body))
+
+        if url.path.startswith("/exec/") and url.path.endswith("/start"):
+            self.send_response(101, "UPGRADED")
+            self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+            self.send_header("Connection", "Upgrade")
+            self.send_header("Upgrade", "tcp")
+            self.end_headers()
+            self.wfile.write(self.exec_output)
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        routes = {
+            ("GET", "/_ping"): (200, "OK"),
+            ("POST", "/containers/create"): (201, {"Id": "new-container-id"}),
+            ("POST", "/containers/cid/exec"): (201, {"Id": "exec-id"}),
+            ("GET", "/exec/exec-id/json"): (200, {"Running": False, "ExitCode": self.exec_exit_code}),
+            ("GET", "/containers/cid/json"): (200, {"Image": "sha256:image"}),
+            ("DELETE", "/containers/cid"): (204, None),
+            ("GET", "/containers/json"): (200, [{
+                "Id": "0123456789abcdef", "Names": ["/coding-agent-exec-task"], "Created": 1704110400,
+                "Labels": {"coding-agent.task-uuid": "task"},
+            }]),
+        }
+        status, payload = routes.get((self.command, url.path), (404, {"message": f"No such container: {url.path}"}))
+        data = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = _handle  # noqa: N815
+
+
+class TestDockerEngineClient:
+    """Unixソケット上の模擬デーモンを使ったDockerEngineClientのテスト."""
+
+    def setup_method(self) -> None:
+        _FakeDockerHandler.requests = []
+        _FakeDockerHandler.connections = 0
+        self._tmp = tempfile.TemporaryDirectory()
+        self.socket_path = str(Path(self._tmp.name) / "docker.sock")
+        self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, _FakeDockerHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = DockerEngineClient(self.socket_path, pool_size=2)
+
+    def teardown_method(self) -> None:
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmp.cleanup()
+
+    def test_requests_reuse_pooled_connection(self) -> None:
+        """通常のAPI呼び出しはkeep-aliveの接続を再利用する."""
+        assert self.client.ping() is True
+        assert self.client.inspect_container("cid")["Image"] == "sha256:image"
+        self.client.remove_container("cid", force=True)
+
+        assert _FakeDockerHandler.connections == 1
+        assert _FakeDockerHandler.requests[-1][2] == {"force": ["1"]}
+
+    def test_exec_run_demultiplexes_streams(self) -> None:
+        """execの出力を標準出力と標準エラー出力に分けて取得する."""
+        _FakeDockerHandler.exec_output = _frame(1, b"out\n") + _frame(2, b"err\n") + _frame(1, b"more\n")
+        _FakeDockerHandler.exec_exit_code = 3
+
+        exit_code, stdout, stderr = self.client.exec_run(parse_exec_args(["-w", "/work", "cid", "make", "test"]))
+
+        assert (exit_code, stdout, stderr) == (3, b"out\nmore\n", b"err\n")
+        create_body = _FakeDockerHandler.requests[0][3]
+        assert create_body["Cmd"] == ["make", "test"]
+        assert create_body["WorkingDir"] == "/work"
+
+    def test_exec_streaming_stops_on_output_limit(self) -> None:
+        """出力量の上限を超えた時点で打ち切る."""
+        _FakeDockerHandler.exec_output = b"".join(_frame(1, b"x" * 1000) for _ in range(20))
+
+        result = self.client.exec_streaming(
+            parse_exec_args(["cid", "yes"]), timeout=30, max_bytes=100, max_total_bytes=5000,
+        )
+
+        assert result.output_limit_exceeded
+        assert result.returncode == -1
+        assert result.stdout.total_bytes <= 6000
+
+    def test_run_cli_command_translates_ps_and_rm(self) -> None:
+        """docker psの--filterを1回のcontainers/jsonの呼び出しに変換する."""
+        returncode, stdout, _ = self.client.run_cli_command([
+            "ps", "-a", "--filter", "name=coding-agent-exec", "--format", "{{.ID}}\t{{.Names}}\t{{.CreatedAt}}",
+        ])
+
+        assert returncode == 0
+        assert stdout == "0123456789ab\tcoding-agent-exec-task\t2024-01-01 12:00:00 +0000 UTC\n"
+        _, path, query, _ = _FakeDockerHandler.requests[-1]
+        assert path == "/containers/json"
+        assert json.loads(query["filters"][0]) == {"name": ["coding-agent-exec"]}
+
+        _, stdout, _ = self.client.run_cli_command([
+            "ps", "-a", "--filter", "label=coding-agent.execution-environment",
+            "--format", '{{.Label "coding-agent.task-uuid"}}\t{{ .Label "missing" }}',
+        ])
+        assert stdout == "task\t\n"
+        _, _, query, _ = _FakeDockerHandler.requests[-1]
+        assert json.loads(query["filters"][0]) == {"label": ["coding-agent.execution-environment"]}
+
+        returncode, _, stderr = self.client.run_cli_command(["rm", "-f", "missing"])
+        assert returncode == 1
+        assert "No such container" in stderr
+
+    def test_exec_connection_lost_after_start_is_not_unavailable(self) -> None:
+        """execの開始後に接続が失われた場合は、CLIで再実行される例外にしない."""
+        _FakeDockerHandler.exec_output = _frame(1, b"out\n")
+
+        with patch.object(
+            self.client, "_exec_exit_code", side_effect=DockerEngineUnavailableError("daemon down"),
+        ), pytest.raises(DockerEngineConnectionLostError):
+            self.client.run_cli_command(["exec", "cid", "git", "push"])
+
+    def test_unavailable_socket_marks_client_unavailable(self) -> None:
+        """接続できない場合は一定時間availableをFalseにする."""
+        client = DockerEngineClient(str(Path(self._tmp.name) / "missing.sock"))
+        assert client.available
+        assert client.ping() is False
+        assert not client.available
+
+
+class TestCliArgumentParsing:
+    """docker CLIの引数の変換のテスト."""
+
+    def test_parse_create_args(self) -> None:
+        """docker createのオプションをコンテナ作成条件に変換する."""
+        name, config = parse_create_args([
+            "--name", "task", "--cpus", "2", "--memory", "4g", "--workdir", "/workspace",
+            "--security-opt", "no-new-privileges", "--network", "net",
+            "-v", "cache:/cache/npm", "-e", "npm_config_cache=/cache/npm", "image:latest",
+        ])
+
+        assert name == "task"
+        assert config["Image"] == "image:latest"
+        assert config["WorkingDir"] == "/workspace"
+        assert config["Env"] == ["npm_config_cache=/cache/npm"]
+        assert config["HostConfig"] == {
+            "NanoCpus": 2_000_000_000,
+            "Memory": 4 * 1024**3,
+            "SecurityOpt": ["no-new-privileges"],
+            "NetworkMode": "net",
+            "Binds": ["cache:/cache/npm"],
+        }
+
+    def test_unsupported_options(self) -> None:
+        """標準入力を使うexecや未対応のオプションは変換しない."""
+        with pytest.raises(UnsupportedDockerCommandError):
+            parse_exec_args(["-i", "cid", "sh"])
+        with pytest.raises(UnsupportedDockerCommandError):
+            parse_create_args(["--name", "task", "--privileged", "image"])
+        # コマンドの引数はオプションとして扱わない
+        assert parse_exec_args(["cid", "ls", "-la"]).cmd == ["ls", "-la"]
+
+
+class TestExecutionEnvironmentManagerEngineApi:
+    """ExecutionEnvironmentManagerのDocker Engine API利用のテスト."""
+
+    def _manager(self, client: MagicMock) -> ExecutionEnvironmentManager:
+        config = {"command_executor": {"enabled": True, "docker": {"engine_api": {"enabled": True}}}}
+        with patch("handlers.execution_environment_manager.get_docker_engine_client", return_value=client):
+            return ExecutionEnvironmentManager(config)
+
+    def test_run_docker_command_uses_api(self) -> None:
+        """APIで実行できるコマンドはdocker CLIを起動しない."""
+        client = MagicMock(available=True)
+        client.run_cli_command.return_value = (1, "", "Error response from daemon: conflict\n")
+        manager = self._manager(client)
+
+        with patch("subprocess.run") as mock_run:
+            result = manager._run_docker_command(["rm", "-f", "cid"], check=False)
+            with pytest.raises(subprocess.CalledProcessError) as exc_info:
+                manager._run_docker_command(["rm", "cid"])
+
+        mock_run.assert_not_called()
+        assert result.returncode == 1
+        assert exc_info.value.stderr == "Error response from daemon: conflict\n"
+
+    def test_run_docker_command_falls_back_to_cli(self) -> None:
+        """APIに変換できない引数の場合はdocker CLIで実行する."""
+        client = MagicMock(available=True)
+        client.run_cli_command.side_effect = UnsupportedDockerCommandError("pull")
+        manager = self._manager(client)
+
+        with patch("subprocess.run") as mock_run:
+            manager._run_docker_command(["pull", "image"])
+
+        assert mock_run.call_args.args[0] == ["docker", "pull", "image"]
+
+    def test_run_docker_command_does_not_rerun_after_connection_lost(self) -> None:
+        """execの開始後に接続が失われた場合はdocker CLIで実行し直さずにエラーにする."""
+        client = MagicMock(available=True)
+        client.run_cli_command.side_effect = DockerEngineConnectionLostError("connection lost")
+        manager = self._manager(client)
+
+        with patch("subprocess.run") as mock_run, pytest.raises(subprocess.SubprocessError):
+            manager._run_docker_command(["exec", "cid", "git", "push"], check=False)
+
+        mock_run.assert_not_called()
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import shutil
+import tempfile
 import unittest
-from unittest.mock import MagicMock
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 from handlers.file_list_context_loader import FileListContextLoader
 
@@ -291,5 +294,85 @@ class TestFileListContextLoader(unittest.TestCase):
         assert result == ""
 
 
+
+class TestFileListContextLoaderTreeApi(unittest.TestCase):
+    """Test fetching file lists through the Git tree APIs."""
+
+    def setUp(self) -> None:
+        """Set up test environment."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.config = {
+            "file_list_context": {"cache_dir": str(self.temp_dir / "cache")},
+            "github": {"personal_access_token": "token", "api_url": "https://api.github.com"},
+            "gitlab": {"personal_access_token": "token", "api_url": "https://gitlab.com/api/v4"},
+        }
+        self.mock_mcp_client = MagicMock()
+
+    def tearDown(self) -> None:
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_github_tree_is_fetched_once_and_cached_by_sha(self) -> None:
+        """Test that the tree is fetched in one call and reused for the same SHA."""
+        loader = FileListContextLoader(config=self.config, mcp_clients={"github": self.mock_mcp_client})
+        tree = {
+            "truncated": False,
+            "tree": [
+                {"path": "README.md", "type": "blob"},
+                {"path": "src", "type": "tree"},
+                {"path": "src/main.py", "type": "blob"},
+            ],
+        }
+
+        with patch("handlers.file_list_context_loader.GithubClient") as mock_client_class:
+            client = mock_client_class.return_value
+            client.api_url = "https://api.github.com"
+            client.get_commit_sha.return_value = "a" * 40
+            client.get_git_tree.return_value = tree
+
+            first = loader._fetch_file_list_from_github("owner", "repo")
+            second = loader._fetch_file_list_from_github("owner", "repo")
+
+        assert first == ["README.md", "src/main.py"]
+        assert second == first
+        client.get_git_tree.assert_called_once_with("owner", "repo", "a" * 40)
+        self.mock_mcp_client.call_tool.assert_not_called()
+
+    def test_github_truncated_tree_falls_back_to_mcp(self) -> None:
+        """Test that a truncated tree falls back to per-directory MCP listing."""
+        loader = FileListContextLoader(config=self.config, mcp_clients={"github": self.mock_mcp_client})
+        self.mock_mcp_client.call_tool.return_value = [{"type": "file", "path": "README.md"}]
+
+        with patch("handlers.file_list_context_loader.GithubClient") as mock_client_class:
+            client = mock_client_class.return_value
+            client.api_url = "https://api.github.com"
+            client.get_commit_sha.return_value = "b" * 40
+            client.get_git_tree.return_value = {"truncated": True, "tree": []}
+
+            result = loader._fetch_file_list_from_github("owner", "repo")
+
+        assert result == ["README.md"]
+        self.mock_mcp_client.call_tool.assert_called_once()
+
+    def test_gitlab_tree_uses_rest_api(self) -> None:
+        """Test that GitLab lists the recursive tree at the default branch commit."""
+        loader = FileListContextLoader(config=self.config, mcp_clients={"gitlab": self.mock_mcp_client})
+
+        with patch("handlers.file_list_context_loader.GitlabClient") as mock_client_class:
+            client = mock_client_class.return_value
+            client.api_url = "https://gitlab.com/api/v4"
+            client.get_commit_sha.return_value = "c" * 40
+            client.list_repository_tree.return_value = [
+                {"path": "lib", "type": "tree"},
+                {"path": "lib/app.rb", "type": "blob"},
+            ]
+
+            result = loader._fetch_file_list_from_gitlab("123")
+
+        assert result == ["lib/app.rb"]
+        client.list_repository_tree.assert_called_once_with("123", ref="c" * 40)
+        self.mock_mcp_client.call_tool.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
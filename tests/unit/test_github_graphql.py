@@ -0,0 +1,322 @@
+"""GitHub GraphQLによるタスク取得のユニットテスト.
+
+Issue/PRとコメント・レビューの一括取得、REST形式への変換、
+タスクゲッターからの利用とフォールバックをテストします。
+"""
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from clients.github_client import GitHubGraphQLError, GithubClient
+from handlers.task_getter_github import (
+    TaskGetterFromGitHub,
+    TaskGitHubIssue,
+    TaskGitHubPullRequest,
+)
+from tests.mocks.mock_mcp_client import MockMCPToolClient
+
+
+def _issue_node(number: int, *, has_more_comments: bool = False) -> dict[str, Any]:
+    return {
+        "__typename": "Issue",
+        "number": number,
+        "title": f"Issue {number}",
+        "body": "body",
+        "state": "OPEN",
+        "author": {"login": "alice"},
+        "labels": {"nodes": [{"name": "coding agent"}]},
+        "assignees": {"nodes": [{"login": "bot"}]},
+        "comments": {
+            "pageInfo": {"hasNextPage": has_more_comments},
+            "nodes": [{
+                "databaseId": 11,
+                "author": {"login": "alice"},
+                "body": "please fix",
+                "createdAt": "2024-01-01T00:00:00Z",
+                "updatedAt": "2024-01-01T00:00:00Z",
+            }],
+        },
+    }
+
+
+def _pull_request_node(number: int) -> dict[str, Any]:
+    return {
+        "__typename": "PullRequest",
+        "number": number,
+        "title": f"PR {number}",
+        "body": "body",
+        "state": "MERGED",
+        "headRefName": "feature",
+        "headRefOid": "abc",
+        "baseRefName": "main",
+        "author": {"login": "bot"},
+        "labels": {"nodes": []},
+        "assignees": {"nodes": []},
+        "reviewRequests": {"nodes": [{"requestedReviewer": {"login": "carol"}}]},
+        "comments": {
+            "pageInfo": {"hasNextPage": False},
+            "nodes": [{
+                "databaseId": 21,
+                "author": {"login": "carol"},
+                "body": "later comment",
+                "createdAt": "2024-01-03T00:00:00Z",
+                "updatedAt": None,
+            }],
+        },
+        "reviews": {
+            "pageInfo": {"hasNextPage": False},
+            "nodes": [{
+                "databaseId": 31,
+                "author": {"login": "carol"},
+                "body": "review",
+                "state": "COMMENTED",
+                "submittedAt": "2024-01-02T00:00:00Z",
+                "comments": {
+                    "pageInfo": {"hasNextPage": False},
+                    "nodes": [{
+                        "databaseId": 41,
+                        "author": {"login": "carol"},
+                        "body": "nit",
+                        "path": "a.py",
+                        "line": 3,
+                        "createdAt": "2024-01-02T00:00:00Z",
+                        "updatedAt": None,
+                    }],
+                },
+            }],
+        },
+    }
+
+
+class TestGithubClientGraphQL:
+    """GithubClientのGraphQL取得のテスト."""
+
+    def test_batch_fetch_converts_to_rest_shape(self) -> None:
+        """1クエリで複数のIssue/PRを取得し、REST形式に変換する."""
+        client = GithubClient(token="token")
+        data = {
+            "item0": {"issueOrPullRequest": _issue_node(1)},
+            "item1": {"issueOrPullRequest": _pull_request_node(2)},
+            "item2": None,
+        }
+
+        with patch.object(client, "graphql", return_value=data) as mock_graphql:
+            items = client.get_issues_and_pull_requests([
+                ("org", "repo", 1), ("org", "repo", 2), ("org", "missing", 3),
+            ])
+
+        assert mock_graphql.call_count == 1
+        assert mock_graphql.call_args[0][1]["number1"] == 2
+
+        issue = items[("org", "repo", 1)]
+        assert issue["state"] == "open"
+        assert issue["labels"] == [{"name": "coding agent"}]
+        assert issue["repository_url"] == "https://api.github.com/repos/org/repo"
+        assert issue["prefetched_comments"][0]["user"]["login"] == "alice"
+
+        pr = items[("org", "repo", 2)]
+        assert pr["state"] == "closed"
+        assert pr["head"]["ref"] == "feature"
+        assert pr["requested_reviewers"] == [{"login": "carol"}]
+        assert [c["type"] for c in pr["prefetched_comments"]] == ["review", "issue_comment"]
+        assert pr["prefetched_comments"][0]["comments"][0]["pull_request_review_id"] == 31
+        assert ("org", "missing", 3) not in items
+
+    def test_incomplete_comments_are_not_prefetched(self) -> None:
+        """1クエリに収まらないコメントは事前取得扱いにしない."""
+        client = GithubClient(token="token")
+        data = {"item0": {"issueOrPullRequest": _issue_node(1, has_more_comments=True)}}
+
+        with patch.object(client, "graphql", return_value=data):
+            items = client.get_issues_and_pull_requests([("org", "repo", 1)])
+
+        assert items[("org", "repo", 1)]["prefetched_comments"] is None
+
+    def test_errors_without_data_raise(self) -> None:
+        """HTTP 200でもerrorsが返りdataがnullの場合は例外にする."""
+        client = GithubClient(token="token")
+        response = MagicMock()
+        response.json.return_value = {
+            "data": None,
+            "errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}],
+        }
+        with patch.object(client.session, "post", return_value=response), pytest.raises(GitHubGraphQLError):
+            client.get_issues_and_pull_requests([("org", "repo", 1)])
+
+    def test_partial_errors_return_data(self) -> None:
+        """dataが返っている部分的なエラーは取得できた分を返す."""
+        client = GithubClient(token="token")
+        response = MagicMock()
+        response.json.return_value = {
+            "data": {"item0": {"issueOrPullRequest": _issue_node(1)}, "item1": None},
+            "errors": [{"type": "NOT_FOUND", "path": ["item1"]}],
+        }
+        with patch.object(client.session, "post", return_value=response):
+            items = client.get_issues_and_pull_requests([("org", "repo", 1), ("org", "missing", 2)])
+
+        assert list(items) == [("org", "repo", 1)]
+
+    def test_graphql_url_for_enterprise(self) -> None:
+        """GitHub EnterpriseのAPI URLからGraphQLのURLを導出する."""
+        client = GithubClient(token="token", api_url="https://ghe.example.com/api/v3")
+        assert client.graphql_url == "https://ghe.example.com/api/graphql"
+        assert GithubClient(token="token").graphql_url == "https://api.github.com/graphql"
+
+
+class TestTaskGetterGraphQL:
+    """TaskGetterFromGitHubのGraphQL利用のテスト."""
+
+    config = {
+        "github": {
+            "owner": "org",
+            "bot_label": "coding agent",
+            "processing_label": "coding agent processing",
+            "personal_access_token": "token",
+            "api_url": "https://api.github.com",
+        },
+    }
+
+    def _make_getter(self) -> tuple[TaskGetterFromGitHub, MagicMock, MagicMock]:
+        mcp_client = MagicMock()
+        with patch("handlers.task_getter_github.GithubClient") as mock_client_class:
+            github_client = mock_client_class.return_value
+            task_getter = TaskGetterFromGitHub(config=self.config, mcp_clients={"github": mcp_client})
+        return task_getter, github_client, mcp_client
+
+    def test_from_task_keys_uses_single_batch(self) -> None:
+        """複数のタスクキーを1回の取得でタスク化し、プロンプト生成でコメントを再取得しない."""
+        task_getter, github_client, mcp_client = self._make_getter()
+        real_client = GithubClient(token="token")
+        data = {
+            "item0": {"issueOrPullRequest": _issue_node(1)},
+            "item1": {"issueOrPullRequest": _pull_request_node(2)},
+        }
+        with patch.object(real_client, "graphql", return_value=data):
+            github_client.get_issues_and_pull_requests.return_value = (
+                real_client.get_issues_and_pull_requests([("org", "repo", 1), ("org", "repo", 2)])
+            )
+
+        tasks = task_getter.from_task_keys([
+            {"type": "github_issue", "owner": "org", "repo": "repo", "number": 1},
+            {"type": "github_pull_request", "owner": "org", "repo": "repo", "number": 2},
+        ])
+
+        assert isinstance(tasks[0], TaskGitHubIssue)
+        assert isinstance(tasks[1], TaskGitHubPullRequest)
+        assert github_client.get_issues_and_pull_requests.call_count == 1
+
+        assert "please fix" in tasks[0].get_prompt()
+        assert "later comment" in tasks[1].get_prompt()
+        mcp_client.call_tool.assert_not_called()
+        github_client.get_pull_request_comments.assert_not_called()
+
+    def test_bot_comments_are_filtered_from_prompt(self) -> None:
+        """GraphQLのBotのloginをREST形式([bot]付き)に変換し、ボット自身のコメントを除外する."""
+        task_getter, github_client, _ = self._make_getter()
+        real_client = GithubClient(token="token")
+        node = _issue_node(1)
+        node["comments"]["nodes"].append({
+            "databaseId": 12,
+            "author": {"__typename": "Bot", "login": "github-actions"},
+            "body": "bot progress report",
+            "createdAt": "2024-01-02T00:00:00Z",
+            "updatedAt": "2024-01-02T00:00:00Z",
+        })
+        with patch.object(real_client, "graphql", return_value={"item0": {"issueOrPullRequest": node}}):
+            github_client.get_issues_and_pull_requests.return_value = (
+                real_client.get_issues_and_pull_requests([("org", "repo", 1)])
+            )
+
+        comments = github_client.get_issues_and_pull_requests.return_value[("org", "repo", 1)]["prefetched_comments"]
+        assert comments[1]["user"]["login"] == "github-actions[bot]"
+
+        task = task_getter.from_task_keys([{"type": "github_issue", "owner": "org", "repo": "repo", "number": 1}])[0]
+        prompt = task.get_prompt()
+        assert "please fix" in prompt
+        assert "bot progress report" not in prompt
+
+    def test_falls_back_to_rest_on_graphql_error(self) -> None:
+        """GraphQLの取得に失敗した場合はREST/MCPで1件ずつ取得する."""
+        task_getter, github_client, _ = self._make_getter()
+        github_client.get_issues_and_pull_requests.side_effect = requests.exceptions.ConnectionError()
+        github_client.get_pull_request.return_value = {
+            "number": 2,
+            "repository_url": "https://api.github.com/repos/org/repo",
+            "labels": [],
+        }
+
+        task = task_getter.from_task_key(
+            {"type": "github_pull_request", "owner": "org", "repo": "repo", "number": 2},
+        )
+
+        assert isinstance(task, TaskGitHubPullRequest)
+        github_client.get_pull_request.assert_called_once_with(owner="org", repo="repo", pull_number=2)
+
+    def test_falls_back_to_rest_on_graphql_errors_with_null_data(self) -> None:
+        """HTTP 200でerrorsとdata: nullが返った場合もREST/MCPで取得する."""
+        task_getter, _, mcp_client = self._make_getter()
+        real_client = GithubClient(token="token")
+        task_getter.github_client = real_client
+        response = MagicMock()
+        response.json.return_value = {"data": None, "errors": [{"type": "FORBIDDEN", "message": "SAML"}]}
+        mcp_client.call_tool.return_value = {
+            "number": 1,
+            "repository_url": "https://api.github.com/repos/org/repo",
+            "labels": [],
+        }
+
+        with patch.object(real_client.session, "post", return_value=response):
+            task = task_getter.from_task_key(
+                {"type": "github_issue", "owner": "org", "repo": "repo", "number": 1},
+            )
+
+        assert isinstance(task, TaskGitHubIssue)
+        mcp_client.call_tool.assert_called_once_with(
+            "get_issue", {"owner": "org", "repo": "repo", "issue_number": 1},
+        )
+
+    def test_keys_missing_from_graphql_are_fetched_via_rest(self) -> None:
+        """GraphQLの結果に含まれなかったキーはRESTで再取得する."""
+        task_getter, github_client, _ = self._make_getter()
+        github_client.get_issues_and_pull_requests.return_value = {}
+        github_client.get_pull_request.return_value = {
+            "number": 2,
+            "repository_url": "https://api.github.com/repos/org/repo",
+            "labels": [],
+        }
+
+        task = task_getter.from_task_key(
+            {"type": "github_pull_request", "owner": "org", "repo": "repo", "number": 2},
+        )
+
+        assert isinstance(task, TaskGitHubPullRequest)
+        github_client.get_pull_request.assert_called_once_with(owner="org", repo="repo", pull_number=2)
+
+    def test_single_key_rest_error_is_raised(self) -> None:
+        """1件の取得でREST APIも失敗した場合は、タスクを破棄させないよう例外を送出する."""
+        task_getter, github_client, _ = self._make_getter()
+        github_client.get_issues_and_pull_requests.return_value = {}
+        github_client.get_pull_request.side_effect = requests.exceptions.ConnectionError()
+        task_key = {"type": "github_pull_request", "owner": "org", "repo": "repo", "number": 2}
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            task_getter.from_task_key(task_key)
+        assert task_getter.from_task_keys([task_key]) == [None]
+
+    def test_graphql_can_be_disabled(self) -> None:
+        """use_graphql: false の場合はMCPで取得する."""
+        config = {"github": {**self.config["github"], "use_graphql": False}}
+        with patch("handlers.task_getter_github.GithubClient") as mock_client_class:
+            github_client = mock_client_class.return_value
+            mcp_client = MockMCPToolClient({"mcp_server_name": "github"})
+            task_getter = TaskGetterFromGitHub(config=config, mcp_clients={"github": mcp_client})
+            task = task_getter.from_task_key(
+                {"type": "github_issue", "owner": "testorg", "repo": "testrepo", "number": 1},
+            )
+
+        assert isinstance(task, TaskGitHubIssue)
+        github_client.get_issues_and_pull_requests.assert_not_called()
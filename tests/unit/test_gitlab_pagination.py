@@ -0,0 +1,103 @@
+"""GitLabクライアントのページング取得のユニットテスト.
+
+X-Total-Pagesによる並列取得、X-Next-Pageによる逐次取得、
+キーセットページネーションをテストします。
+"""
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from clients.gitlab_client import GitlabClient
+
+
+def _make_response(payload: object, headers: dict[str, str] | None = None) -> MagicMock:
+    """requests.Responseのモックを作成する."""
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = payload
+    response.headers = headers or {}
+    return response
+
+
+class TestGitlabPagination:
+    """GitlabClient._fetch_paginated_listのテスト."""
+
+    def test_fetches_remaining_pages_concurrently_in_order(self) -> None:
+        """X-Total-Pagesがある場合は残りのページを取得し、ページ順に連結する."""
+        client = GitlabClient(token="token")
+        pages = {page: [{"id": page * 10 + i} for i in range(2)] for page in range(1, 5)}
+
+        def fake_get(url: str, **kwargs: Any) -> MagicMock:  # noqa: ANN401
+            page = kwargs["params"]["page"]
+            return _make_response(pages[page], {"X-Total-Pages": "4", "X-Next-Page": str(page + 1)})
+
+        with patch.object(client.session, "get", side_effect=fake_get) as mock_get:
+            notes = client.list_issue_notes(project_id=1, issue_iid=2, per_page=2)
+
+        assert [note["id"] for note in notes] == [10, 11, 20, 21, 30, 31, 40, 41]
+        assert mock_get.call_count == 4
+
+    def test_total_pages_is_capped_by_max_pages(self) -> None:
+        """max_pagesを超えるページは取得しない."""
+        client = GitlabClient(token="token")
+
+        def fake_get(url: str, **kwargs: Any) -> MagicMock:  # noqa: ANN401
+            return _make_response([{"id": kwargs["params"]["page"]}], {"X-Total-Pages": "10"})
+
+        with patch.object(client.session, "get", side_effect=fake_get) as mock_get:
+            branches = client.list_branches(project_id=1, per_page=1, max_pages=3)
+
+        assert [branch["id"] for branch in branches] == [1, 2, 3]
+        assert mock_get.call_count == 3
+
+    def test_follows_next_page_without_total_pages(self) -> None:
+        """X-Total-Pagesがない場合はX-Next-Pageを辿り、空の値で終了する."""
+        client = GitlabClient(token="token")
+        responses = [
+            _make_response([{"iid": 1}], {"X-Next-Page": "2"}),
+            _make_response([{"iid": 2}], {"X-Next-Page": ""}),
+        ]
+
+        with patch.object(client.session, "get", side_effect=responses) as mock_get:
+            issues = client.search_issues("query")
+
+        assert [issue["iid"] for issue in issues] == [1, 2]
+        assert mock_get.call_count == 2
+
+    def test_repository_tree_uses_keyset_pagination(self) -> None:
+        """リポジトリツリーはキーセットページネーションでLinkヘッダーのnextを辿る."""
+        client = GitlabClient(token="token")
+        next_url = "https://gitlab.com/api/v4/projects/1/repository/tree?page_token=abc&pagination=keyset"
+        responses = [
+            _make_response([{"path": "a"}], {"Link": f'<{next_url}>; rel="next"'}),
+            _make_response([{"path": "b"}]),
+        ]
+
+        with patch.object(client.session, "get", side_effect=responses) as mock_get:
+            items = client.list_repository_tree(1, ref="main")
+
+        assert [item["path"] for item in items] == ["a", "b"]
+        assert mock_get.call_args_list[0].args[0] == "https://gitlab.com/api/v4/projects/1/repository/tree"
+        assert mock_get.call_args_list[0].kwargs["params"] == {
+            "recursive": True, "ref": "main", "per_page": 100, "pagination": "keyset",
+        }
+        assert mock_get.call_args_list[1].args[0] == next_url
+        assert mock_get.call_args_list[1].kwargs["params"] is None
+
+    def test_repository_tree_fetches_pages_concurrently_with_total_pages(self) -> None:
+        """キーセットページネーション非対応でX-Total-Pagesがある場合は残りのページを並列取得する."""
+        client = GitlabClient(token="token")
+
+        def fake_get(url: str, **kwargs: Any) -> MagicMock:  # noqa: ANN401
+            page = kwargs["params"].get("page", 1)
+            return _make_response([{"path": f"p{page}"}], {"X-Total-Pages": "3"})
+
+        with patch.object(client.session, "get", side_effect=fake_get) as mock_get:
+            items = client.list_repository_tree(1, per_page=1)
+
+        assert [item["path"] for item in items] == ["p1", "p2", "p3"]
+        assert mock_get.call_count == 3
+        later_params = [c.kwargs["params"] for c in mock_get.call_args_list[1:]]
+        assert sorted(p["page"] for p in later_params) == [2, 3]
+        assert all("pagination" not in p for p in later_params)
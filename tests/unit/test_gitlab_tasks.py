@@ -222,6 +222,9 @@ class TestTaskGitLabIssue(BaseTestCase):
 class TestTaskGetterFromGitLab(BaseTestCase):
     """Test TaskGetterFromGitLab functionality."""
 
+    # Test constants
+    TEST_PROJECT_ID = 123
+
     def setUp(self) -> None:
         """Set up test environment."""
         self.config = {
@@ -257,8 +260,8 @@ class TestTaskGetterFromGitLab(BaseTestCase):
             filtered_issues = [
                 issue for issue in test_issues if "coding agent" in issue.get("labels", [])
             ]
-            mock_gitlab_client_instance.search_issues.return_value = filtered_issues
-            mock_gitlab_client_instance.search_merge_requests.return_value = []
+            mock_gitlab_client_instance.list_all_issues.return_value = filtered_issues
+            mock_gitlab_client_instance.list_all_merge_requests.return_value = []
 
             task_getter = TaskGetterFromGitLab(config=self.config, mcp_clients=mcp_clients)
 
@@ -283,8 +286,8 @@ class TestTaskGetterFromGitLab(BaseTestCase):
         with patch("handlers.task_getter_gitlab.GitlabClient") as mock_gitlab_client_class:
             mock_gitlab_client_instance = MagicMock()
             mock_gitlab_client_class.return_value = mock_gitlab_client_instance
-            mock_gitlab_client_instance.search_issues.return_value = []
-            mock_gitlab_client_instance.search_merge_requests.return_value = []
+            mock_gitlab_client_instance.list_all_issues.return_value = []
+            mock_gitlab_client_instance.list_all_merge_requests.return_value = []
 
             task_getter = TaskGetterFromGitLab(config=self.config, mcp_clients=mcp_clients)
 
@@ -309,8 +312,8 @@ class TestTaskGetterFromGitLab(BaseTestCase):
                 if "coding agent" in issue.get("labels", [])
                 and issue.get("assignee", {}).get("username", "") == "testuser"
             ]
-            mock_gitlab_client_instance.search_issues.return_value = filtered_issues
-            mock_gitlab_client_instance.search_merge_requests.return_value = []
+            mock_gitlab_client_instance.list_all_issues.return_value = filtered_issues
+            mock_gitlab_client_instance.list_all_merge_requests.return_value = []
 
             task_getter = TaskGetterFromGitLab(config=self.config, mcp_clients=mcp_clients)
 
@@ -0,0 +1,128 @@
+"""共有HTTPセッションのユニットテスト.
+
+レート制限ヘッダーへの追従、レート制限時のリトライ、
+エンドポイント別レイテンシ統計、セッションの共有をテストします。
+"""
+from __future__ import annotations
+
+import time
+from unittest.mock import MagicMock, patch
+
+from clients.github_client import GithubClient
+from clients.gitlab_client import GitlabClient
+from clients.http_session import (
+    DEFAULT_RATE_PER_SECOND,
+    RateLimitedSession,
+    TokenBucket,
+    get_shared_session,
+    log_shared_session_stats,
+)
+
+
+def _make_response(status_code: int, headers: dict[str, str] | None = None) -> MagicMock:
+    """requests.Responseのモックを作成する."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+class TestRateLimitedSession:
+    """RateLimitedSessionのテスト."""
+
+    def test_retries_after_rate_limit_response(self) -> None:
+        """429応答時はRetry-Afterの間だけ払い出しを止めてリトライする."""
+        session = RateLimitedSession()
+        responses = [_make_response(429, {"Retry-After": "2"}), _make_response(200)]
+
+        with patch.object(session._session, "request", side_effect=responses) as mock_request, \
+                patch.object(session.bucket, "block_for") as mock_block:
+            response = session.get("https://api.github.com/repos/o/r/issues/1")
+
+        assert response.status_code == 200
+        assert mock_request.call_count == 2
+        mock_block.assert_called_once_with(2.0)
+        assert session.rate_limited_count == 1
+
+    def test_forbidden_without_rate_limit_is_not_retried(self) -> None:
+        """レート制限以外の403はそのまま返す."""
+        session = RateLimitedSession()
+        responses = [_make_response(403, {"X-RateLimit-Remaining": "4000"})]
+
+        with patch.object(session._session, "request", side_effect=responses) as mock_request:
+            response = session.get("https://api.github.com/repos/o/r")
+
+        assert response.status_code == 403
+        assert mock_request.call_count == 1
+
+    def test_slows_down_when_remaining_is_low(self) -> None:
+        """残り回数が少ない場合はリセットまで均等に使うレートに下げ、回復したら戻す."""
+        session = RateLimitedSession()
+        reset_at = str(int(time.time()) + 100)
+        low = _make_response(200, {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": reset_at})
+        recovered = _make_response(200, {"RateLimit-Remaining": "1000", "RateLimit-Reset": reset_at})
+
+        with patch.object(session._session, "request", side_effect=[low, recovered]):
+            session.get("https://gitlab.com/api/v4/projects/1")
+            assert 0.09 < session.bucket.rate <= 0.11
+            session.get("https://gitlab.com/api/v4/projects/1")
+
+        assert session.bucket.rate == DEFAULT_RATE_PER_SECOND
+
+    def test_latency_stats_per_endpoint(self) -> None:
+        """数値IDを正規化したエンドポイント単位で統計を記録する."""
+        session = RateLimitedSession()
+        responses = [_make_response(200), _make_response(200), _make_response(502)]
+
+        with patch.object(session._session, "request", side_effect=responses):
+            session.get("https://gitlab.com/api/v4/projects/1/issues/2")
+            session.get("https://gitlab.com/api/v4/projects/3/issues/4?page=2")
+            session.post("https://gitlab.com/api/v4/projects/1/issues/2/notes")
+
+        stats = session.get_latency_stats()
+        assert stats["GET /api/v4/projects/:id/issues/:id"]["count"] == 2
+        assert stats["POST /api/v4/projects/:id/issues/:id/notes"]["errors"] == 1
+
+    def test_log_shared_session_stats(self) -> None:
+        """共有セッションのリクエスト数・レート制限回数・エンドポイント別の統計を出力する."""
+        session = get_shared_session("https://stats.example.com/api/v4", "stats-token")
+        with patch.object(session._session, "request", return_value=_make_response(200)):
+            session.get("https://stats.example.com/api/v4/projects/1/issues")
+        session.rate_limited_count = 2
+        log = MagicMock()
+
+        log_shared_session_stats(log)
+
+        messages = [c.args[0] % c.args[1:] for c in log.info.call_args_list]
+        line = next(m for m in messages if "https://stats.example.com/api/v4" in m)
+        assert "リクエスト数=1" in line
+        assert "レート制限=2回" in line
+        assert "GET /api/v4/projects/:id/issues" in line
+
+
+class TestTokenBucket:
+    """TokenBucketのテスト."""
+
+    def test_waits_when_tokens_are_exhausted(self) -> None:
+        """トークンが尽きると補充されるまで待機する."""
+        bucket = TokenBucket(rate=1.0, capacity=1)
+
+        with patch("clients.http_session.time.sleep") as mock_sleep:
+            assert bucket.acquire() == 0.0
+            bucket.acquire()
+
+        assert mock_sleep.call_count >= 1
+
+
+class TestSharedSession:
+    """セッション共有のテスト."""
+
+    def test_clients_share_session_per_token(self) -> None:
+        """同じAPI URLとトークンのクライアントはセッションを共有する."""
+        first = GithubClient(token="shared-token")  # noqa: S106
+        second = GithubClient(token="shared-token")  # noqa: S106
+        other = GitlabClient(token="shared-token")  # noqa: S106
+
+        assert first.session is second.session
+        assert first.session is get_shared_session("https://api.github.com", "shared-token")
+        assert other.session is not first.session
@@ -0,0 +1,191 @@
+"""差分ポーリングのユニットテスト.
+
+ハイウォーターマークの管理、検索クエリへの反映、
+ETagによる条件付きリクエストをテストします。
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from clients.github_client import GithubClient
+from clients.gitlab_client import GitlabClient
+from handlers.incremental_polling import IncrementalPollingState
+from handlers.task_getter_github import TaskGetterFromGitHub
+from handlers.task_getter_gitlab import TaskGetterFromGitLab
+from tests.mocks.mock_mcp_client import MockMCPToolClient
+
+
+def _make_response(status_code: int, payload: object = None, headers: dict[str, str] | None = None) -> MagicMock:
+    """requests.Responseのモックを作成する."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = payload
+    response.headers = headers or {}
+    return response
+
+
+class TestIncrementalPollingState:
+    """IncrementalPollingStateのテスト."""
+
+    def test_first_poll_is_full_sync(self) -> None:
+        """初回ポーリングは全件同期になる."""
+        state = IncrementalPollingState({})
+
+        assert state.start_poll() is True
+        assert state.get_updated_after("issues") is None
+
+    def test_second_poll_uses_high_water_mark(self) -> None:
+        """2回目以降はハイウォーターマークから重複許容幅を引いた値を返す."""
+        config = {"continuous": {"producer": {"incremental_polling": {"overlap_seconds": 60}}}}
+        state = IncrementalPollingState(config)
+        state.start_poll()
+        state.record("issues", [
+            {"updated_at": "2024-01-01T12:00:00Z"},
+            {"updated_at": "2024-01-02T12:00:00Z"},
+            {"updated_at": None},
+        ])
+
+        assert state.start_poll() is False
+        updated_after = state.get_updated_after("issues")
+        assert updated_after == datetime(2024, 1, 2, 11, 59, tzinfo=timezone.utc)
+        # 種別ごとに独立している
+        assert state.get_updated_after("merge_requests") is None
+
+    def test_full_sync_interval(self) -> None:
+        """全件同期間隔を過ぎると再び全件同期になる."""
+        config = {"continuous": {"producer": {"incremental_polling": {"full_sync_interval_minutes": 0}}}}
+        state = IncrementalPollingState(config)
+        state.start_poll()
+        state.record("issues", [{"updated_at": "2024-01-01T12:00:00Z"}])
+
+        assert state.start_poll() is True
+        assert state.get_updated_after("issues") is None
+
+    def test_disabled_always_full_sync(self) -> None:
+        """無効化時は常に全件同期になる."""
+        config = {"continuous": {"producer": {"incremental_polling": {"enabled": False}}}}
+        state = IncrementalPollingState(config)
+        state.start_poll()
+        state.record("issues", [{"updated_at": "2024-01-01T12:00:00Z"}])
+
+        assert state.start_poll() is True
+
+    def test_parse_timestamp_with_milliseconds(self) -> None:
+        """GitLab形式(ミリ秒付き)の日時も解析できる."""
+        parsed = IncrementalPollingState.parse_timestamp("2024-01-01T12:00:00.123Z")
+        assert parsed is not None
+        assert IncrementalPollingState.format_timestamp(parsed) == "2024-01-01T12:00:00Z"
+        assert IncrementalPollingState.parse_timestamp("invalid") is None
+
+
+class TestTaskGetterIncrementalQuery:
+    """タスクゲッターが差分条件をクエリに反映することのテスト."""
+
+    def test_github_query_includes_updated_qualifier(self) -> None:
+        """2回目の取得ではupdated:>=修飾子が付与される."""
+        config = {
+            "github": {
+                "owner": "testorg",
+                "bot_label": "coding agent",
+                "personal_access_token": "token",
+                "api_url": "https://api.github.com",
+            },
+        }
+        mcp_clients = {"github": MockMCPToolClient({"mcp_server_name": "github"})}
+        issue = {
+            "number": 1,
+            "repository_url": "https://api.github.com/repos/testorg/testrepo",
+            "labels": [{"name": "coding agent"}],
+            "updated_at": "2024-01-01T12:00:00Z",
+        }
+
+        with patch("handlers.task_getter_github.GithubClient") as mock_client_class:
+            mock_client = mock_client_class.return_value
+            mock_client.search_issues.return_value = [issue]
+            mock_client.search_pull_requests.return_value = []
+            task_getter = TaskGetterFromGitHub(config=config, mcp_clients=mcp_clients)
+
+            task_getter.get_task_list()
+            first_query = mock_client.search_issues.call_args[0][0]
+            task_getter.get_task_list()
+            second_query = mock_client.search_issues.call_args[0][0]
+
+        assert "updated:" not in first_query
+        assert 'label:"coding agent"' in second_query
+        assert "updated:>=2024-01-01T11:58:00Z" in second_query
+        # PRはハイウォーターマーク未確定のため全件検索のまま
+        assert "updated:" not in mock_client.search_pull_requests.call_args[0][0]
+
+    def test_gitlab_filters_are_server_side(self) -> None:
+        """GitLabではラベル・アサイン・updated_afterをAPIパラメータで渡す."""
+        config = {
+            "gitlab": {
+                "bot_label": "coding agent",
+                "bot_name": "bot",
+                "personal_access_token": "token",
+                "api_url": "https://gitlab.com/api/v4",
+            },
+        }
+        mcp_clients = {"gitlab": MockMCPToolClient({"mcp_server_name": "gitlab"})}
+        merge_request = {"project_id": 1, "iid": 2, "labels": ["coding agent"], "updated_at": "2024-01-01T12:00:00Z"}
+
+        with patch("handlers.task_getter_gitlab.GitlabClient") as mock_client_class:
+            mock_client = mock_client_class.return_value
+            mock_client.list_all_issues.return_value = []
+            mock_client.list_all_merge_requests.return_value = [merge_request]
+            task_getter = TaskGetterFromGitLab(config=config, mcp_clients=mcp_clients)
+
+            task_getter.get_task_list()
+            task_getter.get_task_list()
+
+        kwargs = mock_client.list_all_merge_requests.call_args.kwargs
+        assert kwargs["labels"] == ["coding agent"]
+        assert kwargs["assignee_username"] == "bot"
+        assert kwargs["updated_after"] == "2024-01-01T11:58:00Z"
+        assert mock_client.list_all_issues.call_args.kwargs["updated_after"] is None
+
+
+class TestConditionalRequests:
+    """ETagによる条件付きリクエストのテスト."""
+
+    def test_github_search_returns_cached_payload_on_304(self) -> None:
+        """304応答時はキャッシュ済みの検索結果を返す."""
+        client = GithubClient(token="token")
+        payload = {"total_count": 1, "items": [{"number": 1}]}
+        responses = [
+            _make_response(200, payload, {"ETag": '"abc"'}),
+            _make_response(304),
+        ]
+
+        with patch.object(client.session, "get", side_effect=responses) as mock_get:
+            first = client.search_issues_and_prs("label:test")
+            second = client.search_issues_and_prs("label:test")
+
+        assert first == second == [{"number": 1}]
+        assert mock_get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"abc"'
+        assert client.not_modified_count == 1
+
+    def test_gitlab_list_all_issues_uses_etag(self) -> None:
+        """GitLabの一覧取得でもETagが再利用される."""
+        client = GitlabClient(token="token")
+        issues = [{"iid": 1}]
+        # 各取得は1ページ目と空の2ページ目の2リクエストで完了する
+        responses = [
+            _make_response(200, issues, {"ETag": 'W/"xyz"'}),
+            _make_response(200, []),
+            _make_response(304),
+            _make_response(200, []),
+        ]
+
+        with patch.object(client.session, "get", side_effect=responses) as mock_get:
+            first = client.list_all_issues(labels=["coding agent"], assignee_username="bot")
+            second = client.list_all_issues(labels=["coding agent"], assignee_username="bot")
+
+        assert first == second == issues
+        params = mock_get.call_args_list[0].kwargs["params"]
+        assert params["scope"] == "all"
+        assert params["labels"] == "coding agent"
+        assert params["assignee_username"] == "bot"
+        assert mock_get.call_args_list[2].kwargs["headers"]["If-None-Match"] == 'W/"xyz"'
+        assert client.not_modified_count == 1
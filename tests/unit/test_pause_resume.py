@@ -4,7 +4,9 @@ from __future__ import annotations
 
 import json
 import shutil
+import signal
 import tempfile
+import time
 import unittest
 from pathlib import Path
 from typing import Any
@@ -12,6 +14,7 @@ from unittest.mock import MagicMock, patch
 
 from handlers.task_key import GitHubIssueTaskKey
 from pause_resume_manager import PauseResumeManager
+from pause_signal_watcher import get_signal_watcher
 
 
 class MockTask:
@@ -164,6 +167,20 @@ class TestPauseResumeManager(unittest.TestCase):
 
         self.assertEqual(task_state["planning_state"], planning_state)
 
+    def test_pause_task_records_execution_checkpoint(self):
+        """Test that the execution checkpoint is saved and readable on resume."""
+        task_key = GitHubIssueTaskKey("owner", "repo", 123)
+        task = MockTask(task_key)
+        checkpoint = {"image": "coding-agent-checkpoint:test", "environment_name": "python"}
+        execution_manager = MagicMock()
+        execution_manager.checkpoint.return_value = checkpoint
+
+        self.manager.pause_task(task, task.uuid, planning_state=None, execution_manager=execution_manager)
+
+        execution_manager.checkpoint.assert_called_once_with(task.uuid)
+        self.assertEqual(self.manager.get_execution_checkpoint(task.uuid), checkpoint)
+        self.assertIsNone(self.manager.get_execution_checkpoint("unknown-uuid"))
+
     def test_get_paused_tasks(self):
         """Test getting list of paused tasks."""
         # Create a paused task
@@ -279,5 +296,79 @@ class TestPauseResumeManager(unittest.TestCase):
         self.assertFalse(result)
 
 
+
+class TestPauseSignalWatcher(unittest.TestCase):
+    """Test event-driven pause signal detection."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.signal_file = self.temp_dir / "pause_signal"
+        self.config = {
+            "pause_resume": {
+                "enabled": True,
+                "signal_file": str(self.signal_file),
+                "poll_interval_seconds": 0.01,
+                "handle_signals": False,
+            },
+            "context_storage": {"base_dir": str(self.temp_dir / "contexts")},
+        }
+        self.manager = PauseResumeManager(self.config)
+        self.watcher = get_signal_watcher(self.signal_file, poll_interval=0.01)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.watcher.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _wait_until(self, condition, timeout: float = 5.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_watcher_wakes_waiter_on_signal_file(self):
+        """Test that creating the signal file wakes up a waiting caller."""
+        self.manager.start_signal_watcher()
+        self.assertTrue(self.watcher.running)
+        self.assertFalse(self.manager.wait_for_pause_signal(0.05))
+
+        self.signal_file.touch()
+        self.assertTrue(self.manager.wait_for_pause_signal(5))
+        self.assertTrue(self.manager.check_pause_signal())
+
+        self.signal_file.unlink()
+        self.assertTrue(self._wait_until(lambda: not self.watcher.event.is_set()))
+        self.assertFalse(self.manager.check_pause_signal())
+
+    def test_watcher_falls_back_to_polling(self):
+        """Test polling fallback when inotify is unavailable."""
+        with patch("pause_signal_watcher._open_inotify", return_value=None):
+            self.manager.start_signal_watcher()
+        self.assertEqual(self.watcher.mode, "polling")
+
+        self.signal_file.touch()
+        self.assertTrue(self.manager.wait_for_pause_signal(5))
+
+    def test_process_signal_is_sticky(self):
+        """Test that SIGTERM is treated as a pause request until exit."""
+        self.manager.start_signal_watcher()
+
+        self.watcher._handle_signal(signal.SIGTERM, None)
+
+        self.assertTrue(self.manager.check_pause_signal())
+        self.assertTrue(self.watcher.refresh())
+        self.assertEqual(self.watcher.signal_received, "SIGTERM")
+
+    def test_wait_without_watcher_polls_signal_file(self):
+        """Test that waiting falls back to stat() polling before the watcher starts."""
+        self.assertFalse(self.manager.wait_for_pause_signal(0.05))
+
+        self.signal_file.touch()
+        self.assertTrue(self.manager.wait_for_pause_signal(1))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -5,6 +5,7 @@ import json
 import sys
 import tempfile
 import unittest
+import unittest.mock
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -253,5 +254,86 @@ class TestPlanningHistoryStore(unittest.TestCase):
         assert verification_entries[2]["verification_result"]["verification_passed"] is True
 
 
+
+    def test_reads_are_cached_and_follow_appends(self) -> None:
+        """Test the file is parsed once and later appends are reflected."""
+        self.store.save_plan({"step": 1})
+        reader = PlanningHistoryStore(self.task_uuid, self.planning_dir)
+
+        with unittest.mock.patch.object(reader, "_read_jsonl", wraps=reader._read_jsonl) as mock_read:
+            assert reader.has_plan()
+            assert reader.get_revision_history() == []
+            reader.save_revision({"step": 2}, {"reason": "retry"})
+            reader.save_reflection({"status": "ok"})
+            latest = reader.get_latest_plan()
+            assert len(reader.get_all_reflections()) == 1
+
+        assert mock_read.call_count == 1
+        assert latest["type"] == "revision"
+        assert latest["updated_plan"] == {"step": 2}
+
+        # Returned entries are independent of the cache
+        latest["updated_plan"]["step"] = 3
+        assert reader.get_latest_plan()["updated_plan"] == {"step": 2}
+
+class TestPlanningHistoryIndex(unittest.TestCase):
+    """Test cross-task planning history lookup through the index."""
+
+    def setUp(self) -> None:
+        """Set up a context base directory with running/ and completed/."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        (self.temp_dir / "completed").mkdir()
+
+    def tearDown(self) -> None:
+        """Clean up test environment."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _store(self, task_uuid: str, issue_id: str) -> PlanningHistoryStore:
+        planning_dir = self.temp_dir / "running" / task_uuid / "planning"
+        store = PlanningHistoryStore(task_uuid, planning_dir, base_dir=self.temp_dir)
+        store.issue_id = issue_id
+        return store
+
+    def test_lookup_follows_moved_task_directory(self) -> None:
+        """Entries are found by issue after the task moves to completed/."""
+        first = self._store("task-1", "42")
+        first.save_plan({"step": "first"})
+        first.save_reflection({"status": "ok"})
+        other = self._store("task-2", "7")
+        other.save_plan({"step": "other"})
+        (self.temp_dir / "running" / "task-1").rename(self.temp_dir / "completed" / "task-1")
+
+        current = self._store("task-3", "42")
+        current.save_plan({"step": "second"})
+        entries = current.get_past_executions_for_issue("42")
+
+        assert [e["type"] for e in entries] == ["plan", "reflection", "plan"]
+        assert [e["task_uuid"] for e in entries] == ["task-1", "task-1", "task-3"]
+        assert entries[0]["plan"] == {"step": "first"}
+
+    def test_backfills_entries_written_before_index(self) -> None:
+        """Entries in planning files without index rows are indexed on first lookup."""
+        planning_dir = self.temp_dir / "completed" / "old-task" / "planning"
+        planning_dir.mkdir(parents=True)
+        lines = [
+            {"type": "plan", "timestamp": "2024-01-01T00:00:00", "issue_id": "42", "plan": {}},
+            {"type": "plan", "timestamp": "2024-01-02T00:00:00", "issue_id": "9", "plan": {}},
+        ]
+        (planning_dir / "old-task.jsonl").write_text("".join(json.dumps(e) + "\n" for e in lines))
+
+        store = self._store("task-new", "42")
+        entries = store.get_past_executions_for_issue("42")
+
+        assert entries == [lines[0]]
+
+    def test_lookup_without_base_dir(self) -> None:
+        """Cross-task lookup is disabled when no base directory is given."""
+        store = PlanningHistoryStore("task", self.temp_dir / "planning")
+        store.issue_id = "42"
+        store.save_plan({})
+        assert store.get_past_executions_for_issue("42") == []
+        assert not (self.temp_dir / "planning_index.sqlite3").exists()
+
 if __name__ == "__main__":
     unittest.main()
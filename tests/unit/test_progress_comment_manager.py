@@ -0,0 +1,107 @@
+"""ProgressCommentManagerのユニットテスト.
+
+コメント更新の集約、同一内容の更新スキップ、
+フェーズ切り替わり・終了時の即時反映をテストします。
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from handlers.progress_comment_manager import ProgressCommentManager
+
+
+def _make_manager(update_interval_seconds: float) -> tuple[ProgressCommentManager, MagicMock]:
+    task = MagicMock()
+    task.comment.return_value = {"id": 123}
+    manager = ProgressCommentManager(
+        task=task,
+        logger=logging.getLogger(__name__),
+        task_uuid="uuid",
+        update_interval_seconds=update_interval_seconds,
+    )
+    manager.create_initial_comment("**タスク**: test")
+    return manager, task
+
+
+def _wait_until(condition: Callable[[], bool], timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestProgressCommentManagerUpdates:
+    """進捗コメント更新の集約のテスト."""
+
+    def test_changes_are_coalesced_into_one_update(self) -> None:
+        """間隔内の複数の変更は1回の更新にまとめられる."""
+        manager, task = _make_manager(update_interval_seconds=60)
+
+        manager.update_status(status="running", llm_call_count=1)
+        manager.add_history_entry("llm_call", "LLM呼び出し #1")
+        manager.set_llm_comment("調査中です")
+        manager.update_status(llm_call_count=2)
+
+        task.update_comment.assert_not_called()
+
+        manager.flush()
+
+        task.update_comment.assert_called_once()
+        content = task.update_comment.call_args[0][1]
+        assert "調査中です" in content
+        assert "**LLM呼び出し回数**: 2" in content
+        manager.close()
+
+    def test_background_updater_flushes_after_interval(self) -> None:
+        """更新スレッドが間隔経過後に変更を反映する."""
+        manager, task = _make_manager(update_interval_seconds=0.05)
+
+        manager.update_status(status="running")
+
+        assert _wait_until(lambda: task.update_comment.call_count == 1)
+        manager.close()
+
+    def test_phase_boundary_is_flushed_without_waiting(self) -> None:
+        """フェーズの切り替わりは待機間隔を待たずに反映される."""
+        manager, task = _make_manager(update_interval_seconds=60)
+        manager._last_flush_at = time.monotonic()
+
+        manager.set_active_phase("planning")
+
+        assert _wait_until(lambda: task.update_comment.call_count == 1)
+        assert "▶️ Planning" in task.update_comment.call_args[0][1]
+        manager.close()
+
+    def test_finalize_flushes_pending_changes_and_stops_updater(self) -> None:
+        """finalizeは未反映の変更を同期的に反映し、以降の変更は即時反映する."""
+        manager, task = _make_manager(update_interval_seconds=60)
+        manager.update_status(status="running")
+
+        manager.finalize(final_status="completed", summary="done")
+
+        task.update_comment.assert_called_once()
+        assert "🏁 Task Completed" in task.update_comment.call_args[0][1]
+        assert manager._updater_thread is None
+
+        manager.update_status(status="archived")
+        assert task.update_comment.call_count == 2
+
+    def test_unchanged_content_is_not_sent(self) -> None:
+        """生成した内容が前回と同じ場合はコメントを更新しない."""
+        fixed_now = datetime(2024, 1, 1, 12, 0, 0)
+        with patch("handlers.progress_comment_manager.datetime") as mock_datetime:
+            mock_datetime.now.return_value = fixed_now
+            manager, task = _make_manager(update_interval_seconds=0)
+            items = [{"id": "step1", "description": "調査", "completed": False}]
+
+            manager.update_checklist(items)
+            manager.update_checklist(list(items))
+
+        assert task.update_comment.call_count == 1
+        assert manager.skipped_update_count == 1
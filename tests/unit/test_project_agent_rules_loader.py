@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 import base64
+import shutil
+import tempfile
 import unittest
-from unittest.mock import MagicMock
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 from mcp import ErrorData, McpError
 
-from handlers.project_agent_rules_loader import ProjectAgentRulesLoader
+from handlers.file_list_context_loader import RepositoryTree
+from handlers.project_agent_rules_loader import ProjectAgentRulesLoader, RulesCache, _rules_cache
 
 
 class TestProjectAgentRulesLoaderMCP(unittest.TestCase):
@@ -98,5 +102,71 @@ class TestProjectAgentRulesLoaderMCP(unittest.TestCase):
         assert result == "# Content"
 
 
+
+class TestProjectAgentRulesLoaderTree(unittest.TestCase):
+    """Test ProjectAgentRulesLoader with the repository tree and REST API."""
+
+    def setUp(self) -> None:
+        """Set up test environment."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.config = {
+            "project_agent_rules": {"enabled": True},
+            "file_list_context": {"cache_dir": str(self.temp_dir / "cache")},
+            "github": {"personal_access_token": "token", "api_url": "https://api.github.com"},
+        }
+        self.mock_mcp_client = MagicMock()
+        _rules_cache.clear()
+
+    def tearDown(self) -> None:
+        """Clean up test environment."""
+        _rules_cache.clear()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _load(self, tree: RepositoryTree, contents: dict[str, str]) -> tuple[str, MagicMock]:
+        loader = ProjectAgentRulesLoader(
+            config=self.config,
+            mcp_client=self.mock_mcp_client,
+            owner="testowner",
+            repo="testrepo",
+        )
+        with patch(
+            "handlers.file_list_context_loader.FileListContextLoader.load_repository_tree",
+            return_value=tree,
+        ), patch("handlers.file_list_context_loader.GithubClient") as mock_client_class:
+            client = mock_client_class.return_value
+            client.get_file_content.side_effect = lambda owner, repo, path, ref: contents[path]
+            return loader.load_rules(), client
+
+    def test_only_existing_files_are_fetched(self) -> None:
+        """Test that only rule files present in the tree are fetched, in order."""
+        tree = RepositoryTree("github:repo", "a" * 40, ["claude.md", "AGENTS.md", "docs/AGENT.md"])
+
+        rules, client = self._load(tree, {"AGENTS.md": "agents rules", "claude.md": "claude rules"})
+
+        fetched = sorted(call.args[2] for call in client.get_file_content.call_args_list)
+        assert fetched == ["AGENTS.md", "claude.md"]
+        assert rules.index("### From: AGENTS.md") < rules.index("### From: claude.md")
+        self.mock_mcp_client.call_tool.assert_not_called()
+
+    def test_rules_are_cached_by_commit_sha(self) -> None:
+        """Test that assembled rules are reused for the same commit SHA."""
+        tree = RepositoryTree("github:repo", "b" * 40, ["AGENTS.md"])
+
+        first, _ = self._load(tree, {"AGENTS.md": "agents rules"})
+        second, client = self._load(tree, {"AGENTS.md": "agents rules"})
+
+        assert second == first
+        client.get_file_content.assert_not_called()
+
+    def test_rules_cache_evicts_by_size(self) -> None:
+        """Test that the rules cache evicts least recently used entries over the size limit."""
+        cache = RulesCache()
+        cache.put(("a",), "x" * 6, max_bytes=10)
+        cache.put(("b",), "y" * 6, max_bytes=10)
+
+        assert cache.get(("a",)) is None
+        assert cache.get(("b",)) == "y" * 6
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -160,6 +160,8 @@ class TestTaskContextDBRegistration:
             user="user",
         )
 
+        context_manager.summary_store.add_summary(1, 1, "final summary", 10, 5)
+
         # Act
         context_manager.complete()
 
@@ -168,6 +170,11 @@ class TestTaskContextDBRegistration:
         # モックDBTaskのstatusがcompletedに設定されたことを確認
         assert mock_db_task.status == "completed"
         assert mock_db_task.completed_at is not None
+        # 引き継ぎ用ダイジェストが保存されたことを確認
+        digest_kwargs = mock_db_manager.save_context_digest.call_args.kwargs
+        assert mock_db_manager.save_context_digest.call_args.args == (task_uuid,)
+        assert digest_kwargs["final_summary"] == "final summary"
+        assert digest_kwargs["metadata"]["uuid"] == task_uuid
 
     @patch("context_storage.task_context_manager.TaskDBManager")
     def test_task_failure_updates_db(self, mock_db_manager_class, temp_base_dir, mock_config, mock_db_task):
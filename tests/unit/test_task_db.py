@@ -13,10 +13,11 @@ from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
 
-from db.task_db import Base, DBTask, TaskDBManager
+from db.task_db import Base, DBTask, DBTaskContextDigest, TaskDBManager
 from handlers.task_key import (
     GitHubIssueTaskKey,
     GitHubPullRequestTaskKey,
@@ -437,6 +438,54 @@ class TestTaskDBManagerIntegration:
         assert saved_task.status == "completed"
         assert saved_task.completed_at is not None
 
+    def test_get_running_task_uuids(self, db_manager):
+        """指定したUUIDのうち実行中のタスクのみを取得するテスト."""
+        now = datetime.now(timezone.utc)
+        uuids = {status: str(uuid.uuid4()) for status in ("running", "completed")}
+        for status, task_uuid in uuids.items():
+            db_manager.create_task({
+                "uuid": task_uuid,
+                "task_source": "github",
+                "task_type": "issue",
+                "owner": "owner",
+                "repo": "repo",
+                "number": 1,
+                "status": status,
+                "created_at": now,
+            })
+
+        running = db_manager.get_running_task_uuids([*uuids.values(), "unknown"])
+
+        assert running == {uuids["running"]}
+        assert db_manager.get_running_task_uuids([]) == set()
+
+    def test_find_completed_tasks_loads_context_digest(self, db_manager):
+        """完了タスクの検索で引き継ぎ用ダイジェストも取得するテスト."""
+        from handlers.task_key import GitHubIssueTaskKey
+
+        now = datetime.now(timezone.utc)
+        for task_uuid in ("with-digest", "without-digest"):
+            db_manager.create_task({
+                "uuid": task_uuid,
+                "task_source": "github",
+                "task_type": "issue",
+                "owner": "owner",
+                "repo": "repo",
+                "number": 1,
+                "status": "completed",
+                "created_at": now,
+                "completed_at": now,
+            })
+        db_manager.save_context_digest("with-digest", "summary", [{"type": "plan"}], {"user": "alice"})
+        db_manager.save_context_digest("with-digest", "updated summary", [], {})
+
+        db_tasks = db_manager.find_completed_tasks_by_key(GitHubIssueTaskKey("owner", "repo", 1))
+
+        digests = {db_task.uuid: db_task.context_digest for db_task in db_tasks}
+        assert digests["without-digest"] is None
+        assert digests["with-digest"].final_summary == "updated summary"
+        assert digests["with-digest"].planning_digest == []
+
     def test_create_tables(self, in_memory_engine):
         """テーブル作成テスト."""
         # 新しいマネージャーでテーブル作成をテスト
@@ -467,3 +516,58 @@ class TestTaskDBManagerIntegration:
         
         db_task = manager.create_task(task_data)
         assert db_task is not None
+
+    def _create_completed_task(self, manager: TaskDBManager, task_uuid: str) -> None:
+        now = datetime.now(timezone.utc)
+        manager.create_task({
+            "uuid": task_uuid,
+            "task_source": "github",
+            "task_type": "issue",
+            "owner": "owner",
+            "repo": "repo",
+            "number": 1,
+            "status": "completed",
+            "created_at": now,
+            "completed_at": now,
+        })
+
+    def test_context_digest_table_created_when_missing(self):
+        """ダイジェストのテーブルがない既存DBでは初回利用時に作成するテスト."""
+        from handlers.task_key import GitHubIssueTaskKey
+
+        engine = create_engine("sqlite:///:memory:", echo=False)
+        DBTask.__table__.create(engine)
+        manager = TaskDBManager.__new__(TaskDBManager)
+        manager.config = {}
+        manager._engine = engine
+        manager._session_factory = sessionmaker(bind=engine)
+        self._create_completed_task(manager, "old-task")
+
+        db_tasks = manager.find_completed_tasks_by_key(GitHubIssueTaskKey("owner", "repo", 1))
+
+        assert [db_task.context_digest for db_task in db_tasks] == [None]
+        assert inspect(engine).has_table("task_context_digests")
+        manager.save_context_digest("old-task", "summary", [], {})
+        db_tasks = manager.find_completed_tasks_by_key(GitHubIssueTaskKey("owner", "repo", 1))
+        assert db_tasks[0].context_digest.final_summary == "summary"
+
+    def test_context_digest_table_unavailable(self):
+        """ダイジェストのテーブルを作成できない場合もタスクを検索できるテスト."""
+        from handlers.task_key import GitHubIssueTaskKey
+
+        engine = create_engine("sqlite:///:memory:", echo=False)
+        DBTask.__table__.create(engine)
+        manager = TaskDBManager.__new__(TaskDBManager)
+        manager.config = {}
+        manager._engine = engine
+        manager._session_factory = sessionmaker(bind=engine)
+        self._create_completed_task(manager, "old-task")
+
+        error = OperationalError("CREATE TABLE", {}, Exception("permission denied"))
+        with patch.object(DBTaskContextDigest.__table__, "create", side_effect=error):
+            db_tasks = manager.find_completed_tasks_by_key(GitHubIssueTaskKey("owner", "repo", 1))
+            manager.save_context_digest("old-task", "summary", [], {})
+
+        assert [db_task.uuid for db_task in db_tasks] == ["old-task"]
+        assert db_tasks[0].context_digest is None
+        assert not inspect(engine).has_table("task_context_digests")
@@ -355,6 +355,78 @@ class TestTaskHandler(unittest.TestCase):
         assert isinstance(system_prompt, str)
         assert len(system_prompt) > 0
 
+    def test_make_system_prompt_is_cached(self) -> None:
+        """Test that repeated system prompt assembly is served from the cache."""
+        task_handler = TaskHandler(
+            llm_client=self.llm_client,
+            mcp_clients={"github": self.github_mcp_client},
+            config=self.config,
+        )
+
+        first = task_handler.get_system_prompt()
+        task_handler._build_system_prompt = MagicMock(side_effect=AssertionError("rebuilt"))
+        second = task_handler.get_system_prompt()
+
+        assert second == first
+        assert task_handler.system_prompt_cache_hits == 1
+        assert task_handler.system_prompt_cache_misses == 1
+
+    def test_make_system_prompt_cache_is_keyed_by_commit_sha(self) -> None:
+        """Test that a new commit SHA rebuilds the task-specific system prompt."""
+        task_handler = TaskHandler(
+            llm_client=self.llm_client,
+            mcp_clients={"github": self.github_mcp_client},
+            config=self.config,
+        )
+        task_handler._build_system_prompt = MagicMock(return_value="prompt")
+        task_handler._get_repository_revision = MagicMock(
+            side_effect=["github:testorg/testrepo@a", "github:testorg/testrepo@a", "github:testorg/testrepo@b"],
+        )
+
+        for _ in range(3):
+            task_handler._make_system_prompt(self.config, self.github_task)
+
+        assert task_handler._build_system_prompt.call_count == 2
+        assert task_handler.system_prompt_cache_hits == 1
+        assert task_handler.system_prompt_cache_misses == 2
+
+    def test_make_system_prompt_picks_up_replaced_mcp_clients(self) -> None:
+        """Test that MCP tool prompts are fetched once per client and a new client rebuilds the prompt."""
+        first_client = MagicMock()
+        first_client.system_prompt = "### first tools"
+        task_handler = TaskHandler(
+            llm_client=self.llm_client,
+            mcp_clients={"github": first_client},
+            config=self.config,
+        )
+
+        first = task_handler.get_system_prompt()
+        task_handler.get_system_prompt()
+        second_client = MagicMock()
+        second_client.system_prompt = "### second tools"
+        task_handler.mcp_clients["github"] = second_client
+        second = task_handler.get_system_prompt()
+
+        assert "### first tools" in first
+        assert "### second tools" in second
+        assert task_handler.system_prompt_cache_hits == 1
+        assert task_handler.system_prompt_cache_misses == 2
+
+    def test_make_system_prompt_without_revision_is_not_cached(self) -> None:
+        """Test that prompts are rebuilt when the commit SHA cannot be resolved."""
+        task_handler = TaskHandler(
+            llm_client=self.llm_client,
+            mcp_clients={"github": self.github_mcp_client},
+            config=self.config,
+        )
+        task_handler._build_system_prompt = MagicMock(return_value="prompt")
+
+        task_handler._make_system_prompt(self.config, self.github_task)
+        task_handler._make_system_prompt(self.config, self.github_task)
+
+        assert task_handler._build_system_prompt.call_count == 2
+        assert task_handler.system_prompt_cache_hits == 0
+
 
 class TestTaskHandlerWithDifferentTasks(unittest.TestCase):
     """Test TaskHandler with different types of tasks."""
@@ -5,6 +5,10 @@ TextEditorMCPClientクラスの単体テストを提供します。
 from __future__ import annotations
 
 import json
+import subprocess
+import sys
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import pytest
@@ -113,6 +117,214 @@ class TestTextEditorMCPClient:
             client.call_tool("view", {"path": "/test"})
 
 
+# 受信したリクエストを逆順に応答する模擬MCPサーバー(2件ずつ)
+_REVERSE_SERVER = textwrap.dedent("""
+    import json, sys
+    sys.stderr.write("x" * 200000 + "\\n")
+    sys.stderr.flush()
+    batch = []
+    for line in sys.stdin:
+        batch.append(json.loads(line))
+        if len(batch) == 2:
+            for request in reversed(batch):
+                text = request["params"]["arguments"]["path"]
+                response = {"jsonrpc": "2.0", "id": request["id"], "result": {"content": [{"text": text}]}}
+                print(json.dumps(response), flush=True)
+            batch = []
+""")
+
+# 同時に受信したリクエストを逆順に処理する(並行処理を模した)編集可能な模擬MCPサーバー
+_EDITING_SERVER = textwrap.dedent("""
+    import json, select, sys
+    files = {"a.py": "v0"}
+    history = {}
+
+    def handle(arguments):
+        path, command = arguments["path"], arguments["command"]
+        if command == "view":
+            return files[path], False
+        if command == "undo_edit":
+            files[path] = history[path].pop()
+            return "undone", False
+        if arguments["old_str"] not in files[path]:
+            return "No match", True
+        history.setdefault(path, []).append(files[path])
+        files[path] = files[path].replace(arguments["old_str"], arguments["new_str"])
+        return "edited", False
+
+    queue = []
+    while True:
+        if not queue or select.select([sys.stdin], [], [], 0.2)[0]:
+            line = sys.stdin.readline()
+            if not line:
+                break
+            queue.append(json.loads(line))
+            continue
+        for request in reversed(queue):
+            text, is_error = handle(request["params"]["arguments"])
+            result = {"content": [{"text": text}], "isError": is_error}
+            print(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result}), flush=True)
+        queue = []
+""")
+
+
+def _start_fake_server(client: TextEditorMCPClient, script: str) -> None:
+    """docker execの代わりに模擬サーバーを起動する."""
+    client._process = subprocess.Popen(
+        [sys.executable, "-c", script],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1,
+    )
+    client._start_readers()
+    client._initialized = True
+
+
+class TestTextEditorMCPClientPipelining:
+    """レスポンスの振り分けとタイムアウトのテスト."""
+
+    def test_responses_are_matched_by_id(self) -> None:
+        """並行した呼び出しの順不同のレスポンスをidで対応付ける(標準エラー出力が多くても詰まらない)."""
+        client = TextEditorMCPClient(container_id="test-container", timeout_seconds=10)
+        _start_fake_server(client, _REVERSE_SERVER)
+        try:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                results = list(executor.map(client.view, ["a.py", "b.py"]))
+        finally:
+            client.stop()
+
+        assert [r.content for r in results] == ["a.py", "b.py"]
+        assert all(r.success for r in results)
+
+    def test_request_times_out(self) -> None:
+        """改行のない応答しか来ない場合もタイムアウトで失敗する."""
+        client = TextEditorMCPClient(container_id="test-container", timeout_seconds=1)
+        script = "import sys, time; sys.stdout.write('{\"id\": 1'); sys.stdout.flush(); time.sleep(30)"
+        _start_fake_server(client, script)
+        try:
+            result = client.view("a.py")
+            assert client._pending == {}
+        finally:
+            client.stop()
+
+        assert result.success is False
+        assert "timed out" in result.error
+
+    def test_calls_wait_for_previous_response(self) -> None:
+        """呼び出しはレスポンスを受け取ってから返るため、続く呼び出しは前の編集を前提にできる."""
+        client = TextEditorMCPClient(container_id="test-container", timeout_seconds=10)
+        _start_fake_server(client, _EDITING_SERVER)
+        try:
+            results = [
+                client.str_replace("a.py", "v0", "v1"),
+                client.str_replace("a.py", "v1", "v2"),
+                client.view("a.py"),
+            ]
+        finally:
+            client.stop()
+
+        assert [r.success for r in results] == [True, True, True]
+        assert results[2].content == "v2"
+
+    def test_server_exit_fails_pending_requests(self) -> None:
+        """サーバーが終了した場合は標準エラー出力を含めて失敗する."""
+        client = TextEditorMCPClient(container_id="test-container", timeout_seconds=10)
+        script = "import sys; sys.stdin.readline(); sys.stderr.write('boom\\n')"
+        _start_fake_server(client, script)
+        try:
+            result = client.view("a.py")
+        finally:
+            client.stop()
+
+        assert result.success is False
+        assert "No response from MCP server" in result.error
+
+
+class TestTextEditorMCPClientBatchEdit:
+    """batch_editメソッドのテスト."""
+
+    @staticmethod
+    def _ok(content: str = "ok") -> TextEditorToolResult:
+        return TextEditorToolResult(success=True, content=content)
+
+    def test_batch_edit_combines_results(self) -> None:
+        """操作を順に実行し、結果を1つにまとめる."""
+        client = TextEditorMCPClient(container_id="test-container")
+        operations = [
+            {"command": "view", "path": "a.py"},
+            {"command": "str_replace", "path": "a.py", "old_str": "x", "new_str": "y"},
+        ]
+        with mock.patch.object(client, "call_tool", side_effect=[self._ok("1\tx"), self._ok()]) as mock_call:
+            result = client.batch_edit(operations)
+
+        assert [c.args[1] for c in mock_call.call_args_list] == operations
+        assert result.success is True
+        assert result.content == "[1] view a.py: ok\n1\tx\n\n[2] str_replace a.py: ok\nok"
+
+    def test_batch_edit_rolls_back_on_failure(self) -> None:
+        """失敗した時点で残りの操作を実行せず、成功した編集を逆順に取り消す."""
+        client = TextEditorMCPClient(container_id="test-container")
+        operations = [
+            {"command": "str_replace", "path": "a.py", "old_str": "x", "new_str": "y"},
+            {"command": "view", "path": "b.py"},
+            {"command": "insert", "path": "b.py", "insert_line": 1, "new_str": "z"},
+            {"command": "str_replace", "path": "c.py", "old_str": "missing", "new_str": "y"},
+            {"command": "insert", "path": "d.py", "insert_line": 1, "new_str": "z"},
+        ]
+        failure = TextEditorToolResult(success=False, content="", error="No match")
+        with mock.patch.object(
+            client, "call_tool", side_effect=[self._ok(), self._ok(), self._ok(), failure, self._ok(), self._ok()],
+        ) as mock_call:
+            result = client.batch_edit(operations)
+
+        assert result.success is False
+        assert "Operation 4 failed" in result.error
+        assert "skipped 1 remaining operation(s)" in result.error
+        assert "rolled back 2 applied edit(s)" in result.error
+        assert [c.args[1] for c in mock_call.call_args_list[4:]] == [
+            {"command": "undo_edit", "path": "b.py"},
+            {"command": "undo_edit", "path": "a.py"},
+        ]
+
+    def test_batch_edit_same_file_edits(self) -> None:
+        """同じファイルへの複数の編集を順に適用し、失敗時は全て取り消す."""
+        client = TextEditorMCPClient(container_id="test-container", timeout_seconds=10)
+        _start_fake_server(client, _EDITING_SERVER)
+        try:
+            applied = client.batch_edit([
+                {"command": "str_replace", "path": "a.py", "old_str": "v0", "new_str": "v1"},
+                {"command": "str_replace", "path": "a.py", "old_str": "v1", "new_str": "v2"},
+            ])
+            after_apply = client.view("a.py").content
+            rolled_back = client.batch_edit([
+                {"command": "str_replace", "path": "a.py", "old_str": "v2", "new_str": "v3"},
+                {"command": "str_replace", "path": "a.py", "old_str": "v3", "new_str": "v4"},
+                {"command": "str_replace", "path": "a.py", "old_str": "missing", "new_str": "v5"},
+            ])
+            after_rollback = client.view("a.py").content
+        finally:
+            client.stop()
+
+        assert applied.success is True
+        assert after_apply == "v2"
+        assert rolled_back.success is False
+        assert "rolled back 2 applied edit(s)" in rolled_back.error
+        assert after_rollback == "v2"
+
+    def test_batch_edit_rejects_invalid_operations(self) -> None:
+        """不正な操作が含まれる場合は何も送信しない."""
+        client = TextEditorMCPClient(container_id="test-container")
+        with mock.patch.object(client, "call_tool") as mock_calls:
+            results = [
+                client.batch_edit([]),
+                client.batch_edit([{"command": "create", "path": "a.py", "file_text": ""}]),
+                client.batch_edit([{"command": "str_replace", "path": "a.py", "old_str": "x"}]),
+            ]
+
+        mock_calls.assert_not_called()
+        assert [r.success for r in results] == [False, False, False]
+        assert "unsupported command 'create'" in results[1].error
+        assert "new_str required" in results[2].error
+
+
 class TestTextEditorMCPClientFunctions:
     """TextEditorMCPClientの関数定義テスト."""
 
@@ -390,6 +602,26 @@ class TestTextEditorMCPInExecutionEnvironmentManager:
             "view", "create", "str_replace", "insert", "undo_edit"
         }
 
+    def test_get_text_editor_functions_with_batch_edit(self) -> None:
+        """batch_edit有効時は一括編集ツールも公開し、ラッパーからルーティングする."""
+        from handlers.execution_environment_manager import ExecutionEnvironmentManager
+        from handlers.execution_environment_mcp_wrapper import ExecutionEnvironmentMCPWrapper
+
+        config = {"text_editor_mcp": {"enabled": True, "batch_edit": {"enabled": True}}}
+        manager = ExecutionEnvironmentManager(config)
+
+        functions = manager.get_text_editor_functions()
+        assert [f["name"] for f in functions] == ["text_editor", "text_batch_edit"]
+        items = functions[1]["parameters"]["properties"]["operations"]["items"]
+        assert set(items["properties"]["command"]["enum"]) == {"view", "str_replace", "insert"}
+
+        wrapper = ExecutionEnvironmentMCPWrapper(manager, "text")
+        assert "text_batch_edit" in wrapper.system_prompt
+        operations = [{"command": "view", "path": "a.py", "view_range": None}]
+        with mock.patch.object(manager, "call_text_editor_batch", return_value={"success": True}) as mock_batch:
+            wrapper._execute_tool_internal("batch_edit", {"operations": operations})
+        mock_batch.assert_called_once_with(operations)
+
     def test_get_text_editor_functions_disabled(self) -> None:
         """無効時のtext-editor関数定義取得をテストする."""
         from handlers.execution_environment_manager import ExecutionEnvironmentManager
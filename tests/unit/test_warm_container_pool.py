@@ -0,0 +1,144 @@
+"""実行環境コンテナのウォームプールのユニットテスト."""
+from __future__ import annotations
+
+import subprocess
+import sys
+import threading
+from collections import deque
+from itertools import count
+from unittest.mock import MagicMock, patch
+
+# Mock the mcp module before importing
+sys.modules.setdefault("mcp", MagicMock())
+
+from handlers.execution_environment_manager import ExecutionEnvironmentManager
+from handlers.warm_container_pool import (
+    PooledContainer,
+    WarmContainerPool,
+    get_warm_container_pool,
+    start_warm_container_pool,
+    stop_warm_container_pool,
+)
+
+
+def _make_pool(target_sizes: dict[str, int]) -> tuple[WarmContainerPool, list[str]]:
+    """作成・削除したコンテナを記録するプールを作成する."""
+    removed: list[str] = []
+    ids = count()
+
+    def creator(environment_name: str) -> PooledContainer:
+        return PooledContainer(
+            container_id=f"{environment_name}-{next(ids)}",
+            name=f"pool-{environment_name}",
+            environment_name=environment_name,
+            spec="spec",
+        )
+
+    pool = WarmContainerPool(creator, removed.append, target_sizes, refill_interval=0.05)
+    return pool, removed
+
+
+def _wait_for_idle(pool: WarmContainerPool, environment_name: str, size: int) -> None:
+    for _ in range(100):
+        if pool.get_metrics().get(environment_name, {}).get("idle") == size:
+            return
+        threading.Event().wait(0.01)
+    msg = f"待機コンテナが{size}件になりませんでした"
+    raise AssertionError(msg)
+
+
+class TestWarmContainerPool:
+    """WarmContainerPoolのテスト."""
+
+    def test_fills_to_target_and_refills_after_acquire(self) -> None:
+        """目標数まで事前に作成し、払い出した分を補充する."""
+        pool, removed = _make_pool({"python": 2, "node": 0})
+        pool.start()
+        try:
+            _wait_for_idle(pool, "python", 2)
+            assert "node" not in pool.get_metrics()
+
+            container = pool.acquire("python", "spec")
+            assert container is not None
+            assert container.container_id == "python-0"
+            _wait_for_idle(pool, "python", 2)
+        finally:
+            pool.stop()
+
+        # 停止時に待機コンテナを削除する
+        assert sorted(removed) == ["python-1", "python-2"]
+
+    def test_acquire_skips_different_spec(self) -> None:
+        """作成条件が異なる場合は払い出さない."""
+        pool, _ = _make_pool({"python": 1})
+        pool.start()
+        try:
+            _wait_for_idle(pool, "python", 1)
+            assert pool.acquire("python", "other-spec") is None
+            assert pool.acquire("node", "spec") is None
+            assert pool.get_metrics()["python"]["idle"] == 1
+        finally:
+            pool.stop()
+
+    def test_record_ready_metrics(self) -> None:
+        """ヒット率と平均準備時間を集計する."""
+        pool, _ = _make_pool({})
+        pool.record_ready("python", 1.0, hit=True)
+        metrics = pool.record_ready("python", 3.0, hit=False)
+
+        assert metrics["hits"] == 1
+        assert metrics["misses"] == 1
+        assert metrics["hit_rate"] == 0.5
+        assert metrics["avg_ready_seconds"] == 2.0
+
+
+class TestExecutionEnvironmentManagerWarmPool:
+    """ExecutionEnvironmentManagerのウォームプール利用のテスト."""
+
+    config = {
+        "command_executor": {
+            "enabled": True,
+            "warm_pool": {"enabled": True, "default_size": 0, "sizes": {"python": 1}},
+        },
+    }
+
+    def teardown_method(self) -> None:
+        stop_warm_container_pool()
+
+    def test_start_warm_pool_uses_environment_sizes(self) -> None:
+        """環境ごとの目標数でプロセス共有のプールを起動する."""
+        manager = ExecutionEnvironmentManager(self.config)
+        with patch.object(manager, "_create_pooled_container", side_effect=RuntimeError("docker")):
+            assert manager.start_warm_pool() is True
+            pool = get_warm_container_pool()
+            assert pool is not None
+            assert pool.target_sizes == {"python": 1}
+
+    def test_start_warm_pool_disabled(self) -> None:
+        """warm_pool.enabledがfalseの場合は起動しない."""
+        config = {"command_executor": {"enabled": True, "warm_pool": {"enabled": False}}}
+        assert ExecutionEnvironmentManager(config).start_warm_pool() is False
+        assert get_warm_container_pool() is None
+
+    def test_acquire_renames_pooled_container(self) -> None:
+        """払い出した待機コンテナをタスク用の名前に変更し、使えないコンテナは破棄する."""
+        manager = ExecutionEnvironmentManager(self.config)
+        spec = manager._container_spec("python", "coding-agent-executor-python:latest")
+        pool = start_warm_container_pool(MagicMock(), MagicMock(), {})
+        pool._idle["python"] = deque([
+            PooledContainer("stale-id", "pool-stale", "python", spec),
+            PooledContainer("live-id", "pool-live", "python", spec),
+        ])
+
+        def fake_docker(args: list[str], **_: object) -> MagicMock:
+            if args[1] == "stale-id":
+                raise subprocess.CalledProcessError(1, args, stderr="No such container")
+            return MagicMock(returncode=0)
+
+        with patch.object(manager, "_run_docker_command", side_effect=fake_docker) as mock_docker:
+            pooled = manager._acquire_pooled_container("coding-agent-exec-task", "python")
+
+        assert pooled is not None
+        assert pooled.container_id == "live-id"
+        mock_docker.assert_called_with(["rename", "live-id", "coding-agent-exec-task"])
+        pool._remover.assert_called_once_with("stale-id")
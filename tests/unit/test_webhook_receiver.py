@@ -0,0 +1,256 @@
+"""Webhook受信のユニットテスト.
+
+署名検証、イベントからタスクキーへの変換、受信サーバーの応答、
+受信したタスクの再確認をテストします。
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import http.client
+import json
+import urllib.error
+import urllib.request
+from http import HTTPStatus
+
+import pytest
+
+from handlers.task_getter import TaskGetter
+from handlers.task_getter_gitlab import TaskGetterFromGitLab, TaskGitLabMergeRequest
+from tests.mocks.mock_mcp_client import MockMCPToolClient
+from webhook_receiver import (
+    WebhookReceiver,
+    parse_github_event,
+    parse_gitlab_event,
+    verify_github_signature,
+    verify_gitlab_token,
+)
+
+SECRET = "test-secret"  # noqa: S105
+BOT_LABEL = "coding agent"
+
+
+def _github_signature(body: bytes) -> str:
+    return "sha256=" + hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+
+def _github_issue_payload(action: str = "labeled", labels: list[str] | None = None) -> dict:
+    return {
+        "action": action,
+        "issue": {
+            "number": 5,
+            "state": "open",
+            "labels": [{"name": name} for name in (labels if labels is not None else [BOT_LABEL])],
+        },
+        "repository": {"name": "testrepo", "owner": {"login": "testorg"}},
+    }
+
+
+class TestSignatureVerification:
+    """署名・トークン検証のテスト."""
+
+    def test_github_signature(self) -> None:
+        """正しい署名のみ受け付ける."""
+        body = b'{"action": "opened"}'
+        assert verify_github_signature(SECRET, body, _github_signature(body)) is True
+        assert verify_github_signature(SECRET, body + b" ", _github_signature(body)) is False
+        assert verify_github_signature(SECRET, body, None) is False
+        assert verify_github_signature("", body, _github_signature(body)) is False
+
+    def test_gitlab_token(self) -> None:
+        """トークンが一致する場合のみ受け付ける."""
+        assert verify_gitlab_token(SECRET, SECRET) is True
+        assert verify_gitlab_token(SECRET, "wrong") is False
+        assert verify_gitlab_token(SECRET, None) is False
+
+
+class TestEventParsing:
+    """イベントからタスクキーへの変換のテスト."""
+
+    def test_github_issue_labeled(self) -> None:
+        """ラベル付与イベントはIssueのタスクキーになる."""
+        task_key = parse_github_event("issues", _github_issue_payload(), BOT_LABEL)
+        assert task_key == {"type": "github_issue", "owner": "testorg", "repo": "testrepo", "number": 5}
+
+    def test_github_comment_on_pull_request(self) -> None:
+        """PRへのコメントはPRのタスクキーになる."""
+        payload = _github_issue_payload(action="created")
+        payload["issue"]["pull_request"] = {"url": "https://api.github.com/repos/testorg/testrepo/pulls/5"}
+        task_key = parse_github_event("issue_comment", payload, BOT_LABEL)
+        assert task_key is not None
+        assert task_key["type"] == "github_pull_request"
+
+    def test_github_ignores_unrelated_events(self) -> None:
+        """対象外のイベント・ラベル・アクションは無視する."""
+        assert parse_github_event("ping", {"zen": "hello"}, BOT_LABEL) is None
+        assert parse_github_event("issues", _github_issue_payload(action="closed"), BOT_LABEL) is None
+        assert parse_github_event("issues", _github_issue_payload(labels=["other"]), BOT_LABEL) is None
+
+    def test_gitlab_merge_request(self) -> None:
+        """MRイベントはMRのタスクキーになる."""
+        payload = {
+            "object_kind": "merge_request",
+            "project": {"id": 10},
+            "object_attributes": {"iid": 3, "state": "opened"},
+            "labels": [{"title": BOT_LABEL}],
+        }
+        task_key = parse_gitlab_event(payload, BOT_LABEL)
+        assert task_key == {"type": "gitlab_merge_request", "project_id": 10, "mr_iid": 3}
+
+    def test_gitlab_note_on_issue(self) -> None:
+        """Issueへのコメントはラベル情報がなくても候補として扱う."""
+        payload = {
+            "object_kind": "note",
+            "project": {"id": 10},
+            "object_attributes": {"noteable_type": "Issue"},
+            "issue": {"iid": 7, "state": "opened"},
+        }
+        task_key = parse_gitlab_event(payload, BOT_LABEL)
+        assert task_key == {"type": "gitlab_issue", "project_id": 10, "issue_iid": 7}
+
+    def test_gitlab_ignores_closed_and_unlabeled(self) -> None:
+        """クローズ済み・対象ラベルなしのイベントは無視する."""
+        closed = {
+            "object_kind": "issue",
+            "project": {"id": 10},
+            "object_attributes": {"iid": 1, "state": "closed"},
+        }
+        unlabeled = {
+            "object_kind": "issue",
+            "project": {"id": 10},
+            "object_attributes": {"iid": 1, "state": "opened"},
+            "labels": [{"title": "other"}],
+        }
+        assert parse_gitlab_event(closed, BOT_LABEL) is None
+        assert parse_gitlab_event(unlabeled, BOT_LABEL) is None
+        assert parse_gitlab_event({"object_kind": "push"}, BOT_LABEL) is None
+
+
+class TestWebhookReceiver:
+    """WebhookReceiverのテスト."""
+
+    @staticmethod
+    def _make_receiver(task_source: str = "github") -> WebhookReceiver:
+        config = {
+            "webhook": {"host": "127.0.0.1", "port": 0, f"{task_source}_secret": SECRET},
+            task_source: {"bot_label": BOT_LABEL},
+        }
+        return WebhookReceiver(config, task_source)
+
+    def test_secret_required(self) -> None:
+        """シークレット未設定の場合はエラーになる."""
+        with pytest.raises(ValueError, match="Webhook secret"):
+            WebhookReceiver({"webhook": {}}, "github")
+
+    def test_handle_request_dedupes_task_keys(self) -> None:
+        """同一タスクの連続イベントは1件にまとめて取り出される."""
+        receiver = self._make_receiver()
+        body = json.dumps(_github_issue_payload()).encode()
+        headers = {"x-github-event": "issues", "x-hub-signature-256": _github_signature(body)}
+
+        assert receiver.handle_request(headers, body) == HTTPStatus.ACCEPTED
+        assert receiver.handle_request(headers, body) == HTTPStatus.ACCEPTED
+        assert len(receiver.drain_task_keys()) == 1
+        assert receiver.drain_task_keys() == []
+
+    def test_handle_request_rejects_invalid_signature(self) -> None:
+        """署名が不正なリクエストは401を返し、タスクキーを蓄積しない."""
+        receiver = self._make_receiver()
+        body = json.dumps(_github_issue_payload()).encode()
+        headers = {"x-github-event": "issues", "x-hub-signature-256": "sha256=invalid"}
+
+        assert receiver.handle_request(headers, body) == HTTPStatus.UNAUTHORIZED
+        assert receiver.drain_task_keys() == []
+
+    def test_http_server(self) -> None:
+        """HTTPサーバー経由でGitLabのイベントを受信できる."""
+        receiver = self._make_receiver("gitlab")
+        receiver.start()
+        try:
+            payload = {
+                "object_kind": "issue",
+                "project": {"id": 10},
+                "object_attributes": {"iid": 1, "state": "opened"},
+                "labels": [{"title": BOT_LABEL}],
+            }
+            request = urllib.request.Request(  # noqa: S310
+                f"http://127.0.0.1:{receiver.port}/webhook",
+                data=json.dumps(payload).encode(),
+                headers={"X-Gitlab-Token": SECRET, "Content-Type": "application/json"},
+                method="POST",
+            )
+            with urllib.request.urlopen(request, timeout=5) as response:  # noqa: S310
+                assert response.status == HTTPStatus.ACCEPTED
+
+            with pytest.raises(urllib.error.HTTPError) as exc_info:
+                urllib.request.urlopen(f"http://127.0.0.1:{receiver.port}/unknown", timeout=5)  # noqa: S310
+            assert exc_info.value.code == HTTPStatus.NOT_FOUND
+        finally:
+            receiver.stop()
+
+        assert receiver.drain_task_keys() == [
+            {"type": "gitlab_issue", "project_id": 10, "issue_iid": 1},
+        ]
+
+    def test_http_server_rejects_negative_content_length(self) -> None:
+        """負のContent-Lengthは本文を読まずに400を返す."""
+        receiver = self._make_receiver("gitlab")
+        receiver.start()
+        conn = http.client.HTTPConnection("127.0.0.1", receiver.port, timeout=5)
+        try:
+            conn.putrequest("POST", "/webhook")
+            conn.putheader("X-Gitlab-Token", SECRET)
+            conn.putheader("Content-Length", "-1")
+            conn.endheaders()
+            assert conn.getresponse().status == HTTPStatus.BAD_REQUEST
+        finally:
+            conn.close()
+            receiver.stop()
+
+        assert receiver.drain_task_keys() == []
+
+
+class TestIsPendingTask:
+    """Webhookで受信したタスクの再確認のテスト."""
+
+    def test_gitlab_pending_task(self) -> None:
+        """bot_label付与済み・ボットにアサイン済みのオープンなMRのみ対象になる."""
+        config = {
+            "gitlab": {
+                "bot_label": BOT_LABEL,
+                "bot_name": "bot",
+                "personal_access_token": "token",
+                "api_url": "https://gitlab.com/api/v4",
+            },
+        }
+        mcp_clients = {"gitlab": MockMCPToolClient({"mcp_server_name": "gitlab"})}
+        task_getter = TaskGetterFromGitLab(config=config, mcp_clients=mcp_clients)
+
+        def make_mr(**overrides: object) -> TaskGitLabMergeRequest:
+            mr = {
+                "project_id": 1,
+                "iid": 2,
+                "state": "opened",
+                "labels": [BOT_LABEL],
+                "assignees": [{"username": "bot"}],
+            }
+            mr.update(overrides)
+            return TaskGitLabMergeRequest(mr, mcp_clients["gitlab"], task_getter.gitlab_client, config)
+
+        assert task_getter.is_pending_task(make_mr()) is True
+        assert task_getter.is_pending_task(make_mr(labels=["coding agent processing"])) is False
+        assert task_getter.is_pending_task(make_mr(state="merged")) is False
+        assert task_getter.is_pending_task(make_mr(assignees=[{"username": "someone"}])) is False
+
+    def test_base_task_getter_requires_override(self) -> None:
+        """is_pending_taskを実装していないTaskGetterはNotImplementedErrorを送出する."""
+
+        class MinimalTaskGetter(TaskGetter):
+            def get_task_list(self) -> list:
+                return []
+
+            def from_task_key(self, task_key_dict: dict) -> None:
+                return None
+
+        with pytest.raises(NotImplementedError):
+            MinimalTaskGetter().is_pending_task(object())
@@ -0,0 +1,329 @@
+"""Webhookによるタスク取り込み.
+
+このモジュールは、GitHub/GitLabのWebhook(Issue・PR/MR・ラベル・コメント)を
+受信してタスクキーに変換する小さなHTTPサーバーを提供します。
+受信したタスクキーはProducerのメインスレッドで取り出され、
+ポーリング時と同じ準備処理を経てタスクキューに投入されます。
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Empty, Queue
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# タスク化の対象とするGitHubイベントとアクション
+GITHUB_TARGET_ACTIONS = {
+    "issues": {"opened", "reopened", "labeled", "assigned", "edited"},
+    "pull_request": {"opened", "reopened", "labeled", "assigned", "ready_for_review"},
+    "issue_comment": {"created"},
+}
+
+# タスク化の対象とするGitLabイベント種別(object_kind)
+GITLAB_TARGET_KINDS = {"issue", "merge_request", "note"}
+
+
+def verify_github_signature(secret: str, body: bytes, signature_header: str | None) -> bool:
+    """GitHub WebhookのX-Hub-Signature-256ヘッダーを検証する.
+
+    Args:
+        secret: Webhookに設定したシークレット
+        body: リクエストボディ(生バイト列)
+        signature_header: X-Hub-Signature-256ヘッダーの値
+
+    Returns:
+        署名が正しい場合True
+
+    """
+    if not secret or not signature_header or not signature_header.startswith("sha256="):
+        return False
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature_header)
+
+
+def verify_gitlab_token(secret: str, token_header: str | None) -> bool:
+    """GitLab WebhookのX-Gitlab-Tokenヘッダーを検証する.
+
+    Args:
+        secret: Webhookに設定したシークレットトークン
+        token_header: X-Gitlab-Tokenヘッダーの値
+
+    Returns:
+        トークンが一致する場合True
+
+    """
+    if not secret or not token_header:
+        return False
+    return hmac.compare_digest(secret, token_header)
+
+
+def _labels_contain(labels: object, label: str) -> bool | None:
+    """ペイロード内のラベル配列に指定ラベルが含まれるか判定する.
+
+    Returns:
+        含まれる場合True、含まれない場合False、ラベル情報がない場合None
+
+    """
+    if not isinstance(labels, list):
+        return None
+    names = [
+        (item.get("name") or item.get("title")) if isinstance(item, dict) else item
+        for item in labels
+    ]
+    return label in names
+
+
+def parse_github_event(
+    event_name: str | None, payload: dict[str, Any], bot_label: str,
+) -> dict[str, Any] | None:
+    """GitHub Webhookイベントをタスクキー辞書に変換する.
+
+    Args:
+        event_name: X-GitHub-Eventヘッダーの値
+        payload: イベントペイロード
+        bot_label: タスク化の対象とするラベル名
+
+    Returns:
+        タスクキー辞書、対象外のイベントの場合はNone
+
+    """
+    actions = GITHUB_TARGET_ACTIONS.get(event_name or "")
+    if actions is None or payload.get("action") not in actions:
+        return None
+
+    item = payload.get("pull_request") if event_name == "pull_request" else payload.get("issue")
+    repository = payload.get("repository") or {}
+    owner = (repository.get("owner") or {}).get("login")
+    repo = repository.get("name")
+    if not isinstance(item, dict) or not owner or not repo or item.get("number") is None:
+        return None
+
+    if item.get("state", "open") != "open":
+        return None
+    if _labels_contain(item.get("labels"), bot_label) is False:
+        return None
+
+    is_pull_request = event_name == "pull_request" or "pull_request" in item
+    return {
+        "type": "github_pull_request" if is_pull_request else "github_issue",
+        "owner": owner,
+        "repo": repo,
+        "number": item["number"],
+    }
+
+
+def parse_gitlab_event(payload: dict[str, Any], bot_label: str) -> dict[str, Any] | None:
+    """GitLab Webhookイベントをタスクキー辞書に変換する.
+
+    Args:
+        payload: イベントペイロード
+        bot_label: タスク化の対象とするラベル名
+
+    Returns:
+        タスクキー辞書、対象外のイベントの場合はNone
+
+    """
+    kind = payload.get("object_kind")
+    if kind not in GITLAB_TARGET_KINDS:
+        return None
+
+    project_id = (payload.get("project") or {}).get("id") or payload.get("project_id")
+    attributes = payload.get("object_attributes") or {}
+    if project_id is None:
+        return None
+
+    if kind == "note":
+        noteable_type = attributes.get("noteable_type")
+        if noteable_type == "Issue":
+            kind, item = "issue", payload.get("issue") or {}
+        elif noteable_type == "MergeRequest":
+            kind, item = "merge_request", payload.get("merge_request") or {}
+        else:
+            return None
+        labels = item.get("labels")
+    else:
+        item = attributes
+        labels = payload.get("labels", attributes.get("labels"))
+
+    iid = item.get("iid")
+    if iid is None or item.get("state", "opened") != "opened":
+        return None
+    if _labels_contain(labels, bot_label) is False:
+        return None
+
+    if kind == "issue":
+        return {"type": "gitlab_issue", "project_id": project_id, "issue_iid": iid}
+    return {"type": "gitlab_merge_request", "project_id": project_id, "mr_iid": iid}
+
+
+class WebhookReceiver:
+    """GitHub/GitLab Webhookの受信サーバー.
+
+    HTTPリクエストはバックグラウンドスレッドで受け付け、署名検証と
+    タスクキーへの変換のみを行います。タスクキーは内部キューに蓄積され、
+    drain_task_keys()で取り出されます。
+    """
+
+    def __init__(self, config: dict[str, Any], task_source: str) -> None:
+        """Webhook受信サーバーを初期化する.
+
+        Args:
+            config: アプリケーション設定辞書
+            task_source: タスクソース("github" または "gitlab")
+
+        Raises:
+            ValueError: シークレットが設定されていない場合
+
+        """
+        webhook_config = config.get("webhook", {})
+        self.task_source = task_source
+        self.host = webhook_config.get("host", "0.0.0.0")  # noqa: S104
+        self.port = int(webhook_config.get("port", 8090))
+        self.path = webhook_config.get("path", "/webhook")
+        self.max_body_bytes = webhook_config.get("max_body_bytes", 5 * 1024 * 1024)
+        self.secret = webhook_config.get(f"{task_source}_secret", "")
+        self.bot_label = config.get(task_source, {}).get("bot_label", "coding agent")
+
+        if not self.secret:
+            msg = (
+                f"Webhook secret is not configured. Please set 'webhook.{task_source}_secret' "
+                f"in config.yaml or set {task_source.upper()}_WEBHOOK_SECRET environment variable."
+            )
+            raise ValueError(msg)
+
+        self._pending: Queue[dict[str, Any]] = Queue()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """バックグラウンドスレッドでHTTPサーバーを起動する."""
+        self._server = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="webhook-receiver", daemon=True,
+        )
+        self._thread.start()
+        logger.info("Webhook受信サーバーを起動しました: %s:%d%s", self.host, self.port, self.path)
+
+    def stop(self) -> None:
+        """HTTPサーバーを停止する."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
+        logger.info("Webhook受信サーバーを停止しました")
+
+    def handle_request(self, headers: dict[str, str], body: bytes) -> HTTPStatus:
+        """Webhookリクエストを検証し、対象イベントであればタスクキーを蓄積する.
+
+        Args:
+            headers: リクエストヘッダー(キーは小文字)
+            body: リクエストボディ
+
+        Returns:
+            レスポンスのHTTPステータス
+
+        """
+        if self.task_source == "github":
+            if not verify_github_signature(self.secret, body, headers.get("x-hub-signature-256")):
+                logger.warning("GitHub Webhookの署名検証に失敗しました")
+                return HTTPStatus.UNAUTHORIZED
+        elif not verify_gitlab_token(self.secret, headers.get("x-gitlab-token")):
+            logger.warning("GitLab Webhookのトークン検証に失敗しました")
+            return HTTPStatus.UNAUTHORIZED
+
+        try:
+            payload = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return HTTPStatus.BAD_REQUEST
+        if not isinstance(payload, dict):
+            return HTTPStatus.BAD_REQUEST
+
+        if self.task_source == "github":
+            task_key = parse_github_event(headers.get("x-github-event"), payload, self.bot_label)
+        else:
+            task_key = parse_gitlab_event(payload, self.bot_label)
+
+        if task_key is None:
+            # pingや対象外のイベントは正常応答のみ返す
+            return HTTPStatus.OK
+
+        logger.info("Webhookからタスク候補を受信しました: %s", task_key)
+        self._pending.put(task_key)
+        return HTTPStatus.ACCEPTED
+
+    def drain_task_keys(self) -> list[dict[str, Any]]:
+        """蓄積されたタスクキーを重複を除いて取り出す.
+
+        ラベル付与とアサインなど、同一タスクに対するイベントが
+        短時間に連続して届くため、同じタスクキーは1件にまとめます。
+
+        Returns:
+            受信順のタスクキー辞書のリスト
+
+        """
+        task_keys: dict[str, dict[str, Any]] = {}
+        while True:
+            try:
+                task_key = self._pending.get_nowait()
+            except Empty:
+                break
+            task_keys.setdefault(json.dumps(task_key, sort_keys=True), task_key)
+        return list(task_keys.values())
+
+
+def _make_handler(receiver: WebhookReceiver) -> type[BaseHTTPRequestHandler]:
+    """WebhookReceiverに紐づくリクエストハンドラークラスを生成する."""
+
+    class WebhookRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            # ヘルスチェック用
+            status = HTTPStatus.OK if self.path == "/health" else HTTPStatus.NOT_FOUND
+            self._respond(status)
+
+        def do_POST(self) -> None:  # noqa: N802
+            if self.path != receiver.path:
+                self._respond(HTTPStatus.NOT_FOUND)
+                return
+            try:
+                length = int(self.headers.get("Content-Length", "0"))
+            except ValueError:
+                self._respond(HTTPStatus.BAD_REQUEST)
+                return
+            if length < 0:
+                # rfile.read(-1)は接続が閉じられるまで読み続けるため拒否する
+                self._respond(HTTPStatus.BAD_REQUEST)
+                return
+            if length > receiver.max_body_bytes:
+                self._respond(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+                return
+
+            body = self.rfile.read(length)
+            headers = {key.lower(): value for key, value in self.headers.items()}
+            try:
+                status = receiver.handle_request(headers, body)
+            except Exception:
+                logger.exception("Webhookの処理中にエラーが発生しました")
+                status = HTTPStatus.INTERNAL_SERVER_ERROR
+            self._respond(status)
+
+        def _respond(self, status: HTTPStatus) -> None:
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002, ANN401
+            logger.debug("webhook: " + format, *args)  # noqa: G003
+
+    return WebhookRequestHandler